@@ -5,7 +5,7 @@
 """
 
 import os
-from typing import List
+from typing import Dict, List
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
@@ -66,7 +66,17 @@ class Settings(BaseSettings):
     
     admin_group_chat_id: str = Field(
         default="",
-        description="Chat ID группы администраторов для уведомлений о обращениях клиентов"
+        description="Chat ID группы администраторов для уведомлений сотрудникам"
+    )
+    
+    staff_notification_routing: str = Field(
+        default="deadline=group,daily_summary=group,support_request=group_mention",
+        description="Доставка уведомлений сотрудникам по видам: group, group_mention (с упоминаниями) или individual"
+    )
+    
+    staff_group_mentions: str = Field(
+        default="",
+        description="Упоминаемые в группе сотрудники: telegram_id:Имя через запятую"
     )
     
     # ============================================
@@ -158,6 +168,31 @@ class Settings(BaseSettings):
         description="Путь к файлу логов"
     )
     
+    log_dir: str = Field(
+        default="logs",
+        description="Директория файлов логов веб-приложения и бота (web.log, bot.log)"
+    )
+    
+    log_format: str = Field(
+        default="text",
+        description="Формат вывода в консоль: text или json (файлы всегда в JSON)"
+    )
+    
+    log_max_bytes: int = Field(
+        default=10 * 1024 * 1024,
+        description="Размер файла лога, после которого он ротируется (байты)"
+    )
+    
+    log_backup_count: int = Field(
+        default=5,
+        description="Количество хранимых ротированных файлов лога"
+    )
+    
+    log_sampling: str = Field(
+        default="bot.middlewares.logging=0.1",
+        description="Доля записей ниже WARNING по логгерам (формат: logger=доля,logger=доля)"
+    )
+    
     # ============================================
     # CORS Settings
     # ============================================
@@ -194,6 +229,189 @@ class Settings(BaseSettings):
         description="Интервал обновления JWT токена (секунды)"
     )
     
+    web_api_pool_limit: int = Field(
+        default=20,
+        description="Максимум одновременных соединений бота к Web API"
+    )
+    
+    web_api_pool_limit_per_host: int = Field(
+        default=10,
+        description="Максимум одновременных соединений к одному хосту Web API"
+    )
+    
+    web_api_keepalive_timeout: int = Field(
+        default=30,
+        description="Время удержания простаивающего keep-alive соединения (секунды)"
+    )
+    
+    web_api_dns_cache_ttl: int = Field(
+        default=300,
+        description="Время кэширования DNS ответов (секунды)"
+    )
+    
+    web_api_cache_ttls: str = Field(
+        default="/api/dashboard/stats=10,/api/deadlines/expiring-soon=5,/api/deadlines/summary=5",
+        description="TTL кэша GET ответов по endpoint (endpoint=секунды через запятую, пусто - без кэша)"
+    )
+    
+    web_api_cb_failure_rate: float = Field(
+        default=0.5,
+        description="Доля ошибок в окне, при которой circuit breaker размыкается (0..1)"
+    )
+    
+    web_api_cb_slow_call_seconds: float = Field(
+        default=5.0,
+        description="Запрос к API дольше этого считается медленным (секунды)"
+    )
+    
+    web_api_cb_slow_call_rate: float = Field(
+        default=0.5,
+        description="Доля медленных запросов в окне, при которой circuit breaker размыкается (0..1)"
+    )
+    
+    web_api_cb_window_size: int = Field(
+        default=20,
+        description="Размер скользящего окна circuit breaker (запросов)"
+    )
+    
+    web_api_cb_min_calls: int = Field(
+        default=5,
+        description="Минимум запросов в окне для срабатывания circuit breaker"
+    )
+    
+    web_api_cb_open_timeout: int = Field(
+        default=30,
+        description="Время работы через БД после размыкания до пробного запроса (секунды)"
+    )
+    
+    web_api_cb_probe_interval: int = Field(
+        default=10,
+        description="Интервал фоновой проверки /health при разомкнутом circuit breaker (секунды)"
+    )
+    
+    # ============================================
+    # Bot FSM Storage
+    # ============================================
+    bot_fsm_storage_path: str = Field(
+        default="database/bot_fsm.db",
+        description="Файл SQLite для хранения состояний диалогов бота (FSM)"
+    )
+    
+    bot_fsm_state_ttl: int = Field(
+        default=3600,
+        description="Время жизни брошенного диалога бота (секунды)"
+    )
+    
+    bot_fsm_flush_interval: float = Field(
+        default=1.0,
+        description="Интервал пакетной записи состояний FSM на диск (секунды)"
+    )
+    
+    # ============================================
+    # Statistics Snapshots
+    # ============================================
+    stats_snapshot_time: str = Field(
+        default="23:55",
+        description="Время ежедневного снимка статистики (ЧЧ:ММ)"
+    )
+    
+    # ============================================
+    # Broadcasts
+    # ============================================
+    broadcast_rate_per_second: float = Field(
+        default=20,
+        description="Максимум сообщений рассылки в секунду (лимит Telegram ~30)"
+    )
+    
+    broadcast_batch_size: int = Field(
+        default=100,
+        description="Получателей рассылки в одной пачке (после пачки сохраняется прогресс)"
+    )
+    
+    broadcast_poll_interval: float = Field(
+        default=5,
+        description="Интервал проверки новых заданий рассылки ботом (секунды)"
+    )
+    
+    # ============================================
+    # Bot Export
+    # ============================================
+    bot_export_max_bytes: int = Field(
+        default=200 * 1024 * 1024,
+        description="Максимальный размер скачиваемого файла экспорта (байт)"
+    )
+    
+    bot_export_spool_size: int = Field(
+        default=1024 * 1024,
+        description="Размер файла экспорта, после которого он пишется во временный файл на диске (байт)"
+    )
+    
+    bot_export_file_id_ttl: int = Field(
+        default=300,
+        description="Время повторного использования file_id отправленного экспорта (секунды)"
+    )
+    
+    # ============================================
+    # Bot Event Loop
+    # ============================================
+    bot_db_max_workers: int = Field(
+        default=8,
+        description="Потоков для запросов бота к БД (не больше размера пула соединений)"
+    )
+    
+    bot_loop_lag_interval: float = Field(
+        default=0.5,
+        description="Интервал замера задержки event loop бота (секунды)"
+    )
+    
+    bot_loop_lag_warning: float = Field(
+        default=0.2,
+        description="Задержка event loop, после которой пишется предупреждение в лог (секунды)"
+    )
+    
+    # ============================================
+    # Bot Read Replica
+    # ============================================
+    bot_replica_enabled: bool = Field(
+        default=True,
+        description="Отвечать на команды чтения из локальной копии дедлайнов в памяти"
+    )
+    
+    bot_replica_sync_interval: float = Field(
+        default=5.0,
+        description="Интервал запроса изменений дедлайнов у Web API (секунды)"
+    )
+    
+    bot_replica_max_lag: float = Field(
+        default=60.0,
+        description="Максимальная задержка синхронизации, при которой копия используется (секунды)"
+    )
+    
+    bot_render_cache_max_clients: int = Field(
+        default=1000,
+        description="Клиентов в кэше готовых сообщений со списками дедлайнов"
+    )
+    
+    bot_inline_results_limit: int = Field(
+        default=20,
+        description="Максимум клиентов в ответе inline-поиска"
+    )
+    
+    bot_inline_cache_ttl: float = Field(
+        default=30.0,
+        description="Время жизни результатов inline-поиска в кэше бота (секунды)"
+    )
+    
+    bot_inline_cache_time: int = Field(
+        default=5,
+        description="cache_time ответа на inline-запрос: кэш результатов на стороне Telegram (секунды)"
+    )
+    
+    bot_inline_debounce: float = Field(
+        default=0.3,
+        description="Пауза перед поиском в БД, если копия не синхронизирована: запросы, заменённые следующим нажатием, не выполняются (секунды)"
+    )
+    
     @property
     def cors_origins_list(self) -> List[str]:
         """
@@ -227,6 +445,69 @@ class Settings(BaseSettings):
         """
         return [int(day.strip()) for day in self.notification_days.split(",")]
     
+    @property
+    def web_api_cache_ttls_dict(self) -> Dict[str, float]:
+        """
+        Преобразование строки TTL кэша Web API в словарь
+        
+        Returns:
+            Dict[str, float]: {endpoint: TTL в секундах}
+        """
+        ttls = {}
+        for item in self.web_api_cache_ttls.split(","):
+            if '=' not in item:
+                continue
+            endpoint, ttl = item.rsplit('=', 1)
+            ttls[endpoint.strip()] = float(ttl.strip())
+        return ttls
+    
+    @property
+    def log_sampling_dict(self) -> Dict[str, float]:
+        """
+        Преобразование строки выборочного логирования в словарь
+        
+        Returns:
+            Dict[str, float]: {имя логгера: доля сохраняемых записей}
+        """
+        rates = {}
+        for item in self.log_sampling.split(","):
+            if '=' not in item:
+                continue
+            name, rate = item.rsplit('=', 1)
+            rates[name.strip()] = float(rate.strip())
+        return rates
+    
+    @property
+    def staff_notification_routing_dict(self) -> Dict[str, str]:
+        """
+        Преобразование строки маршрутизации уведомлений сотрудникам в словарь
+        
+        Returns:
+            Dict[str, str]: {вид уведомления: стратегия}
+        """
+        routing = {}
+        for item in self.staff_notification_routing.split(","):
+            if '=' not in item:
+                continue
+            kind, strategy = item.split('=', 1)
+            routing[kind.strip()] = strategy.strip()
+        return routing
+    
+    @property
+    def staff_group_mentions_dict(self) -> Dict[int, str]:
+        """
+        Преобразование строки упоминаний сотрудников в словарь
+        
+        Returns:
+            Dict[int, str]: {Telegram ID: имя} (имя может быть пустым)
+        """
+        mentions = {}
+        for item in self.staff_group_mentions.split(","):
+            telegram_id, _, name = item.partition(':')
+            if telegram_id.strip():
+                mentions[int(telegram_id.strip())] = name.strip()
+        return mentions
+    
     @property
     def telegram_admin_ids_list(self) -> List[int]:
         """
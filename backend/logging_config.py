@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+Настройка логирования веб-приложения и бота
+
+Запись в файлы и консоль выполняет QueueListener в отдельном потоке: вызов
+logger.info() в event loop только кладёт запись в очередь. Файлы - JSON по
+строке на запись, в каждую запись добавляются request_id (веб) и update_id
+(бот) текущего запроса.
+
+Файл одного процесса (бот, отдельный планировщик) ротируется по размеру в
+самом процессе. Файл, в который пишут несколько процессов (воркеры uvicorn),
+ротирует logrotate: процессы только дописывают и переоткрывают файл после
+переименования (WatchedFileHandler) - ротация в каждом воркере переименовывала
+бы файлы из-под других и теряла записи.
+
+Логирование настраивается в точке входа (startup, main), а не при импорте.
+"""
+
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+from datetime import datetime
+from typing import Dict, Optional
+
+from backend.config import settings
+
+# Идентификаторы текущего HTTP запроса / обновления Telegram
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('request_id', default=None)
+update_id_var: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar('update_id', default=None)
+
+# Атрибуты LogRecord, которые не выводятся как дополнительные поля
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {
+    'message', 'asctime', 'service', 'request_id', 'update_id'
+}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class ContextFilter(logging.Filter):
+    """Добавляет в запись service, request_id и update_id (в потоке, где вызван логгер)"""
+
+    def __init__(self, service: str):
+        super().__init__()
+        self.service = service
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.service = self.service
+        record.request_id = request_id_var.get()
+        record.update_id = update_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Выборочная запись частых сообщений ниже WARNING
+
+    Правила - доля сохраняемых записей по префиксу имени логгера,
+    применяется самое длинное совпадение
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        for prefix, rate in self.rates:
+            if record.name == prefix or record.name.startswith(prefix + '.'):
+                return random.random() < rate
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна JSON строка на запись"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'service': getattr(record, 'service', None),
+            'message': record.getMessage()
+        }
+        for key in ('request_id', 'update_id'):
+            if getattr(record, key, None) is not None:
+                data[key] = getattr(record, key)
+
+        # Поля из extra={...}
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and key not in data:
+                data[key] = value
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data['exc'] = record.exc_text
+
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler, сохраняющий трассировку отдельно от текста сообщения"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(
+    service: str,
+    filename: Optional[str] = None,
+    shared: bool = False
+) -> logging.handlers.QueueListener:
+    """
+    Настройка корневого логгера процесса
+
+    Args:
+        service: Имя сервиса в записях ('web', 'bot')
+        filename: Файл в settings.log_dir (без файла - только консоль)
+        shared: В файл пишут несколько процессов - без ротации по размеру,
+            файл ротирует logrotate
+
+    Returns:
+        QueueListener: Запущенный поток записи (остановить - shutdown_logging)
+    """
+    global _listener
+
+    if _listener is not None:
+        return _listener
+
+    text_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    json_formatter = JsonFormatter()
+
+    console = logging.StreamHandler()
+    console.setFormatter(json_formatter if settings.log_format == 'json' else text_formatter)
+    handlers = [console]
+
+    if filename:
+        os.makedirs(settings.log_dir, exist_ok=True)
+        path = os.path.join(settings.log_dir, filename)
+        if shared:
+            file_handler = logging.handlers.WatchedFileHandler(path, encoding='utf-8')
+        else:
+            file_handler = logging.handlers.RotatingFileHandler(
+                path,
+                maxBytes=settings.log_max_bytes,
+                backupCount=settings.log_backup_count,
+                encoding='utf-8'
+            )
+        file_handler.setFormatter(json_formatter)
+        handlers.append(file_handler)
+
+    queue_handler = _QueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(ContextFilter(service))
+    queue_handler.addFilter(SamplingFilter(settings.log_sampling_dict))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(settings.log_level.upper())
+
+    _listener = logging.handlers.QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging():
+    """Запись оставшихся в очереди сообщений и остановка потока логирования"""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+# Экспорт
+__all__ = [
+    'request_id_var',
+    'update_id_var',
+    'ContextFilter',
+    'SamplingFilter',
+    'JsonFormatter',
+    'setup_logging',
+    'shutdown_logging'
+]
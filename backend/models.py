@@ -7,7 +7,7 @@ constraints, and automatic timestamp management.
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, Date, DateTime, Boolean, ForeignKey, CheckConstraint, Index
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, Boolean, ForeignKey, CheckConstraint, Index, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from backend.database import Base
@@ -493,3 +493,128 @@ class NotificationLog(Base):
             'error_message': self.error_message,
             'sent_at': self.sent_at.isoformat() if self.sent_at else None
         }
+
+
+class BroadcastJob(Base):
+    """
+    Announcement broadcast to Telegram-connected clients
+    
+    Created by the web API or the bot /broadcast command; the bot's broadcast
+    sender selects recipients, sends the message with throttling and keeps
+    the progress counters up to date.
+    
+    Attributes:
+        id: Unique job identifier
+        message_text: Message to send (HTML)
+        filters: Recipient filter {"ofd_provider_id", "deadline_type_id", "region"}
+        status: pending, running, paused, cancelled, completed, failed
+        total: Number of selected recipients
+        delivered: Messages delivered
+        blocked: Recipients who blocked the bot or deleted their account
+        failed: Other delivery errors
+        created_by: Reference to users.id of the author (NULL if unknown)
+        notify_chat_id: Telegram chat that receives the final report
+        error_message: Error details if the job failed
+        created_at / started_at / finished_at: Lifecycle timestamps
+    
+    Relationships:
+        recipients: Per-recipient delivery state
+    """
+    __tablename__ = "broadcast_jobs"
+    
+    # Primary Key
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    
+    # Broadcast Information
+    message_text = Column(Text, nullable=False)
+    filters = Column(JSON, nullable=False, default=dict)
+    status = Column(String(20), nullable=False, default='pending', index=True)
+    
+    # Progress Counters
+    total = Column(Integer, nullable=False, default=0)
+    delivered = Column(Integer, nullable=False, default=0)
+    blocked = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    
+    # Author
+    created_by = Column(Integer, ForeignKey('users.id', ondelete='SET NULL'), nullable=True)
+    notify_chat_id = Column(String(50), nullable=True)
+    error_message = Column(Text, nullable=True)
+    
+    # Timestamps
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    
+    # Relationships
+    recipients = relationship("BroadcastRecipient", back_populates="job", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        CheckConstraint(
+            "status IN ('pending', 'running', 'paused', 'cancelled', 'completed', 'failed')",
+            name='check_broadcast_job_status'
+        ),
+    )
+    
+    def __repr__(self):
+        return f"<BroadcastJob(id={self.id}, status='{self.status}', delivered={self.delivered}/{self.total})>"
+    
+    def to_dict(self):
+        """Convert model instance to dictionary"""
+        return {
+            'id': self.id,
+            'message_text': self.message_text,
+            'filters': self.filters or {},
+            'status': self.status,
+            'total': self.total,
+            'delivered': self.delivered,
+            'blocked': self.blocked,
+            'failed': self.failed,
+            'pending': max(self.total - self.delivered - self.blocked - self.failed, 0),
+            'created_by': self.created_by,
+            'notify_chat_id': self.notify_chat_id,
+            'error_message': self.error_message,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+class BroadcastRecipient(Base):
+    """
+    Delivery state of a broadcast for one client
+    
+    Attributes:
+        id: Unique identifier
+        job_id: Reference to broadcast_jobs.id
+        user_id: Reference to users.id (client)
+        telegram_id: Chat to send to (copied at selection time)
+        status: pending, sending (batch in flight), delivered, blocked, failed
+        error_message: Error details if not delivered
+        sent_at: Delivery attempt timestamp
+    """
+    __tablename__ = "broadcast_recipients"
+    
+    # Primary Key
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    
+    # Foreign Keys
+    job_id = Column(Integer, ForeignKey('broadcast_jobs.id', ondelete='CASCADE'), nullable=False)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    
+    # Delivery State
+    telegram_id = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False, default='pending')
+    error_message = Column(Text, nullable=True)
+    sent_at = Column(DateTime, nullable=True)
+    
+    # Relationships
+    job = relationship("BroadcastJob", back_populates="recipients")
+    
+    # Composite Index: pending recipients of a job are read in batches
+    __table_args__ = (
+        Index('ix_broadcast_recipients_job_status', 'job_id', 'status', 'id'),
+    )
+    
+    def __repr__(self):
+        return f"<BroadcastRecipient(job_id={self.job_id}, user_id={self.user_id}, status='{self.status}')>"
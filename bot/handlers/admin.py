@@ -9,11 +9,14 @@ from datetime import datetime
 from aiogram import Router, Bot
 from aiogram.filters import Command
 from aiogram.types import Message
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, contains_eager
 
 from bot.services.notifier import process_deadline_notifications
-from bot.services.formatter import format_api_statistics, format_health_status
+from bot.services.formatter import format_api_statistics, format_health_status, format_event_loop_health, format_replica_health
 from bot.services import checker
+from bot.services.pagination import DeadlinePageCursor, render_deadlines_page, VIEW_FILTER
+from bot.services.db_executor import run_db, get_db_executor_metrics
+from bot.services.loop_monitor import get_loop_lag_metrics
 from backend.config import settings
 from backend.models import User
 
@@ -45,6 +48,42 @@ def find_client_by_name(db_session: Session, search_query: str):
     return clients
 
 
+def get_client_by_id(db_session: Session, user_id: int):
+    """
+    Получение клиента по ID
+    
+    Args:
+        db_session: Сессия базы данных
+        user_id: ID клиента
+        
+    Returns:
+        User или None
+    """
+    return db_session.query(User).filter(
+        User.id == user_id,
+        User.role == 'client'
+    ).first()
+
+
+def get_client_active_deadlines(db_session: Session, user_id: int):
+    """
+    Активные дедлайны клиента
+    
+    Args:
+        db_session: Сессия базы данных
+        user_id: ID клиента
+        
+    Returns:
+        Список дедлайнов
+    """
+    from backend.models import Deadline
+    
+    return db_session.query(Deadline).filter(
+        Deadline.user_id == user_id,
+        Deadline.status == 'active'
+    ).all()
+
+
 @router.message(Command('check'))
 async def cmd_check(
     message: Message,
@@ -147,6 +186,65 @@ async def cmd_check(
         )
 
 
+def _collect_status_stats(db_session: Session) -> dict:
+    """
+    Статистика для /status напрямую из БД (выполняется через run_db)
+    
+    Args:
+        db_session: Сессия базы данных
+        
+    Returns:
+        dict: Счётчики клиентов и дедлайнов по статусам
+    """
+    from backend.models import Deadline
+    from datetime import date
+    
+    stats = {}
+    
+    # Количество активных клиентов
+    stats['active_clients_count'] = db_session.query(User).filter(
+        User.role == 'client',
+        User.is_active == True
+    ).count()
+    
+    stats['total_clients_count'] = db_session.query(User).filter(
+        User.role == 'client'
+    ).count()
+    
+    # Количество дедлайнов по статусам
+    all_deadlines = db_session.query(Deadline).filter(
+        Deadline.status == 'active'
+    ).all()
+    
+    stats['active_deadlines_count'] = len(all_deadlines)
+    stats['total_deadlines_count'] = db_session.query(Deadline).count()
+    
+    # Подсчёт по статусам
+    today = date.today()
+    green_count = 0
+    yellow_count = 0
+    red_count = 0
+    expired_count = 0
+    
+    for deadline in all_deadlines:
+        days_remaining = (deadline.expiration_date - today).days
+        
+        if days_remaining < 0:
+            expired_count += 1
+        elif days_remaining < 7:
+            red_count += 1
+        elif days_remaining < 14:
+            yellow_count += 1
+        else:
+            green_count += 1
+    
+    stats['status_green'] = green_count
+    stats['status_yellow'] = yellow_count
+    stats['status_red'] = red_count
+    stats['status_expired'] = expired_count
+    return stats
+
+
 @router.message(Command('status'))
 async def cmd_status(
     message: Message,
@@ -196,6 +294,7 @@ async def cmd_status(
                 # Добавляем время ответа API
                 stats['api_response_time'] = response_time
                 stats['data_source'] = 'api'
+                stats['circuit_breaker'] = checker.get_api_circuit_state()
                 
                 # Форматируем статистику из API
                 status_text = format_api_statistics(stats)
@@ -207,54 +306,10 @@ async def cmd_status(
             except Exception as api_error:
                 logger.warning(f"⚠️ Web API недоступен для /status, используем fallback: {api_error}")
         
-        # Fallback: получаем статистику из БД напрямую
-        from backend.models import User, Deadline
-        from datetime import date
-        
-        stats = {}
-        
-        # Количество активных клиентов
-        stats['active_clients_count'] = db_session.query(User).filter(
-            User.role == 'client',
-            User.is_active == True
-        ).count()
-        
-        stats['total_clients_count'] = db_session.query(User).filter(
-            User.role == 'client'
-        ).count()
-        
-        # Количество дедлайнов по статусам
-        all_deadlines = db_session.query(Deadline).filter(
-            Deadline.status == 'active'
-        ).all()
-        
-        stats['active_deadlines_count'] = len(all_deadlines)
-        stats['total_deadlines_count'] = db_session.query(Deadline).count()
-        
-        # Подсчёт по статусам
-        today = date.today()
-        green_count = 0
-        yellow_count = 0
-        red_count = 0
-        expired_count = 0
-        
-        for deadline in all_deadlines:
-            days_remaining = (deadline.expiration_date - today).days
-            
-            if days_remaining < 0:
-                expired_count += 1
-            elif days_remaining < 7:
-                red_count += 1
-            elif days_remaining < 14:
-                yellow_count += 1
-            else:
-                green_count += 1
-        
-        stats['status_green'] = green_count
-        stats['status_yellow'] = yellow_count
-        stats['status_red'] = red_count
-        stats['status_expired'] = expired_count
+        # Fallback: получаем статистику из БД напрямую (в пуле потоков)
+        stats = await run_db(_collect_status_stats, db_session)
         stats['data_source'] = 'database'
+        stats['circuit_breaker'] = checker.get_api_circuit_state()
         
         # Форматируем статистику
         status_text = format_api_statistics(stats)
@@ -314,7 +369,9 @@ async def cmd_health(
         if not api_client:
             await status_msg.edit_text(
                 "⚠️ <b>Web API клиент не инициализирован</b>\n\n"
-                "Бот работает в режиме прямого доступа к базе данных.",
+                "Бот работает в режиме прямого доступа к базе данных.\n"
+                + format_event_loop_health(get_loop_lag_metrics(), get_db_executor_metrics())
+                + format_replica_health(checker.get_read_replica_metrics()),
                 parse_mode='HTML'
             )
             return
@@ -334,7 +391,7 @@ async def cmd_health(
         # Проверяем доступность API
         try:
             start_time = time.time()
-            stats = await api_client.get_dashboard_stats()
+            stats = await api_client.get_dashboard_stats(use_cache=False)
             response_time = int((time.time() - start_time) * 1000)
             
             health_data['api_available'] = True
@@ -344,6 +401,15 @@ async def cmd_health(
         except Exception as api_error:
             health_data['error'] = str(api_error)
         
+        # Метрики пула соединений и кэша
+        health_data['client_metrics'] = api_client.get_metrics()
+        health_data['circuit_breaker'] = checker.get_api_circuit_state()
+        
+        # Задержка event loop и пул потоков БД
+        health_data['loop_lag'] = get_loop_lag_metrics()
+        health_data['db_executor'] = get_db_executor_metrics()
+        health_data['replica'] = checker.get_read_replica_metrics()
+        
         # Форматируем результат проверки
         health_text = format_health_status(health_data)
         
@@ -417,36 +483,17 @@ async def cmd_filter(
         from backend.models import User, Deadline, DeadlineType
         from datetime import date
         
-        # Строим базовый запрос
-        query = db_session.query(
-            Deadline.id.label('deadline_id'),
-            User.company_name.label('client_name'),
-            User.inn.label('client_inn'),
-            DeadlineType.type_name.label('deadline_type_name'),
-            Deadline.expiration_date.label('expiration_date'),
-            User.id.label('user_id')
-        ).join(
-            User, Deadline.user_id == User.id
-        ).join(
-            DeadlineType, Deadline.deadline_type_id == DeadlineType.id
-        ).filter(
-            Deadline.status == 'active',
-            User.is_active == True,
-            User.role == 'client'
-        )
+        filter_client_id = None
         
         # Применяем фильтр
         if filter_param.lower() != 'all':
             # Пробуем найти по ID
             try:
                 user_id = int(filter_param)
-                query = query.filter(User.id == user_id)
+                filter_client_id = user_id
                 
                 # Проверяем существование клиента
-                client = db_session.query(User).filter(
-                    User.id == user_id,
-                    User.role == 'client'
-                ).first()
+                client = await run_db(get_client_by_id, db_session, user_id)
                 
                 if not client:
                     await status_msg.edit_text(
@@ -460,7 +507,7 @@ async def cmd_filter(
                 
             except ValueError:
                 # Не число - ищем по названию компании
-                found_clients = find_client_by_name(db_session, filter_param)
+                found_clients = await run_db(find_client_by_name, db_session, filter_param)
                 
                 if not found_clients:
                     await status_msg.edit_text(
@@ -477,7 +524,7 @@ async def cmd_filter(
                 # Если найден один клиент - фильтруем по нему
                 if len(found_clients) == 1:
                     client = found_clients[0]
-                    query = query.filter(User.id == client.id)
+                    filter_client_id = client.id
                     filter_title = f"Дедлайны клиента: {client.company_name}"
                     
                 # Если найдено несколько - показываем список для выбора
@@ -503,10 +550,11 @@ async def cmd_filter(
         else:
             filter_title = "Все активные дедлайны"
         
-        # Выполняем запрос
-        results = query.order_by(Deadline.expiration_date).all()
+        # Первая страница результатов (остальные - кнопками ◀️/▶️)
+        cursor = DeadlinePageCursor(VIEW_FILTER, client_id=filter_client_id)
+        message_text, keyboard, total = await render_deadlines_page(cursor)
         
-        if not results:
+        if total == 0:
             await status_msg.edit_text(
                 f"📭 <b>{filter_title}</b>\n\n"
                 "Дедлайны не найдены.",
@@ -514,41 +562,8 @@ async def cmd_filter(
             )
             return
         
-        # Форматируем результаты
-        today = date.today()
-        deadlines = []
-        
-        for row in results:
-            days_remaining = (row.expiration_date - today).days
-            
-            # Определяем статус
-            if days_remaining < 0:
-                status = 'expired'
-            elif days_remaining < 7:
-                status = 'red'
-            elif days_remaining < 14:
-                status = 'yellow'
-            else:
-                status = 'green'
-            
-            deadlines.append({
-                'deadline_id': row.deadline_id,
-                'client_name': row.client_name or 'Неизвестно',
-                'client_inn': row.client_inn or 'Неизвестно',
-                'deadline_type_name': row.deadline_type_name,
-                'expiration_date': row.expiration_date,
-                'days_remaining': days_remaining,
-                'status': status,
-                'user_id': row.user_id
-            })
-        
-        # Форматируем список
-        from bot.services.formatter import format_deadline_list
-        message_text = format_deadline_list(deadlines, title=f"🔍 {filter_title}")
-        message_text += f"\n\n📊 <b>Всего:</b> {len(deadlines)} дедлайнов"
-        
-        await status_msg.edit_text(message_text, parse_mode='HTML')
-        logger.info(f"✅ Фильтр выполнен: найдено {len(deadlines)} дедлайнов")
+        await status_msg.edit_text(message_text, parse_mode='HTML', reply_markup=keyboard)
+        logger.info(f"✅ Фильтр выполнен: найдено {total} дедлайнов")
         
     except Exception as e:
         logger.error(f"❌ Ошибка при /filter: {e}")
@@ -618,7 +633,7 @@ async def cmd_client(
         # Не число - ищем по названию
         logger.info(f"👤 /client от {user_role} {user.id}: поиск='{search_param}'")
         
-        found_clients = find_client_by_name(db_session, search_param)
+        found_clients = await run_db(find_client_by_name, db_session, search_param)
         
         if not found_clients:
             await message.answer(
@@ -664,10 +679,7 @@ async def cmd_client(
         
         # Получаем данные клиента (если ещё не нашли по названию)
         if not client:
-            client = db_session.query(User).filter(
-                User.id == user_id,
-                User.role == 'client'
-            ).first()
+            client = await run_db(get_client_by_id, db_session, user_id)
         
         if not client:
             await status_msg.edit_text(
@@ -711,10 +723,7 @@ async def cmd_client(
         # Статистика по дедлайнам
         card_text += f"\n📊 <b>Дедлайны:</b>\n"
         
-        deadlines = db_session.query(Deadline).filter(
-            Deadline.user_id == user_id,
-            Deadline.status == 'active'
-        ).all()
+        deadlines = await run_db(get_client_active_deadlines, db_session, user_id)
         
         if deadlines:
             today = date.today()
@@ -777,6 +786,21 @@ async def cmd_client(
         )
 
 
+def _get_client_deadline(db_session: Session, user_id: int, deadline_id: int):
+    """Активный дедлайн клиента вместе с типом (выполняется через run_db)"""
+    from backend.models import Deadline, DeadlineType
+    
+    return db_session.query(Deadline).join(
+        DeadlineType, Deadline.deadline_type_id == DeadlineType.id
+    ).options(
+        contains_eager(Deadline.deadline_type)
+    ).filter(
+        Deadline.id == deadline_id,
+        Deadline.user_id == user_id,
+        Deadline.status == 'active'
+    ).first()
+
+
 @router.message(Command('notify'))
 async def cmd_notify(
     message: Message,
@@ -842,10 +866,7 @@ async def cmd_notify(
         from bot.services.formatter import format_deadline_notification
         
         # Проверяем существование клиента
-        client = db_session.query(User).filter(
-            User.id == user_id,
-            User.role == 'client'
-        ).first()
+        client = await run_db(get_client_by_id, db_session, user_id)
         
         if not client:
             await status_msg.edit_text(
@@ -866,13 +887,7 @@ async def cmd_notify(
             return
         
         # Проверяем существование дедлайна
-        deadline = db_session.query(Deadline).join(
-            DeadlineType, Deadline.deadline_type_id == DeadlineType.id
-        ).filter(
-            Deadline.id == deadline_id,
-            Deadline.user_id == user_id,
-            Deadline.status == 'active'
-        ).first()
+        deadline = await run_db(_get_client_deadline, db_session, user_id, deadline_id)
         
         if not deadline:
             await status_msg.edit_text(
@@ -914,7 +929,8 @@ async def cmd_notify(
         
         if success:
             # Записываем в лог
-            log_notification(
+            await run_db(
+                log_notification,
                 deadline_id=deadline.id,
                 recipient_id=client.telegram_id,
                 days=days_remaining,
@@ -933,7 +949,8 @@ async def cmd_notify(
             logger.info(f"✅ Ручное уведомление отправлено: deadline_id={deadline_id}, user_id={user_id}")
         else:
             # Записываем ошибку в лог
-            log_notification(
+            await run_db(
+                log_notification,
                 deadline_id=deadline.id,
                 recipient_id=client.telegram_id,
                 days=days_remaining,
@@ -963,6 +980,123 @@ async def cmd_notify(
         )
 
 
+def _build_stats_text(db_session: Session) -> str:
+    """
+    Текст расширенной статистики для /stats (выполняется через run_db)
+    
+    Args:
+        db_session: Сессия базы данных
+        
+    Returns:
+        str: Отформатированная статистика
+    """
+    from backend.models import User, Deadline, NotificationLog
+    from datetime import date, timedelta
+    
+    stats_text = "<b>📊 Статистика системы</b>\n\n"
+    
+    # Клиенты
+    stats_text += "👥 <b>Клиенты:</b>\n"
+    total_clients = db_session.query(User).filter(User.role == 'client').count()
+    active_clients = db_session.query(User).filter(
+        User.role == 'client',
+        User.is_active == True
+    ).count()
+    telegram_connected = db_session.query(User).filter(
+        User.role == 'client',
+        User.telegram_id.isnot(None)
+    ).count()
+    
+    stats_text += f"   Всего: <b>{total_clients}</b>\n"
+    stats_text += f"   Активные: <b>{active_clients}</b>\n"
+    stats_text += f"   Привязаны к Telegram: <b>{telegram_connected}</b> ({int(telegram_connected / max(total_clients, 1) * 100)}%)\n\n"
+    
+    # Дедлайны
+    stats_text += "📅 <b>Дедлайны:</b>\n"
+    total_deadlines = db_session.query(Deadline).count()
+    active_deadlines = db_session.query(Deadline).filter(
+        Deadline.status == 'active'
+    ).count()
+    
+    stats_text += f"   Всего: <b>{total_deadlines}</b>\n"
+    stats_text += f"   Активные: <b>{active_deadlines}</b>\n\n"
+    
+    # Статусы дедлайнов
+    stats_text += "🚦 <b>Статусы активных дедлайнов:</b>\n"
+    
+    active_deadlines_list = db_session.query(Deadline).filter(
+        Deadline.status == 'active'
+    ).all()
+    
+    today = date.today()
+    green_count = 0
+    yellow_count = 0
+    red_count = 0
+    expired_count = 0
+    
+    for deadline in active_deadlines_list:
+        days_remaining = (deadline.expiration_date - today).days
+        if days_remaining < 0:
+            expired_count += 1
+        elif days_remaining < 7:
+            red_count += 1
+        elif days_remaining < 14:
+            yellow_count += 1
+        else:
+            green_count += 1
+    
+    stats_text += f"   🟢 Безопасно (&gt;14 дней): <b>{green_count}</b>\n"
+    stats_text += f"   🟡 Внимание (7-14 дней): <b>{yellow_count}</b>\n"
+    stats_text += f"   🔴 Критично (&lt;7 дней): <b>{red_count}</b>\n"
+    stats_text += f"   ❌ Просроченные: <b>{expired_count}</b>\n\n"
+    
+    # Уведомления за последние 30 дней
+    stats_text += "📬 <b>Уведомления (за 30 дней):</b>\n"
+    
+    thirty_days_ago = datetime.now() - timedelta(days=30)
+    
+    total_notifications = db_session.query(NotificationLog).filter(
+        NotificationLog.sent_at >= thirty_days_ago
+    ).count()
+    
+    sent_notifications = db_session.query(NotificationLog).filter(
+        NotificationLog.sent_at >= thirty_days_ago,
+        NotificationLog.status == 'sent'
+    ).count()
+    
+    failed_notifications = db_session.query(NotificationLog).filter(
+        NotificationLog.sent_at >= thirty_days_ago,
+        NotificationLog.status == 'failed'
+    ).count()
+    
+    stats_text += f"   Всего отправлено: <b>{total_notifications}</b>\n"
+    stats_text += f"   Успешно: <b>{sent_notifications}</b> ({int(sent_notifications / max(total_notifications, 1) * 100)}%)\n"
+    stats_text += f"   Ошибки: <b>{failed_notifications}</b>\n\n"
+    
+    # Ближайшие дедлайны (7 дней)
+    stats_text += "⏰ <b>Ближайшие дедлайны (7 дней):</b>\n"
+    
+    upcoming_date = today + timedelta(days=7)
+    upcoming_deadlines = db_session.query(Deadline).filter(
+        Deadline.status == 'active',
+        Deadline.expiration_date >= today,
+        Deadline.expiration_date <= upcoming_date
+    ).count()
+    
+    stats_text += f"   Истекают в ближайшие 7 дней: <b>{upcoming_deadlines}</b>\n\n"
+    
+    # Настройки системы
+    stats_text += "⚙️ <b>Настройки:</b>\n"
+    stats_text += f"   Проверка дедлайнов: <b>{settings.notification_check_time}</b>\n"
+    stats_text += f"   Дни уведомлений: <b>{', '.join(map(str, settings.notification_days_list))}</b>\n"
+    stats_text += f"   Часовой пояс: <b>{settings.notification_timezone}</b>\n\n"
+    
+    # Временная метка
+    timestamp = datetime.now().strftime('%d.%m.%Y %H:%M')
+    stats_text += f"🕒 <b>Обновлено:</b> {timestamp}"
+    return stats_text
+
+
 @router.message(Command('stats'))
 async def cmd_stats(
     message: Message,
@@ -998,111 +1132,8 @@ async def cmd_stats(
     status_msg = await message.answer("🔄 Сбор статистики...", parse_mode='HTML')
     
     try:
-        from backend.models import User, Deadline, NotificationLog
-        from datetime import date, timedelta
-        from sqlalchemy import func
-        
-        stats_text = "<b>📊 Статистика системы</b>\n\n"
-        
-        # Клиенты
-        stats_text += "👥 <b>Клиенты:</b>\n"
-        total_clients = db_session.query(User).filter(User.role == 'client').count()
-        active_clients = db_session.query(User).filter(
-            User.role == 'client',
-            User.is_active == True
-        ).count()
-        telegram_connected = db_session.query(User).filter(
-            User.role == 'client',
-            User.telegram_id.isnot(None)
-        ).count()
-        
-        stats_text += f"   Всего: <b>{total_clients}</b>\n"
-        stats_text += f"   Активные: <b>{active_clients}</b>\n"
-        stats_text += f"   Привязаны к Telegram: <b>{telegram_connected}</b> ({int(telegram_connected / max(total_clients, 1) * 100)}%)\n\n"
-        
-        # Дедлайны
-        stats_text += "📅 <b>Дедлайны:</b>\n"
-        total_deadlines = db_session.query(Deadline).count()
-        active_deadlines = db_session.query(Deadline).filter(
-            Deadline.status == 'active'
-        ).count()
-        
-        stats_text += f"   Всего: <b>{total_deadlines}</b>\n"
-        stats_text += f"   Активные: <b>{active_deadlines}</b>\n\n"
-        
-        # Статусы дедлайнов
-        stats_text += "🚦 <b>Статусы активных дедлайнов:</b>\n"
-        
-        active_deadlines_list = db_session.query(Deadline).filter(
-            Deadline.status == 'active'
-        ).all()
-        
-        today = date.today()
-        green_count = 0
-        yellow_count = 0
-        red_count = 0
-        expired_count = 0
-        
-        for deadline in active_deadlines_list:
-            days_remaining = (deadline.expiration_date - today).days
-            if days_remaining < 0:
-                expired_count += 1
-            elif days_remaining < 7:
-                red_count += 1
-            elif days_remaining < 14:
-                yellow_count += 1
-            else:
-                green_count += 1
-        
-        stats_text += f"   🟢 Безопасно (&gt;14 дней): <b>{green_count}</b>\n"
-        stats_text += f"   🟡 Внимание (7-14 дней): <b>{yellow_count}</b>\n"
-        stats_text += f"   🔴 Критично (&lt;7 дней): <b>{red_count}</b>\n"
-        stats_text += f"   ❌ Просроченные: <b>{expired_count}</b>\n\n"
-        
-        # Уведомления за последние 30 дней
-        stats_text += "📬 <b>Уведомления (за 30 дней):</b>\n"
-        
-        thirty_days_ago = datetime.now() - timedelta(days=30)
-        
-        total_notifications = db_session.query(NotificationLog).filter(
-            NotificationLog.sent_at >= thirty_days_ago
-        ).count()
-        
-        sent_notifications = db_session.query(NotificationLog).filter(
-            NotificationLog.sent_at >= thirty_days_ago,
-            NotificationLog.status == 'sent'
-        ).count()
-        
-        failed_notifications = db_session.query(NotificationLog).filter(
-            NotificationLog.sent_at >= thirty_days_ago,
-            NotificationLog.status == 'failed'
-        ).count()
-        
-        stats_text += f"   Всего отправлено: <b>{total_notifications}</b>\n"
-        stats_text += f"   Успешно: <b>{sent_notifications}</b> ({int(sent_notifications / max(total_notifications, 1) * 100)}%)\n"
-        stats_text += f"   Ошибки: <b>{failed_notifications}</b>\n\n"
-        
-        # Ближайшие дедлайны (7 дней)
-        stats_text += "⏰ <b>Ближайшие дедлайны (7 дней):</b>\n"
-        
-        upcoming_date = today + timedelta(days=7)
-        upcoming_deadlines = db_session.query(Deadline).filter(
-            Deadline.status == 'active',
-            Deadline.expiration_date >= today,
-            Deadline.expiration_date <= upcoming_date
-        ).count()
-        
-        stats_text += f"   Истекают в ближайшие 7 дней: <b>{upcoming_deadlines}</b>\n\n"
-        
-        # Настройки системы
-        stats_text += "⚙️ <b>Настройки:</b>\n"
-        stats_text += f"   Проверка дедлайнов: <b>{settings.notification_check_time}</b>\n"
-        stats_text += f"   Дни уведомлений: <b>{', '.join(map(str, settings.notification_days_list))}</b>\n"
-        stats_text += f"   Часовой пояс: <b>{settings.notification_timezone}</b>\n\n"
-        
-        # Временная метка
-        timestamp = datetime.now().strftime('%d.%m.%Y %H:%M')
-        stats_text += f"🕒 <b>Обновлено:</b> {timestamp}"
+        # Все запросы статистики - одним вызовом в пуле потоков БД
+        stats_text = await run_db(_build_stats_text, db_session)
         
         await status_msg.edit_text(stats_text, parse_mode='HTML')
         logger.info(f"✅ Статистика отправлена")
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+Команда рассылки объявлений клиентам через Telegram бота
+Доступна только администратору
+"""
+import logging
+import shlex
+from typing import Dict, Optional, Tuple
+
+from aiogram import Router
+from aiogram.filters import Command, CommandObject
+from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
+from aiogram.exceptions import TelegramBadRequest
+
+from bot.services.broadcast import create_broadcast, get_broadcast, send_broadcast_report, set_broadcast_status
+from bot.services.formatter import format_broadcast_progress
+from bot.services.db_executor import run_db
+
+logger = logging.getLogger(__name__)
+router = Router()
+
+# Ключи фильтра в команде -> поля фильтра задания
+FILTER_KEYS = {
+    'ofd': 'ofd_provider_id',
+    'type': 'deadline_type_id',
+    'region': 'region'
+}
+
+BROADCAST_HELP = (
+    "📣 <b>Рассылка объявления клиентам</b>\n\n"
+    "Формат:\n"
+    "<code>/broadcast [ofd=ID] [type=ID] [region=\"Город\"]\n"
+    "Текст объявления</code>\n\n"
+    "Первая строка - необязательный фильтр:\n"
+    "• <code>ofd</code> - ID провайдера ОФД\n"
+    "• <code>type</code> - ID типа услуги (есть активный дедлайн)\n"
+    "• <code>region</code> - часть адреса клиента или кассы\n\n"
+    "Со следующей строки - текст (поддерживается HTML).\n"
+    "Без фильтра сообщение получат все клиенты с Telegram."
+)
+
+
+def parse_broadcast_args(args: str) -> Tuple[Dict, str]:
+    """
+    Разбор аргументов команды: фильтр в первой строке, текст - далее
+
+    Args:
+        args: Текст после /broadcast
+
+    Returns:
+        Tuple: (фильтр, текст сообщения)
+
+    Raises:
+        ValueError: Неверный формат фильтра
+    """
+    first_line, _, rest = args.partition('\n')
+    tokens = shlex.split(first_line) if first_line.strip() else []
+
+    # Первая строка без key=value - это уже текст сообщения
+    if not tokens or not all('=' in token for token in tokens):
+        return {}, args.strip()
+
+    filters = {}
+    for token in tokens:
+        key, _, value = token.partition('=')
+        if key not in FILTER_KEYS or not value:
+            raise ValueError(f"Неизвестный параметр фильтра: {token}")
+        field = FILTER_KEYS[key]
+        filters[field] = value if field == 'region' else int(value)
+
+    return filters, rest.strip()
+
+
+def build_broadcast_keyboard(job: Dict) -> Optional[InlineKeyboardMarkup]:
+    """
+    Кнопки управления рассылкой по её статусу
+
+    Args:
+        job: Состояние задания
+
+    Returns:
+        InlineKeyboardMarkup или None для завершённой рассылки
+    """
+    job_id = job['id']
+    if job['status'] in ('pending', 'running'):
+        control = InlineKeyboardButton(text="⏸ Пауза", callback_data=f"bc:pause:{job_id}")
+    elif job['status'] == 'paused':
+        control = InlineKeyboardButton(text="▶️ Продолжить", callback_data=f"bc:resume:{job_id}")
+    else:
+        return None
+
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [control, InlineKeyboardButton(text="⛔ Отменить", callback_data=f"bc:cancel:{job_id}")],
+        [InlineKeyboardButton(text="🔄 Обновить", callback_data=f"bc:refresh:{job_id}")]
+    ])
+
+
+@router.message(Command('broadcast'))
+async def cmd_broadcast(
+    message: Message,
+    command: CommandObject,
+    user_role: str = 'unknown',
+    **kwargs
+):
+    """Команда /broadcast - рассылка объявления клиентам"""
+    user = message.from_user
+
+    if user_role != 'admin':
+        logger.warning(f"⛔ Попытка /broadcast от не-админа: user_id={user.id}, роль={user_role}")
+        await message.answer(
+            "❌ <b>Доступ запрещён</b>\n\n"
+            "Эта команда доступна только администратору.",
+            parse_mode='HTML'
+        )
+        return
+
+    if not command.args:
+        await message.answer(BROADCAST_HELP, parse_mode='HTML')
+        return
+
+    try:
+        filters, text = parse_broadcast_args(command.args)
+    except ValueError as e:
+        await message.answer(f"❌ {e}\n\n{BROADCAST_HELP}", parse_mode='HTML')
+        return
+
+    if not text:
+        await message.answer("❌ Текст объявления пуст\n\n" + BROADCAST_HELP, parse_mode='HTML')
+        return
+
+    job_id = await run_db(
+        create_broadcast,
+        message_text=text,
+        filters=filters,
+        notify_chat_id=str(message.chat.id)
+    )
+    job = await run_db(get_broadcast, job_id)
+
+    logger.info(f"📣 /broadcast #{job_id} от администратора {user.id}")
+
+    await message.answer(
+        format_broadcast_progress(job),
+        reply_markup=build_broadcast_keyboard(job),
+        parse_mode='HTML'
+    )
+
+
+@router.callback_query(lambda c: c.data and c.data.startswith('bc:'))
+async def process_broadcast_callback(
+    callback: CallbackQuery,
+    user_role: str = 'unknown',
+    **kwargs
+):
+    """Пауза, продолжение, отмена и обновление прогресса рассылки"""
+    if user_role != 'admin':
+        await callback.answer("❌ Доступ запрещён", show_alert=True)
+        return
+
+    _, action, job_id = callback.data.split(':')
+    job_id = int(job_id)
+
+    alert = None
+    try:
+        if action == 'refresh':
+            job = await run_db(get_broadcast, job_id)
+        else:
+            job = await run_db(set_broadcast_status, job_id, action)
+            # Отменено до запуска или на паузе - отправитель отчёт не пришлёт
+            if job and job['report_needed']:
+                await send_broadcast_report(callback.bot, job)
+    except ValueError as e:
+        alert = str(e)
+        job = await run_db(get_broadcast, job_id)
+
+    if job is None:
+        await callback.answer("Рассылка не найдена", show_alert=True)
+        return
+
+    try:
+        await callback.message.edit_text(
+            format_broadcast_progress(job),
+            reply_markup=build_broadcast_keyboard(job),
+            parse_mode='HTML'
+        )
+    except TelegramBadRequest as e:
+        # Прогресс не изменился с прошлого обновления
+        if 'message is not modified' not in str(e):
+            raise
+
+    await callback.answer(alert, show_alert=bool(alert))
+
+
+# Экспорт
+__all__ = ['router']
@@ -15,6 +15,8 @@ from sqlalchemy.orm import Session
 
 from backend.models import User
 from bot.services import checker
+from bot.services.db_executor import run_db
+from bot.services.staff_notifications import KIND_SUPPORT_REQUEST, send_staff_notification
 
 logger = logging.getLogger(__name__)
 
@@ -23,24 +25,24 @@ router = Router()
 
 
 async def notify_admins_about_support_request(
+    bot: Bot,
     support_request,
     client_id: int,
     db_session: Session
 ):
     """
     Отправка уведомления администраторам о новом обращении клиента
-    Отправляет уведомление в группу администраторов (если настроена) или индивидуально каждому админу
+    Отправляет уведомление в группу администраторов (если настроена) или индивидуально каждому сотруднику
     
     Args:
+        bot: Бот, получивший обращение (его сессия и пул соединений)
         support_request: Объект SupportRequest из БД
         client_id: ID клиента, создавшего обращение
         db_session: Сессия базы данных
     """
     try:
-        from backend.config import settings
-        
         # Получаем информацию о клиенте
-        client = db_session.query(User).filter(User.id == client_id).first()
+        client = await run_db(db_session.get, User, client_id)
         if not client:
             logger.warning(f"Клиент {client_id} не найден для уведомления")
             return
@@ -62,34 +64,9 @@ async def notify_admins_about_support_request(
             f"⏰ <b>Время создания:</b> {support_request.created_at.strftime('%d.%m.%Y %H:%M')}"
         )
         
-        # Создаем бота для отправки уведомлений
-        bot = Bot(token=settings.telegram_bot_token)
-        
-        # Проверяем, настроена ли группа администраторов
-        admin_group_chat_id = settings.admin_group_chat_id.strip() if settings.admin_group_chat_id else None
-        
-        if admin_group_chat_id:
-            # Отправка в группу администраторов
-            try:
-                await bot.send_message(
-                    chat_id=admin_group_chat_id,
-                    text=notification_text,
-                    parse_mode='HTML'
-                )
-                logger.info(f"✅ Уведомление об обращении #{support_request.id} отправлено в группу администраторов (chat_id: {admin_group_chat_id})")
-            except Exception as group_error:
-                logger.error(f"❌ Ошибка отправки в группу администраторов: {group_error}")
-                logger.warning("⚠️ Переключаемся на индивидуальную отправку администраторам")
-                # Если не удалось отправить в группу, отправляем индивидуально
-                await _send_to_individual_admins(bot, notification_text, support_request, db_session)
-        else:
-            # Группа не настроена - отправляем индивидуально каждому администратору
-            logger.info("📧 ADMIN_GROUP_CHAT_ID не настроен, отправляем уведомления индивидуально")
-            await _send_to_individual_admins(bot, notification_text, support_request, db_session)
-        
-        # Закрываем сессию бота
-        await bot.session.close()
-        
+        # Группа администраторов или лично каждому - по STAFF_NOTIFICATION_ROUTING
+        await send_staff_notification(bot, KIND_SUPPORT_REQUEST, notification_text)
+    
     except Exception as e:
         logger.error(f"❌ Ошибка при отправке уведомлений администраторам: {e}")
         import traceback
@@ -97,47 +74,11 @@ async def notify_admins_about_support_request(
         raise
 
 
-async def _send_to_individual_admins(
-    bot: Bot,
-    notification_text: str,
-    support_request,
-    db_session: Session
-):
-    """
-    Вспомогательная функция для отправки уведомлений индивидуально каждому администратору
-    
-    Args:
-        bot: Экземпляр бота
-        notification_text: Текст уведомления
-        support_request: Объект обращения
-        db_session: Сессия БД
-    """
-    # Получаем всех администраторов с telegram_id
-    admins = db_session.query(User).filter(
-        User.role == 'admin',
-        User.telegram_id.isnot(None),
-        User.is_active.is_(True)
-    ).all()
-    
-    if not admins:
-        logger.warning("Нет активных администраторов с Telegram ID для отправки уведомлений")
-        return
-    
-    # Отправляем уведомление каждому администратору
-    sent_count = 0
-    for admin in admins:
-        try:
-            await bot.send_message(
-                chat_id=int(admin.telegram_id),
-                text=notification_text,
-                parse_mode='HTML'
-            )
-            sent_count += 1
-            logger.info(f"✅ Уведомление отправлено администратору {admin.full_name} (ID: {admin.telegram_id})")
-        except Exception as send_error:
-            logger.error(f"❌ Ошибка отправки администратору {admin.full_name}: {send_error}")
-    
-    logger.info(f"📨 Уведомление об обращении #{support_request.id} отправлено {sent_count}/{len(admins)} администраторам")
+def _save_support_request(db_session: Session, support_request):
+    """Сохранение обращения (выполняется через run_db)"""
+    db_session.add(support_request)
+    db_session.commit()
+    db_session.refresh(support_request)
 
 
 # FSM состояния для формы обращения
@@ -188,77 +129,14 @@ async def cmd_my_deadlines(
         return
     
     try:
-        # Получаем данные клиента из БД
-        client = db_session.query(User).filter(User.id == client_id).first()
-        
-        if not client:
-            await message.answer("❌ Ошибка: данные клиента не найдены")
-            return
-        
-        # Получаем дедлайны через API/БД
-        # Используем модель Deadline из web.app.models.client (с cash_register_id)
-        from web.app.models.client import Deadline
-        from datetime import date
-        
-        deadlines = db_session.query(Deadline).filter(
-            Deadline.client_id == client_id,
-            Deadline.status == 'active'
-        ).order_by(Deadline.expiration_date).all()
-        
-        if not deadlines:
-            await message.answer(
-                "✅ <b>У вас нет активных дедлайнов!</b>\n\n"
-                "Все ваши услуги актуальны.",
-                parse_mode='HTML'
-            )
-            return
-        
-        # Формируем данные для отправки
-        today = date.today()
-        deadlines_data = []
-        
-        for deadline in deadlines:
-            days_diff = (deadline.expiration_date - today).days
-            
-            # Определение статуса
-            if days_diff < 0:
-                status_color = "expired"
-            elif days_diff <= 7:
-                status_color = "red"
-            elif days_diff <= 14:
-                status_color = "yellow"
-            else:
-                status_color = "green"
-            
-            # Базовая информация о дедлайне
-            deadline_info = {
-                'deadline_id': deadline.id,
-                'client_name': client.company_name or client.full_name,
-                'client_inn': client.inn or 'Не указано',
-                'deadline_type_name': deadline.deadline_type.type_name if deadline.deadline_type else 'Неизвестно',
-                'expiration_date': deadline.expiration_date,
-                'days_remaining': days_diff,
-                'status': status_color
-            }
-            
-            # Добавляем информацию о кассе, если дедлайн привязан к кассе
-            if deadline.cash_register_id and deadline.cash_register:
-                cash_register = deadline.cash_register
-                deadline_info['cash_register_model'] = cash_register.model or 'Не указана'
-                deadline_info['cash_register_serial'] = cash_register.factory_number or 'Не указан'
-                deadline_info['cash_register_name'] = cash_register.register_name or cash_register.model or 'ККТ'
-                deadline_info['installation_address'] = cash_register.installation_address
-            
-            deadlines_data.append(deadline_info)
-        
-        # Форматируем и отправляем
-        from bot.services.formatter import format_deadline_list
+        # Первая страница дедлайнов клиента, остальные - кнопками ◀️/▶️
+        from bot.services.pagination import DeadlinePageCursor, render_deadlines_page, VIEW_MY
         
-        title = f"📄 Ваши текущие дедлайны ({len(deadlines_data)})"
-        message_text = format_deadline_list(deadlines_data, title=title)
+        cursor = DeadlinePageCursor(VIEW_MY, client_id=client_id)
+        message_text, keyboard, total = await render_deadlines_page(cursor)
         
-        await message.answer(message_text, parse_mode='HTML')
-        logger.info(f"✅ Отправлено {len(deadlines_data)} дедлайнов клиенту {client_id}")
+        await message.answer(message_text, parse_mode='HTML', reply_markup=keyboard)
+        logger.info(f"✅ Отправлена страница 1, всего {total} дедлайнов клиенту {client_id}")
         
     except Exception as e:
         logger.error(f"❌ Ошибка при получении дедлайнов: {e}")
@@ -401,15 +279,14 @@ async def process_phone(message: Message, state: FSMContext, db_session: Session
             created_at=datetime.now()
         )
         
-        db_session.add(support_request)
-        db_session.commit()
-        db_session.refresh(support_request)
+        await run_db(_save_support_request, db_session, support_request)
         
         logger.info(f"✅ Создано обращение #{support_request.id} от клиента {data['client_id']}")
         
         # Отправляем уведомление администраторам
         try:
             await notify_admins_about_support_request(
+                bot=message.bot,
                 support_request=support_request,
                 client_id=data['client_id'],
                 db_session=db_session
@@ -6,12 +6,16 @@ import logging
 from datetime import date, timedelta
 from aiogram import Router
 from aiogram.filters import Command
-from aiogram.types import Message
+from aiogram.types import Message, CallbackQuery
+from aiogram.exceptions import TelegramBadRequest
 from sqlalchemy.orm import Session
 
 from backend.models import User, Deadline, DeadlineType
-from bot.services.formatter import format_deadline_list
-from bot.services import checker
+from bot.services.pagination import (
+    DeadlinePageCursor, render_deadlines_page,
+    CALLBACK_PREFIX, NOOP_CALLBACK,
+    VIEW_LIST, VIEW_TODAY, VIEW_WEEK, VIEW_NEXT
+)
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +23,11 @@ logger = logging.getLogger(__name__)
 router = Router()
 
 
+def _own_client_id(user_role: str, client_id: int = None):
+    """Фильтр по клиенту: клиенты видят только свои дедлайны"""
+    return client_id if user_role == 'client' else None
+
+
 @router.message(Command('list'))
 async def cmd_list(
     message: Message,
@@ -42,22 +51,12 @@ async def cmd_list(
     logger.info(f"📋 /list от пользователя {user.id}, роль={user_role}")
     
     try:
-        # Получаем дедлайны через checker service (использует API или fallback)
-        deadlines = await checker.get_expiring_deadlines(days=30)
-        
-        # Для клиентов фильтруем по их ID
-        if user_role == 'client' and client_id:
-            deadlines = [d for d in deadlines if d.get('client_id') == client_id]
-        
-        # Форматируем и отправляем
-        if deadlines:
-            title = "📋 Ваши дедлайны (30 дней)" if user_role == 'client' else "📋 Все дедлайны (30 дней)"
-            response = format_deadline_list(deadlines, title=title)
-        else:
-            response = "✅ Нет дедлайнов на ближайшие 30 дней"
+        # Первая страница (для клиентов - только их дедлайны)
+        cursor = DeadlinePageCursor(VIEW_LIST, days=30, client_id=_own_client_id(user_role, client_id))
+        response, keyboard, total = await render_deadlines_page(cursor)
         
-        await message.answer(response, parse_mode='HTML')
-        logger.info(f"✅ Отправлено {len(deadlines)} дедлайнов")
+        await message.answer(response, parse_mode='HTML', reply_markup=keyboard)
+        logger.info(f"✅ Отправлена страница 1, всего {total} дедлайнов")
         
     except Exception as e:
         logger.error(f"❌ Ошибка при /list: {e}")
@@ -92,28 +91,11 @@ async def cmd_today(
     logger.info(f"📅 /today от пользователя {user.id}, роль={user_role}")
     
     try:
-        # Получаем все дедлайны на ближайшие дни
-        all_deadlines = await checker.get_expiring_deadlines(days=1)
-        
-        # Фильтруем только сегодняшние
-        today = date.today()
-        deadlines = [
-            d for d in all_deadlines 
-            if d.get('days_remaining') == 0
-        ]
-        
-        # Для клиентов фильтруем по их ID
-        if user_role == 'client' and client_id:
-            deadlines = [d for d in deadlines if d.get('client_id') == client_id]
-        
-        # Форматируем и отправляем
-        if deadlines:
-            response = format_deadline_list(deadlines, title="📅 Дедлайны на сегодня")
-        else:
-            response = "🎉 На сегодня нет дедлайнов!"
+        cursor = DeadlinePageCursor(VIEW_TODAY, client_id=_own_client_id(user_role, client_id))
+        response, keyboard, total = await render_deadlines_page(cursor)
         
-        await message.answer(response, parse_mode='HTML')
-        logger.info(f"✅ Отправлено {len(deadlines)} дедлайнов на сегодня")
+        await message.answer(response, parse_mode='HTML', reply_markup=keyboard)
+        logger.info(f"✅ Отправлено {total} дедлайнов на сегодня")
         
     except Exception as e:
         logger.error(f"❌ Ошибка при /today: {e}")
@@ -148,21 +130,11 @@ async def cmd_week(
     logger.info(f"📆 /week от пользователя {user.id}, роль={user_role}")
     
     try:
-        # Получаем дедлайны на 7 дней через checker service
-        deadlines = await checker.get_expiring_deadlines(days=7)
+        cursor = DeadlinePageCursor(VIEW_WEEK, days=7, client_id=_own_client_id(user_role, client_id))
+        response, keyboard, total = await render_deadlines_page(cursor)
         
-        # Для клиентов фильтруем по их ID
-        if user_role == 'client' and client_id:
-            deadlines = [d for d in deadlines if d.get('client_id') == client_id]
-        
-        # Форматируем и отправляем
-        if deadlines:
-            response = format_deadline_list(deadlines, title="📆 Дедлайны на неделю")
-        else:
-            response = "🎉 На этой неделе нет дедлайнов!"
-        
-        await message.answer(response, parse_mode='HTML')
-        logger.info(f"✅ Отправлено {len(deadlines)} дедлайнов на неделю")
+        await message.answer(response, parse_mode='HTML', reply_markup=keyboard)
+        logger.info(f"✅ Отправлено {total} дедлайнов на неделю")
         
     except Exception as e:
         logger.error(f"❌ Ошибка при /week: {e}")
@@ -226,22 +198,11 @@ async def cmd_next(
                 )
                 return
         
-        # Получаем дедлайны через checker service
-        deadlines = await checker.get_expiring_deadlines(days=days)
+        cursor = DeadlinePageCursor(VIEW_NEXT, days=days, client_id=_own_client_id(user_role, client_id))
+        response, keyboard, total = await render_deadlines_page(cursor)
         
-        # Для клиентов фильтруем по их ID
-        if user_role == 'client' and client_id:
-            deadlines = [d for d in deadlines if d.get('client_id') == client_id]
-        
-        # Форматируем и отправляем
-        if deadlines:
-            title = f"🔮 Дедлайны на {days} дней"
-            response = format_deadline_list(deadlines, title=title)
-        else:
-            response = f"✅ Нет дедлайнов на ближайшие {days} дней"
-        
-        await message.answer(response, parse_mode='HTML')
-        logger.info(f"✅ Отправлено {len(deadlines)} дедлайнов на {days} дней")
+        await message.answer(response, parse_mode='HTML', reply_markup=keyboard)
+        logger.info(f"✅ Отправлено {total} дедлайнов на {days} дней")
         
     except Exception as e:
         logger.error(f"❌ Ошибка при /next: {e}")
@@ -253,5 +214,54 @@ async def cmd_next(
         )
 
 
+@router.callback_query(lambda c: c.data and c.data.startswith(f'{CALLBACK_PREFIX}:'))
+async def process_deadlines_page(
+    callback: CallbackQuery,
+    user_role: str = 'unknown',
+    client_id: int = None,
+    **kwargs
+):
+    """
+    Листание списка дедлайнов кнопками ◀️/▶️
+    Загружает только запрошенную страницу и редактирует сообщение на месте
+    
+    Args:
+        callback: Нажатие кнопки
+        user_role: Роль пользователя из middleware
+        client_id: ID клиента (для клиентов)
+    """
+    if callback.data == NOOP_CALLBACK:
+        await callback.answer()
+        return
+    
+    try:
+        cursor = DeadlinePageCursor.unpack(callback.data)
+    except ValueError:
+        logger.warning(f"Неверный курсор страницы: {callback.data}")
+        await callback.answer("⚠️ Устаревшая кнопка", show_alert=False)
+        return
+    
+    # Клиент может листать только свои дедлайны, сотрудники - любые
+    if user_role not in ('admin', 'manager') and cursor.client_id != _own_client_id(user_role, client_id):
+        await callback.answer("❌ Доступ запрещён", show_alert=True)
+        return
+    
+    try:
+        response, keyboard, total = await render_deadlines_page(cursor)
+        await callback.message.edit_text(response, parse_mode='HTML', reply_markup=keyboard)
+        await callback.answer()
+        logger.info(f"📄 Страница {cursor.page} ({cursor.view}) для пользователя {callback.from_user.id}")
+        
+    except TelegramBadRequest as e:
+        # Повторное нажатие на ту же страницу - сообщение не изменилось
+        if 'message is not modified' in str(e):
+            await callback.answer()
+        else:
+            raise
+    except Exception as e:
+        logger.error(f"❌ Ошибка при листании дедлайнов: {e}")
+        await callback.answer("⚠️ Ошибка загрузки страницы", show_alert=True)
+
+
 # Экспорт роутера
 __all__ = ['router']
\ No newline at end of file
@@ -3,12 +3,14 @@
 Команда экспорта данных через Telegram бота
 Экспорт клиентов, дедлайнов и статистики в JSON/CSV
 """
+import asyncio
 import logging
 from aiogram import Router, F
 from aiogram.filters import Command
-from aiogram.types import Message, BufferedInputFile
+from aiogram.types import Message
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.types import CallbackQuery
+from aiogram.exceptions import TelegramBadRequest
 from datetime import datetime
 
 from bot.services.conversation import (
@@ -16,10 +18,17 @@ from bot.services.conversation import (
 )
 from bot.services.api_client import WebAPIClient
 from bot.services import checker
+from bot.services.file_transfer import (
+    TELEGRAM_UPLOAD_LIMIT, SpooledInputFile, FileIdCache, compress_to_zip
+)
+from backend.config import settings
 
 logger = logging.getLogger(__name__)
 router = Router()
 
+# file_id отправленных экспортов: (тип данных, формат) -> file_id и время выгрузки
+_export_file_ids = FileIdCache(ttl=settings.bot_export_file_id_ttl)
+
 
 @router.message(Command('export'))
 async def cmd_export(
@@ -149,6 +158,34 @@ async def process_format_callback(
         await callback.message.edit_text("⚠️ Web API недоступен")
         return
     
+    cache_key = (data_type, format_type)
+    
+    def build_caption(exported_at: datetime, archived: bool = False) -> str:
+        return (
+            f"✅ <b>Экспорт завершён</b>\n\n"
+            f"📁 Тип: {data_type}\n"
+            f"📄 Формат: {format_type.upper()}{' (zip)' if archived else ''}\n"
+            f"📅 Дата: {exported_at.strftime('%d.%m.%Y %H:%M')}"
+        )
+    
+    # Тот же экспорт недавно отправлялся - переиспользуем file_id
+    # (в подписи - время исходной выгрузки: данные могли с тех пор измениться)
+    cached = _export_file_ids.get(cache_key)
+    if cached:
+        try:
+            await callback.message.answer_document(
+                document=cached.file_id,
+                caption=build_caption(cached.created_at),
+                parse_mode='HTML'
+            )
+            await callback.message.delete()
+            logger.info(f"Экспорт {data_type}.{format_type} отправлен по file_id для user {user.id}")
+            return
+        except TelegramBadRequest as e:
+            logger.warning(f"file_id экспорта не принят Telegram, скачиваем заново: {e}")
+            _export_file_ids.invalidate(cache_key)
+    
+    file = None
     try:
         # Формируем запрос к API
         endpoint = f"/api/export/{data_type}"
@@ -160,45 +197,56 @@ async def process_format_callback(
         elif data_type == 'deadlines':
             params['status'] = 'active'
         
-        # Получаем данные через API (как bytes)
+        # Скачиваем файл потоково во временный файл
         logger.info(f"Экспорт: {endpoint}?{params}")
-        
-        # Используем метод get_file для получения файла
-        response = await api_client._request(
-            method='GET',
-            endpoint=endpoint,
-            params=params
+        exported_at = datetime.now()
+        file, info = await api_client.download(
+            endpoint,
+            params=params,
+            max_bytes=settings.bot_export_max_bytes,
+            spool_size=settings.bot_export_spool_size
         )
         
-        # response содержит bytes файла
-        if not response:
+        if not info['size']:
             await callback.message.edit_text("❌ Нет данных для экспорта")
             return
         
         # Определяем имя файла
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        extension = format_type
-        filename = f"{data_type}_{timestamp}.{extension}"
-        
-        # Определяем MIME тип
-        mime_type = "application/json" if format_type == 'json' else "text/csv"
+        timestamp = exported_at.strftime('%Y%m%d_%H%M%S')
+        filename = info['filename'] or f"{data_type}_{timestamp}.{format_type}"
         
-        # Создаём файл для отправки
-        file = BufferedInputFile(
-            file=response,
-            filename=filename
-        )
+        # Больше лимита загрузки Telegram - упаковываем в zip
+        archived = False
+        if info['size'] > TELEGRAM_UPLOAD_LIMIT:
+            logger.info(f"Экспорт {filename} ({info['size']} байт) больше лимита Telegram, упаковка в zip")
+            archive, archive_size = await asyncio.to_thread(
+                compress_to_zip, file, filename, settings.bot_export_spool_size
+            )
+            file.close()
+            file = archive
+            
+            if archive_size > TELEGRAM_UPLOAD_LIMIT:
+                await callback.message.edit_text(
+                    "❌ <b>Файл экспорта слишком большой</b>\n\n"
+                    f"Даже в архиве он превышает {TELEGRAM_UPLOAD_LIMIT // (1024 * 1024)} МБ. "
+                    "Выгрузите данные через веб-интерфейс.",
+                    parse_mode='HTML'
+                )
+                return
+            
+            filename = f"{filename.rsplit('.', 1)[0]}.zip"
+            archived = True
         
-        # Отправляем файл пользователю
-        await callback.message.answer_document(
-            document=file,
-            caption=f"✅ <b>Экспорт завершён</b>\n\n"
-                   f"📁 Тип: {data_type}\n"
-                   f"📄 Формат: {format_type.upper()}\n"
-                   f"📅 Дата: {datetime.now().strftime('%d.%m.%Y %H:%M')}",
+        # Отправляем файл пользователю (читается из временного файла кусками)
+        sent = await callback.message.answer_document(
+            document=SpooledInputFile(file, filename=filename),
+            caption=build_caption(exported_at, archived),
             parse_mode='HTML'
         )
         
+        if sent.document:
+            _export_file_ids.put(cache_key, sent.document.file_id, exported_at)
+        
         # Удаляем сообщение с меню
         await callback.message.delete()
         
@@ -212,6 +260,10 @@ async def process_format_callback(
             f"Попробуйте позже или обратитесь к администратору.",
             parse_mode='HTML'
         )
+    
+    finally:
+        if file is not None:
+            file.close()
 
 
 # Экспорт
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Inline-поиск клиентов для администраторов и менеджеров
+Ввод "@bot Ром" в любом чате показывает карточки клиентов с ближайшими
+дедлайнами. Поиск идёт по индексу в памяти (локальная копия дедлайнов),
+результаты кэшируются по запросу. Если копия не синхронизирована - запрос
+к БД после паузы debounce, чтобы не искать на каждое нажатие клавиши.
+Inline-режим включается у @BotFather командой /setinline
+"""
+import asyncio
+import logging
+from datetime import date
+from typing import Dict, List, Tuple
+
+from aiogram import Router
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import InlineQuery, InlineQueryResultArticle, InputTextMessageContent
+from sqlalchemy.orm import Session, contains_eager
+
+from backend.config import settings
+from backend.models import User, Deadline, DeadlineType
+from bot.services import checker
+from bot.services.client_index import QueryResultCache, normalize
+from bot.services.db_executor import run_in_session
+from bot.services.formatter import format_client_inline_card, format_client_inline_description
+
+logger = logging.getLogger(__name__)
+router = Router()
+
+# Минимальная длина запроса для поиска
+MIN_QUERY_LENGTH = 2
+
+_result_cache = QueryResultCache(ttl=settings.bot_inline_cache_ttl)
+
+# Последний inline-запрос пользователя (более ранние при debounce не выполняются)
+_latest_query: Dict[int, str] = {}
+
+
+def _is_staff(telegram_id: int) -> bool:
+    """Администратор или менеджер (по настройкам, без запроса к БД)"""
+    return telegram_id in settings.telegram_admin_ids_list or telegram_id in settings.telegram_manager_ids_list
+
+
+def _client_dict(client) -> Dict:
+    return {
+        'id': client.id,
+        'company_name': client.company_name or client.full_name,
+        'inn': client.inn,
+        'email': client.email,
+        'phone': client.phone
+    }
+
+
+def search_clients_with_deadlines(db: Session, query: str, limit: int) -> List[Tuple[Dict, List[Dict]]]:
+    """
+    Поиск клиентов в БД и их активные дедлайны (два запроса)
+
+    Args:
+        db: Сессия базы данных
+        query: Строка поиска (часть названия или ИНН)
+        limit: Максимум клиентов
+
+    Returns:
+        List[Tuple]: (клиент, дедлайны по дате) в формате локальной копии
+    """
+    pattern = f"%{query}%"
+    clients = db.query(User).filter(
+        User.role == 'client',
+        User.is_active == True,
+        (User.company_name.ilike(pattern)) | (User.inn.ilike(pattern))
+    ).order_by(User.company_name).limit(limit).all()
+
+    if not clients:
+        return []
+
+    deadlines = db.query(Deadline).join(
+        DeadlineType
+    ).options(
+        contains_eager(Deadline.deadline_type)
+    ).filter(
+        Deadline.user_id.in_([client.id for client in clients]),
+        Deadline.status == 'active'
+    ).order_by(
+        Deadline.expiration_date
+    ).all()
+
+    today = date.today()
+    by_client: Dict[int, List[Dict]] = {}
+    for deadline in deadlines:
+        days_remaining = (deadline.expiration_date - today).days
+        by_client.setdefault(deadline.user_id, []).append({
+            'deadline_type_name': deadline.deadline_type.type_name,
+            'expiration_date': deadline.expiration_date,
+            'days_remaining': days_remaining,
+            'status': checker.get_deadline_status(days_remaining)
+        })
+
+    return [(_client_dict(client), by_client.get(client.id, [])) for client in clients]
+
+
+def _build_results(found: List[Tuple[Dict, List[Dict]]]) -> List[InlineQueryResultArticle]:
+    return [
+        InlineQueryResultArticle(
+            id=str(client['id']),
+            title=client['company_name'] or f"Клиент #{client['id']}",
+            description=format_client_inline_description(client, deadlines),
+            input_message_content=InputTextMessageContent(
+                message_text=format_client_inline_card(client, deadlines),
+                parse_mode='HTML'
+            )
+        )
+        for client, deadlines in found
+    ]
+
+
+def _replica_results(replica, text: str) -> List[InlineQueryResultArticle]:
+    """
+    Результаты из индекса локальной копии
+
+    Кэш: по запросу и версии индекса хранятся найденные ID, версии их данных
+    и готовые результаты; при изменении дедлайнов клиента результаты
+    собираются заново по тем же ID без повторного поиска
+    """
+    key = ('replica', text, replica.search_index.version)
+    cached = _result_cache.get(key)
+
+    if cached is not None:
+        client_ids, versions, results = cached
+    else:
+        client_ids = replica.search_index.search(text, settings.bot_inline_results_limit)
+        versions, results = None, None
+
+    current = tuple(replica.client_version(client_id) for client_id in client_ids)
+    if results is None or versions != current:
+        found = [
+            (_client_dict(replica.clients[client_id]), replica.client_deadlines(client_id))
+            for client_id in client_ids
+        ]
+        results = _build_results(found)
+        _result_cache.put(key, (client_ids, current, results))
+
+    return results
+
+
+@router.inline_query()
+async def inline_client_search(inline_query: InlineQuery):
+    """Inline-запрос: карточки найденных клиентов"""
+    user_id = inline_query.from_user.id
+    text = normalize(inline_query.query)
+
+    if not _is_staff(user_id) or len(text) < MIN_QUERY_LENGTH:
+        await inline_query.answer([], cache_time=settings.bot_inline_cache_time, is_personal=True)
+        return
+
+    replica = checker.get_read_replica()
+    if replica is not None:
+        results = _replica_results(replica, text)
+    else:
+        key = ('db', text)
+        results = _result_cache.get(key)
+        if results is None:
+            # Пользователь ещё печатает - ответим только на последний запрос
+            _latest_query[user_id] = inline_query.id
+            await asyncio.sleep(settings.bot_inline_debounce)
+            if _latest_query.get(user_id) != inline_query.id:
+                return
+
+            found = await run_in_session(
+                search_clients_with_deadlines,
+                inline_query.query.strip(),
+                settings.bot_inline_results_limit
+            )
+            results = _build_results(found)
+            _result_cache.put(key, results)
+
+    logger.debug(f"🔎 Inline-поиск от {user_id}: '{text}' -> {len(results)}")
+
+    try:
+        await inline_query.answer(results, cache_time=settings.bot_inline_cache_time, is_personal=True)
+    except TelegramBadRequest as e:
+        # Пользователь уже изменил запрос, старый ответ не нужен
+        if 'query is too old' not in str(e):
+            raise
+
+
+def get_inline_cache_metrics() -> Dict[str, int]:
+    """Метрики кэша результатов inline-поиска"""
+    return _result_cache.get_metrics()
+
+
+# Экспорт
+__all__ = ['router', 'search_clients_with_deadlines', 'get_inline_cache_metrics']
@@ -13,8 +13,8 @@ from aiogram.fsm.state import State, StatesGroup
 from sqlalchemy.orm import Session
 
 from backend.models import User
-from backend.database import SessionLocal
 from backend.config import settings
+from bot.services.db_executor import run_in_session
 
 logger = logging.getLogger(__name__)
 
@@ -80,16 +80,17 @@ async def process_registration_code(message: Message, state: FSMContext):
         )
         return
     
-    # Поиск пользователя с таким кодом
-    db: Session = SessionLocal()
     try:
-        user = db.query(User).filter(
-            User.registration_code == code,
-            User.telegram_id == None,  # Ещё не зарегистрирован
-            User.role == 'client'
-        ).first()
+        result, user = await run_in_session(
+            _redeem_registration_code,
+            code,
+            telegram_id,
+            telegram_username,
+            first_name,
+            last_name
+        )
         
-        if not user:
+        if result == 'not_found':
             logger.warning(f"Код {code} не найден или уже использован")
             await message.answer(
                 "❌ <b>Неверный код регистрации</b>\n\n"
@@ -102,9 +103,8 @@ async def process_registration_code(message: Message, state: FSMContext):
             )
             return
         
-        # Проверка срока действия кода
-        if user.code_expires_at and datetime.now() > user.code_expires_at:
-            logger.warning(f"Код {code} истёк для пользователя {user.id}")
+        if result == 'expired':
+            logger.warning(f"Код {code} истёк для пользователя {user['id']}")
             await message.answer(
                 "⏰ <b>Срок действия кода истёк</b>\n\n"
                 "Код регистрации действителен только 72 часа.\n"
@@ -113,18 +113,6 @@ async def process_registration_code(message: Message, state: FSMContext):
             )
             return
         
-        # Успешная регистрация - обновляем данные пользователя
-        user.telegram_id = telegram_id
-        user.telegram_username = telegram_username
-        user.first_name = first_name
-        user.last_name = last_name
-        user.registration_code = None  # Очищаем код (одноразовый)
-        user.code_expires_at = None
-        user.registered_at = datetime.now()
-        
-        db.commit()
-        db.refresh(user)
-        
         # Очищаем состояние FSM
         await state.clear()
         
@@ -135,12 +123,12 @@ async def process_registration_code(message: Message, state: FSMContext):
         success_message = f"""
 ✅ <b>Регистрация успешно завершена!</b>
 
-Привет, <b>{user.full_name}</b>!
+Привет, <b>{user['full_name']}</b>!
 
 Вы подключены к системе уведомлений о дедлайнах.
 
-<b>Ваша компания:</b> {user.company_name or 'Не указана'}
-<b>ИНН:</b> {user.inn or 'Не указан'}
+<b>Ваша компания:</b> {user['company_name'] or 'Не указана'}
+<b>ИНН:</b> {user['inn'] or 'Не указан'}
 
 📋 <b>Доступные команды:</b>
 • /list - Показать все ваши дедлайны (30 дней)
@@ -160,7 +148,7 @@ async def process_registration_code(message: Message, state: FSMContext):
         
         await message.answer(success_message, parse_mode='HTML', reply_markup=get_client_keyboard())
         
-        logger.info(f"✅ Пользователь {telegram_id} успешно зарегистрирован как {user.company_name} (ID: {user.id})")
+        logger.info(f"✅ Пользователь {telegram_id} успешно зарегистрирован как {user['company_name']} (ID: {user['id']})")
         
     except Exception as e:
         logger.error(f"Ошибка при регистрации пользователя {telegram_id}: {e}")
@@ -170,9 +158,71 @@ async def process_registration_code(message: Message, state: FSMContext):
             "Пожалуйста, попробуйте позже или обратитесь к администратору.",
             parse_mode='HTML'
         )
-        db.rollback()
-    finally:
-        db.close()
+
+
+def _redeem_registration_code(
+    db: Session,
+    code: str,
+    telegram_id: str,
+    telegram_username: str,
+    first_name: str,
+    last_name: str
+) -> tuple:
+    """
+    Привязка Telegram к клиенту по коду регистрации (выполняется через run_in_session)
+    
+    Args:
+        db: Сессия базы данных
+        code: Код регистрации
+        telegram_id: Telegram ID пользователя
+        telegram_username: Username в Telegram
+        first_name: Имя
+        last_name: Фамилия
+        
+    Returns:
+        tuple: ('ok' | 'not_found' | 'expired', данные клиента или None)
+    """
+    # Поиск пользователя с таким кодом
+    user = db.query(User).filter(
+        User.registration_code == code,
+        User.telegram_id == None,  # Ещё не зарегистрирован
+        User.role == 'client'
+    ).first()
+    
+    if not user:
+        return 'not_found', None
+    
+    user_info = {
+        'id': user.id,
+        'full_name': user.full_name,
+        'company_name': user.company_name,
+        'inn': user.inn
+    }
+    
+    # Проверка срока действия кода
+    if user.code_expires_at and datetime.now() > user.code_expires_at:
+        return 'expired', user_info
+    
+    # Успешная регистрация - обновляем данные пользователя
+    user.telegram_id = telegram_id
+    user.telegram_username = telegram_username
+    user.first_name = first_name
+    user.last_name = last_name
+    user.registration_code = None  # Очищаем код (одноразовый)
+    user.code_expires_at = None
+    user.registered_at = datetime.now()
+    
+    db.commit()
+    return 'ok', user_info
+
+
+def _find_registered_user(db: Session, telegram_id: int):
+    """Активный клиент с данным Telegram ID (выполняется через run_in_session)"""
+    return db.query(User).filter(
+        User.telegram_id == str(telegram_id),
+        User.role == 'client',
+        User.is_active == True
+    ).first()
 
 
 async def check_user_registered(telegram_id: int) -> tuple[bool, User]:
@@ -185,17 +235,8 @@ async def check_user_registered(telegram_id: int) -> tuple[bool, User]:
     Returns:
         tuple: (зарегистрирован, объект пользователя или None)
     """
-    db: Session = SessionLocal()
-    try:
-        user = db.query(User).filter(
-            User.telegram_id == str(telegram_id),
-            User.role == 'client',
-            User.is_active == True
-        ).first()
-        
-        return (user is not None, user)
-    finally:
-        db.close()
+    user = await run_in_session(_find_registered_user, telegram_id)
+    return (user is not None, user)
 
 
 # Экспорт
@@ -7,10 +7,11 @@ from aiogram import Router
 from aiogram.filters import Command
 from aiogram.types import Message
 from datetime import date
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, contains_eager
 
 from backend.models import User, Deadline, DeadlineType
 from bot.services import checker
+from bot.services.db_executor import run_db
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +42,29 @@ def find_client_by_name_or_inn(db_session: Session, search_query: str):
     return clients
 
 
+def get_client_active_deadlines(db_session: Session, client_id: int):
+    """
+    Активные дедлайны клиента вместе с типами (без ленивых запросов при выводе)
+    
+    Args:
+        db_session: Сессия базы данных
+        client_id: ID клиента
+        
+    Returns:
+        Список дедлайнов, отсортированный по дате
+    """
+    return db_session.query(Deadline).join(
+        DeadlineType
+    ).options(
+        contains_eager(Deadline.deadline_type)
+    ).filter(
+        Deadline.user_id == client_id,
+        Deadline.status == 'active'
+    ).order_by(
+        Deadline.expiration_date
+    ).all()
+
+
 @router.message(Command('search'))
 async def cmd_search(
     message: Message,
@@ -95,9 +119,13 @@ async def cmd_search(
     
     logger.info(f"🔍 /search от {user_role} {user.id}: query='{search_query}'")
     
-    # Поиск в базе данных
+    # Поиск в локальной копии, если она синхронизирована, иначе в базе данных
+    replica = checker.get_read_replica()
     try:
-        found_clients = find_client_by_name_or_inn(db_session, search_query)
+        if replica is not None:
+            found_clients = replica.search_clients(search_query)
+        else:
+            found_clients = await run_db(find_client_by_name_or_inn, db_session, search_query)
         
         if not found_clients:
             await message.answer(
@@ -130,20 +158,22 @@ async def cmd_search(
         
         # Формируем подробную информацию для каждого найденного клиента (до 10 шт)
         for client in found_clients[:10]:
-            # Получаем активные дедлайны клиента
-            active_deadlines = db_session.query(Deadline).join(
-                DeadlineType
-            ).filter(
-                Deadline.user_id == client.id,
-                Deadline.status == 'active'
-            ).order_by(
-                Deadline.deadline_date
-            ).all()
+            # Получаем активные дедлайны клиента: (тип, дата истечения)
+            if replica is not None:
+                active_deadlines = [
+                    (d['deadline_type_name'], d['expiration_date'])
+                    for d in replica.client_deadlines(client.id)
+                ]
+            else:
+                active_deadlines = [
+                    (d.deadline_type.type_name, d.expiration_date)
+                    for d in await run_db(get_client_active_deadlines, db_session, client.id)
+                ]
             
             # Формируем список дедлайнов
             deadlines_info = ""
-            for d in active_deadlines[:5]:  # Максимум 5 дедлайнов
-                days = (d.deadline_date - date.today()).days
+            for type_name, expiration_date in active_deadlines[:5]:  # Максимум 5 дедлайнов
+                days = (expiration_date - date.today()).days
                 
                 if days < 0:
                     emoji = "⚫"
@@ -154,11 +184,14 @@ async def cmd_search(
                 else:
                     emoji = "🟢"
                 
-                deadlines_info += f"\n   {emoji} {d.deadline_type.name}: {d.deadline_date.strftime('%d.%m.%Y')} (через {days} дн.)"
+                deadlines_info += f"\n   {emoji} {type_name}: {expiration_date.strftime('%d.%m.%Y')} (через {days} дн.)"
             
             if len(active_deadlines) > 5:
                 deadlines_info += f"\n   <i>... и ещё {len(active_deadlines) - 5}</i>"
             
+            if not deadlines_info:
+                deadlines_info = "\n   <i>Нет дедлайнов</i>"
+            
             # Формируем ответ
             response_text = f"""
 🔍 <b>Результат поиска</b>
@@ -171,7 +204,7 @@ async def cmd_search(
 • Телефон: {client.phone or 'не указан'}
 • Статус: {'✅ Активен' if client.is_active else '❌ Неактивен'}
 
-<b>📅 Активные дедлайны ({len(active_deadlines)}):</b>{deadlines_info if deadlines_info else '\n   <i>Нет дедлайнов</i>'}
+<b>📅 Активные дедлайны ({len(active_deadlines)}):</b>{deadlines_info}
 
 <b>⚙️ Управление:</b>
 • /client {client.id} - полная карточка клиента
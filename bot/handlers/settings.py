@@ -12,6 +12,7 @@ from sqlalchemy.orm import Session
 
 from backend.models import User, Deadline
 from bot.services.formatter import format_deadline_list
+from bot.services.db_executor import run_db
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +20,61 @@ logger = logging.getLogger(__name__)
 router = Router()
 
 
+def _set_notifications_enabled(db_session: Session, telegram_id: str, enabled: bool) -> bool:
+    """
+    Включение/отключение уведомлений клиента (выполняется через run_db)
+    
+    Args:
+        db_session: Сессия базы данных
+        telegram_id: Telegram ID клиента
+        enabled: Новое значение
+        
+    Returns:
+        bool: False если клиент не найден
+    """
+    user_obj = db_session.query(User).filter(
+        User.telegram_id == telegram_id,
+        User.role == 'client'
+    ).first()
+    
+    if not user_obj:
+        return False
+    
+    user_obj.notifications_enabled = enabled
+    db_session.commit()
+    return True
+
+
+def _get_client_settings(db_session: Session, telegram_id: str) -> dict:
+    """
+    Настройки клиента и количество активных дедлайнов (выполняется через run_db)
+    
+    Args:
+        db_session: Сессия базы данных
+        telegram_id: Telegram ID клиента
+        
+    Returns:
+        dict: notifications_enabled, deadlines_count или None если клиент не найден
+    """
+    user_obj = db_session.query(User).filter(
+        User.telegram_id == telegram_id,
+        User.role == 'client'
+    ).first()
+    
+    if not user_obj:
+        return None
+    
+    deadlines_count = db_session.query(Deadline).filter(
+        Deadline.user_id == user_obj.id,
+        Deadline.status == 'active'
+    ).count()
+    
+    return {
+        'notifications_enabled': user_obj.notifications_enabled,
+        'deadlines_count': deadlines_count
+    }
+
+
 @router.message(Command('mute'))
 async def cmd_mute(
     message: Message,
@@ -76,13 +132,12 @@ async def cmd_mute(
             return
     
     try:
-        # Находим пользователя по telegram_id
-        user_obj = db_session.query(User).filter(
-            User.telegram_id == str(user.id),
-            User.role == 'client'
-        ).first()
+        # Отключаем уведомления
+        # Note: muted_until поле не существует в новой модели User
+        # Можно добавить в notes или просто отключить
+        found = await run_db(_set_notifications_enabled, db_session, str(user.id), False)
         
-        if not user_obj:
+        if not found:
             await message.answer(
                 "❌ <b>Контакт не найден</b>\n\n"
                 "Обратитесь к администратору.",
@@ -90,12 +145,6 @@ async def cmd_mute(
             )
             return
         
-        # Отключаем уведомления
-        user_obj.notifications_enabled = False
-        # Note: muted_until поле не существует в новой модели User
-        # Можно добавить в notes или просто отключить
-        db_session.commit()
-        
         await message.answer(
             f"🔕 <b>Уведомления отключены</b>\n\n"
             f"📅 На {days} дн.\n\n"
@@ -142,23 +191,16 @@ async def cmd_unmute(
         return
     
     try:
-        # Находим пользователя по telegram_id
-        user_obj = db_session.query(User).filter(
-            User.telegram_id == str(user.id),
-            User.role == 'client'
-        ).first()
+        # Включаем уведомления
+        found = await run_db(_set_notifications_enabled, db_session, str(user.id), True)
         
-        if not user_obj:
+        if not found:
             await message.answer(
                 "❌ <b>Контакт не найден</b>",
                 parse_mode='HTML'
             )
             return
         
-        # Включаем уведомления
-        user_obj.notifications_enabled = True
-        db_session.commit()
-        
         await message.answer(
             "🔔 <b>Уведомления включены</b>\n\n"
             "Вы снова будете получать уведомления о приближающихся сроках.",
@@ -225,17 +267,14 @@ async def cmd_settings(
             
         else:
             # Для клиента показываем его настройки
-            user_obj = db_session.query(User).filter(
-                User.telegram_id == str(user.id),
-                User.role == 'client'
-            ).first()
+            client_settings = await run_db(_get_client_settings, db_session, str(user.id))
             
-            if not user_obj:
+            if not client_settings:
                 await message.answer("❌ <b>Контакт не найден</b>", parse_mode='HTML')
                 return
             
             # Статус уведомлений
-            if user_obj.notifications_enabled:
+            if client_settings['notifications_enabled']:
                 status = "✅ Включены"
                 mute_info = ""
             else:
@@ -243,10 +282,7 @@ async def cmd_settings(
                 mute_info = ""
             
             # Количество активных дедлайнов
-            deadlines_count = db_session.query(Deadline).filter(
-                Deadline.user_id == user_obj.id,
-                Deadline.status == 'active'
-            ).count()
+            deadlines_count = client_settings['deadlines_count']
             
             response = f"""
 ⚙️ <b>Ваши настройки</b>
@@ -276,6 +312,60 @@ async def cmd_settings(
         )
 
 
+def _write_export_file(db_session: Session, user_role: str, client_id: int, client_name: str) -> tuple:
+    """
+    Выборка дедлайнов и запись JSON файла экспорта (выполняется через run_db)
+    
+    Args:
+        db_session: Сессия базы данных
+        user_role: Роль пользователя
+        client_id: ID клиента
+        client_name: Название клиента
+        
+    Returns:
+        tuple: (путь к файлу, количество дедлайнов)
+    """
+    # Получаем дедлайны клиента
+    deadlines_query = db_session.query(Deadline).filter(
+        Deadline.status == 'active'
+    )
+    
+    if user_role == 'client':
+        deadlines_query = deadlines_query.filter(Deadline.client_id == client_id)
+    
+    deadlines = deadlines_query.all()
+    
+    # Формируем JSON
+    export_data = {
+        'export_date': datetime.now().isoformat(),
+        'client_name': client_name if user_role == 'client' else 'All Clients',
+        'deadlines_count': len(deadlines),
+        'deadlines': []
+    }
+    
+    for d in deadlines:
+        export_data['deadlines'].append({
+            'id': d.id,
+            'client_name': d.client.name,
+            'client_inn': d.client.inn,
+            'deadline_type': d.deadline_type.type_name,
+            'expiration_date': d.expiration_date.isoformat(),
+            'days_remaining': (d.expiration_date - date.today()).days,
+            'notes': d.notes,
+            'status': d.status,
+            'created_at': d.created_at.isoformat() if d.created_at else None
+        })
+    
+    # Создаём временный файл
+    filename = f"export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    filepath = f"logs/{filename}"
+    
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(export_data, f, ensure_ascii=False, indent=2)
+    
+    return filepath, len(deadlines)
+
+
 @router.message(Command('export'))
 async def cmd_export(
     message: Message,
@@ -303,52 +393,19 @@ async def cmd_export(
         return
     
     try:
-        # Получаем дедлайны клиента
-        deadlines_query = db_session.query(Deadline).filter(
-            Deadline.status == 'active'
+        # Запросы и запись файла - в пуле потоков БД
+        filepath, deadlines_count = await run_db(
+            _write_export_file, db_session, user_role, client_id, client_name
         )
         
-        if user_role == 'client':
-            deadlines_query = deadlines_query.filter(Deadline.client_id == client_id)
-        
-        deadlines = deadlines_query.all()
-        
-        # Формируем JSON
-        export_data = {
-            'export_date': datetime.now().isoformat(),
-            'client_name': client_name if user_role == 'client' else 'All Clients',
-            'deadlines_count': len(deadlines),
-            'deadlines': []
-        }
-        
-        for d in deadlines:
-            export_data['deadlines'].append({
-                'id': d.id,
-                'client_name': d.client.name,
-                'client_inn': d.client.inn,
-                'deadline_type': d.deadline_type.type_name,
-                'expiration_date': d.expiration_date.isoformat(),
-                'days_remaining': (d.expiration_date - date.today()).days,
-                'notes': d.notes,
-                'status': d.status,
-                'created_at': d.created_at.isoformat() if d.created_at else None
-            })
-        
-        # Создаём временный файл
-        filename = f"export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        filepath = f"logs/{filename}"
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, ensure_ascii=False, indent=2)
-        
         # Отправляем файл
         await message.answer_document(
             document=FSInputFile(filepath),
-            caption=f"📊 <b>Экспорт данных</b>\n\nВсего дедлайнов: {len(deadlines)}",
+            caption=f"📊 <b>Экспорт данных</b>\n\nВсего дедлайнов: {deadlines_count}",
             parse_mode='HTML'
         )
         
-        logger.info(f"📊 Экспорт данных: user_id={message.from_user.id}, count={len(deadlines)}")
+        logger.info(f"📊 Экспорт данных: user_id={message.from_user.id}, count={deadlines_count}")
         
     except Exception as e:
         logger.error(f"❌ Ошибка при экспорте: {e}")
@@ -0,0 +1,616 @@
+# -*- coding: utf-8 -*-
+"""
+Нагрузочный тест диспетчера Telegram бота без сети
+
+Собирает настоящий Dispatcher (create_dispatcher, setup_middlewares,
+register_handlers), подменяет сессию Bot на локальную с настраиваемой
+задержкой ответа Telegram API и прогоняет синтетические сценарии
+пользователей (команды, кнопки, шаги FSM, листание страниц) с заданной
+частотой обновлений на заполненной тестовыми данными SQLite базе.
+
+Отчёт: p50/p95/p99 по обработчикам, накладные расходы middleware и фильтров,
+открытые сессии и запросы к БД, вызовы Bot API, задержка event loop.
+
+Сетевая сессия aiogram на время теста заблокирована: вызов Bot API мимо
+подменённой сессии (Bot, созданный в коде бота) не уходит в Telegram,
+попадает в отчёт, и тест завершается с ошибкой.
+
+Использование:
+    python -m bot.loadtest --seed --updates 5000 --rate 200
+    python -m bot.loadtest --updates 20000 --rate 500 --api-latency-ms 80 --json report.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import random
+import time
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Telegram ID синтетических пользователей
+ADMIN_IDS = (900001, 900002)
+MANAGER_IDS = (900101,)
+CLIENT_ID_BASE = 1000000
+UNKNOWN_ID_BASE = 2000000
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Аргументы командной строки"""
+    parser = argparse.ArgumentParser(description="Нагрузочный тест диспетчера бота (offline, SQLite)")
+    parser.add_argument('--db', default='database/loadtest.db', help="Файл SQLite базы для теста")
+    parser.add_argument('--seed', action='store_true', help="Пересоздать базу и заполнить тестовыми данными")
+    parser.add_argument('--clients', type=int, default=200, help="Клиентов при заполнении")
+    parser.add_argument('--deadlines-per-client', type=int, default=10, help="Дедлайнов на клиента при заполнении")
+    parser.add_argument('--unknown-users', type=int, default=100, help="Незарегистрированных пользователей")
+    parser.add_argument('--updates', type=int, default=5000, help="Сколько обновлений отправить")
+    parser.add_argument('--rate', type=float, default=200.0, help="Целевая частота обновлений в секунду")
+    parser.add_argument('--api-latency-ms', type=float, default=50.0, help="Задержка ответа Telegram API (мс)")
+    parser.add_argument('--api-jitter-ms', type=float, default=20.0, help="Разброс задержки Telegram API (мс)")
+    parser.add_argument('--log-level', default='WARNING', help="Уровень логирования во время теста")
+    parser.add_argument('--random-seed', type=int, default=42, help="Seed генератора сценариев")
+    parser.add_argument('--json', dest='json_path', help="Сохранить отчёт в JSON файл")
+    return parser.parse_args(argv)
+
+
+def configure_environment(args: argparse.Namespace):
+    """
+    Настройки бота для offline теста (до импорта модулей бота)
+
+    Args:
+        args: Аргументы командной строки
+    """
+    db_path = os.path.abspath(args.db)
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+    os.environ['BOT_FSM_STORAGE_PATH'] = f"{db_path}.fsm"
+    os.environ['TELEGRAM_ADMIN_IDS'] = ','.join(map(str, ADMIN_IDS))
+    os.environ['TELEGRAM_MANAGER_IDS'] = ','.join(map(str, MANAGER_IDS))
+    os.environ.setdefault('TELEGRAM_BOT_TOKEN', '123456:LOADTEST')
+    os.environ.setdefault('JWT_SECRET_KEY', 'loadtest')
+
+    if args.seed:
+        for path in (db_path, f"{db_path}.fsm"):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+# ============================================
+# Тестовые данные
+# ============================================
+
+def seed_database(clients: int, deadlines_per_client: int) -> Dict[str, int]:
+    """
+    Создание таблиц и тестовых данных
+
+    Args:
+        clients: Количество клиентов
+        deadlines_per_client: Дедлайнов на клиента
+
+    Returns:
+        Dict: Количество созданных записей
+    """
+    from backend.database import SessionLocal, engine, Base as BackendBase
+    from web.app.database import Base as WebBase
+    from web.app.models.user import User
+    from web.app.models.client import Deadline, DeadlineType
+    from web.app.models.cash_register import CashRegister
+    import backend.models  # noqa: F401 - регистрация таблиц бота
+
+    # Схема веб-приложения первой: таблица users у неё полнее
+    WebBase.metadata.create_all(bind=engine)
+    BackendBase.metadata.create_all(bind=engine)
+
+    rnd = random.Random(1)
+    today = date.today()
+    db = SessionLocal()
+    try:
+        types = [DeadlineType(type_name=name) for name in ('ОФД', 'ФН', 'Регистрация ККТ', 'ЭЦП')]
+        db.add_all(types)
+        db.flush()
+
+        users = [
+            User(
+                username=f"client{i}",
+                email=f"client{i}@loadtest.local",
+                full_name=f"Клиент {i}",
+                role='client',
+                company_name=f"ООО Компания {i}",
+                inn=f"77{i:08d}",
+                telegram_id=str(CLIENT_ID_BASE + i),
+                is_active=True
+            )
+            for i in range(clients)
+        ]
+        db.add_all(users)
+        db.flush()
+
+        registers = [
+            CashRegister(
+                client_id=user.id,
+                model='АТОЛ 30Ф',
+                factory_number=f"{user.id:06d}{n}",
+                register_name=f"Касса {n + 1}",
+                installation_address=f"г. Москва, ул. Тестовая, д. {user.id}"
+            )
+            for user in users for n in range(2)
+        ]
+        db.add_all(registers)
+        db.flush()
+
+        registers_by_client = defaultdict(list)
+        for register in registers:
+            registers_by_client[register.client_id].append(register.id)
+
+        deadlines = [
+            Deadline(
+                client_id=user.id,
+                deadline_type_id=rnd.choice(types).id,
+                cash_register_id=rnd.choice(registers_by_client[user.id] + [None]),
+                expiration_date=today + timedelta(days=rnd.randint(-10, 90)),
+                status='active'
+            )
+            for user in users for _ in range(deadlines_per_client)
+        ]
+        db.add_all(deadlines)
+        db.commit()
+
+        return {'clients': len(users), 'cash_registers': len(registers), 'deadlines': len(deadlines)}
+    finally:
+        db.close()
+
+
+def load_client_ids() -> Dict[int, int]:
+    """Telegram ID -> ID клиента для сценариев с кнопками"""
+    from backend.database import SessionLocal
+    from web.app.models.user import User
+
+    db = SessionLocal()
+    try:
+        rows = db.query(User.telegram_id, User.id).filter(
+            User.role == 'client',
+            User.telegram_id.isnot(None)
+        ).all()
+        return {int(telegram_id): user_id for telegram_id, user_id in rows}
+    finally:
+        db.close()
+
+
+# ============================================
+# Сессия Bot без сети
+# ============================================
+
+def build_fake_session(latency: float, jitter: float, api_calls: Counter):
+    """
+    Сессия aiogram, отвечающая на вызовы Bot API локально
+
+    Args:
+        latency: Средняя задержка ответа (секунды)
+        jitter: Разброс задержки (секунды)
+        api_calls: Счётчик вызовов по методам
+
+    Returns:
+        BaseSession
+    """
+    import typing
+    from aiogram.client.session.base import BaseSession
+    from aiogram.types import Chat, Message, User
+    from pydantic import BaseModel
+
+    message_ids = itertools.count(1)
+    me = User(id=123456, is_bot=True, first_name='LoadTest', username='loadtest_bot')
+
+    class FakeSession(BaseSession):
+        async def make_request(self, bot, method, timeout=None):
+            api_calls[type(method).__name__] += 1
+            await asyncio.sleep(max(latency + random.uniform(-jitter, jitter), 0))
+            return self._result(bot, method)
+
+        def _result(self, bot, method) -> Any:
+            returning = method.__returning__
+            if typing.get_origin(returning) is typing.Union:
+                returning = next(arg for arg in typing.get_args(returning) if arg is not bool)
+            if typing.get_origin(returning) is list:
+                return []
+            if returning is bool:
+                return True
+            if returning is User:
+                return me
+            if returning is Message:
+                chat_id = getattr(method, 'chat_id', None) or 0
+                return Message(
+                    message_id=next(message_ids),
+                    date=datetime.now(),
+                    chat=Chat(id=int(chat_id) if str(chat_id).lstrip('-').isdigit() else 0, type='private'),
+                    from_user=me,
+                    text=getattr(method, 'text', None)
+                ).as_(bot)
+            if isinstance(returning, type) and issubclass(returning, BaseModel):
+                return returning.model_construct()
+            return True
+
+        async def close(self):
+            pass
+
+        async def stream_content(self, url, headers=None, timeout=30, chunk_size=65536, raise_for_status=True):
+            yield b''
+
+    return FakeSession()
+
+
+def block_real_bot_api(real_calls: Counter):
+    """
+    Запрет запросов к настоящему Telegram API на время теста
+
+    Args:
+        real_calls: Счётчик заблокированных вызовов по методам
+    """
+    from aiogram.client.session.aiohttp import AiohttpSession
+
+    async def make_request(self, bot, method, timeout=None):
+        real_calls[type(method).__name__] += 1
+        raise RuntimeError(f"Вызов Telegram API мимо тестовой сессии: {type(method).__name__}")
+
+    AiohttpSession.make_request = make_request
+
+
+# ============================================
+# Сбор метрик
+# ============================================
+
+class LoadTestStats:
+    """Замеры по обработчикам и обновлениям"""
+
+    def __init__(self):
+        self.handler_times: Dict[str, List[float]] = defaultdict(list)
+        self.update_times: Dict[str, List[float]] = defaultdict(list)
+        self.overhead: List[float] = []
+        self.errors: Counter = Counter()
+        self.db = Counter()
+
+    def handler_middleware(self):
+        """Самое внутреннее middleware: время обработчика по его имени"""
+        stats = self
+
+        async def middleware(
+            handler: Callable[[Any, Dict[str, Any]], Awaitable[Any]],
+            event: Any,
+            data: Dict[str, Any]
+        ) -> Any:
+            callback = data['handler'].callback
+            name = f"{callback.__module__.rsplit('.', 1)[-1]}.{callback.__name__}"
+            started = time.perf_counter()
+            try:
+                return await handler(event, data)
+            except Exception:
+                stats.errors[name] += 1
+                raise
+            finally:
+                elapsed = time.perf_counter() - started
+                stats.handler_times[name].append(elapsed)
+                # Словарь, переданный в feed_update: время вычитается из времени обновления
+                if '_loadtest' in data:
+                    data['_loadtest']['handler_time'] = elapsed
+
+        return middleware
+
+    def attach_db_counters(self):
+        """Счётчики сессий, соединений и SQL запросов"""
+        from sqlalchemy import event
+        from backend.database import SessionLocal, engine
+
+        event.listen(SessionLocal, 'after_begin', lambda *a: self.db.update(['transactions']))
+        event.listen(engine, 'checkout', lambda *a: self.db.update(['connection_checkouts']))
+        event.listen(engine, 'before_cursor_execute', lambda *a: self.db.update(['statements']))
+
+    def record_update(self, kind: str, elapsed: float, handler_time: Optional[float]):
+        self.update_times[kind].append(elapsed)
+        if handler_time is not None:
+            self.overhead.append(elapsed - handler_time)
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    """count, p50, p95, p99, max (мс)"""
+    if not values:
+        return {'count': 0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+    ordered = sorted(values)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(int(q * len(ordered)), len(ordered) - 1)] * 1000, 1)
+
+    return {
+        'count': len(ordered),
+        'p50': pick(0.50),
+        'p95': pick(0.95),
+        'p99': pick(0.99),
+        'max': round(ordered[-1] * 1000, 1)
+    }
+
+
+# ============================================
+# Сценарии пользователей
+# ============================================
+
+Step = Tuple[str, str]  # ('message' | 'callback', текст или callback_data)
+
+
+def build_scenarios() -> List[Tuple[str, int, List[Step]]]:
+    """
+    Шаблоны сценариев с весами по частоте
+
+    Returns:
+        List: (тип пользователя, вес, шаги); {cid} в шаге - ID клиента,
+        конкретный пользователь выбирается при генерации
+    """
+    return [
+        ('client', 30, [('message', "📋 Мои дедлайны"), ('callback', "dlp:m:0:{cid}:2")]),
+        ('client', 10, [('message', "/start")]),
+        ('client', 10, [('message', "/list")]),
+        ('client', 5, [('message', "/settings")]),
+        ('client', 5, [
+            ('message', "❓ Помощь"),
+            ('message', "Вопрос по продлению ОФД"),
+            ('message', "Подскажите сроки продления договора"),
+            ('message', "+7 900 000-00-00")
+        ]),
+        ('admin', 8, [('message', "/list"), ('callback', "dlp:l:30:0:2")]),
+        ('admin', 5, [('message', "/today")]),
+        ('admin', 5, [('message', "/week")]),
+        ('admin', 5, [('message', "/search Компания 1")]),
+        ('admin', 3, [('message', "/status")]),
+        ('admin', 2, [('message', "/health")]),
+        ('manager', 4, [('message', "/next 60")]),
+        ('unknown', 8, [('message', "/start"), ('message', "ABC123")]),
+    ]
+
+
+class ScenarioRunner:
+    """Генерация и отправка обновлений в диспетчер"""
+
+    def __init__(self, dp, bot, stats: LoadTestStats, client_ids: Dict[int, int], unknown_users: int, seed: int):
+        self.dp = dp
+        self.bot = bot
+        self.stats = stats
+        self.client_ids = client_ids
+        self.unknown_users = unknown_users
+        self.rnd = random.Random(seed)
+        self.templates = build_scenarios()
+        self.update_ids = itertools.count(1)
+        self.message_ids = itertools.count(1)
+        # Шаги одного пользователя выполняются по очереди (FSM)
+        self.user_locks: Dict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self.sent = 0
+
+    def _pick(self) -> Tuple[int, List[Step], str]:
+        kind, _, steps = self.rnd.choices(self.templates, weights=[t[1] for t in self.templates])[0]
+        if kind == 'client':
+            telegram_id = self.rnd.choice(list(self.client_ids))
+        elif kind == 'admin':
+            telegram_id = self.rnd.choice(ADMIN_IDS)
+        elif kind == 'manager':
+            telegram_id = self.rnd.choice(MANAGER_IDS)
+        else:
+            telegram_id = UNKNOWN_ID_BASE + self.rnd.randrange(self.unknown_users)
+        return telegram_id, steps, kind
+
+    def _update(self, telegram_id: int, step: Step):
+        from aiogram.types import Update
+
+        kind, payload = step
+        payload = payload.format(cid=self.client_ids.get(telegram_id, 0))
+        user = {'id': telegram_id, 'is_bot': False, 'first_name': f"User{telegram_id}"}
+        message = {
+            'message_id': next(self.message_ids),
+            'date': int(time.time()),
+            'chat': {'id': telegram_id, 'type': 'private'},
+            'from': user,
+            'text': payload
+        }
+        if kind == 'message':
+            body = {'message': message}
+        else:
+            message['from'] = {'id': 123456, 'is_bot': True, 'first_name': 'LoadTest'}
+            body = {'callback_query': {
+                'id': str(next(self.update_ids)),
+                'from': user,
+                'chat_instance': str(telegram_id),
+                'message': message,
+                'data': payload
+            }}
+        return Update.model_validate({'update_id': next(self.update_ids), **body}, context={'bot': self.bot})
+
+    async def _run_scenario(self, telegram_id: int, steps: List[Step], budget: int):
+        async with self.user_locks[telegram_id]:
+            for step in steps[:budget]:
+                update = self._update(telegram_id, step)
+                data: Dict[str, Any] = {}
+                started = time.perf_counter()
+                try:
+                    await self.dp.feed_update(self.bot, update, _loadtest=data)
+                except Exception:
+                    self.stats.errors['update'] += 1
+                elapsed = time.perf_counter() - started
+                self.stats.record_update(step[0], elapsed, data.get('handler_time'))
+
+    async def run(self, total_updates: int, rate: float) -> float:
+        """
+        Отправка обновлений с целевой частотой
+
+        Args:
+            total_updates: Сколько обновлений отправить
+            rate: Обновлений в секунду
+
+        Returns:
+            float: Фактическая длительность (секунды)
+        """
+        tasks = []
+        started = time.perf_counter()
+        while self.sent < total_updates:
+            telegram_id, steps, _ = self._pick()
+            budget = min(len(steps), total_updates - self.sent)
+            self.sent += budget
+            tasks.append(asyncio.create_task(self._run_scenario(telegram_id, steps, budget)))
+
+            # Сценарий из N шагов занимает N слотов расписания
+            next_at = started + self.sent / rate
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        await asyncio.gather(*tasks)
+        return time.perf_counter() - started
+
+
+# ============================================
+# Запуск
+# ============================================
+
+async def run_load_test(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Сборка диспетчера, прогон сценариев и сбор отчёта
+
+    Args:
+        args: Аргументы командной строки
+
+    Returns:
+        Dict: Отчёт
+    """
+    from aiogram import Bot
+    from bot.main import create_dispatcher, setup_middlewares, register_handlers
+    from bot.services.db_executor import get_db_executor_metrics, shutdown_db_executor
+    from bot.services.loop_monitor import LoopLagMonitor
+
+    logging.getLogger().setLevel(args.log_level.upper())
+    logging.getLogger('aiogram').setLevel(max(logging.getLogger().level, logging.WARNING))
+
+    seeded = seed_database(args.clients, args.deadlines_per_client) if args.seed else None
+    client_ids = load_client_ids()
+    if not client_ids:
+        raise SystemExit("В базе нет клиентов с Telegram ID - запустите с --seed")
+
+    api_calls: Counter = Counter()
+    real_api_calls: Counter = Counter()
+    block_real_bot_api(real_api_calls)
+    bot = Bot(
+        token=os.environ['TELEGRAM_BOT_TOKEN'],
+        session=build_fake_session(args.api_latency_ms / 1000, args.api_jitter_ms / 1000, api_calls)
+    )
+
+    stats = LoadTestStats()
+    stats.attach_db_counters()
+
+    dp = create_dispatcher()
+    setup_middlewares(dp)
+    register_handlers(dp)
+
+    # Замер времени обработчика - после middleware бота (самое внутреннее)
+    handler_middleware = stats.handler_middleware()
+    dp.message.middleware(handler_middleware)
+    dp.callback_query.middleware(handler_middleware)
+
+    monitor = LoopLagMonitor(interval=0.05, warning_threshold=float('inf'))
+    monitor.start()
+
+    runner = ScenarioRunner(dp, bot, stats, client_ids, args.unknown_users, args.random_seed)
+    try:
+        duration = await runner.run(args.updates, args.rate)
+    finally:
+        await monitor.stop()
+        await dp.storage.close()
+        await bot.session.close()
+
+    db_executor = get_db_executor_metrics()
+    shutdown_db_executor()
+
+    all_updates = [t for times in stats.update_times.values() for t in times]
+    return {
+        'config': {
+            'updates': args.updates,
+            'target_rate': args.rate,
+            'api_latency_ms': args.api_latency_ms,
+            'clients': len(client_ids),
+            'seeded': seeded
+        },
+        'duration_s': round(duration, 2),
+        'throughput': round(len(all_updates) / duration, 1) if duration else 0.0,
+        'updates': {kind: percentiles(times) for kind, times in stats.update_times.items()},
+        'updates_total': percentiles(all_updates),
+        'handlers': {name: percentiles(times) for name, times in sorted(stats.handler_times.items())},
+        'middleware_overhead': percentiles(stats.overhead),
+        'errors': dict(stats.errors),
+        'db': {
+            **dict(stats.db),
+            'per_update': round(stats.db['transactions'] / len(all_updates), 2) if all_updates else 0.0,
+            'executor_max_wait_ms': round(db_executor['max_wait'] * 1000, 1),
+            'executor_max_run_ms': round(db_executor['max_run'] * 1000, 1)
+        },
+        'bot_api_calls': dict(api_calls),
+        'real_api_calls': dict(real_api_calls),
+        'loop_lag': monitor.get_metrics()
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Текстовый отчёт для консоли"""
+    def row(name: str, p: Dict[str, float]) -> str:
+        return f"  {name:<42} {p['count']:>7} {p['p50']:>9} {p['p95']:>9} {p['p99']:>9} {p['max']:>9}"
+
+    header = f"  {'':<42} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+    lines = [
+        "=" * 90,
+        f"Обновлений: {report['updates_total']['count']} за {report['duration_s']} сек "
+        f"({report['throughput']}/сек, цель {report['config']['target_rate']}/сек), "
+        f"задержка Telegram API {report['config']['api_latency_ms']} мс",
+        "=" * 90,
+        "Обновление целиком:",
+        header,
+        *(row(kind, p) for kind, p in sorted(report['updates'].items())),
+        row('всего', report['updates_total']),
+        "",
+        "Обработчики (без middleware):",
+        header,
+        *(row(name, p) for name, p in report['handlers'].items()),
+        "",
+        "Middleware и фильтры (обновление минус обработчик):",
+        header,
+        row('overhead', report['middleware_overhead']),
+        "",
+        f"БД: транзакций {report['db'].get('transactions', 0)} "
+        f"({report['db']['per_update']} на обновление), "
+        f"соединений из пула {report['db'].get('connection_checkouts', 0)}, "
+        f"SQL запросов {report['db'].get('statements', 0)}; "
+        f"макс. ожидание потока {report['db']['executor_max_wait_ms']} мс",
+        f"Bot API: {sum(report['bot_api_calls'].values())} вызовов "
+        f"({', '.join(f'{k}={v}' for k, v in sorted(report['bot_api_calls'].items()))})",
+        f"Event loop: средняя задержка {report['loop_lag']['avg_ms']} мс, "
+        f"максимум {report['loop_lag']['max_ms']} мс",
+        f"Ошибки: {report['errors'] or 'нет'}",
+        f"Вызовы настоящего Telegram API (заблокированы): {report['real_api_calls'] or 'нет'}",
+        "=" * 90,
+    ]
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    configure_environment(args)
+
+    report = asyncio.run(run_load_test(args))
+    print(format_report(report))
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+        print(f"Отчёт сохранён: {args.json_path}")
+
+    if report['real_api_calls']:
+        raise SystemExit("Тест не offline: обработчики обращались к настоящему Telegram API")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,7 +4,6 @@
 """
 import asyncio
 import logging
-import os
 from aiogram import Bot, Dispatcher
 from aiogram.enums import ParseMode
 from aiogram.client.default import DefaultBotProperties
@@ -16,26 +15,22 @@ from bot.middlewares.logging import LoggingMiddleware
 # Импорт обработчиков
 from bot.handlers import common, admin, deadlines, registration
 from bot.handlers import settings as settings_handler
-from bot.handlers import search, export, client_buttons
+from bot.handlers import search, export, client_buttons, broadcast, inline_search
 
 from bot.scheduler import setup_scheduler
-from backend.database import SessionLocal
 from backend.config import settings
+from backend.logging_config import setup_logging, shutdown_logging
 
 # Импорт API клиента
 from bot.services.token_manager import TokenManager
 from bot.services.api_client import WebAPIClient
+from bot.services.circuit_breaker import CircuitBreaker
 from bot.services import checker
-
-# Настройка логирования
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('logs/bot.log', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+from bot.services.fsm_storage import SQLiteStorage
+from bot.services.broadcast import BroadcastSender
+from bot.services.db_executor import shutdown_db_executor
+from bot.services.loop_monitor import LoopLagMonitor, set_loop_monitor
+from bot.services.read_replica import DeadlineReplica, ReplicaSyncer
 
 logger = logging.getLogger(__name__)
 
@@ -56,13 +51,17 @@ def create_bot() -> Bot:
 def create_dispatcher() -> Dispatcher:
     """
     Создание диспетчера для обработки обновлений
-    Инициализирует FSM storage для работы с состояниями
+    Инициализирует персистентный FSM storage (SQLite), чтобы диалоги
+    регистрации и обращений не терялись при перезапуске бота
     
     Returns:
         Dispatcher: Настроенный диспетчер
     """
-    from aiogram.fsm.storage.memory import MemoryStorage
-    storage = MemoryStorage()
+    storage = SQLiteStorage(
+        path=settings.bot_fsm_storage_path,
+        state_ttl=settings.bot_fsm_state_ttl,
+        flush_interval=settings.bot_fsm_flush_interval
+    )
     return Dispatcher(storage=storage)
 
 
@@ -87,7 +86,18 @@ async def create_api_client() -> WebAPIClient:
     api_client = WebAPIClient(
         base_url=settings.web_api_base_url,
         token_manager=token_manager,
-        timeout=settings.web_api_timeout
+        timeout=settings.web_api_timeout,
+        cache_ttls=settings.web_api_cache_ttls_dict,
+        circuit_breaker=CircuitBreaker(
+            name='web_api',
+            failure_rate_threshold=settings.web_api_cb_failure_rate,
+            slow_call_threshold=settings.web_api_cb_slow_call_seconds,
+            slow_call_rate_threshold=settings.web_api_cb_slow_call_rate,
+            window_size=settings.web_api_cb_window_size,
+            min_calls=settings.web_api_cb_min_calls,
+            open_timeout=settings.web_api_cb_open_timeout,
+            probe_interval=settings.web_api_cb_probe_interval
+        )
     )
     
     # Проверяем подключение к API
@@ -140,6 +150,8 @@ def register_handlers(dp: Dispatcher):
     dp.include_router(search.router)                 # /search
     dp.include_router(settings_handler.router)       # /settings
     dp.include_router(export.router)                 # /export + callbacks
+    dp.include_router(broadcast.router)              # /broadcast + callbacks
+    dp.include_router(inline_search.router)          # @bot <запрос> - inline-поиск клиентов
     
     # 2. Регистрация клиентов (обработка FSM состояний)
     dp.include_router(registration.router)           # Авторизация клиентов
@@ -154,6 +166,8 @@ def register_handlers(dp: Dispatcher):
     logger.info("   - search (поиск)")
     logger.info("   - settings (настройки)")
     logger.info("   - export (экспорт данных)")
+    logger.info("   - broadcast (рассылки)")
+    logger.info("   - inline_search (inline-поиск клиентов)")
     logger.info("   - client_buttons (кнопки клиентов)")
 
 
@@ -168,7 +182,14 @@ async def main():
     # Создаём экземпляры
     bot = create_bot()
     dp = create_dispatcher()
-    db_session = SessionLocal()
+    
+    # Замер задержки event loop (максимум показывается в /health)
+    loop_monitor = LoopLagMonitor(
+        interval=settings.bot_loop_lag_interval,
+        warning_threshold=settings.bot_loop_lag_warning
+    )
+    loop_monitor.start()
+    set_loop_monitor(loop_monitor)
     
     # Создаём и настраиваем API клиент
     api_client = await create_api_client()
@@ -177,15 +198,32 @@ async def main():
     checker.set_api_client(api_client)
     logger.info("✅ API клиент установлен в сервисы бота")
     
+    # Локальная копия дедлайнов для команд чтения (догоняет API по дельтам)
+    replica_syncer = None
+    if settings.bot_replica_enabled:
+        replica = DeadlineReplica()
+        checker.set_read_replica(replica)
+        replica_syncer = ReplicaSyncer(api_client, replica, interval=settings.bot_replica_sync_interval)
+        replica_syncer.start()
+    
     # Настройка middleware и обработчиков
     setup_middlewares(dp)
     register_handlers(dp)
     
     # Настройка планировщика (передаём api_client)
-    scheduler = setup_scheduler(bot, db_session, api_client)
+    scheduler = setup_scheduler(bot, api_client)
     scheduler.start()
     logger.info("✅ Планировщик запущен")
     
+    # Отправитель рассылок (задания из веб-интерфейса и /broadcast)
+    broadcast_sender = BroadcastSender(
+        bot,
+        rate_per_second=settings.broadcast_rate_per_second,
+        batch_size=settings.broadcast_batch_size,
+        poll_interval=settings.broadcast_poll_interval
+    )
+    broadcast_sender.start()
+    
     # Получаем информацию о боте
     try:
         bot_info = await bot.get_me()
@@ -202,7 +240,7 @@ async def main():
         logger.info("Общие: /start, /help, /next, /list, /today, /week")
         logger.info("Поиск: /search")
         logger.info("Экспорт: /export")
-        logger.info("Система (админ): /status, /check, /health")
+        logger.info("Система (админ): /status, /check, /health, /broadcast")
         logger.info("=" * 60)
         logger.info("✅ Бот готов к работе! Нажмите Ctrl+C для остановки")
         logger.info("=" * 60)
@@ -221,7 +259,11 @@ async def main():
         # Graceful shutdown
         logger.info("🛑 Остановка бота...")
         scheduler.shutdown(wait=False)
-        db_session.close()
+        await broadcast_sender.stop()
+        if replica_syncer is not None:
+            await replica_syncer.stop()
+        await loop_monitor.stop()
+        shutdown_db_executor()
         
         # Закрываем API клиент
         await api_client.close()
@@ -232,14 +274,15 @@ async def main():
 
 
 if __name__ == '__main__':
+    # Настройка логирования (запись в logs/bot.log и консоль - в отдельном потоке)
+    setup_logging('bot', 'bot.log')
     try:
-        # Создаём директорию для логов
-        os.makedirs('logs', exist_ok=True)
-        
         asyncio.run(main())
     except KeyboardInterrupt:
         logger.info("👋 Бот остановлен пользователем (Ctrl+C)")
     except Exception as e:
         logger.error(f"💥 Критическая ошибка: {e}")
         import traceback
-        logger.error(traceback.format_exc())
\ No newline at end of file
+        logger.error(traceback.format_exc())
+    finally:
+        shutdown_logging()
\ No newline at end of file
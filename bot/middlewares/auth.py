@@ -10,6 +10,7 @@ from typing import Any, Dict, Callable, Awaitable, List
 from sqlalchemy.orm import Session
 from backend.database import SessionLocal
 from backend import models
+from bot.services.db_executor import run_db
 import logging
 
 logger = logging.getLogger(__name__)
@@ -41,6 +42,7 @@ class AuthMiddleware(BaseMiddleware):
             Any: Результат выполнения обработчика
         """
         # Создаём сессию БД для обработчика
+        # Обработчики выполняют запросы через run_db, соединение берётся лениво
         db_session: Session = SessionLocal()
         
         try:
@@ -55,8 +57,8 @@ class AuthMiddleware(BaseMiddleware):
                 logger.warning(f"Неизвестный тип события: {type(event)}")
                 return await handler(event, data)
             
-            # Проверяем роль пользователя
-            user_role, client_id = self._check_user_role(user_id)
+            # Проверяем роль пользователя (запрос к БД - в пуле потоков)
+            user_role, client_id = await run_db(self._check_user_role, user_id)
             
             # Добавляем информацию о пользователе в данные события
             data['user_id'] = user_id
@@ -79,8 +81,8 @@ class AuthMiddleware(BaseMiddleware):
             return await handler(event, data)
             
         finally:
-            # Закрываем сессию после обработки
-            db_session.close()
+            # Закрываем сессию после обработки (возврат соединения в пул - тоже вне loop)
+            await run_db(db_session.close)
 
     def _check_user_role(self, telegram_id: int) -> tuple:
         """
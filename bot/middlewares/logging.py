@@ -11,6 +11,8 @@ from aiogram import BaseMiddleware
 from aiogram.types import Message, CallbackQuery
 from typing import Any, Dict, Callable, Awaitable
 
+from backend.logging_config import update_id_var
+
 logger = logging.getLogger(__name__)
 
 
@@ -41,17 +43,21 @@ class LoggingMiddleware(BaseMiddleware):
         """
         start_time = time.time()
         
+        # update_id попадает во все записи логов, сделанные при обработке
+        update = data.get('event_update')
+        context_token = update_id_var.set(update.update_id if update else None)
+        
         try:
-            # Логируем входящее сообщение
+            # Текст сообщения - только на DEBUG (частая строка, пишется выборочно)
             if isinstance(event, Message):
                 user = event.from_user
-                logger.info(
+                logger.debug(
                     f"📥 Входящее сообщение от @{user.username or user.id} "
                     f"(ID: {user.id}): {event.text or '[non-text]'}"
                 )
             elif isinstance(event, CallbackQuery):
                 user = event.from_user
-                logger.info(
+                logger.debug(
                     f"📥 Callback от @{user.username or user.id} "
                     f"(ID: {user.id}): {event.data}"
                 )
@@ -61,14 +67,14 @@ class LoggingMiddleware(BaseMiddleware):
             
             # Логируем успешное выполнение
             execution_time = time.time() - start_time
-            if isinstance(event, Message):
-                logger.info(
-                    f"✅ Сообщение обработано за {execution_time:.3f} секунд"
-                )
-            elif isinstance(event, CallbackQuery):
-                logger.info(
-                    f"✅ Callback обработан за {execution_time:.3f} секунд"
-                )
+            if isinstance(event, CallbackQuery):
+                kind, text = 'callback', f"✅ Callback обработан за {execution_time:.3f} секунд"
+            else:
+                kind, text = 'message', f"✅ Сообщение обработано за {execution_time:.3f} секунд"
+            logger.info(
+                text,
+                extra={'event': kind, 'user_id': event.from_user.id, 'duration_ms': round(execution_time * 1000, 1)}
+            )
                 
             return result
             
@@ -97,6 +103,9 @@ class LoggingMiddleware(BaseMiddleware):
             
             # Повторно вызываем исключение
             raise
+        
+        finally:
+            update_id_var.reset(context_token)
 
 
 # Экспортируем middleware для использования
@@ -12,19 +12,20 @@ from sqlalchemy.orm import Session
 from bot.services.notifier import process_deadline_notifications
 from bot.services.api_client import WebAPIClient
 from bot.services.exceptions import APIError, ConnectionError as APIConnectionError
+from bot.services.db_executor import run_in_session
+from bot.services.staff_notifications import KIND_DAILY_SUMMARY, send_staff_notification
 from backend.config import settings
 
 logger = logging.getLogger(__name__)
 
 
-async def scheduled_deadline_check(bot: Bot, db_session: Session, api_client: WebAPIClient = None):
+async def scheduled_deadline_check(bot: Bot, api_client: WebAPIClient = None):
     """
     Запланированная проверка дедлайнов
     Вызывается автоматически по расписанию
     
     Args:
         bot: Экземпляр бота для отправки уведомлений
-        db_session: Сессия базы данных
         api_client: API клиент для проверки здоровья (опционально)
     """
     logger.info("⏰ ЗАПУСК АВТОМАТИЧЕСКОЙ ПРОВЕРКИ ДЕДЛАЙНОВ")
@@ -118,14 +119,66 @@ async def scheduled_deadline_check(bot: Bot, db_session: Session, api_client: We
             pass
 
 
-async def send_admin_daily_summary(bot: Bot, db_session: Session):
+def _collect_daily_summary(db_session: Session) -> dict:
+    """
+    Данные ежедневной сводки (выполняется через run_in_session)
+    
+    Args:
+        db_session: Сессия базы данных
+        
+    Returns:
+        dict: Счётчики green/yellow/red/expired и upcoming -
+              (компания, тип услуги, дата) ближайших 5 дедлайнов
+    """
+    from backend.models import User, Deadline, DeadlineType
+    from datetime import date, timedelta
+    
+    # Основная статистика
+    active_deadlines = db_session.query(Deadline.expiration_date).filter(
+        Deadline.status == 'active'
+    ).all()
+    
+    today = date.today()
+    counts = {'green': 0, 'yellow': 0, 'red': 0, 'expired': 0}
+    
+    for (expiration_date,) in active_deadlines:
+        days_remaining = (expiration_date - today).days
+        if days_remaining < 0:
+            counts['expired'] += 1
+        elif days_remaining < 7:
+            counts['red'] += 1
+        elif days_remaining < 14:
+            counts['yellow'] += 1
+        else:
+            counts['green'] += 1
+    
+    upcoming_date = today + timedelta(days=7)
+    counts['upcoming'] = [
+        tuple(row) for row in db_session.query(
+            User.company_name,
+            DeadlineType.type_name,
+            Deadline.expiration_date
+        ).join(
+            User, Deadline.user_id == User.id
+        ).join(
+            DeadlineType, Deadline.deadline_type_id == DeadlineType.id
+        ).filter(
+            Deadline.status == 'active',
+            Deadline.expiration_date >= today,
+            Deadline.expiration_date <= upcoming_date
+        ).order_by(Deadline.expiration_date, Deadline.id).limit(5).all()
+    ]
+    
+    return counts
+
+
+async def send_admin_daily_summary(bot: Bot):
     """
     НОВАЯ ФУНКЦИЯ: Отправка ежедневной сводки администраторам и менеджерам
     Содержит статистику по дедлайнам и ближайшим истекающим дедлайнам
     
     Args:
         bot: Экземпляр бота
-        db_session: Сессия базы данных
     """
     if not settings.admin_summary_enabled:
         logger.info("⏭️ Ежедневная сводка отключена в настройках")
@@ -134,32 +187,17 @@ async def send_admin_daily_summary(bot: Bot, db_session: Session):
     logger.info("📊 Генерация ежедневной сводки...")
     
     try:
-        from backend.models import User, Deadline, DeadlineType
-        from datetime import date, timedelta
-        
-        summary_text = "🕒 <b>Ежедневная сводка</b>\n\n"
-        
-        # Основная статистика
-        active_deadlines = db_session.query(Deadline).filter(
-            Deadline.status == 'active'
-        ).all()
+        from datetime import date
         
+        # Запросы сводки - в пуле потоков БД
+        summary = await run_in_session(_collect_daily_summary)
+        green_count = summary['green']
+        yellow_count = summary['yellow']
+        red_count = summary['red']
+        expired_count = summary['expired']
         today = date.today()
-        green_count = 0
-        yellow_count = 0
-        red_count = 0
-        expired_count = 0
         
-        for deadline in active_deadlines:
-            days_remaining = (deadline.expiration_date - today).days
-            if days_remaining < 0:
-                expired_count += 1
-            elif days_remaining < 7:
-                red_count += 1
-            elif days_remaining < 14:
-                yellow_count += 1
-            else:
-                green_count += 1
+        summary_text = "🕒 <b>Ежедневная сводка</b>\n\n"
         
         summary_text += "🚦 <b>Статус дедлайнов:</b>\n"
         summary_text += f"   🟢 Безопасно (&gt;14 дней): <b>{green_count}</b>\n"
@@ -170,43 +208,22 @@ async def send_admin_daily_summary(bot: Bot, db_session: Session):
         summary_text += "\n"
         
         # Ближайшие дедлайны (7 дней)
-        upcoming_date = today + timedelta(days=7)
-        upcoming = db_session.query(Deadline).join(
-            User, Deadline.user_id == User.id
-        ).join(
-            DeadlineType, Deadline.deadline_type_id == DeadlineType.id
-        ).filter(
-            Deadline.status == 'active',
-            Deadline.expiration_date >= today,
-            Deadline.expiration_date <= upcoming_date
-        ).order_by(Deadline.expiration_date).limit(5).all()
+        upcoming = summary['upcoming']
         
         if upcoming:
             summary_text += "⏰ <b>Ближайшие дедлайны (7 дней):</b>\n"
-            for d in upcoming:
-                days_left = (d.expiration_date - today).days
+            for company_name, type_name, expiration_date in upcoming:
+                days_left = (expiration_date - today).days
                 emoji = '🔴' if days_left < 7 else '🟡'
-                summary_text += f"   {emoji} {d.user.company_name}: {d.deadline_type.type_name} - {d.expiration_date.strftime('%d.%m')} ({days_left} дн.)\n"
+                summary_text += f"   {emoji} {company_name}: {type_name} - {expiration_date.strftime('%d.%m')} ({days_left} дн.)\n"
             summary_text += "\n"
         
         # Временная метка
         summary_text += f"📅 <b>Дата:</b> {today.strftime('%d.%m.%Y')}\n"
         summary_text += f"⏰ <b>Время:</b> {datetime.now().strftime('%H:%M')}"
         
-        # Отправляем админам и менеджерам
-        recipients = [settings.telegram_admin_id]
-        recipients.extend(settings.telegram_manager_ids_list)
-        
-        for recipient_id in recipients:
-            try:
-                await bot.send_message(
-                    chat_id=recipient_id,
-                    text=summary_text,
-                    parse_mode='HTML'
-                )
-                logger.info(f"✅ Сводка отправлена пользователю {recipient_id}")
-            except Exception as e:
-                logger.error(f"❌ Ошибка отправки сводки пользователю {recipient_id}: {e}")
+        # Группа администраторов или лично админам и менеджерам - по STAFF_NOTIFICATION_ROUTING
+        await send_staff_notification(bot, KIND_DAILY_SUMMARY, summary_text)
         
         logger.info("✅ Ежедневная сводка отправлена")
         
@@ -216,13 +233,13 @@ async def send_admin_daily_summary(bot: Bot, db_session: Session):
         logger.error(traceback.format_exc())
 
 
-def setup_scheduler(bot: Bot, db_session: Session, api_client: WebAPIClient = None) -> AsyncIOScheduler:
+def setup_scheduler(bot: Bot, api_client: WebAPIClient = None) -> AsyncIOScheduler:
     """
     Настройка и запуск планировщика задач
+    Задачи открывают собственные сессии БД в пуле потоков (run_in_session)
     
     Args:
         bot: Экземпляр бота
-        db_session: Сессия базы данных
         api_client: API клиент для health checks (опционально)
         
     Returns:
@@ -246,7 +263,7 @@ def setup_scheduler(bot: Bot, db_session: Session, api_client: WebAPIClient = No
     scheduler.add_job(
         scheduled_deadline_check,
         trigger=trigger,
-        args=[bot, db_session, api_client],  # Передаём api_client
+        args=[bot, api_client],  # Передаём api_client
         id='deadline_check',
         name='Ежедневная проверка дедлайнов',
         replace_existing=True
@@ -264,7 +281,7 @@ def setup_scheduler(bot: Bot, db_session: Session, api_client: WebAPIClient = No
         scheduler.add_job(
             send_admin_daily_summary,
             trigger=summary_trigger,
-            args=[bot, db_session],
+            args=[bot],
             id='daily_summary',
             name='Ежедневная сводка',
             replace_existing=True
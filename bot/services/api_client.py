@@ -4,37 +4,70 @@ HTTP клиент для взаимодействия с Web API
 Обрабатывает все запросы к FastAPI backend
 """
 
+import asyncio
+import copy
+import tempfile
+import time
 import aiohttp
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple, IO
 from datetime import date
 from .token_manager import TokenManager
+from .http_pool import get_shared_session, close_shared_session, get_pool_metrics
+from .circuit_breaker import CircuitBreaker
 from .exceptions import (
     APIError,
     ConnectionError,
     NotFoundError,
     ValidationError,
-    ServerError
+    ServerError,
+    CircuitOpenError,
+    TokenRefreshError
 )
 
 logger = logging.getLogger(__name__)
 
 
+class _CacheEntry:
+    """Закэшированный GET ответ"""
+    
+    __slots__ = ('data', 'etag', 'expires_at')
+    
+    def __init__(self, data: Any, etag: Optional[str], expires_at: float):
+        self.data = data
+        self.etag = etag
+        self.expires_at = expires_at
+
+
 class WebAPIClient:
     """
     Клиент для взаимодействия с Web API
     
+    Одинаковые одновременные GET запросы объединяются в один запрос к API
+    (singleflight), ответы endpoint'ов из cache_ttls кэшируются на короткое время
+    с ревалидацией по ETag (If-None-Match / 304).
+    
+    Если задан circuit_breaker, при открытом circuit запросы сразу завершаются
+    CircuitOpenError без ожидания тайм-аута.
+    
     Attributes:
         base_url: Базовый URL API
         timeout: Тайм-аут запросов (секунды)
         token_manager: Менеджер JWT токенов
+        cache_ttls: TTL кэша по endpoint (секунды)
+        circuit_breaker: Circuit breaker запросов (или None)
     """
     
+    # Размер куска при потоковом скачивании файлов
+    DOWNLOAD_CHUNK_SIZE = 64 * 1024
+    
     def __init__(
         self,
         base_url: str,
         token_manager: TokenManager,
-        timeout: int = 30
+        timeout: int = 30,
+        cache_ttls: Optional[Dict[str, float]] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None
     ):
         """
         Инициализация API клиента
@@ -43,29 +76,43 @@ class WebAPIClient:
             base_url: URL Web API (например, http://localhost:8000)
             token_manager: Экземпляр TokenManager для аутентификации
             timeout: Тайм-аут запросов в секундах
+            cache_ttls: TTL кэша GET ответов по endpoint, например {"/api/dashboard/stats": 10}
+            circuit_breaker: Circuit breaker (фоновая проба - GET /health)
         """
         self.base_url = base_url.rstrip('/')
         self.token_manager = token_manager
         self.timeout = aiohttp.ClientTimeout(total=timeout)
-        self._session: Optional[aiohttp.ClientSession] = None
+        self.cache_ttls = cache_ttls or {}
+        self.circuit_breaker = circuit_breaker
+        
+        if circuit_breaker is not None:
+            circuit_breaker.set_probe(self._probe)
+        
+        self._cache: Dict[Tuple, _CacheEntry] = {}
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+        self._metrics: Dict[str, int] = {
+            'upstream_requests': 0,
+            'coalesced': 0,
+            'cache_hits': 0,
+            'not_modified': 0
+        }
         
         logger.info(f"WebAPIClient инициализирован для {base_url}")
     
     async def _get_session(self) -> aiohttp.ClientSession:
         """
-        Получение или создание HTTP сессии
+        Получение общей HTTP сессии пула соединений
         
         Returns:
             aiohttp.ClientSession: Активная сессия
         """
-        if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession(timeout=self.timeout)
-        return self._session
+        return get_shared_session()
     
     async def _make_request(
         self,
         method: str,
         endpoint: str,
+        meta: Optional[Dict[str, Any]] = None,
         **kwargs
     ) -> Dict[str, Any]:
         """
@@ -74,6 +121,8 @@ class WebAPIClient:
         Args:
             method: HTTP метод (GET, POST, PUT, DELETE)
             endpoint: API endpoint (например, /api/deadlines)
+            meta: Словарь для метаданных ответа (etag, not_modified); если в нём
+                  задан sink - тело ответа пишется в этот файл (см. download)
             **kwargs: Дополнительные параметры для aiohttp (params, json, data)
         
         Returns:
@@ -84,19 +133,69 @@ class WebAPIClient:
             NotFoundError: Ресурс не найден (404)
             ValidationError: Ошибка валидации (422)
             ServerError: Ошибка сервера (500+)
+            CircuitOpenError: Circuit breaker открыт
             APIError: Прочие ошибки API
         """
+        breaker = self.circuit_breaker
+        if breaker is None:
+            return await self._send(method, endpoint, meta, **kwargs)
+        
+        if not breaker.allow_request():
+            raise CircuitOpenError(f"Web API временно недоступен ({method} {endpoint} не отправлен)")
+        
+        start = time.monotonic()
+        try:
+            result = await self._send(method, endpoint, meta, **kwargs)
+        except (ConnectionError, ServerError):
+            # Сеть, тайм-аут, 5xx - сбой доступности
+            breaker.record_failure(time.monotonic() - start)
+            raise
+        except TokenRefreshError as e:
+            if e.unavailable:
+                breaker.record_failure(time.monotonic() - start)
+            else:
+                breaker.record_success(time.monotonic() - start)
+            raise
+        except APIError:
+            # API ответил (404, 422, прочие 4xx) - это не сбой доступности
+            breaker.record_success(time.monotonic() - start)
+            raise
+        
+        breaker.record_success(time.monotonic() - start)
+        return result
+    
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        meta: Optional[Dict[str, Any]] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Отправка HTTP запроса с токеном и повтором после 401
+        
+        Args:
+            method: HTTP метод
+            endpoint: API endpoint
+            meta: Словарь для метаданных ответа
+            **kwargs: Параметры для aiohttp
+        
+        Returns:
+            Dict: Распарсенный JSON ответ
+        """
         url = f"{self.base_url}{endpoint}"
         session = await self._get_session()
+        kwargs.setdefault('timeout', self.timeout)
+        self._metrics['upstream_requests'] += 1
         
         # Попытка 1: С текущим токеном
         try:
             token = await self.token_manager.get_token()
-            headers = kwargs.pop('headers', {})
+            headers = kwargs.pop('headers', None) or {}
             headers['Authorization'] = f"Bearer {token}"
             
             async with session.request(method, url, headers=headers, **kwargs) as response:
-                return await self._handle_response(response)
+                return await self._handle_response(response, meta)
         
         except aiohttp.ClientError as e:
             # Если 401, пробуем обновить токен и повторить
@@ -110,7 +209,7 @@ class WebAPIClient:
                     headers['Authorization'] = f"Bearer {token}"
                     
                     async with session.request(method, url, headers=headers, **kwargs) as response:
-                        return await self._handle_response(response)
+                        return await self._handle_response(response, meta)
                 
                 except Exception as retry_error:
                     logger.error(f"Повторная попытка не удалась: {retry_error}")
@@ -120,19 +219,43 @@ class WebAPIClient:
             logger.error(f"Ошибка подключения к {url}: {e}")
             raise ConnectionError(f"Не удалось подключиться к API: {e}")
         
+        except APIError:
+            raise
+        
+        except asyncio.TimeoutError:
+            logger.error(f"Тайм-аут запроса {method} {url}")
+            raise ConnectionError(f"Тайм-аут запроса к API ({method} {endpoint})")
+        
         except Exception as e:
             logger.error(f"Неожиданная ошибка при запросе {method} {url}: {e}")
             raise APIError(f"Ошибка API запроса: {e}")
     
-    async def _handle_response(self, response: aiohttp.ClientResponse) -> Dict[str, Any]:
+    async def _probe(self) -> bool:
+        """
+        Проверка доступности API для circuit breaker (без аутентификации)
+        
+        Returns:
+            bool: True если GET /health ответил 200 быстрее порога медленного вызова
+        """
+        session = await self._get_session()
+        timeout = aiohttp.ClientTimeout(total=self.circuit_breaker.slow_call_threshold)
+        async with session.get(f"{self.base_url}/health", timeout=timeout) as response:
+            return response.status == 200
+    
+    async def _handle_response(
+        self,
+        response: aiohttp.ClientResponse,
+        meta: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         """
         Обработка HTTP ответа
         
         Args:
             response: Ответ от сервера
+            meta: Словарь для метаданных ответа (etag, not_modified)
             
         Returns:
-            Dict: Распарсенный JSON
+            Dict: Распарсенный JSON (None для 304 Not Modified)
             
         Raises:
             NotFoundError: 404
@@ -142,8 +265,19 @@ class WebAPIClient:
         """
         status = response.status
         
+        if meta is not None:
+            meta['etag'] = response.headers.get('ETag')
+        
+        # Данные не изменились - используется закэшированный ответ
+        if status == 304 and meta is not None:
+            meta['not_modified'] = True
+            return None
+        
         # Успешный ответ
         if 200 <= status < 300:
+            if meta is not None and meta.get('sink') is not None:
+                return await self._stream_response(response, meta['sink'], meta.get('max_bytes'))
+            
             try:
                 data = await response.json()
                 logger.debug(f"✅ {response.method} {response.url} → {status}")
@@ -172,22 +306,137 @@ class WebAPIClient:
             error_text = await response.text()
             raise APIError(f"HTTP {status}: {error_text}")
     
+    async def _stream_response(
+        self,
+        response: aiohttp.ClientResponse,
+        sink: IO[bytes],
+        max_bytes: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Запись тела ответа в файл кусками
+        
+        Args:
+            response: Ответ от сервера
+            sink: Файл для записи
+            max_bytes: Максимальный размер (байт), None - без ограничения
+            
+        Returns:
+            Dict: size, filename, content_type
+            
+        Raises:
+            APIError: Размер превышает max_bytes
+        """
+        size = 0
+        async for chunk in response.content.iter_chunked(self.DOWNLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if max_bytes is not None and size > max_bytes:
+                raise APIError(f"Файл превышает допустимый размер {max_bytes // (1024 * 1024)} МБ")
+            sink.write(chunk)
+        
+        sink.seek(0)
+        disposition = response.content_disposition
+        logger.debug(f"✅ {response.method} {response.url} → {response.status}, {size} байт")
+        
+        return {
+            'size': size,
+            'filename': disposition.filename if disposition else None,
+            'content_type': response.content_type
+        }
+    
     # ============================================
     # Общие HTTP методы
     # ============================================
     
-    async def get(self, endpoint: str, params: Optional[Dict] = None) -> Dict[str, Any]:
+    async def get(
+        self,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        use_cache: bool = True
+    ) -> Dict[str, Any]:
         """
         GET запрос
         
+        Свежий ответ из кэша возвращается без запроса к API; одинаковые
+        одновременные запросы ждут один общий запрос.
+        
         Args:
             endpoint: API endpoint
             params: Query параметры
+            use_cache: False - не брать ответ из кэша (например, для health check)
             
         Returns:
             Dict: Ответ API
         """
-        return await self._make_request("GET", endpoint, params=params)
+        key = (endpoint, tuple(sorted((params or {}).items())))
+        ttl = self.cache_ttls.get(endpoint, 0)
+        
+        # Кэш
+        if ttl and use_cache:
+            entry = self._cache.get(key)
+            if entry is not None and entry.expires_at > time.monotonic():
+                self._metrics['cache_hits'] += 1
+                return copy.deepcopy(entry.data)
+        
+        # Singleflight: присоединяемся к уже выполняющемуся запросу
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._metrics['coalesced'] += 1
+            return copy.deepcopy(await asyncio.shield(inflight))
+        
+        future = asyncio.ensure_future(self._fetch(key, endpoint, params, ttl))
+        self._inflight[key] = future
+        future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        
+        data = await asyncio.shield(future)
+        # Ответ хранится в кэше - вызывающему отдаём копию
+        return copy.deepcopy(data) if ttl else data
+    
+    async def _fetch(self, key: Tuple, endpoint: str, params: Optional[Dict], ttl: float) -> Any:
+        """
+        Выполнение GET запроса с ревалидацией закэшированного ответа по ETag
+        
+        Args:
+            key: Ключ кэша
+            endpoint: API endpoint
+            params: Query параметры
+            ttl: TTL кэша (0 - без кэша)
+            
+        Returns:
+            Any: Ответ API
+        """
+        entry = self._cache.get(key) if ttl else None
+        headers = {}
+        if entry is not None and entry.etag:
+            headers['If-None-Match'] = entry.etag
+        
+        meta: Dict[str, Any] = {}
+        data = await self._make_request("GET", endpoint, params=params, headers=headers, meta=meta)
+        
+        if meta.get('not_modified') and entry is not None:
+            self._metrics['not_modified'] += 1
+            entry.expires_at = time.monotonic() + ttl
+            return entry.data
+        
+        if ttl:
+            self._cache[key] = _CacheEntry(data, meta.get('etag'), time.monotonic() + ttl)
+        return data
+    
+    def invalidate_cache(self):
+        """Сброс кэша GET ответов (после изменяющих запросов)"""
+        self._cache.clear()
+    
+    def get_metrics(self) -> Dict[str, int]:
+        """
+        Метрики клиента: сколько запросов к API сэкономлено
+        
+        Returns:
+            Dict: upstream_requests, coalesced, cache_hits, not_modified,
+                  saved_requests, connections_created, connections_reused
+        """
+        metrics = dict(self._metrics)
+        metrics['saved_requests'] = metrics['coalesced'] + metrics['cache_hits']
+        metrics.update(get_pool_metrics())
+        return metrics
     
     async def post(self, endpoint: str, data: Optional[Dict] = None) -> Dict[str, Any]:
         """
@@ -200,6 +449,7 @@ class WebAPIClient:
         Returns:
             Dict: Ответ API
         """
+        self.invalidate_cache()
         return await self._make_request("POST", endpoint, json=data)
     
     async def put(self, endpoint: str, data: Optional[Dict] = None) -> Dict[str, Any]:
@@ -213,6 +463,7 @@ class WebAPIClient:
         Returns:
             Dict: Ответ API
         """
+        self.invalidate_cache()
         return await self._make_request("PUT", endpoint, json=data)
     
     async def delete(self, endpoint: str) -> Dict[str, Any]:
@@ -225,8 +476,56 @@ class WebAPIClient:
         Returns:
             Dict: Ответ API
         """
+        self.invalidate_cache()
         return await self._make_request("DELETE", endpoint)
     
+    async def download(
+        self,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        max_bytes: Optional[int] = None,
+        spool_size: int = 1024 * 1024
+    ) -> Tuple[IO[bytes], Dict[str, Any]]:
+        """
+        Потоковое скачивание файла (например, /api/export/*)
+        
+        Тело читается кусками в SpooledTemporaryFile: до spool_size байт в памяти,
+        больше - во временном файле на диске. Запрашивается gzip сжатие передачи.
+        
+        Args:
+            endpoint: API endpoint
+            params: Query параметры
+            max_bytes: Максимальный размер файла (байт)
+            spool_size: Порог размера для переноса файла на диск (байт)
+            
+        Returns:
+            Tuple: (файл, открытый на чтение с начала; {size, filename, content_type}).
+                   Файл закрывает вызывающий
+        """
+        sink = tempfile.SpooledTemporaryFile(max_size=spool_size)
+        meta: Dict[str, Any] = {'sink': sink, 'max_bytes': max_bytes}
+        
+        # aiohttp не принимает bool в query параметрах
+        query = {
+            key: str(value).lower() if isinstance(value, bool) else value
+            for key, value in (params or {}).items()
+        }
+        
+        try:
+            info = await self._make_request(
+                "GET",
+                endpoint,
+                params=query,
+                headers={'Accept-Encoding': 'gzip'},
+                meta=meta
+            )
+        except BaseException:
+            sink.close()
+            raise
+        
+        logger.info(f"Скачан файл {endpoint}: {info['size']} байт")
+        return sink, info
+    
     # ============================================
     # Специализированные методы для дедлайнов
     # ============================================
@@ -304,16 +603,51 @@ class WebAPIClient:
         
         return response
     
-    async def get_dashboard_stats(self) -> Dict:
+    async def get_deadlines_summary(self, filters: Dict) -> Dict:
+        """
+        Получить сводку по дедлайнам (агрегатный запрос на стороне API)
+        
+        Args:
+            filters: Фильтры (client_id, deadline_status, date_from, date_to)
+            
+        Returns:
+            Dict: total, expired, red, yellow, green
+        """
+        params = {}
+        for key, value in filters.items():
+            if isinstance(value, date):
+                params[key] = value.isoformat()
+            elif value is not None:
+                params[key] = value
+        
+        return await self.get("/api/deadlines/summary", params=params)
+    
+    async def get_deadline_changes(self, since: Optional[str] = None) -> Dict:
+        """
+        Получить изменения для локальной копии данных бота
+        
+        Args:
+            since: server_time прошлого ответа (None - полная выгрузка)
+            
+        Returns:
+            Dict: full, server_time, version, deadlines, clients, cash_registers, deadline_types
+        """
+        params = {'since': since} if since else None
+        return await self.get("/api/deadlines/changes", params=params, use_cache=False)
+    
+    async def get_dashboard_stats(self, use_cache: bool = True) -> Dict:
         """
         Получить статистику для dashboard
         
+        Args:
+            use_cache: False - запросить API в обход кэша
+        
         Returns:
             Dict: Статистика системы
         """
         logger.info("Запрос статистики dashboard")
         
-        response = await self.get("/api/dashboard/stats")
+        response = await self.get("/api/dashboard/stats", use_cache=use_cache)
         
         logger.info(
             f"Статистика: {response.get('active_clients_count', 0)} клиентов, "
@@ -323,10 +657,11 @@ class WebAPIClient:
         return response
     
     async def close(self):
-        """Закрытие HTTP сессии"""
-        if self._session and not self._session.closed:
-            await self._session.close()
-            logger.info("HTTP сессия закрыта")
+        """Закрытие HTTP сессии (общего пула соединений)"""
+        if self.circuit_breaker is not None:
+            await self.circuit_breaker.close()
+        await close_shared_session()
+        logger.info("HTTP сессия закрыта")
 
 
 # Для тестирования
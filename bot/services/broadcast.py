@@ -0,0 +1,468 @@
+# -*- coding: utf-8 -*-
+"""
+Массовые рассылки объявлений клиентам в Telegram
+Задания (broadcast_jobs) создаются из веб-интерфейса или командой /broadcast,
+отправитель в процессе бота выбирает получателей одним запросом и рассылает
+сообщения с ограничением скорости, обновляя прогресс в БД
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError, TelegramForbiddenError, TelegramRetryAfter
+from sqlalchemy import and_, exists, or_
+
+from backend.config import settings
+from backend.database import SessionLocal, engine
+from backend.models import BroadcastJob, BroadcastRecipient
+from bot.services.db_executor import run_db
+
+logger = logging.getLogger(__name__)
+
+# Статусы, в которых отправитель обрабатывает задание
+ACTIVE_STATUSES = ('pending', 'running')
+
+# Статусы завершённого задания
+FINAL_STATUSES = ('cancelled', 'completed', 'failed')
+
+# Статусы, в которых отправитель задание не обрабатывает: отчёт об отмене
+# такого задания отправляет тот, кто его отменил
+IDLE_STATUSES = ('pending', 'paused')
+
+# Получатели пачки, результаты которой не сохранились: сообщение могло
+# уйти, поэтому повторно не отправляется
+UNKNOWN_RESULT_ERROR = "Результат отправки неизвестен (сбой при сохранении пачки), повторно не отправлялось"
+
+
+def select_recipients(db, filters: Dict) -> List[Tuple[int, str]]:
+    """
+    Выбор получателей рассылки одним запросом
+
+    Args:
+        db: Сессия БД
+        filters: ofd_provider_id, deadline_type_id, region (подстрока адреса клиента или кассы)
+
+    Returns:
+        List: (user_id, telegram_id) активных клиентов с привязанным Telegram
+    """
+    from web.app.models.user import User
+    from web.app.models.client import Deadline
+    from web.app.models.cash_register import CashRegister
+
+    query = db.query(User.id, User.telegram_id).filter(
+        User.role == 'client',
+        User.is_active == True,
+        User.telegram_id.isnot(None),
+        User.telegram_id != ''
+    )
+
+    if filters.get('ofd_provider_id'):
+        query = query.filter(exists().where(and_(
+            CashRegister.client_id == User.id,
+            CashRegister.is_active == True,
+            CashRegister.ofd_provider_id == filters['ofd_provider_id']
+        )))
+
+    if filters.get('deadline_type_id'):
+        query = query.filter(exists().where(and_(
+            Deadline.client_id == User.id,
+            Deadline.status == 'active',
+            Deadline.deadline_type_id == filters['deadline_type_id']
+        )))
+
+    if filters.get('region'):
+        pattern = f"%{filters['region']}%"
+        query = query.filter(or_(
+            User.address.ilike(pattern),
+            exists().where(and_(
+                CashRegister.client_id == User.id,
+                CashRegister.installation_address.ilike(pattern)
+            ))
+        ))
+
+    return query.order_by(User.id).all()
+
+
+def create_broadcast(
+    message_text: str,
+    filters: Dict,
+    created_by: Optional[int] = None,
+    notify_chat_id: Optional[str] = None
+) -> int:
+    """
+    Создание задания рассылки (отправка начнётся в течение интервала опроса)
+
+    Args:
+        message_text: Текст сообщения (HTML)
+        filters: Фильтр получателей
+        created_by: ID автора (users.id)
+        notify_chat_id: Чат для итогового отчёта
+
+    Returns:
+        int: ID задания
+    """
+    db = SessionLocal()
+    try:
+        job = BroadcastJob(
+            message_text=message_text,
+            filters={key: value for key, value in filters.items() if value},
+            status='pending',
+            created_by=created_by,
+            notify_chat_id=notify_chat_id
+        )
+        db.add(job)
+        db.commit()
+        logger.info(f"📣 Создана рассылка #{job.id} (фильтр: {job.filters})")
+        return job.id
+    finally:
+        db.close()
+
+
+def get_broadcast(job_id: int) -> Optional[Dict]:
+    """
+    Состояние задания рассылки
+
+    Args:
+        job_id: ID задания
+
+    Returns:
+        Optional[Dict]: BroadcastJob.to_dict() или None
+    """
+    db = SessionLocal()
+    try:
+        job = db.query(BroadcastJob).filter(BroadcastJob.id == job_id).first()
+        return job.to_dict() if job else None
+    finally:
+        db.close()
+
+
+def set_broadcast_status(job_id: int, action: str) -> Optional[Dict]:
+    """
+    Пауза, продолжение или отмена рассылки
+
+    Args:
+        job_id: ID задания
+        action: pause, resume или cancel
+
+    Returns:
+        Optional[Dict]: Новое состояние или None, если задание не найдено;
+            report_needed - отменено задание, которое отправитель не обрабатывал,
+            итоговый отчёт отправляет вызывающий (send_broadcast_report)
+
+    Raises:
+        ValueError: Действие недопустимо в текущем статусе
+    """
+    db = SessionLocal()
+    try:
+        job = db.query(BroadcastJob).filter(BroadcastJob.id == job_id).first()
+        if job is None:
+            return None
+
+        if job.status in FINAL_STATUSES:
+            raise ValueError(f"Рассылка #{job_id} уже завершена ({job.status})")
+
+        report_needed = action == 'cancel' and job.status in IDLE_STATUSES
+
+        if action == 'pause':
+            job.status = 'paused'
+        elif action == 'resume':
+            if job.status != 'paused':
+                raise ValueError(f"Рассылка #{job_id} не на паузе")
+            # Получатели ещё не выбраны - задание начнётся с начала
+            job.status = 'running' if job.started_at else 'pending'
+        elif action == 'cancel':
+            job.status = 'cancelled'
+            job.finished_at = datetime.now()
+        else:
+            raise ValueError(f"Неизвестное действие: {action}")
+
+        db.commit()
+        logger.info(f"📣 Рассылка #{job_id}: {action} → {job.status}")
+        return dict(job.to_dict(), report_needed=report_needed)
+    finally:
+        db.close()
+
+
+async def send_broadcast_report(bot: Bot, job: Dict):
+    """
+    Итоговый отчёт о рассылке автору и администраторам
+
+    Args:
+        bot: Экземпляр бота
+        job: BroadcastJob.to_dict()
+    """
+    logger.info(
+        f"📣 Рассылка #{job['id']} {job['status']}: доставлено {job['delivered']}, "
+        f"заблокировали бота {job['blocked']}, ошибок {job['failed']} (из {job['total']})"
+    )
+
+    from bot.services.formatter import format_broadcast_progress
+    text = format_broadcast_progress(job)
+
+    chats = {str(admin_id) for admin_id in settings.telegram_admin_ids_list}
+    if job.get('notify_chat_id'):
+        chats.add(str(job['notify_chat_id']))
+
+    for chat_id in chats:
+        try:
+            await bot.send_message(chat_id=int(chat_id), text=text, parse_mode='HTML')
+        except Exception as e:
+            logger.error(f"❌ Не удалось отправить отчёт о рассылке в {chat_id}: {e}")
+
+
+class _RateLimiter:
+    """Равномерное ограничение скорости: не больше rate вызовов в секунду"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds: float):
+        """Сдвиг всех следующих отправок (после RetryAfter от Telegram)"""
+        self._next_slot = max(self._next_slot, time.monotonic() + seconds)
+
+
+class BroadcastSender:
+    """
+    Фоновый отправитель рассылок в процессе бота
+
+    Опрашивает broadcast_jobs раз в poll_interval секунд и выполняет задания
+    по одному. Получатели читаются пачками по batch_size, после каждой пачки
+    прогресс сохраняется, а статус задания перечитывается (пауза/отмена
+    из веб-интерфейса или бота вступают в силу после текущей пачки).
+
+    Пачка помечается sending до отправки: сбой при сохранении результатов
+    не приводит к повторной отправке тех же получателей.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        rate_per_second: float = 20,
+        batch_size: int = 100,
+        poll_interval: float = 5
+    ):
+        """
+        Args:
+            bot: Экземпляр бота (общий для всего процесса)
+            rate_per_second: Максимум сообщений в секунду
+            batch_size: Получателей в одной пачке
+            poll_interval: Интервал проверки новых заданий (секунды)
+        """
+        self.bot = bot
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._limiter = _RateLimiter(rate_per_second)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Запуск фонового цикла"""
+        BroadcastJob.__table__.create(bind=engine, checkfirst=True)
+        BroadcastRecipient.__table__.create(bind=engine, checkfirst=True)
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info("✅ Отправитель рассылок запущен")
+
+    async def stop(self):
+        """Остановка фонового цикла (прогресс уже сохранён в БД)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        """Цикл опроса заданий"""
+        while True:
+            try:
+                job_id = await run_db(self._next_job_id)
+                if job_id is not None:
+                    await self._process(job_id)
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Ошибка отправителя рассылок: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    def _next_job_id(self) -> Optional[int]:
+        """Самое старое задание, ожидающее отправки"""
+        db = SessionLocal()
+        try:
+            row = db.query(BroadcastJob.id).filter(
+                BroadcastJob.status.in_(ACTIVE_STATUSES)
+            ).order_by(BroadcastJob.id).first()
+            return row[0] if row else None
+        finally:
+            db.close()
+
+    def _prepare(self, job_id: int) -> Optional[str]:
+        """
+        Выбор получателей для нового задания и перевод в running
+
+        Returns:
+            str: Текст рассылки или None, если задание уже не активно
+        """
+        db = SessionLocal()
+        try:
+            job = db.query(BroadcastJob).filter(BroadcastJob.id == job_id).first()
+            if job is None or job.status not in ACTIVE_STATUSES:
+                return None
+
+            if job.status == 'pending':
+                recipients = select_recipients(db, job.filters or {})
+                db.bulk_insert_mappings(BroadcastRecipient, [
+                    {'job_id': job.id, 'user_id': user_id, 'telegram_id': telegram_id, 'status': 'pending'}
+                    for user_id, telegram_id in recipients
+                ])
+                job.total = len(recipients)
+                job.status = 'running'
+                job.started_at = datetime.now()
+                db.commit()
+                logger.info(f"📣 Рассылка #{job.id}: выбрано получателей {job.total}")
+            else:
+                # Пачка, отправленная до сбоя сохранения или остановки бота
+                unknown = db.query(BroadcastRecipient).filter(
+                    BroadcastRecipient.job_id == job_id,
+                    BroadcastRecipient.status == 'sending'
+                ).update({
+                    'status': 'failed',
+                    'error_message': UNKNOWN_RESULT_ERROR,
+                    'sent_at': datetime.now()
+                }, synchronize_session=False)
+                if unknown:
+                    job.failed += unknown
+                    db.commit()
+                    logger.warning(f"📣 Рассылка #{job.id}: результат отправки неизвестен для {unknown} получателей")
+
+            return job.message_text
+        finally:
+            db.close()
+
+    def _claim_batch(self, job_id: int) -> List[Tuple[int, str]]:
+        """Следующая пачка неотправленных получателей, помеченная sending до отправки"""
+        db = SessionLocal()
+        try:
+            batch = db.query(BroadcastRecipient.id, BroadcastRecipient.telegram_id).filter(
+                BroadcastRecipient.job_id == job_id,
+                BroadcastRecipient.status == 'pending'
+            ).order_by(BroadcastRecipient.id).limit(self.batch_size).all()
+            if batch:
+                db.query(BroadcastRecipient).filter(
+                    BroadcastRecipient.id.in_([recipient_id for recipient_id, _ in batch])
+                ).update({'status': 'sending'}, synchronize_session=False)
+                db.commit()
+            return batch
+        finally:
+            db.close()
+
+    def _save_batch(self, job_id: int, results: List[Tuple[int, str, Optional[str]]]) -> str:
+        """
+        Сохранение результатов пачки и счётчиков задания
+
+        Returns:
+            str: Текущий статус задания (мог измениться извне)
+        """
+        db = SessionLocal()
+        try:
+            now = datetime.now()
+            db.bulk_update_mappings(BroadcastRecipient, [
+                {'id': recipient_id, 'status': status, 'error_message': error, 'sent_at': now}
+                for recipient_id, status, error in results
+            ])
+
+            job = db.query(BroadcastJob).filter(BroadcastJob.id == job_id).first()
+            for _, status, _ in results:
+                setattr(job, status, getattr(job, status) + 1)
+            db.commit()
+            return job.status
+        finally:
+            db.close()
+
+    def _finish(self, job_id: int) -> Dict:
+        """Завершение задания, если все получатели обработаны"""
+        db = SessionLocal()
+        try:
+            job = db.query(BroadcastJob).filter(BroadcastJob.id == job_id).first()
+            if job.status == 'running':
+                job.status = 'completed'
+                job.finished_at = datetime.now()
+                db.commit()
+            return job.to_dict()
+        finally:
+            db.close()
+
+    async def _send_one(self, recipient_id: int, telegram_id: str, text: str) -> Tuple[int, str, Optional[str]]:
+        """
+        Отправка одному получателю с учётом лимита и RetryAfter
+
+        Returns:
+            Tuple: (id получателя, delivered/blocked/failed, ошибка)
+        """
+        for _ in range(3):
+            await self._limiter.wait()
+            try:
+                await self.bot.send_message(chat_id=int(telegram_id), text=text, parse_mode='HTML')
+                return recipient_id, 'delivered', None
+            except TelegramRetryAfter as e:
+                logger.warning(f"Telegram просит подождать {e.retry_after} сек (рассылка)")
+                self._limiter.pause(e.retry_after)
+            except TelegramForbiddenError as e:
+                return recipient_id, 'blocked', str(e)[:500]
+            except (TelegramAPIError, ValueError) as e:
+                return recipient_id, 'failed', str(e)[:500]
+        return recipient_id, 'failed', 'Превышено число повторов после RetryAfter'
+
+    async def _process(self, job_id: int):
+        """Выполнение задания до завершения, паузы или отмены"""
+        message_text = await run_db(self._prepare, job_id)
+        if message_text is None:
+            return
+
+        while True:
+            batch = await run_db(self._claim_batch, job_id)
+            if not batch:
+                break
+
+            results = await asyncio.gather(*(
+                self._send_one(recipient_id, telegram_id, message_text)
+                for recipient_id, telegram_id in batch
+            ))
+            status = await run_db(self._save_batch, job_id, results)
+
+            if status != 'running':
+                logger.info(f"📣 Рассылка #{job_id} остановлена: {status}")
+                if status == 'cancelled':
+                    await self._report(await run_db(self._finish, job_id))
+                return
+
+        await self._report(await run_db(self._finish, job_id))
+
+    async def _report(self, job: Dict):
+        """Итоговый отчёт автору рассылки и администраторам"""
+        await send_broadcast_report(self.bot, job)
+
+
+# Экспорт
+__all__ = [
+    'BroadcastSender',
+    'select_recipients',
+    'create_broadcast',
+    'get_broadcast',
+    'set_broadcast_status',
+    'send_broadcast_report'
+]
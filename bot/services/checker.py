@@ -4,11 +4,16 @@
 Использует Web API для получения данных с fallback на прямые запросы к БД
 """
 
-from typing import List, Dict, Optional
-from datetime import date
+from typing import List, Dict, Optional, Tuple
+from datetime import date, timedelta
+import math
 from sqlalchemy.orm import Session
 from backend.database import SessionLocal
 from backend import models
+from backend.config import settings
+from bot.services.exceptions import CircuitOpenError
+from bot.services.db_executor import run_db, run_in_session
+from bot.services.render_cache import client_data_version
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,6 +21,9 @@ logger = logging.getLogger(__name__)
 # Глобальная переменная для API клиента (будет установлена из main.py)
 _api_client = None
 
+# Локальная копия активных дедлайнов (DeadlineReplica, устанавливается из main.py)
+_read_replica = None
+
 
 def set_api_client(api_client):
     """
@@ -29,6 +37,68 @@ def set_api_client(api_client):
     logger.info("API клиент установлен в checker service")
 
 
+def set_read_replica(replica):
+    """
+    Установка локальной копии дедлайнов для команд чтения
+    
+    Args:
+        replica: Экземпляр DeadlineReplica
+    """
+    global _read_replica
+    _read_replica = replica
+    logger.info("Локальная копия дедлайнов установлена в checker service")
+
+
+def get_read_replica():
+    """
+    Локальная копия дедлайнов, если она синхронизирована не позже bot_replica_max_lag
+    
+    Returns:
+        DeadlineReplica или None
+    """
+    if _read_replica is not None and _read_replica.is_fresh(settings.bot_replica_max_lag):
+        return _read_replica
+    return None
+
+
+def get_read_replica_metrics() -> Optional[Dict]:
+    """
+    Метрики локальной копии (задержка синхронизации, объём)
+    
+    Returns:
+        Optional[Dict]: DeadlineReplica.get_metrics() или None, если копия не используется
+    """
+    return _read_replica.get_metrics() if _read_replica is not None else None
+
+
+async def get_client_data_version(client_id: int) -> Tuple:
+    """
+    Версия данных клиента для кэша готовых сообщений
+    
+    Args:
+        client_id: ID клиента
+        
+    Returns:
+        Tuple: Версия из локальной копии или из БД (сравнивается целиком)
+    """
+    replica = get_read_replica()
+    if replica is not None:
+        return ('replica',) + replica.client_version(client_id)
+    return await run_in_session(client_data_version, client_id)
+
+
+def get_api_circuit_state() -> Optional[Dict]:
+    """
+    Состояние circuit breaker Web API
+    
+    Returns:
+        Optional[Dict]: Состояние (см. CircuitBreaker.get_state) или None, если breaker не используется
+    """
+    if _api_client is None or getattr(_api_client, 'circuit_breaker', None) is None:
+        return None
+    return _api_client.circuit_breaker.get_state()
+
+
 async def get_expiring_deadlines(days: int) -> List[Dict]:
     """
     Получение списка дедлайнов, истекающих через указанное количество дней
@@ -76,12 +146,15 @@ async def get_expiring_deadlines(days: int) -> List[Dict]:
             logger.info(f"✅ Получено {len(deadlines)} дедлайнов через Web API")
             return deadlines
             
+        except CircuitOpenError:
+            logger.debug("Circuit breaker открыт, дедлайны из БД")
+            
         except Exception as e:
             logger.warning(f"⚠️ Web API недоступен, переключение на fallback: {e}")
             # Продолжаем к fallback
     
     # Попытка 2: Fallback на прямые запросы к БД
-    return _get_expiring_deadlines_fallback(days)
+    return await run_db(_get_expiring_deadlines_fallback, days)
 
 
 def _get_expiring_deadlines_fallback(days: int) -> List[Dict]:
@@ -157,10 +230,238 @@ def _get_expiring_deadlines_fallback(days: int) -> List[Dict]:
             db.close()
 
 
+def get_deadline_status(days_remaining: int) -> str:
+    """
+    Цветовой статус дедлайна по количеству оставшихся дней
+    
+    Args:
+        days_remaining (int): Дней до истечения
+        
+    Returns:
+        str: expired, red, yellow или green
+    """
+    if days_remaining < 0:
+        return 'expired'
+    elif days_remaining < 7:
+        return 'red'
+    elif days_remaining < 14:
+        return 'yellow'
+    return 'green'
+
+
+async def get_deadlines_page(
+    page: int,
+    page_size: int,
+    client_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+) -> Dict:
+    """
+    Получение одной страницы активных дедлайнов и сводки по всей выборке
+    
+    Загружается только запрошенная страница, счётчики по статусам
+    считаются агрегатным запросом. Использует Web API с fallback на БД.
+    
+    Args:
+        page (int): Номер страницы (с 1)
+        page_size (int): Размер страницы
+        client_id (int): Фильтр по клиенту (опционально)
+        date_from (date): Дата истечения от (опционально)
+        date_to (date): Дата истечения до (опционально)
+        
+    Returns:
+        Dict: deadlines, total, page, total_pages, status_counts
+    """
+    # Попытка 0: Локальная копия в памяти
+    replica = get_read_replica()
+    if replica is not None:
+        return replica.page(page, page_size, client_id, date_from, date_to)
+    
+    filters = {
+        'client_id': client_id,
+        'date_from': date_from,
+        'date_to': date_to
+    }
+    
+    # Попытка 1: Использовать Web API
+    if _api_client is not None:
+        try:
+            response = await _api_client.get_deadlines_filtered({**filters, 'page': page, 'page_size': page_size})
+            summary = await _api_client.get_deadlines_summary(filters)
+            
+            today = date.today()
+            deadlines = []
+            for d in response.get('deadlines', []):
+                expiration_date = date.fromisoformat(d['expiration_date']) if isinstance(d.get('expiration_date'), str) else d.get('expiration_date')
+                days_remaining = d.get('days_until_expiration', (expiration_date - today).days)
+                client = d.get('client') or {}
+                deadline_type = d.get('deadline_type') or {}
+                register = d.get('cash_register') or {}
+                
+                deadline_info = {
+                    'deadline_id': d.get('id'),
+                    'client_id': d.get('client_id'),
+                    'client_name': client.get('company_name') or 'Неизвестно',
+                    'client_inn': client.get('inn') or 'Не указано',
+                    'deadline_type_name': deadline_type.get('type_name') or 'Неизвестно',
+                    'expiration_date': expiration_date,
+                    'days_remaining': days_remaining,
+                    'status': get_deadline_status(days_remaining)
+                }
+                
+                # Блок ККТ - как в fallback и локальной копии
+                if register.get('model') or register.get('factory_number'):
+                    deadline_info['cash_register_model'] = register.get('model') or 'Не указана'
+                    deadline_info['cash_register_serial'] = register.get('factory_number') or 'Не указан'
+                    deadline_info['cash_register_name'] = register.get('register_name') or register.get('model') or 'ККТ'
+                    deadline_info['installation_address'] = register.get('installation_address')
+                
+                deadlines.append(deadline_info)
+            
+            return {
+                'deadlines': deadlines,
+                'total': summary.get('total', response.get('total', 0)),
+                'page': page,
+                'total_pages': response.get('total_pages', 1),
+                'status_counts': {key: summary.get(key, 0) for key in ('expired', 'red', 'yellow', 'green')}
+            }
+            
+        except CircuitOpenError:
+            logger.debug("Circuit breaker открыт, страница дедлайнов из БД")
+            
+        except Exception as e:
+            logger.warning(f"⚠️ Web API недоступен, переключение на fallback: {e}")
+    
+    # Попытка 2: Fallback на прямые запросы к БД
+    return await run_db(_get_deadlines_page_fallback, page, page_size, client_id, date_from, date_to)
+
+
+def _get_deadlines_page_fallback(
+    page: int,
+    page_size: int,
+    client_id: Optional[int],
+    date_from: Optional[date],
+    date_to: Optional[date]
+) -> Dict:
+    """
+    Fallback метод постраничной выборки: прямые запросы к базе данных
+    Используются модели веб-приложения (нужны данные о кассах)
+    
+    Args:
+        page (int): Номер страницы (с 1)
+        page_size (int): Размер страницы
+        client_id (int): Фильтр по клиенту
+        date_from (date): Дата истечения от
+        date_to (date): Дата истечения до
+        
+    Returns:
+        Dict: deadlines, total, page, total_pages, status_counts
+    """
+    from sqlalchemy import and_, case, func
+    from web.app.models.client import Deadline, DeadlineType
+    from web.app.models.user import User
+    from web.app.models.cash_register import CashRegister
+    
+    db: Session = SessionLocal()
+    try:
+        today = date.today()
+        
+        conditions = [Deadline.status == 'active']
+        if client_id:
+            conditions.append(Deadline.client_id == client_id)
+        if date_from:
+            conditions.append(Deadline.expiration_date >= date_from)
+        if date_to:
+            conditions.append(Deadline.expiration_date <= date_to)
+        
+        # Сводка по всей выборке одним агрегатным запросом
+        red_from = today
+        yellow_from = today + timedelta(days=7)
+        green_from = today + timedelta(days=14)
+        total, expired, red, yellow, green = db.query(
+            func.count(Deadline.id),
+            func.sum(case((Deadline.expiration_date < red_from, 1), else_=0)),
+            func.sum(case((and_(Deadline.expiration_date >= red_from, Deadline.expiration_date < yellow_from), 1), else_=0)),
+            func.sum(case((and_(Deadline.expiration_date >= yellow_from, Deadline.expiration_date < green_from), 1), else_=0)),
+            func.sum(case((Deadline.expiration_date >= green_from, 1), else_=0))
+        ).filter(*conditions).one()
+        total = total or 0
+        
+        # Только запрошенная страница
+        rows = db.query(
+            Deadline.id.label('deadline_id'),
+            Deadline.client_id.label('client_id'),
+            Deadline.expiration_date.label('expiration_date'),
+            User.company_name.label('company_name'),
+            User.full_name.label('full_name'),
+            User.inn.label('client_inn'),
+            DeadlineType.type_name.label('deadline_type_name'),
+            CashRegister.model.label('cash_register_model'),
+            CashRegister.factory_number.label('cash_register_serial'),
+            CashRegister.register_name.label('cash_register_name'),
+            CashRegister.installation_address.label('installation_address')
+        ).outerjoin(
+            User, Deadline.client_id == User.id
+        ).outerjoin(
+            DeadlineType, Deadline.deadline_type_id == DeadlineType.id
+        ).outerjoin(
+            CashRegister, Deadline.cash_register_id == CashRegister.id
+        ).filter(
+            *conditions
+        ).order_by(
+            Deadline.expiration_date, Deadline.id
+        ).offset((page - 1) * page_size).limit(page_size).all()
+        
+        deadlines = []
+        for row in rows:
+            days_remaining = (row.expiration_date - today).days
+            deadline_info = {
+                'deadline_id': row.deadline_id,
+                'client_id': row.client_id,
+                'client_name': row.company_name or row.full_name or 'Неизвестно',
+                'client_inn': row.client_inn or 'Не указано',
+                'deadline_type_name': row.deadline_type_name or 'Неизвестно',
+                'expiration_date': row.expiration_date,
+                'days_remaining': days_remaining,
+                'status': get_deadline_status(days_remaining)
+            }
+            
+            if row.cash_register_model or row.cash_register_serial:
+                deadline_info['cash_register_model'] = row.cash_register_model or 'Не указана'
+                deadline_info['cash_register_serial'] = row.cash_register_serial or 'Не указан'
+                deadline_info['cash_register_name'] = row.cash_register_name or row.cash_register_model or 'ККТ'
+                deadline_info['installation_address'] = row.installation_address
+            
+            deadlines.append(deadline_info)
+        
+        logger.info(f"✅ Fallback: страница {page}, {len(deadlines)} из {total} дедлайнов")
+        return {
+            'deadlines': deadlines,
+            'total': total,
+            'page': page,
+            'total_pages': math.ceil(total / page_size) if total > 0 else 1,
+            'status_counts': {
+                'expired': expired or 0,
+                'red': red or 0,
+                'yellow': yellow or 0,
+                'green': green or 0
+            }
+        }
+        
+    except Exception as e:
+        logger.error(f"❌ Ошибка fallback получения страницы дедлайнов: {e}")
+        import traceback
+        logger.error(traceback.format_exc())
+        return {'deadlines': [], 'total': 0, 'page': page, 'total_pages': 1, 'status_counts': {}}
+    finally:
+        db.close()
+
+
 def get_notification_recipients(deadline_id: int) -> List[Dict]:
     """
     Получение списка получателей уведомлений для конкретного дедлайна
-    ОБНОВЛЕНО: поддержка ролевой модели (admin, manager, client)
+    ОБНОВЛЕНО: поддержка ролевой модели (admin, manager, client);
+    сотрудников может заменять одна запись группы администраторов (recipient_type='group')
     
     Args:
         deadline_id (int): ID дедлайна
@@ -179,34 +480,17 @@ def get_notification_recipients(deadline_id: int) -> List[Dict]:
             
         recipients = []
         
-        # Получаем конфигурацию для добавления админов и менеджеров
-        from backend.config import settings
-        from bot.config import get_bot_config
-        config = get_bot_config()
-        
-        # 1. Добавляем администраторов как получателей (если включено в настройках)
-        if settings.notification_include_admins:
-            # Главный админ
-            recipients.append({
-                'telegram_id': str(config['telegram_admin_id']),
-                'recipient_type': 'admin',
-                'user_id': None
-            })
-            
-            # Дополнительные админы из списка
-            for admin_id in config.get('telegram_admin_ids', []):
-                if admin_id != config['telegram_admin_id']:  # Избегаем дублирования
-                    recipients.append({
-                        'telegram_id': str(admin_id),
-                        'recipient_type': 'admin',
-                        'user_id': None
-                    })
-        
-        # 2. Добавляем менеджеров (если есть в настройках)
-        for manager_id in settings.telegram_manager_ids_list:
+        # 1-2. Администраторы и менеджеры: одна запись группы администраторов
+        # или каждый сотрудник отдельно - по STAFF_NOTIFICATION_ROUTING
+        from bot.services.staff_notifications import (
+            KIND_DEADLINE, STRATEGY_INDIVIDUAL, get_group_chat_id, get_staff_recipients, get_staff_strategy
+        )
+        if get_staff_strategy(KIND_DEADLINE) == STRATEGY_INDIVIDUAL:
+            recipients.extend(get_staff_recipients())
+        else:
             recipients.append({
-                'telegram_id': str(manager_id),
-                'recipient_type': 'manager',
+                'telegram_id': get_group_chat_id(),
+                'recipient_type': 'group',
                 'user_id': None
             })
         
@@ -234,6 +518,7 @@ def get_notification_recipients(deadline_id: int) -> List[Dict]:
             logger.warning(f"Дедлайн {deadline_id} не привязан к клиенту (client_id отсутствует)")
             
         logger.debug(f"Найдено {len(recipients)} получателей для дедлайна {deadline_id}: "
+                    f"{sum(1 for r in recipients if r['recipient_type'] == 'group')} групп, "
                     f"{sum(1 for r in recipients if r['recipient_type'] == 'admin')} админов, "
                     f"{sum(1 for r in recipients if r['recipient_type'] == 'manager')} менеджеров, "
                     f"{sum(1 for r in recipients if r['recipient_type'] == 'client')} клиентов")
@@ -283,6 +568,34 @@ def check_notification_sent(deadline_id: int, days: int, recipient_id: str) -> b
         db.close()
 
 
+def check_notification_sent_any(deadline_id: int, recipient_ids: List[str]) -> bool:
+    """
+    Было ли уведомление по дедлайну успешно отправлено хотя бы одному из получателей
+    (группе администраторов или кому-то из сотрудников при личной доставке)
+    
+    Args:
+        deadline_id (int): ID дедлайна
+        recipient_ids (List[str]): Telegram ID / chat ID получателей
+        
+    Returns:
+        bool: True если уведомление уже было отправлено
+    """
+    try:
+        db: Session = SessionLocal()
+        
+        return db.query(models.NotificationLog.id).filter(
+            models.NotificationLog.deadline_id == deadline_id,
+            models.NotificationLog.recipient_telegram_id.in_(recipient_ids),
+            models.NotificationLog.status == 'sent'
+        ).first() is not None
+        
+    except Exception as e:
+        logger.error(f"Ошибка проверки отправки уведомления: {e}")
+        return False
+    finally:
+        db.close()
+
+
 if __name__ == "__main__":
     # Тестирование сервиса
     import asyncio
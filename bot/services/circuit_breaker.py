@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+"""
+Circuit breaker для запросов бота к Web API
+Пока API недоступен или отвечает слишком медленно, запросы не отправляются
+(сразу CircuitOpenError), и checker без ожидания тайм-аута уходит на fallback к БД
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Состояния
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker с состояниями closed / open / half-open
+
+    - closed: запросы проходят, результаты последних window_size вызовов
+      учитываются в скользящем окне; при доле ошибок >= failure_rate_threshold
+      или доле медленных вызовов >= slow_call_rate_threshold переходит в open
+    - open: запросы отклоняются; фоновая проба проверяет API раз в probe_interval
+      секунд, успешная проба (или истечение open_timeout) переводит в half-open
+    - half-open: пропускается один пробный запрос; успех - closed, ошибка - open
+
+    Attributes:
+        name: Имя (для логов)
+        state: Текущее состояние
+    """
+
+    def __init__(
+        self,
+        name: str = 'web_api',
+        failure_rate_threshold: float = 0.5,
+        slow_call_threshold: float = 5.0,
+        slow_call_rate_threshold: float = 0.5,
+        window_size: int = 20,
+        min_calls: int = 5,
+        open_timeout: float = 30.0,
+        probe_interval: float = 10.0
+    ):
+        """
+        Инициализация circuit breaker
+
+        Args:
+            name: Имя для логов
+            failure_rate_threshold: Доля ошибок в окне для размыкания (0..1)
+            slow_call_threshold: Вызов дольше этого считается медленным (секунды)
+            slow_call_rate_threshold: Доля медленных вызовов в окне для размыкания (0..1)
+            window_size: Размер скользящего окна (вызовов)
+            min_calls: Минимум вызовов в окне для оценки долей
+            open_timeout: Время в open до пробного запроса (секунды)
+            probe_interval: Интервал фоновых проверок API в open (секунды)
+        """
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.min_calls = min_calls
+        self.open_timeout = open_timeout
+        self.probe_interval = probe_interval
+
+        self.state = STATE_CLOSED
+        # (успех, медленный) для последних вызовов
+        self._window: Deque[Tuple[bool, bool]] = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._trial_started_at: Optional[float] = None
+        self._probe: Optional[Callable[[], Awaitable[bool]]] = None
+        self._probe_task: Optional[asyncio.Task] = None
+
+        self._stats: Dict[str, int] = {
+            'opened': 0,
+            'rejected': 0,
+            'probes': 0
+        }
+
+    def set_probe(self, probe: Callable[[], Awaitable[bool]]):
+        """
+        Установка фоновой проверки доступности API
+
+        Args:
+            probe: Корутина без аргументов, возвращает True если API доступен
+        """
+        self._probe = probe
+
+    # ============================================
+    # Учёт вызовов
+    # ============================================
+
+    def allow_request(self) -> bool:
+        """
+        Можно ли выполнить запрос к API
+
+        Returns:
+            bool: False - запрос нужно отклонить (circuit открыт)
+        """
+        now = time.monotonic()
+
+        if self.state == STATE_OPEN and now - self._opened_at >= self.open_timeout:
+            self._transition(STATE_HALF_OPEN)
+
+        if self.state == STATE_CLOSED:
+            return True
+
+        if self.state == STATE_HALF_OPEN:
+            # Один пробный запрос; зависший (отменённый) пробный запрос не блокирует навсегда
+            if self._trial_started_at is None or now - self._trial_started_at >= self.open_timeout:
+                self._trial_started_at = now
+                return True
+
+        self._stats['rejected'] += 1
+        return False
+
+    def record_success(self, latency: float):
+        """
+        Учёт успешного вызова
+
+        Args:
+            latency: Длительность вызова (секунды)
+        """
+        slow = latency >= self.slow_call_threshold
+
+        if self.state == STATE_HALF_OPEN:
+            if slow:
+                self._open(f"пробный запрос выполнялся {latency:.1f} сек")
+            else:
+                self._transition(STATE_CLOSED)
+            return
+
+        self._window.append((True, slow))
+        self._evaluate()
+
+    def record_failure(self, latency: float):
+        """
+        Учёт неудачного вызова (сеть, тайм-аут, 5xx)
+
+        Args:
+            latency: Длительность вызова (секунды)
+        """
+        if self.state == STATE_HALF_OPEN:
+            self._open("пробный запрос завершился ошибкой")
+            return
+
+        self._window.append((False, latency >= self.slow_call_threshold))
+        self._evaluate()
+
+    def _evaluate(self):
+        """Проверка порогов скользящего окна"""
+        if self.state != STATE_CLOSED or len(self._window) < self.min_calls:
+            return
+
+        failure_rate, slow_rate = self._rates()
+        if failure_rate >= self.failure_rate_threshold:
+            self._open(f"доля ошибок {failure_rate:.0%}")
+        elif slow_rate >= self.slow_call_rate_threshold:
+            self._open(f"доля медленных ответов {slow_rate:.0%}")
+
+    def _rates(self) -> Tuple[float, float]:
+        """Доли ошибок и медленных вызовов в окне"""
+        if not self._window:
+            return 0.0, 0.0
+        total = len(self._window)
+        failures = sum(1 for success, _ in self._window if not success)
+        slow = sum(1 for _, is_slow in self._window if is_slow)
+        return failures / total, slow / total
+
+    # ============================================
+    # Переходы состояний
+    # ============================================
+
+    def _open(self, reason: str):
+        """Размыкание: запросы отклоняются, запускаются фоновые пробы"""
+        self._stats['opened'] += 1
+        self._opened_at = time.monotonic()
+        self._transition(STATE_OPEN)
+        logger.warning(
+            f"⚡ Circuit breaker {self.name} открыт ({reason}), "
+            f"запросы идут в fallback на {self.open_timeout:.0f} сек"
+        )
+        self._ensure_probe_task()
+
+    def _transition(self, state: str):
+        """Смена состояния"""
+        if state == self.state:
+            return
+
+        logger.info(f"Circuit breaker {self.name}: {self.state} → {state}")
+        self.state = state
+        self._trial_started_at = None
+
+        if state == STATE_CLOSED:
+            self._window.clear()
+
+    def _ensure_probe_task(self):
+        """Запуск фоновой проверки API, пока circuit открыт"""
+        if self._probe is None:
+            return
+        if self._probe_task is not None and not self._probe_task.done():
+            return
+        try:
+            self._probe_task = asyncio.get_running_loop().create_task(self._probe_loop())
+        except RuntimeError:
+            # Нет event loop - переход в half-open произойдёт по open_timeout
+            pass
+
+    async def _probe_loop(self):
+        """Фоновая проверка: пока circuit открыт, опрашиваем API"""
+        while self.state == STATE_OPEN:
+            await asyncio.sleep(self.probe_interval)
+            if self.state != STATE_OPEN:
+                break
+
+            self._stats['probes'] += 1
+            try:
+                healthy = await self._probe()
+            except Exception as e:
+                logger.debug(f"Проба {self.name} не удалась: {e}")
+                healthy = False
+
+            if healthy and self.state == STATE_OPEN:
+                logger.info(f"✅ Проба {self.name} успешна, пропускаем пробный запрос")
+                self._transition(STATE_HALF_OPEN)
+
+    async def close(self):
+        """Остановка фоновой проверки"""
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+
+    # ============================================
+    # Статус
+    # ============================================
+
+    def get_state(self) -> Dict:
+        """
+        Текущее состояние для /health и /status
+
+        Returns:
+            Dict: state, failure_rate, slow_call_rate, calls, opened, rejected,
+                  probes, retry_in (секунд до пробного запроса, если открыт)
+        """
+        failure_rate, slow_rate = self._rates()
+        state = {
+            'state': self.state,
+            'failure_rate': round(failure_rate, 2),
+            'slow_call_rate': round(slow_rate, 2),
+            'calls': len(self._window),
+            **self._stats
+        }
+        if self.state == STATE_OPEN:
+            state['retry_in'] = max(0, int(self.open_timeout - (time.monotonic() - self._opened_at)))
+        return state
+
+
+# Экспорт
+__all__ = [
+    'CircuitBreaker',
+    'STATE_CLOSED',
+    'STATE_OPEN',
+    'STATE_HALF_OPEN'
+]
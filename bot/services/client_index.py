@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+Индекс поиска клиентов в памяти для inline-режима бота
+Префиксный поиск по словам названия и ИНН (bisect по отсортированным спискам)
+и нечёткий поиск по триграммам для опечаток и середины слова.
+Обновляется по одному клиенту вместе с локальной копией дедлайнов
+"""
+
+import heapq
+import re
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+# Организационно-правовые формы не различают клиентов и не индексируются
+LEGAL_FORMS = {'ооо', 'оао', 'зао', 'пао', 'ао', 'ип', 'нко', 'ано', 'чоп', 'тоо'}
+
+# Минимальное сходство по триграммам для нечёткого совпадения
+TRIGRAM_THRESHOLD = 0.25
+
+_WORD_RE = re.compile(r'[0-9a-zа-я]+')
+
+
+def normalize(text: Optional[str]) -> str:
+    """Нижний регистр, ё -> е, кавычки и знаки препинания -> пробелы"""
+    return ' '.join(_WORD_RE.findall((text or '').casefold().replace('ё', 'е')))
+
+
+def _words(text: str) -> List[str]:
+    return [word for word in text.split() if word not in LEGAL_FORMS]
+
+
+def _trigrams(text: str) -> Set[str]:
+    grams = set()
+    for word in text.split():
+        padded = f" {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _prefix_range(index: List[Tuple[str, int]], prefix: str, exact: bool = False) -> List[int]:
+    """ID из отсортированного списка (строка, id), строка которых начинается с prefix (или равна ему)"""
+    lo = bisect_left(index, (prefix,))
+    hi = bisect_left(index, (prefix + ('\0' if exact else '\uffff'),))
+    return [client_id for _, client_id in index[lo:hi]]
+
+
+class ClientSearchIndex:
+    """
+    Индекс активных клиентов по названию компании и ИНН
+
+    _words - отсортированные (слово названия, id), _inns - (ИНН, id),
+    _trigrams - триграмма -> множество id. version растёт при каждом
+    изменении (ключ кэша результатов).
+    """
+
+    def __init__(self):
+        self._entries: Dict[int, Tuple[List[str], str, Set[str]]] = {}
+        self._words: List[Tuple[str, int]] = []
+        self._inns: List[Tuple[str, int]] = []
+        self._trigrams: Dict[str, Set[int]] = {}
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        """Удаление всех клиентов"""
+        self._entries = {}
+        self._words = []
+        self._inns = []
+        self._trigrams = {}
+        self.version += 1
+
+    def remove(self, client_id: int):
+        """Удаление клиента из индекса"""
+        entry = self._entries.pop(client_id, None)
+        if entry is None:
+            return
+
+        words, inn, grams = entry
+        for word in words:
+            del self._words[bisect_left(self._words, (word, client_id))]
+        if inn:
+            del self._inns[bisect_left(self._inns, (inn, client_id))]
+        for gram in grams:
+            ids = self._trigrams[gram]
+            ids.discard(client_id)
+            if not ids:
+                del self._trigrams[gram]
+        self.version += 1
+
+    def upsert(self, client_id: int, company_name: Optional[str], inn: Optional[str], is_active: bool = True):
+        """
+        Добавление или обновление клиента (неактивный клиент удаляется)
+
+        Args:
+            client_id: ID клиента
+            company_name: Название компании
+            inn: ИНН
+            is_active: Активен ли клиент
+        """
+        self.remove(client_id)
+        if not is_active:
+            return
+
+        name = normalize(company_name)
+        words = sorted(set(_words(name)))
+        inn = ''.join(ch for ch in (inn or '') if ch.isdigit())
+        grams = _trigrams(' '.join(words))
+
+        self._entries[client_id] = (words, inn, grams)
+        for word in words:
+            insort(self._words, (word, client_id))
+        if inn:
+            insort(self._inns, (inn, client_id))
+        for gram in grams:
+            self._trigrams.setdefault(gram, set()).add(client_id)
+        self.version += 1
+
+    def search(self, query: str, limit: int = 20) -> List[int]:
+        """
+        Поиск клиентов, лучшие совпадения первыми
+
+        Порядок: точный ИНН, префикс ИНН, все слова запроса - префиксы слов
+        названия, затем сходство по триграммам.
+
+        Args:
+            query: Строка поиска ("Ром", "ооо ромашка", "7701")
+            limit: Максимум результатов
+
+        Returns:
+            List[int]: ID клиентов
+        """
+        text = normalize(query)
+        scores: Dict[int, float] = {}
+
+        digits = text.replace(' ', '')
+        if digits.isdigit():
+            for client_id in _prefix_range(self._inns, digits):
+                scores[client_id] = 4.0 if self._entries[client_id][1] == digits else 3.0
+
+        tokens = _words(text)
+        if tokens:
+            # Каждое слово запроса должно быть началом какого-либо слова названия
+            matched: Optional[Set[int]] = None
+            for token in sorted(tokens, key=len, reverse=True):
+                ids = set(_prefix_range(self._words, token))
+                matched = ids if matched is None else matched & ids
+                if not matched:
+                    break
+            if matched:
+                # Совпадение слова целиком поднимает клиента выше совпадения по началу
+                exact: Dict[int, int] = {}
+                for token in tokens:
+                    for client_id in _prefix_range(self._words, token, exact=True):
+                        exact[client_id] = exact.get(client_id, 0) + 1
+                for client_id in matched:
+                    scores.setdefault(client_id, 2.0 + exact.get(client_id, 0) / (len(tokens) + 1))
+
+            if len(scores) < limit:
+                query_grams = _trigrams(' '.join(tokens))
+                shared: Dict[int, int] = {}
+                for gram in query_grams:
+                    for client_id in self._trigrams.get(gram, ()):
+                        shared[client_id] = shared.get(client_id, 0) + 1
+                for client_id, count in shared.items():
+                    if client_id in scores:
+                        continue
+                    similarity = count / (len(query_grams) + len(self._entries[client_id][2]) - count)
+                    if similarity >= TRIGRAM_THRESHOLD:
+                        scores[client_id] = similarity
+
+        ranked = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [client_id for client_id, _ in ranked]
+
+
+class QueryResultCache:
+    """LRU кэш результатов запросов с ограниченным временем жизни"""
+
+    def __init__(self, max_entries: int = 500, ttl: float = 30.0):
+        """
+        Args:
+            max_entries: Сколько запросов хранить
+            ttl: Время жизни результата (секунды)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Сохранённый результат или None"""
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: Hashable, value: Any):
+        """Сохранение результата"""
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_metrics(self) -> Dict[str, int]:
+        """
+        Метрики кэша
+
+        Returns:
+            Dict: entries, hits, misses
+        """
+        return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+# Экспорт
+__all__ = [
+    'normalize',
+    'ClientSearchIndex',
+    'QueryResultCache'
+]
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 """
 Управление многошаговыми диалогами (conversation state)
+Диалоги менеджера истекают при обращении к ним (get_conversation),
+диалоги на aiogram FSM (регистрация, обращения) - по TTL в SQLiteStorage
 """
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
@@ -170,22 +172,6 @@ class ConversationManager:
             return command
         return None
     
-    def cleanup_expired(self):
-        """Очистка истёкших диалогов"""
-        expired_users = []
-        
-        for user_id, conversation in self._conversations.items():
-            if conversation.is_expired():
-                expired_users.append(user_id)
-        
-        for user_id in expired_users:
-            conversation = self._conversations[user_id]
-            logger.info(f"Удаление истёкшего диалога: user {user_id}, команда {conversation.command}")
-            del self._conversations[user_id]
-        
-        if expired_users:
-            logger.info(f"Очищено истёкших диалогов: {len(expired_users)}")
-    
     def get_active_count(self) -> int:
         """Получить количество активных диалогов"""
         return len(self._conversations)
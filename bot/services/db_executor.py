@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Выполнение синхронных запросов SQLAlchemy вне event loop бота
+Все обращения бота к БД идут через ограниченный пул потоков, чтобы медленный
+запрос (например, запись в notification_logs) не останавливал polling
+"""
+
+import asyncio
+import functools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from backend.config import settings
+from backend.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+# Счётчики: wait - ожидание свободного потока, run - выполнение запроса
+_metrics: Dict[str, float] = {
+    'calls': 0,
+    'errors': 0,
+    'in_flight': 0,
+    'max_wait': 0.0,
+    'max_run': 0.0
+}
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Пул потоков БД (создаётся при первом вызове)"""
+    global _executor
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.bot_db_max_workers,
+            thread_name_prefix="bot-db"
+        )
+        logger.info(f"Пул потоков БД создан: {settings.bot_db_max_workers} потоков")
+
+    return _executor
+
+
+def _timed_call(submitted_at: float, func: Callable, args: tuple, kwargs: dict) -> Any:
+    started_at = time.monotonic()
+    _metrics['max_wait'] = max(_metrics['max_wait'], started_at - submitted_at)
+    try:
+        return func(*args, **kwargs)
+    finally:
+        _metrics['max_run'] = max(_metrics['max_run'], time.monotonic() - started_at)
+
+
+async def run_db(func: Callable, *args, **kwargs) -> Any:
+    """
+    Выполнение синхронной функции с доступом к БД в пуле потоков
+
+    Args:
+        func: Синхронная функция
+        *args, **kwargs: Аргументы функции
+
+    Returns:
+        Any: Результат функции (исключения пробрасываются)
+    """
+    loop = asyncio.get_running_loop()
+    _metrics['calls'] += 1
+    _metrics['in_flight'] += 1
+    try:
+        return await loop.run_in_executor(
+            _get_executor(),
+            functools.partial(_timed_call, time.monotonic(), func, args, kwargs)
+        )
+    except Exception:
+        _metrics['errors'] += 1
+        raise
+    finally:
+        _metrics['in_flight'] -= 1
+
+
+def _call_with_session(func: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+    db: Session = SessionLocal()
+    try:
+        return func(db, *args, **kwargs)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+async def run_in_session(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Выполнение функции func(db, *args, **kwargs) с новой сессией в пуле потоков
+
+    Сессия открывается, используется и закрывается в одном рабочем потоке.
+    Функция должна вернуть готовые данные (словари, числа), а не ORM объекты
+    с ленивыми связями - сессия к моменту возврата уже закрыта.
+
+    Args:
+        func: Синхронная функция, первым аргументом принимающая сессию
+        *args, **kwargs: Остальные аргументы функции
+
+    Returns:
+        Any: Результат функции
+    """
+    return await run_db(_call_with_session, func, args, kwargs)
+
+
+def get_db_executor_metrics() -> Dict[str, float]:
+    """
+    Метрики пула потоков БД
+
+    Returns:
+        Dict: calls, errors, in_flight, max_wait и max_run (секунды)
+    """
+    return {**_metrics, 'max_workers': settings.bot_db_max_workers}
+
+
+def shutdown_db_executor():
+    """Остановка пула потоков БД с ожиданием текущих запросов"""
+    global _executor
+
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        logger.info("Пул потоков БД остановлен")
+    _executor = None
+
+
+# Экспорт
+__all__ = [
+    'run_db',
+    'run_in_session',
+    'get_db_executor_metrics',
+    'shutdown_db_executor'
+]
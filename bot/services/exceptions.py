@@ -11,8 +11,16 @@ class APIError(Exception):
 
 
 class TokenRefreshError(APIError):
-    """Ошибка обновления JWT токена"""
-    pass
+    """
+    Ошибка обновления JWT токена
+
+    Attributes:
+        unavailable: API недоступен (сеть, тайм-аут, 5xx), а не отклонил вход
+    """
+
+    def __init__(self, message: str, unavailable: bool = False):
+        super().__init__(message)
+        self.unavailable = unavailable
 
 
 class ConnectionError(APIError):
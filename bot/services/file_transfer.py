@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Передача файлов экспорта в Telegram без загрузки целиком в память
+Файл скачивается во временный spooled файл, при превышении лимита загрузки
+Telegram упаковывается в zip, file_id отправленного файла переиспользуется
+"""
+
+import logging
+import tempfile
+import time
+import zipfile
+from datetime import datetime
+from typing import AsyncGenerator, Dict, Hashable, IO, NamedTuple, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.types.input_file import InputFile
+
+logger = logging.getLogger(__name__)
+
+# Лимит загрузки файлов ботом через Bot API (50 МБ)
+TELEGRAM_UPLOAD_LIMIT = 50 * 1024 * 1024
+
+
+class SpooledInputFile(InputFile):
+    """
+    Файл для отправки в Telegram из открытого файлового объекта
+
+    В отличие от BufferedInputFile не требует bytes в памяти: читается
+    кусками с начала файла при отправке
+    """
+
+    def __init__(self, file: IO[bytes], filename: str, chunk_size: int = 64 * 1024):
+        """
+        Args:
+            file: Открытый бинарный файл (например, SpooledTemporaryFile)
+            filename: Имя файла для Telegram
+            chunk_size: Размер куска чтения
+        """
+        super().__init__(filename=filename, chunk_size=chunk_size)
+        self.file = file
+
+    async def read(self, bot: Bot) -> AsyncGenerator[bytes, None]:
+        self.file.seek(0)
+        while chunk := self.file.read(self.chunk_size):
+            yield chunk
+
+
+def compress_to_zip(source: IO[bytes], filename: str, spool_size: int) -> Tuple[IO[bytes], int]:
+    """
+    Упаковка файла в zip архив (блокирующая, вызывать через asyncio.to_thread)
+
+    Args:
+        source: Исходный файл
+        filename: Имя файла внутри архива
+        spool_size: Порог размера, после которого архив пишется на диск
+
+    Returns:
+        Tuple: (файл архива, размер в байтах)
+    """
+    archive = tempfile.SpooledTemporaryFile(max_size=spool_size)
+    source.seek(0)
+
+    with zipfile.ZipFile(archive, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=6) as zf:
+        with zf.open(filename, 'w', force_zip64=True) as dest:
+            while chunk := source.read(1024 * 1024):
+                dest.write(chunk)
+
+    size = archive.tell()
+    archive.seek(0)
+    return archive, size
+
+
+class CachedFile(NamedTuple):
+    """Отправленный файл в кэше: file_id и время формирования данных"""
+    file_id: str
+    created_at: datetime
+
+
+class FileIdCache:
+    """
+    Кэш Telegram file_id отправленных файлов
+
+    Повторный запрос того же экспорта в течение ttl секунд отправляется
+    по file_id без скачивания и повторной загрузки. Вместе с file_id
+    хранится время формирования файла: повторная отправка показывает его,
+    а не текущее время
+    """
+
+    def __init__(self, ttl: float = 300):
+        """
+        Args:
+            ttl: Время жизни file_id в кэше (секунды)
+        """
+        self.ttl = ttl
+        self._items: Dict[Hashable, Tuple[CachedFile, float]] = {}
+
+    def get(self, key: Hashable) -> Optional[CachedFile]:
+        """
+        Получение file_id
+
+        Args:
+            key: Ключ экспорта
+
+        Returns:
+            Optional[CachedFile]: file_id и время формирования или None, если нет или истёк
+        """
+        item = self._items.get(key)
+        if item is None:
+            return None
+
+        cached, expires_at = item
+        if time.monotonic() >= expires_at:
+            del self._items[key]
+            return None
+        return cached
+
+    def put(self, key: Hashable, file_id: str, created_at: datetime):
+        """
+        Сохранение file_id
+
+        Args:
+            key: Ключ экспорта
+            file_id: file_id отправленного документа
+            created_at: Время формирования данных файла
+        """
+        now = time.monotonic()
+        # Удаляем истёкшие, чтобы кэш не рос
+        for stale in [k for k, (_, expires_at) in self._items.items() if expires_at <= now]:
+            del self._items[stale]
+        self._items[key] = (CachedFile(file_id, created_at), now + self.ttl)
+
+    def invalidate(self, key: Hashable):
+        """Удаление file_id (например, Telegram его не принял)"""
+        self._items.pop(key, None)
+
+
+# Экспорт
+__all__ = [
+    'TELEGRAM_UPLOAD_LIMIT',
+    'SpooledInputFile',
+    'compress_to_zip',
+    'CachedFile',
+    'FileIdCache'
+]
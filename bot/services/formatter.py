@@ -5,7 +5,8 @@
 ОБНОВЛЕНО: добавлены форматтеры для Web API данных
 """
 
-from typing import Dict, List
+import html
+from typing import Dict, List, Optional
 from datetime import datetime
 
 import logging
@@ -94,11 +95,182 @@ def format_deadline_notification(deadline: Dict, days: int) -> str:
         return "⚠️ Уведомление о дедлайне\n\nПроизошла ошибка при формировании сообщения"
 
 
+# Лимит длины одного сообщения Telegram
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+# Поля дедлайна со свободным текстом: сокращаются, если страница
+# из DEADLINES_PAGE_SIZE блоков не помещается в одно сообщение
+TRUNCATABLE_FIELDS = (
+    'description',
+    'installation_address',
+    'client_name',
+    'cash_register_name',
+    'cash_register_model',
+    'cash_register_serial',
+    'deadline_type_name'
+)
+
+# Длина заголовка страницы (название клиента в заголовке /filter)
+PAGE_TITLE_LIMIT = 256
+
+# Эмодзи статусов дедлайнов
+STATUS_EMOJI = {
+    'green': '🟢',
+    'yellow': '🟡',
+    'red': '🔴',
+    'expired': '❌'
+}
+
+
+def _format_status_counts(status_counts: Dict) -> str:
+    """
+    Блок статистики по статусам дедлайнов
+    
+    Args:
+        status_counts (Dict): Количество дедлайнов по статусам (expired, red, yellow, green)
+        
+    Returns:
+        str: Отформатированный блок (пустая строка, если статистики нет)
+    """
+    if not any(status_counts.values()):
+        return ""
+    
+    message = "<b>📊 Статистика:</b>\n"
+    if status_counts.get('expired', 0) > 0:
+        message += f"   ❌ Просрочено: <b>{status_counts['expired']}</b>\n"
+    if status_counts.get('red', 0) > 0:
+        message += f"   🔴 Срочно (&lt;7 дн): <b>{status_counts['red']}</b>\n"
+    if status_counts.get('yellow', 0) > 0:
+        message += f"   🟡 Внимание (7-14 дн): <b>{status_counts['yellow']}</b>\n"
+    if status_counts.get('green', 0) > 0:
+        message += f"   🟢 Хорошо (&gt;14 дн): <b>{status_counts['green']}</b>\n"
+    message += "\n"
+    return message
+
+
+def _format_deadline_block(index: int, deadline: Dict) -> str:
+    """
+    Блок с детализацией одного дедлайна в списке
+    
+    Args:
+        index (int): Порядковый номер дедлайна в списке
+        deadline (Dict): Информация о дедлайне
+        
+    Returns:
+        str: Отформатированный блок
+    """
+    emoji = STATUS_EMOJI.get(deadline.get('status', 'green'), '⚪')
+    days_remaining = deadline.get('days_remaining', 'N/A')
+    
+    # Определяем уровень срочности
+    if isinstance(days_remaining, int):
+        if days_remaining <= 0:
+            urgency_text = "ПРОСРОЧЕНО!"
+        elif days_remaining <= 3:
+            urgency_text = "КРИТИЧНО!"
+        elif days_remaining <= 7:
+            urgency_text = "Требует внимания"
+        else:
+            urgency_text = "В норме"
+    else:
+        urgency_text = "Неизвестно"
+    
+    # Форматируем дату
+    if deadline.get('expiration_date'):
+        exp_date = deadline['expiration_date'].strftime('%d.%m.%Y') if hasattr(deadline['expiration_date'], 'strftime') else str(deadline['expiration_date'])
+    else:
+        exp_date = 'Не указана'
+    
+    # Формируем блок дедлайна
+    message = f"<b>{index}.</b> {emoji} <b>{urgency_text}</b>\n"
+    message += f"━━━━━━━━━━━━━━━━\n"
+    
+    # Информация о клиенте
+    message += f"🏢 <b>Клиент:</b>\n"
+    message += f"   • {deadline.get('client_name', 'Неизвестно')}\n"
+    message += f"   • ИНН: <code>{deadline.get('client_inn', 'Неизвестно')}</code>\n\n"
+    
+    # Информация о сервисе
+    message += f"🛠 <b>Услуга:</b> {deadline.get('deadline_type_name', 'Неизвестно')}\n"
+    
+    # Информация о кассе (если есть)
+    if deadline.get('cash_register_model') or deadline.get('cash_register_serial'):
+        message += f"\n🖨️ <b>ККТ:</b>\n"
+        if deadline.get('cash_register_name'):
+            message += f"   • Название: <b>{deadline['cash_register_name']}</b>\n"
+        if deadline.get('cash_register_model'):
+            message += f"   • Модель: {deadline['cash_register_model']}\n"
+        if deadline.get('cash_register_serial'):
+            message += f"   • Зав. №: <code>{deadline['cash_register_serial']}</code>\n"
+        if deadline.get('installation_address'):
+            message += f"   • Адрес: {deadline['installation_address']}\n"
+    
+    # Дополнительная информация (если есть)
+    if deadline.get('description'):
+        message += f"\n📝 <b>Описание:</b> {deadline['description']}\n"
+    
+    # Сроки
+    message += f"\n⏰ <b>Дата окончания:</b> {exp_date}\n"
+    message += f"⌛️ <b>Осталось:</b> "
+    if isinstance(days_remaining, int):
+        if days_remaining == 0:
+            message += "<b>Истекает СЕГОДНЯ!</b>\n"
+        elif days_remaining == 1:
+            message += "<b>1 день</b>\n"
+        elif days_remaining < 0:
+            message += f"<b>Просрочено на {abs(days_remaining)} дн.</b>\n"
+        else:
+            message += f"<b>{days_remaining} дн.</b>\n"
+    else:
+        message += f"{days_remaining}\n"
+    
+    message += "\n"
+    return message
+
+
+def _truncate(text: str, limit: int) -> str:
+    """Обрезка текста до limit символов с многоточием"""
+    return text if len(text) <= limit else text[:max(limit - 1, 0)] + '…'
+
+
+def _fit_deadline_block(index: int, deadline: Dict, budget: int) -> str:
+    """
+    Блок дедлайна не длиннее budget символов
+    
+    Длинные текстовые поля (примечание, адрес, названия) сокращаются до
+    общего предела, который уменьшается, пока блок не поместится
+    
+    Args:
+        index (int): Порядковый номер дедлайна в списке
+        deadline (Dict): Информация о дедлайне
+        budget (int): Допустимая длина блока
+    
+    Returns:
+        str: Отформатированный блок
+    """
+    block = _format_deadline_block(index, deadline)
+    fields = [field for field in TRUNCATABLE_FIELDS if isinstance(deadline.get(field), str)]
+    if len(block) <= budget or not fields:
+        return block
+    
+    limit = max(len(deadline[field]) for field in fields)
+    while len(block) > budget and limit > 1:
+        limit = max(limit - (len(block) - budget) // len(fields) - 1, 1)
+        short = dict(deadline)
+        for field in fields:
+            short[field] = _truncate(deadline[field], limit)
+        block = _format_deadline_block(index, short)
+    return block
+
+
 def format_deadline_list(deadlines: List[Dict], title: str = None) -> str:
     """
     Форматирование списка дедлайнов с детализацией
     ОБНОВЛЕНО: добавлена подробная информация о каждом дедлайне
     
+    Для длинных списков используйте format_deadline_page - одно сообщение
+    Telegram ограничено 4096 символами
+    
     Args:
         deadlines (List[Dict]): Список дедлайнов
         title (str): Кастомный заголовок (опционально)
@@ -109,14 +281,6 @@ def format_deadline_list(deadlines: List[Dict], title: str = None) -> str:
     try:
         if not deadlines:
             return "📭 <b>Нет предстоящих дедлайнов</b>"
-            
-        # Определяем эмодзи по статусу
-        status_emoji = {
-            'green': '🟢',
-            'yellow': '🟡',
-            'red': '🔴',
-            'expired': '❌'
-        }
         
         # Формируем заголовок
         if title:
@@ -134,89 +298,14 @@ def format_deadline_list(deadlines: List[Dict], title: str = None) -> str:
             status_counts[status] = status_counts.get(status, 0) + 1
         
         # Показываем статистику
-        if status_counts:
-            message += "<b>📊 Статистика:</b>\n"
-            if status_counts.get('expired', 0) > 0:
-                message += f"   ❌ Просрочено: <b>{status_counts['expired']}</b>\n"
-            if status_counts.get('red', 0) > 0:
-                message += f"   🔴 Срочно (&lt;7 дн): <b>{status_counts['red']}</b>\n"
-            if status_counts.get('yellow', 0) > 0:
-                message += f"   🟡 Внимание (7-14 дн): <b>{status_counts['yellow']}</b>\n"
-            if status_counts.get('green', 0) > 0:
-                message += f"   🟢 Хорошо (&gt;14 дн): <b>{status_counts['green']}</b>\n"
-            message += "\n"
+        message += _format_status_counts(status_counts)
         
         message += "<b>📋 ДЕТАЛИ ДЕДЛАЙНОВ:</b>\n"
         message += "=" * 30 + "\n\n"
         
         # Добавляем каждый дедлайн с детализацией
         for i, deadline in enumerate(deadlines, 1):
-            emoji = status_emoji.get(deadline.get('status', 'green'), '⚪')
-            days_remaining = deadline.get('days_remaining', 'N/A')
-            
-            # Определяем уровень срочности
-            if isinstance(days_remaining, int):
-                if days_remaining <= 0:
-                    urgency_text = "ПРОСРОЧЕНО!"
-                elif days_remaining <= 3:
-                    urgency_text = "КРИТИЧНО!"
-                elif days_remaining <= 7:
-                    urgency_text = "Требует внимания"
-                else:
-                    urgency_text = "В норме"
-            else:
-                urgency_text = "Неизвестно"
-            
-            # Форматируем дату
-            if deadline.get('expiration_date'):
-                exp_date = deadline['expiration_date'].strftime('%d.%m.%Y') if hasattr(deadline['expiration_date'], 'strftime') else str(deadline['expiration_date'])
-            else:
-                exp_date = 'Не указана'
-            
-            # Формируем блок дедлайна
-            message += f"<b>{i}.</b> {emoji} <b>{urgency_text}</b>\n"
-            message += f"━━━━━━━━━━━━━━━━\n"
-            
-            # Информация о клиенте
-            message += f"🏢 <b>Клиент:</b>\n"
-            message += f"   • {deadline.get('client_name', 'Неизвестно')}\n"
-            message += f"   • ИНН: <code>{deadline.get('client_inn', 'Неизвестно')}</code>\n\n"
-            
-            # Информация о сервисе
-            message += f"🛠 <b>Услуга:</b> {deadline.get('deadline_type_name', 'Неизвестно')}\n"
-            
-            # Информация о кассе (если есть)
-            if deadline.get('cash_register_model') or deadline.get('cash_register_serial'):
-                message += f"\n🖨️ <b>ККТ:</b>\n"
-                if deadline.get('cash_register_name'):
-                    message += f"   • Название: <b>{deadline['cash_register_name']}</b>\n"
-                if deadline.get('cash_register_model'):
-                    message += f"   • Модель: {deadline['cash_register_model']}\n"
-                if deadline.get('cash_register_serial'):
-                    message += f"   • Зав. №: <code>{deadline['cash_register_serial']}</code>\n"
-                if deadline.get('installation_address'):
-                    message += f"   • Адрес: {deadline['installation_address']}\n"
-            
-            # Дополнительная информация (если есть)
-            if deadline.get('description'):
-                message += f"\n📝 <b>Описание:</b> {deadline['description']}\n"
-            
-            # Сроки
-            message += f"\n⏰ <b>Дата окончания:</b> {exp_date}\n"
-            message += f"⌛️ <b>Осталось:</b> "
-            if isinstance(days_remaining, int):
-                if days_remaining == 0:
-                    message += "<b>Истекает СЕГОДНЯ!</b>\n"
-                elif days_remaining == 1:
-                    message += "<b>1 день</b>\n"
-                elif days_remaining < 0:
-                    message += f"<b>Просрочено на {abs(days_remaining)} дн.</b>\n"
-                else:
-                    message += f"<b>{days_remaining} дн.</b>\n"
-            else:
-                message += f"{days_remaining}\n"
-            
-            message += "\n"
+            message += _format_deadline_block(i, deadline)
         
         # Подсказка внизу
         message += "━━━━━━━━━━━━━━━━\n"
@@ -229,6 +318,79 @@ def format_deadline_list(deadlines: List[Dict], title: str = None) -> str:
         return "⚠️ Произошла ошибка при формировании списка дедлайнов"
 
 
+def format_deadline_page(
+    deadlines: List[Dict],
+    title: str,
+    page: int,
+    total_pages: int,
+    total: int,
+    status_counts: Dict,
+    offset: int = 0,
+    hint: Optional[str] = None
+) -> str:
+    """
+    Форматирование одной страницы списка дедлайнов
+    Страница разбивается только по границам дедлайнов, статистика
+    передаётся готовой (посчитана агрегатным запросом по всей выборке)
+    
+    На странице всегда все переданные дедлайны: если они не помещаются в
+    лимит Telegram, в блоках сокращаются длинные текстовые поля
+    (следующая страница начинается с offset + len(deadlines))
+    
+    Args:
+        deadlines (List[Dict]): Дедлайны текущей страницы
+        title (str): Заголовок списка
+        page (int): Номер страницы (с 1)
+        total_pages (int): Всего страниц
+        total (int): Всего дедлайнов в выборке
+        status_counts (Dict): Количество дедлайнов по статусам во всей выборке
+        offset (int): Сколько дедлайнов на предыдущих страницах (для нумерации)
+        hint (str): Строка внизу страницы вместо подсказки по навигации
+    
+    Returns:
+        str: Текст сообщения не длиннее лимита Telegram
+    """
+    try:
+        message = f"<b>{_truncate(title, PAGE_TITLE_LIMIT)}</b>\n"
+        message += "=" * 30 + "\n\n"
+        message += f"<b>Всего дедлайнов:</b> {total}\n\n"
+        
+        # Статистику показываем только на первой странице
+        if page == 1:
+            message += _format_status_counts(status_counts)
+        
+        message += f"<b>📋 ДЕТАЛИ ДЕДЛАЙНОВ</b> (стр. {page} из {total_pages}):\n"
+        message += "=" * 30 + "\n\n"
+        
+        footer = "━━━━━━━━━━━━━━━━\n"
+        if hint:
+            footer += hint
+        elif total_pages > 1:
+            footer += "💡 <i>Листайте кнопками ◀️ ▶️</i>"
+        else:
+            footer += "💡 <i>Используйте /help для просмотра всех команд</i>"
+        
+        blocks = [_format_deadline_block(i, deadline) for i, deadline in enumerate(deadlines, offset + 1)]
+        free = TELEGRAM_MESSAGE_LIMIT - len(message) - len(footer)
+        if sum(len(block) for block in blocks) > free:
+            # Не помещается - делим место поровну, короткие блоки отдают остаток длинным
+            logger.info(f"Страница {page} длиннее лимита Telegram, длинные поля дедлайнов сокращены")
+            order = sorted(range(len(blocks)), key=lambda k: len(blocks[k]))
+            for n, k in enumerate(order):
+                budget = free // (len(blocks) - n)
+                blocks[k] = _fit_deadline_block(offset + k + 1, deadlines[k], budget)
+                free -= len(blocks[k])
+        
+        message += ''.join(blocks)
+        
+        message += footer
+        return message.strip()
+        
+    except Exception as e:
+        logger.error(f"Ошибка форматирования страницы дедлайнов: {e}")
+        return "⚠️ Произошла ошибка при формировании списка дедлайнов"
+
+
 def format_statistics(stats: Dict) -> str:
     """
     Форматирование статистики системы (старая версия для совместимости)
@@ -471,7 +633,8 @@ def format_help_message(user_role: str) -> str:
             "/health - Проверка Web API\n"
             "/check - Принудительная проверка и отправка уведомлений\n"
             "/search - Поиск клиента (ИНН/название)\n"
-            "/export - Экспорт всех данных в JSON\n\n"
+            "/export - Экспорт всех данных в JSON\n"
+            "/broadcast - Рассылка объявления клиентам\n\n"
             "ℹ️ Администратор получает уведомления обо всех дедлайнах."
         )
     else:
@@ -496,6 +659,104 @@ def format_help_message(user_role: str) -> str:
     return message
 
 
+CIRCUIT_STATE_LABELS = {
+    'closed': '🟢 Замкнут (запросы идут в API)',
+    'half_open': '🟡 Полуоткрыт (пробный запрос)',
+    'open': '🔴 Разомкнут (работа через БД)'
+}
+
+
+def _format_circuit_state(circuit: Optional[Dict]) -> str:
+    """
+    Строка состояния circuit breaker Web API
+    
+    Args:
+        circuit (Optional[Dict]): Результат CircuitBreaker.get_state()
+        
+    Returns:
+        str: Строка сообщения (пустая, если breaker не используется)
+    """
+    if not circuit:
+        return ""
+    
+    line = f"⚡ <b>Circuit breaker:</b> {CIRCUIT_STATE_LABELS.get(circuit['state'], circuit['state'])}\n"
+    if circuit['state'] == 'open':
+        line += f"   Повтор через {circuit.get('retry_in', 0)} сек\n"
+    line += (
+        f"   Ошибок: {circuit.get('failure_rate', 0):.0%}, медленных: {circuit.get('slow_call_rate', 0):.0%} "
+        f"(из {circuit.get('calls', 0)}), размыканий: {circuit.get('opened', 0)}, "
+        f"отклонено: {circuit.get('rejected', 0)}\n"
+    )
+    return line
+
+
+def format_event_loop_health(loop_lag: Optional[Dict], db_metrics: Optional[Dict]) -> str:
+    """
+    Блок состояния event loop бота и пула потоков БД
+    
+    Args:
+        loop_lag (Optional[Dict]): Результат get_loop_lag_metrics()
+        db_metrics (Optional[Dict]): Результат get_db_executor_metrics()
+        
+    Returns:
+        str: Строки сообщения (пустая строка, если метрик нет)
+    """
+    message = ""
+    
+    if loop_lag:
+        message += "\n🔁 <b>Event loop:</b>\n"
+        message += (
+            f"   • Задержка: сейчас {loop_lag.get('last_ms', 0):.0f}ms, "
+            f"средняя {loop_lag.get('avg_ms', 0):.1f}ms\n"
+        )
+        message += f"   • Максимум: <b>{loop_lag.get('max_ms', 0):.0f}ms</b>"
+        if loop_lag.get('max_at'):
+            message += f" ({datetime.fromtimestamp(loop_lag['max_at']).strftime('%d.%m %H:%M:%S')})"
+        message += "\n"
+    
+    if db_metrics:
+        message += "\n🗄 <b>Запросы к БД (пул потоков):</b>\n"
+        message += (
+            f"   • Вызовов: {db_metrics.get('calls', 0)}, ошибок: {db_metrics.get('errors', 0)}, "
+            f"сейчас: {db_metrics.get('in_flight', 0)}/{db_metrics.get('max_workers', 0)}\n"
+        )
+        message += (
+            f"   • Макс. ожидание потока: {db_metrics.get('max_wait', 0) * 1000:.0f}ms, "
+            f"макс. запрос: {db_metrics.get('max_run', 0) * 1000:.0f}ms\n"
+        )
+    
+    return message
+
+
+def format_replica_health(replica: Optional[Dict]) -> str:
+    """
+    Блок состояния локальной копии дедлайнов
+    
+    Args:
+        replica (Optional[Dict]): Результат get_read_replica_metrics()
+        
+    Returns:
+        str: Строки сообщения (пустая строка, если копия не используется)
+    """
+    if not replica:
+        return ""
+    
+    message = "\n📦 <b>Локальная копия дедлайнов:</b>\n"
+    if not replica.get('ready'):
+        message += "   • ⏳ Первая загрузка не выполнена, чтение из API/БД\n"
+    else:
+        message += (
+            f"   • Задержка синхронизации: <b>{replica.get('lag', 0):.1f} сек</b>, "
+            f"последняя: {replica.get('last_sync_ms', 0)}ms\n"
+        )
+        message += f"   • Дедлайнов: {replica.get('deadlines', 0)}, клиентов: {replica.get('clients', 0)}\n"
+    message += (
+        f"   • Дельт: {replica.get('delta_syncs', 0)}, полных загрузок: {replica.get('full_syncs', 0)}, "
+        f"расхождений версии: {replica.get('version_mismatches', 0)}, ошибок: {replica.get('errors', 0)}\n"
+    )
+    return message
+
+
 def format_api_statistics(stats: Dict) -> str:
     """
     Форматирование статистики из Web API
@@ -536,6 +797,7 @@ def format_api_statistics(stats: Dict) -> str:
         
         # Метаданные
         message += f"📡 <b>Источник:</b> {source}\n"
+        message += _format_circuit_state(stats.get('circuit_breaker'))
         message += f"🕒 <b>Обновлено:</b> {now}"
         
         return message
@@ -576,6 +838,27 @@ def format_health_status(health_data: Dict) -> str:
         else:
             message += "\n⚠️ <b>Токен:</b> Невалиден/Истёк\n"
         
+        # Circuit breaker
+        circuit_line = _format_circuit_state(health_data.get('circuit_breaker'))
+        if circuit_line:
+            message += "\n" + circuit_line
+        
+        # Метрики клиента API
+        metrics = health_data.get('client_metrics')
+        if metrics:
+            message += "\n📡 <b>Клиент API:</b>\n"
+            message += f"   • Запросов к API: {metrics.get('upstream_requests', 0)}\n"
+            message += f"   • Из кэша: {metrics.get('cache_hits', 0)}\n"
+            message += f"   • Объединено: {metrics.get('coalesced', 0)}\n"
+            message += f"   • 304 Not Modified: {metrics.get('not_modified', 0)}\n"
+            message += (
+                f"   • Соединений: создано {metrics.get('connections_created', 0)}, "
+                f"переиспользовано {metrics.get('connections_reused', 0)}\n"
+            )
+        
+        message += format_event_loop_health(health_data.get('loop_lag'), health_data.get('db_executor'))
+        message += format_replica_health(health_data.get('replica'))
+        
         return message
         
     except Exception as e:
@@ -583,6 +866,120 @@ def format_health_status(health_data: Dict) -> str:
         return "⚠️ Ошибка при формировании health status"
 
 
+
+BROADCAST_STATUS_LABELS = {
+    'pending': '⏳ Ожидает запуска',
+    'running': '📤 Отправляется',
+    'paused': '⏸ На паузе',
+    'cancelled': '⛔ Отменена',
+    'completed': '✅ Завершена',
+    'failed': '❌ Ошибка'
+}
+
+
+def format_broadcast_progress(job: Dict) -> str:
+    """
+    Форматирование прогресса рассылки
+    
+    Args:
+        job (Dict): BroadcastJob.to_dict()
+        
+    Returns:
+        str: Отформатированное сообщение
+    """
+    try:
+        message = f"📣 <b>Рассылка #{job['id']}</b>\n\n"
+        message += f"<b>Статус:</b> {BROADCAST_STATUS_LABELS.get(job['status'], job['status'])}\n"
+        
+        filters = job.get('filters') or {}
+        if filters:
+            labels = {'ofd_provider_id': 'ОФД', 'deadline_type_id': 'Тип услуги', 'region': 'Регион'}
+            message += "<b>Фильтр:</b> " + ", ".join(
+                f"{labels.get(key, key)}: {value}" for key, value in filters.items()
+            ) + "\n"
+        
+        message += f"\n👥 Получателей: <b>{job['total']}</b>\n"
+        message += f"✅ Доставлено: <b>{job['delivered']}</b>\n"
+        message += f"🚫 Заблокировали бота: <b>{job['blocked']}</b>\n"
+        message += f"❌ Ошибок: <b>{job['failed']}</b>\n"
+        if job.get('pending'):
+            message += f"⏳ Осталось: <b>{job['pending']}</b>\n"
+        
+        preview = job['message_text'][:200]
+        message += f"\n<i>Текст:</i>\n{preview}{'…' if len(job['message_text']) > 200 else ''}"
+        
+        return message
+        
+    except Exception as e:
+        logger.error(f"Ошибка форматирования рассылки: {e}")
+        return "⚠️ Ошибка при формировании статуса рассылки"
+
+def _format_days_left(days: int) -> str:
+    """Короткая подпись срока: просрочено / сегодня / через N дн."""
+    if days < 0:
+        return f"просрочено {-days} дн."
+    if days == 0:
+        return "сегодня"
+    return f"через {days} дн."
+
+
+def format_client_inline_description(client: Dict, deadlines: List[Dict], limit: int = 2) -> str:
+    """
+    Описание результата inline-поиска: ИНН и ближайшие дедлайны одной строкой
+    
+    Args:
+        client (Dict): id, company_name, inn
+        deadlines (List[Dict]): Активные дедлайны по дате (deadline_type_name, expiration_date, days_remaining, status)
+        limit (int): Сколько ближайших дедлайнов показать
+        
+    Returns:
+        str: Строка описания (без HTML)
+    """
+    parts = [f"ИНН {client.get('inn') or 'не указан'}"]
+    for deadline in deadlines[:limit]:
+        parts.append(
+            f"{STATUS_EMOJI.get(deadline['status'], '')} {deadline['deadline_type_name']} "
+            f"{deadline['expiration_date'].strftime('%d.%m')} ({_format_days_left(deadline['days_remaining'])})"
+        )
+    if not deadlines:
+        parts.append("нет активных дедлайнов")
+    return " • ".join(parts)
+
+
+def format_client_inline_card(client: Dict, deadlines: List[Dict], limit: int = 5) -> str:
+    """
+    Карточка клиента, отправляемая в чат из inline-поиска
+    
+    Args:
+        client (Dict): id, company_name, inn, email, phone
+        deadlines (List[Dict]): Активные дедлайны по дате
+        limit (int): Сколько ближайших дедлайнов показать
+        
+    Returns:
+        str: Отформатированное сообщение
+    """
+    message = f"🏢 <b>{html.escape(client.get('company_name') or 'Без названия')}</b>\n"
+    message += f"ИНН: <code>{html.escape(client.get('inn') or 'не указан')}</code>\n"
+    if client.get('phone'):
+        message += f"📞 {html.escape(client['phone'])}\n"
+    if client.get('email'):
+        message += f"📧 {html.escape(client['email'])}\n"
+    
+    message += f"\n<b>📅 Ближайшие дедлайны ({len(deadlines)}):</b>\n"
+    for deadline in deadlines[:limit]:
+        message += (
+            f"   {STATUS_EMOJI.get(deadline['status'], '')} {html.escape(deadline['deadline_type_name'])}: "
+            f"{deadline['expiration_date'].strftime('%d.%m.%Y')} ({_format_days_left(deadline['days_remaining'])})\n"
+        )
+    if len(deadlines) > limit:
+        message += f"   <i>... и ещё {len(deadlines) - limit}</i>\n"
+    if not deadlines:
+        message += "   <i>Нет активных дедлайнов</i>\n"
+    
+    message += f"\n/client {client['id']} • /filter {client['id']}"
+    return message
+
+
 if __name__ == "__main__":
     # Тестирование форматтера
     print("=" * 50)
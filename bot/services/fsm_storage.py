@@ -0,0 +1,357 @@
+# -*- coding: utf-8 -*-
+"""
+Персистентное хранилище FSM состояний бота на SQLite
+Состояния диалогов (регистрация, обращения в поддержку) переживают перезапуск бота
+
+Хранилище рассчитано на один процесс бота: чтения идут из кэша процесса,
+запись отложенная, поэтому второй процесс на том же файле видел бы устаревшие
+состояния. Несколько экземпляров бота требуют общего хранилища (например, Redis)
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StorageKey
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    """Запись кэша: состояние и данные одного ключа FSM"""
+
+    __slots__ = ('state', 'data', 'expires_at')
+
+    def __init__(self, state: Optional[str], data: Dict[str, Any], expires_at: float):
+        self.state = state
+        self.data = data
+        self.expires_at = expires_at
+
+    def is_empty(self) -> bool:
+        """Пустая запись (нет ни состояния, ни данных) удаляется из БД"""
+        return self.state is None and not self.data
+
+    def is_expired(self, now: float) -> bool:
+        """Проверка истечения TTL"""
+        return now >= self.expires_at
+
+
+class SQLiteStorage(BaseStorage):
+    """
+    FSM storage для aiogram на локальном файле SQLite
+
+    - запись отложенная (write-behind): изменения копятся в памяти и сбрасываются
+      в БД пачкой раз в flush_interval секунд одной транзакцией
+    - брошенные диалоги истекают через state_ttl секунд бездействия
+      (каждая запись продлевает срок), просроченные строки удаляются периодически
+    - LRU кэш чтения: горячие состояния не читаются с диска на каждое сообщение;
+      кэш не сверяется с файлом, файл принадлежит одному процессу
+
+    Attributes:
+        path: Путь к файлу БД
+        state_ttl: Время жизни неактивного диалога (секунды)
+        flush_interval: Интервал сброса изменений на диск (секунды)
+        cache_size: Максимальное количество записей в кэше
+    """
+
+    def __init__(
+        self,
+        path: str = 'database/bot_fsm.db',
+        state_ttl: int = 3600,
+        flush_interval: float = 1.0,
+        cache_size: int = 10000,
+        purge_interval: int = 300
+    ):
+        """
+        Инициализация хранилища
+
+        Args:
+            path: Путь к файлу SQLite
+            state_ttl: TTL диалога в секундах
+            flush_interval: Интервал пакетной записи в секундах
+            cache_size: Размер LRU кэша чтения
+            purge_interval: Интервал удаления просроченных записей из БД (секунды)
+        """
+        self.path = path
+        self.state_ttl = state_ttl
+        self.flush_interval = flush_interval
+        self.cache_size = cache_size
+        self.purge_interval = purge_interval
+
+        self._cache: 'OrderedDict[str, _Entry]' = OrderedDict()
+        self._dirty: Dict[str, _Entry] = {}
+        self._db_lock = threading.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._last_purge = 0.0
+        self._closed = False
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('PRAGMA busy_timeout=5000')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS fsm_storage ('
+            '  key TEXT PRIMARY KEY,'
+            '  state TEXT,'
+            '  data TEXT NOT NULL,'
+            '  expires_at REAL NOT NULL'
+            ')'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS ix_fsm_storage_expires_at ON fsm_storage (expires_at)')
+
+        logger.info(f"SQLiteStorage инициализирован: {path} (TTL {state_ttl} сек)")
+
+    # ============================================
+    # Интерфейс BaseStorage
+    # ============================================
+
+    async def set_state(self, key: StorageKey, state: Any = None) -> None:
+        """
+        Установка состояния для ключа
+
+        Args:
+            key: Ключ хранилища
+            state: Новое состояние (State, строка или None)
+        """
+        entry = await self._get_entry(key)
+        entry.state = state.state if isinstance(state, State) else state
+        self._touch(self._build_key(key), entry)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        """
+        Получение текущего состояния
+
+        Args:
+            key: Ключ хранилища
+
+        Returns:
+            Optional[str]: Состояние или None
+        """
+        entry = await self._get_entry(key)
+        return entry.state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        """
+        Замена данных для ключа
+
+        Args:
+            key: Ключ хранилища
+            data: Новые данные
+        """
+        entry = await self._get_entry(key)
+        entry.data = dict(data)
+        self._touch(self._build_key(key), entry)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        """
+        Получение копии данных для ключа
+
+        Args:
+            key: Ключ хранилища
+
+        Returns:
+            Dict: Данные диалога
+        """
+        entry = await self._get_entry(key)
+        return dict(entry.data)
+
+    async def close(self) -> None:
+        """Остановка фоновой записи, сброс изменений и закрытие файла БД"""
+        if self._closed:
+            return
+        
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+
+        await self.flush()
+
+        with self._db_lock:
+            self._conn.close()
+        self._closed = True
+        logger.info("SQLiteStorage закрыт")
+
+    # ============================================
+    # Кэш и отложенная запись
+    # ============================================
+
+    @staticmethod
+    def _build_key(key: StorageKey) -> str:
+        """
+        Преобразование StorageKey в строковый ключ таблицы
+
+        Args:
+            key: Ключ хранилища aiogram
+
+        Returns:
+            str: Ключ вида bot:chat:thread:user:business:destiny
+        """
+        return ':'.join(str(part) for part in (
+            key.bot_id,
+            key.chat_id,
+            key.thread_id or '',
+            key.user_id,
+            getattr(key, 'business_connection_id', None) or '',
+            key.destiny
+        ))
+
+    async def _get_entry(self, key: StorageKey) -> _Entry:
+        """
+        Получение записи из кэша или с диска
+
+        Args:
+            key: Ключ хранилища
+
+        Returns:
+            _Entry: Запись (пустая, если ключа нет или TTL истёк)
+        """
+        str_key = self._build_key(key)
+        now = time.time()
+
+        entry = self._cache.get(str_key) or self._dirty.get(str_key)
+        if entry is None:
+            loaded = await asyncio.to_thread(self._load, str_key)
+            # Пока читался диск, запись мог загрузить и изменить другой
+            # обработчик того же ключа - она новее прочитанной строки
+            entry = self._cache.get(str_key) or self._dirty.get(str_key) or loaded
+        self._remember(str_key, entry)
+
+        if entry.is_expired(now) and not entry.is_empty():
+            logger.info(f"FSM диалог {str_key} истёк (state={entry.state})")
+            entry.state = None
+            entry.data = {}
+            self._dirty[str_key] = entry
+
+        return entry
+
+    def _touch(self, str_key: str, entry: _Entry):
+        """
+        Продление TTL записи и постановка в очередь на запись
+
+        Args:
+            str_key: Строковый ключ
+            entry: Изменённая запись
+        """
+        entry.expires_at = time.time() + self.state_ttl
+        self._dirty[str_key] = entry
+        self._remember(str_key, entry)
+        self._ensure_flush_task()
+
+    def _remember(self, str_key: str, entry: _Entry):
+        """Помещение записи в LRU кэш с вытеснением самых старых"""
+        self._cache[str_key] = entry
+        self._cache.move_to_end(str_key)
+        while len(self._cache) > self.cache_size:
+            old_key, _ = self._cache.popitem(last=False)
+            # Несохранённые записи остаются в _dirty до ближайшего сброса
+            logger.debug(f"FSM ключ {old_key} вытеснен из кэша")
+
+    def _ensure_flush_task(self):
+        """Запуск фоновой задачи сброса при первой записи"""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        """Фоновый цикл: пакетная запись изменений и удаление просроченных записей"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+                if time.time() - self._last_purge >= self.purge_interval:
+                    await asyncio.to_thread(self._purge_expired)
+                    self._evict_expired()
+            except Exception as e:
+                logger.error(f"❌ Ошибка записи FSM состояний: {e}")
+
+    async def flush(self):
+        """Сброс всех накопленных изменений на диск одной транзакцией"""
+        if not self._dirty:
+            return
+
+        batch = self._dirty
+        self._dirty = {}
+
+        upserts: List[Tuple[str, Optional[str], str, float]] = []
+        deletes: List[Tuple[str]] = []
+        for str_key, entry in batch.items():
+            if entry.is_empty():
+                deletes.append((str_key,))
+            else:
+                upserts.append((str_key, entry.state, json.dumps(entry.data, ensure_ascii=False, default=str), entry.expires_at))
+
+        try:
+            await asyncio.to_thread(self._write_batch, upserts, deletes)
+        except Exception:
+            # Возвращаем несохранённые записи, если их не перезаписали новые изменения
+            for str_key, entry in batch.items():
+                self._dirty.setdefault(str_key, entry)
+            raise
+
+        logger.debug(f"FSM: сохранено {len(upserts)}, удалено {len(deletes)} записей")
+
+    # ============================================
+    # Операции с файлом БД (выполняются в потоке)
+    # ============================================
+
+    def _load(self, str_key: str) -> _Entry:
+        """Чтение записи с диска"""
+        with self._db_lock:
+            row = self._conn.execute(
+                'SELECT state, data, expires_at FROM fsm_storage WHERE key = ?',
+                (str_key,)
+            ).fetchone()
+
+        if row is None:
+            return _Entry(None, {}, time.time() + self.state_ttl)
+        return _Entry(row[0], json.loads(row[1]), row[2])
+
+    def _write_batch(self, upserts: List[Tuple], deletes: List[Tuple]):
+        """Запись пачки изменений одной транзакцией"""
+        with self._db_lock:
+            self._conn.execute('BEGIN')
+            try:
+                if upserts:
+                    self._conn.executemany(
+                        'INSERT INTO fsm_storage (key, state, data, expires_at) VALUES (?, ?, ?, ?) '
+                        'ON CONFLICT(key) DO UPDATE SET state = excluded.state, '
+                        'data = excluded.data, expires_at = excluded.expires_at',
+                        upserts
+                    )
+                if deletes:
+                    self._conn.executemany('DELETE FROM fsm_storage WHERE key = ?', deletes)
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+
+    def _purge_expired(self):
+        """Удаление брошенных диалогов с истёкшим TTL"""
+        now = time.time()
+        with self._db_lock:
+            deleted = self._conn.execute('DELETE FROM fsm_storage WHERE expires_at <= ?', (now,)).rowcount
+        self._last_purge = now
+
+        if deleted:
+            logger.info(f"Удалено истёкших FSM диалогов: {deleted}")
+
+    def _evict_expired(self):
+        """Удаление истёкших записей из кэша"""
+        now = time.time()
+        for str_key in [k for k, e in self._cache.items() if e.is_expired(now) and k not in self._dirty]:
+            del self._cache[str_key]
+
+
+# Экспорт
+__all__ = ['SQLiteStorage']
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Общий пул HTTP соединений бота к Web API
+Один настроенный aiohttp коннектор (лимиты, keep-alive, DNS кэш) используется
+и WebAPIClient, и TokenManager вместо отдельной сессии на каждый логин
+"""
+
+import logging
+from typing import Dict, Optional
+
+import aiohttp
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+_session: Optional[aiohttp.ClientSession] = None
+
+# Счётчики соединений: reused - сколько TCP/TLS подключений сэкономлено keep-alive
+_metrics: Dict[str, int] = {
+    'connections_created': 0,
+    'connections_reused': 0,
+    'dns_cache_hits': 0,
+    'dns_resolutions': 0
+}
+
+
+async def _on_connection_create_end(session, context, params):
+    _metrics['connections_created'] += 1
+
+
+async def _on_connection_reuseconn(session, context, params):
+    _metrics['connections_reused'] += 1
+
+
+async def _on_dns_cache_hit(session, context, params):
+    _metrics['dns_cache_hits'] += 1
+
+
+async def _on_dns_resolvehost_end(session, context, params):
+    _metrics['dns_resolutions'] += 1
+
+
+def _create_trace_config() -> aiohttp.TraceConfig:
+    """Трассировка соединений для метрик пула"""
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_connection_create_end.append(_on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(_on_connection_reuseconn)
+    trace_config.on_dns_cache_hit.append(_on_dns_cache_hit)
+    trace_config.on_dns_resolvehost_end.append(_on_dns_resolvehost_end)
+    return trace_config
+
+
+def get_shared_session() -> aiohttp.ClientSession:
+    """
+    Получение общей HTTP сессии (создаётся при первом вызове)
+
+    Returns:
+        aiohttp.ClientSession: Сессия с настроенным коннектором
+    """
+    global _session
+
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=settings.web_api_pool_limit,
+            limit_per_host=settings.web_api_pool_limit_per_host,
+            keepalive_timeout=settings.web_api_keepalive_timeout,
+            ttl_dns_cache=settings.web_api_dns_cache_ttl,
+            use_dns_cache=True
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            trace_configs=[_create_trace_config()]
+        )
+        logger.info(
+            f"HTTP пул создан: limit={settings.web_api_pool_limit}, "
+            f"per_host={settings.web_api_pool_limit_per_host}, "
+            f"keepalive={settings.web_api_keepalive_timeout}s"
+        )
+
+    return _session
+
+
+async def close_shared_session():
+    """Закрытие общей HTTP сессии и всех соединений пула"""
+    global _session
+
+    if _session is not None and not _session.closed:
+        await _session.close()
+        logger.info("HTTP пул закрыт")
+    _session = None
+
+
+def get_pool_metrics() -> Dict[str, int]:
+    """
+    Метрики пула соединений
+
+    Returns:
+        Dict: Счётчики созданных/переиспользованных соединений и DNS кэша
+    """
+    return dict(_metrics)
+
+
+# Экспорт
+__all__ = ['get_shared_session', 'close_shared_session', 'get_pool_metrics']
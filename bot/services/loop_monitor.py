@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Замер задержки event loop бота
+Фоновая задача засыпает на фиксированный интервал и измеряет, насколько позже
+она проснулась - это время, на которое loop был занят блокирующим кодом
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """Фоновый замер задержки event loop"""
+
+    def __init__(self, interval: float = 0.5, warning_threshold: float = 0.2):
+        """
+        Args:
+            interval: Интервал замера (секунды)
+            warning_threshold: Задержка, после которой пишется предупреждение (секунды)
+        """
+        self.interval = interval
+        self.warning_threshold = warning_threshold
+        self._task: Optional[asyncio.Task] = None
+        self._started_at: Optional[float] = None
+        self._samples = 0
+        self._total_lag = 0.0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.max_lag_at: Optional[float] = None
+
+    def start(self):
+        """Запуск замера в текущем event loop"""
+        if self._task is None or self._task.done():
+            self._started_at = time.time()
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"⏱ Замер задержки event loop: каждые {self.interval} сек")
+
+    async def stop(self):
+        """Остановка замера"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(time.monotonic() - expected, 0.0)
+
+            self.last_lag = lag
+            self._samples += 1
+            self._total_lag += lag
+            if lag > self.max_lag:
+                self.max_lag = lag
+                self.max_lag_at = time.time()
+            if lag >= self.warning_threshold:
+                logger.warning(f"⚠️ Event loop был заблокирован {lag * 1000:.0f} мс")
+
+    def get_metrics(self) -> Dict:
+        """
+        Текущие метрики задержки
+
+        Returns:
+            Dict: last_ms, avg_ms, max_ms, max_at (unix time), samples, since (unix time)
+        """
+        return {
+            'last_ms': round(self.last_lag * 1000, 1),
+            'avg_ms': round(self._total_lag / self._samples * 1000, 1) if self._samples else 0.0,
+            'max_ms': round(self.max_lag * 1000, 1),
+            'max_at': self.max_lag_at,
+            'samples': self._samples,
+            'since': self._started_at
+        }
+
+
+_monitor: Optional[LoopLagMonitor] = None
+
+
+def set_loop_monitor(monitor: LoopLagMonitor):
+    """
+    Установка монитора для /health
+
+    Args:
+        monitor: Запущенный LoopLagMonitor
+    """
+    global _monitor
+    _monitor = monitor
+
+
+def get_loop_lag_metrics() -> Optional[Dict]:
+    """
+    Метрики задержки event loop или None, если замер не запущен
+
+    Returns:
+        Dict: Результат LoopLagMonitor.get_metrics()
+    """
+    return _monitor.get_metrics() if _monitor is not None else None
+
+
+# Экспорт
+__all__ = ['LoopLagMonitor', 'set_loop_monitor', 'get_loop_lag_metrics']
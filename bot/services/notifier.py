@@ -10,6 +10,7 @@ from typing import Dict, List
 from sqlalchemy.orm import Session
 from backend.database import SessionLocal
 from backend import models
+from bot.services.db_executor import run_db
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +39,7 @@ async def send_notification(bot, chat_id: int, message: str) -> bool:
 def log_notification(deadline_id: int, recipient_id: str, days: int, status: str, error: str = None):
     """
     Запись информации об отправке уведомления в базу данных
+    Синхронная - из корутин вызывается через run_db
     
     Args:
         deadline_id (int): ID дедлайна
@@ -84,7 +86,10 @@ async def process_deadline_notifications(bot, days: int) -> Dict:
     Returns:
         Dict: Статистика отправки уведомлений
     """
-    from bot.services.checker import get_expiring_deadlines, get_notification_recipients, check_notification_sent
+    from bot.services.checker import (
+        get_expiring_deadlines, get_notification_recipients, check_notification_sent, check_notification_sent_any
+    )
+    from bot.services.staff_notifications import KIND_DEADLINE, get_staff_recipients, send_staff_notification
     
     stats = {
         'sent': 0,
@@ -108,7 +113,7 @@ async def process_deadline_notifications(bot, days: int) -> Dict:
         # Для каждого дедлайна отправляем уведомления
         for deadline in deadlines:
             # Получаем список получателей
-            recipients = get_notification_recipients(deadline['deadline_id'])
+            recipients = await run_db(get_notification_recipients, deadline['deadline_id'])
             
             if not recipients:
                 logger.warning(f"Нет получателей для дедлайна {deadline['deadline_id']}")
@@ -122,8 +127,29 @@ async def process_deadline_notifications(bot, days: int) -> Dict:
             for recipient in recipients:
                 telegram_id = recipient['telegram_id']
                 
+                # Группа администраторов: отправка с переходом на личную доставку сотрудникам
+                if recipient['recipient_type'] == 'group':
+                    staff_ids = [telegram_id] + [staff['telegram_id'] for staff in get_staff_recipients()]
+                    if await run_db(check_notification_sent_any, deadline['deadline_id'], staff_ids):
+                        stats['skipped'] += 1
+                        logger.debug(f"Уведомление для дедлайна {deadline['deadline_id']} сотрудникам уже было отправлено")
+                        continue
+                    
+                    for delivery in await send_staff_notification(bot, KIND_DEADLINE, message):
+                        stats['sent' if delivery['status'] == 'sent' else 'failed'] += 1
+                        stats['total_notifications'] += 1
+                        await run_db(
+                            log_notification,
+                            deadline_id=deadline['deadline_id'],
+                            recipient_id=delivery['telegram_id'],
+                            days=days,
+                            status=delivery['status'],
+                            error=delivery['error']
+                        )
+                    continue
+                
                 # Проверяем, было ли уже отправлено уведомление
-                if check_notification_sent(deadline['deadline_id'], days, telegram_id):
+                if await run_db(check_notification_sent, deadline['deadline_id'], days, telegram_id):
                     stats['skipped'] += 1
                     logger.debug(f"Уведомление для дедлайна {deadline['deadline_id']} получателю {telegram_id} уже было отправлено")
                     continue
@@ -142,7 +168,8 @@ async def process_deadline_notifications(bot, days: int) -> Dict:
                         error_msg = 'Failed to send message'
                         
                     # Записываем лог
-                    log_notification(
+                    await run_db(
+                        log_notification,
                         deadline_id=deadline['deadline_id'],
                         recipient_id=telegram_id,
                         days=days,
@@ -155,7 +182,8 @@ async def process_deadline_notifications(bot, days: int) -> Dict:
                 except ValueError as e:
                     logger.error(f"Некорректный Telegram ID {telegram_id}: {e}")
                     stats['failed'] += 1
-                    log_notification(
+                    await run_db(
+                        log_notification,
                         deadline_id=deadline['deadline_id'],
                         recipient_id=telegram_id,
                         days=days,
@@ -165,7 +193,8 @@ async def process_deadline_notifications(bot, days: int) -> Dict:
                 except Exception as e:
                     logger.error(f"Ошибка отправки уведомления получателю {telegram_id}: {e}")
                     stats['failed'] += 1
-                    log_notification(
+                    await run_db(
+                        log_notification,
                         deadline_id=deadline['deadline_id'],
                         recipient_id=telegram_id,
                         days=days,
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+Постраничный вывод списков дедлайнов в Telegram
+Курсор страницы кодируется в callback_data кнопок ◀️/▶️, при листании
+загружается только нужная страница и сообщение редактируется на месте
+"""
+
+import logging
+from datetime import date, timedelta
+from typing import Optional, Tuple
+
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+
+from backend.config import settings
+from bot.services import checker
+from bot.services.formatter import format_deadline_page
+from bot.services.render_cache import RenderCache
+
+logger = logging.getLogger(__name__)
+
+# Дедлайнов на одной странице (≈15 строк на дедлайн, укладывается в лимит 4096 символов;
+# длинные примечания и адреса format_deadline_page сокращает)
+DEADLINES_PAGE_SIZE = 5
+
+# Готовые страницы списков клиента (ключ - callback_data курсора)
+_render_cache = RenderCache(max_clients=settings.bot_render_cache_max_clients)
+
+# Префикс callback_data кнопок пагинации
+CALLBACK_PREFIX = 'dlp'
+
+# callback_data кнопки-счётчика страниц (ничего не делает)
+NOOP_CALLBACK = f'{CALLBACK_PREFIX}:noop'
+
+# Виды списков: код -> описание
+VIEW_LIST = 'l'      # /list - 30 дней
+VIEW_TODAY = 't'     # /today
+VIEW_WEEK = 'w'      # /week
+VIEW_NEXT = 'n'      # /next <дни>
+VIEW_FILTER = 'f'    # /filter
+VIEW_MY = 'm'        # Кнопка "Мои дедлайны"
+
+
+class DeadlinePageCursor:
+    """
+    Компактный курсор страницы списка дедлайнов
+
+    Формат callback_data: dlp:<вид>:<дни>:<client_id>:<страница>
+    (client_id = 0 - без фильтра по клиенту), укладывается в лимит 64 байта
+    """
+
+    __slots__ = ('view', 'days', 'client_id', 'page')
+
+    def __init__(self, view: str, days: int = 0, client_id: Optional[int] = None, page: int = 1):
+        self.view = view
+        self.days = days
+        self.client_id = client_id
+        self.page = page
+
+    def pack(self, page: Optional[int] = None) -> str:
+        """
+        Кодирование курсора в callback_data
+
+        Args:
+            page: Номер страницы (по умолчанию текущая)
+
+        Returns:
+            str: Строка callback_data
+        """
+        return f"{CALLBACK_PREFIX}:{self.view}:{self.days}:{self.client_id or 0}:{page or self.page}"
+
+    @classmethod
+    def unpack(cls, data: str) -> 'DeadlinePageCursor':
+        """
+        Декодирование курсора из callback_data
+
+        Args:
+            data: Строка callback_data
+
+        Returns:
+            DeadlinePageCursor
+
+        Raises:
+            ValueError: Неверный формат
+        """
+        prefix, view, days, client_id, page = data.split(':')
+        if prefix != CALLBACK_PREFIX:
+            raise ValueError(f"Неверный префикс курсора: {data}")
+        return cls(view, int(days), int(client_id) or None, max(int(page), 1))
+
+    def date_range(self) -> Tuple[Optional[date], Optional[date]]:
+        """
+        Диапазон дат истечения для вида списка
+
+        Returns:
+            Tuple: (date_from, date_to), None - без ограничения
+        """
+        today = date.today()
+        if self.view == VIEW_TODAY:
+            return today, today
+        if self.view in (VIEW_LIST, VIEW_WEEK, VIEW_NEXT):
+            # Как и /api/deadlines/expiring-soon - включая просроченные
+            return None, today + timedelta(days=self.days)
+        return None, None
+
+    def title(self, result: dict) -> str:
+        """Заголовок списка для вида"""
+        if self.view == VIEW_LIST:
+            return "📋 Ваши дедлайны (30 дней)" if self.client_id else "📋 Все дедлайны (30 дней)"
+        if self.view == VIEW_TODAY:
+            return "📅 Дедлайны на сегодня"
+        if self.view == VIEW_WEEK:
+            return "📆 Дедлайны на неделю"
+        if self.view == VIEW_NEXT:
+            return f"🔮 Дедлайны на {self.days} дней"
+        if self.view == VIEW_MY:
+            return f"📄 Ваши текущие дедлайны ({result['total']})"
+        if self.client_id and result['deadlines']:
+            return f"🔍 Дедлайны клиента: {result['deadlines'][0]['client_name']}"
+        return "🔍 Все активные дедлайны"
+
+    def empty_text(self) -> str:
+        """Текст для пустого списка"""
+        if self.view == VIEW_LIST:
+            return "✅ Нет дедлайнов на ближайшие 30 дней"
+        if self.view == VIEW_TODAY:
+            return "🎉 На сегодня нет дедлайнов!"
+        if self.view == VIEW_WEEK:
+            return "🎉 На этой неделе нет дедлайнов!"
+        if self.view == VIEW_NEXT:
+            return f"✅ Нет дедлайнов на ближайшие {self.days} дней"
+        if self.view == VIEW_MY:
+            return "✅ <b>У вас нет активных дедлайнов!</b>\n\nВсе ваши услуги актуальны."
+        return "📭 <b>Дедлайны не найдены</b>"
+
+
+def build_pagination_keyboard(cursor: DeadlinePageCursor, total_pages: int) -> Optional[InlineKeyboardMarkup]:
+    """
+    Клавиатура навигации по страницам
+
+    Args:
+        cursor: Курсор текущей страницы
+        total_pages: Всего страниц
+
+    Returns:
+        InlineKeyboardMarkup или None, если страница одна
+    """
+    if total_pages <= 1:
+        return None
+
+    buttons = []
+    if cursor.page > 1:
+        buttons.append(InlineKeyboardButton(text="◀️", callback_data=cursor.pack(cursor.page - 1)))
+    buttons.append(InlineKeyboardButton(text=f"{cursor.page}/{total_pages}", callback_data=NOOP_CALLBACK))
+    if cursor.page < total_pages:
+        buttons.append(InlineKeyboardButton(text="▶️", callback_data=cursor.pack(cursor.page + 1)))
+
+    return InlineKeyboardMarkup(inline_keyboard=[buttons])
+
+
+async def render_deadlines_page(cursor: DeadlinePageCursor) -> Tuple[str, Optional[InlineKeyboardMarkup], int]:
+    """
+    Загрузка и форматирование страницы списка дедлайнов
+
+    Страницы списков одного клиента берутся из кэша, пока не изменилась
+    версия данных клиента (дедлайны, кассы, профиль) и дата.
+
+    Args:
+        cursor: Курсор страницы
+
+    Returns:
+        Tuple: (текст сообщения, клавиатура, всего дедлайнов)
+    """
+    if not cursor.client_id:
+        return await _render_page(cursor)
+
+    version = await checker.get_client_data_version(cursor.client_id)
+    key = cursor.pack()
+    rendered = _render_cache.get(cursor.client_id, version, key)
+    if rendered is None:
+        rendered = await _render_page(cursor)
+        _render_cache.put(cursor.client_id, version, key, rendered)
+    return rendered
+
+
+def get_render_cache_metrics() -> dict:
+    """
+    Метрики кэша готовых страниц
+
+    Returns:
+        dict: clients, hits, misses
+    """
+    return _render_cache.get_metrics()
+
+
+async def _render_page(cursor: DeadlinePageCursor) -> Tuple[str, Optional[InlineKeyboardMarkup], int]:
+    date_from, date_to = cursor.date_range()
+    result = await checker.get_deadlines_page(
+        page=cursor.page,
+        page_size=DEADLINES_PAGE_SIZE,
+        client_id=cursor.client_id,
+        date_from=date_from,
+        date_to=date_to
+    )
+
+    if result['total'] == 0:
+        return cursor.empty_text(), None, 0
+
+    # Страница могла исчезнуть, пока пользователь листал (дедлайны закрыты)
+    if cursor.page > result['total_pages']:
+        cursor.page = result['total_pages']
+        return await _render_page(cursor)
+
+    text = format_deadline_page(
+        result['deadlines'],
+        title=cursor.title(result),
+        page=cursor.page,
+        total_pages=result['total_pages'],
+        total=result['total'],
+        status_counts=result['status_counts'],
+        offset=(cursor.page - 1) * DEADLINES_PAGE_SIZE
+    )
+    return text, build_pagination_keyboard(cursor, result['total_pages']), result['total']
+
+
+# Экспорт
+__all__ = [
+    'DeadlinePageCursor',
+    'DEADLINES_PAGE_SIZE',
+    'CALLBACK_PREFIX',
+    'NOOP_CALLBACK',
+    'VIEW_LIST',
+    'VIEW_TODAY',
+    'VIEW_WEEK',
+    'VIEW_NEXT',
+    'VIEW_FILTER',
+    'VIEW_MY',
+    'build_pagination_keyboard',
+    'render_deadlines_page',
+    'get_render_cache_metrics'
+]
@@ -0,0 +1,455 @@
+# -*- coding: utf-8 -*-
+"""
+Локальная копия активных дедлайнов в памяти бота
+Команды чтения (/list, /today, /week, /next, "Мои дедлайны", /filter, /search)
+отвечают из памяти; копия догоняет Web API по дельтам updated_at каждые
+несколько секунд и полностью перезагружается при старте или расхождении версии
+"""
+
+import asyncio
+import logging
+import math
+import time
+from bisect import bisect_left, insort
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from bot.services.client_index import ClientSearchIndex
+from bot.services.exceptions import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+# Перекрытие окна дельты: строки, закоммиченные чуть позже своего updated_at, не теряются
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+class DeadlineRecord:
+    """Активный дедлайн"""
+
+    __slots__ = ('id', 'client_id', 'type_id', 'cash_register_id', 'expiration_date')
+
+    def __init__(self, id: int, client_id: int, type_id: Optional[int], cash_register_id: Optional[int], expiration_date: date):
+        self.id = id
+        self.client_id = client_id
+        self.type_id = type_id
+        self.cash_register_id = cash_register_id
+        self.expiration_date = expiration_date
+
+    @property
+    def key(self) -> Tuple[date, int]:
+        """Ключ сортировки индексов: дата истечения, затем ID"""
+        return self.expiration_date, self.id
+
+
+class ClientRecord:
+    """Клиент"""
+
+    __slots__ = ('id', 'company_name', 'full_name', 'inn', 'email', 'phone', 'telegram_id', 'is_active')
+
+    def __init__(self, id, company_name, full_name, inn, email, phone, telegram_id, is_active):
+        self.id = id
+        self.company_name = company_name
+        self.full_name = full_name
+        self.inn = inn
+        self.email = email
+        self.phone = phone
+        self.telegram_id = telegram_id
+        self.is_active = is_active
+
+
+class CashRegisterRecord:
+    """Касса (ККТ), к которой привязан дедлайн"""
+
+    __slots__ = ('id', 'model', 'serial', 'name', 'address', 'client_id')
+
+    def __init__(self, id, model, serial, name, address, client_id):
+        self.id = id
+        self.model = model
+        self.serial = serial
+        self.name = name
+        self.address = address
+        self.client_id = client_id
+
+
+def _same(old, new) -> bool:
+    """Совпадают ли все поля двух записей (повторы из окна перекрытия дельты)"""
+    return old is not None and all(getattr(old, slot) == getattr(new, slot) for slot in new.__slots__)
+
+
+class DeadlineReplica:
+    """
+    Модель чтения: словари записей и отсортированные по дате индексы
+
+    _index - все активные дедлайны, _by_client - по клиентам; элементы
+    (expiration_date, id), поиск диапазона дат и счётчики срочности - bisect.
+    _client_versions - счётчик изменений данных клиента (ключ кэша сообщений),
+    search_index - индекс клиентов для inline-поиска
+    """
+
+    def __init__(self):
+        self.deadlines: Dict[int, DeadlineRecord] = {}
+        self.clients: Dict[int, ClientRecord] = {}
+        self.cash_registers: Dict[int, CashRegisterRecord] = {}
+        self.types: Dict[int, str] = {}
+        self._index: List[Tuple[date, int]] = []
+        self._by_client: Dict[int, List[Tuple[date, int]]] = {}
+        self._id_sum = 0
+        self._client_versions: Dict[int, int] = {}
+        self._generation = 0
+        self.search_index = ClientSearchIndex()
+
+        self.ready = False
+        self.server_time: Optional[datetime] = None
+        self.synced_at: Optional[float] = None
+        self._metrics = {
+            'full_syncs': 0,
+            'delta_syncs': 0,
+            'version_mismatches': 0,
+            'errors': 0,
+            'last_delta_rows': 0,
+            'last_sync_ms': 0
+        }
+
+    # ----------------------------------------
+    # Применение выгрузок
+    # ----------------------------------------
+
+    def _touch(self, client_id: Optional[int]):
+        if client_id is not None:
+            self._client_versions[client_id] = self._client_versions.get(client_id, 0) + 1
+
+    def _reference_rows(self, payload: Dict):
+        for row in payload.get('clients', []):
+            record = ClientRecord(*row)
+            if not _same(self.clients.get(record.id), record):
+                self.clients[record.id] = record
+                self.search_index.upsert(record.id, record.company_name, record.inn, record.is_active)
+                self._touch(record.id)
+        for row in payload.get('cash_registers', []):
+            record = CashRegisterRecord(*row)
+            if not _same(self.cash_registers.get(record.id), record):
+                self.cash_registers[record.id] = record
+                self._touch(record.client_id)
+        if 'deadline_types' in payload:
+            types = {type_id: name for type_id, name in payload['deadline_types']}
+            if types != self.types:
+                # Переименование типа затрагивает всех клиентов
+                self.types = types
+                self._generation += 1
+
+    def _remove(self, deadline_id: int):
+        record = self.deadlines.pop(deadline_id, None)
+        if record is None:
+            return
+        key = record.key
+        del self._index[bisect_left(self._index, key)]
+        client_index = self._by_client[record.client_id]
+        del client_index[bisect_left(client_index, key)]
+        if not client_index:
+            del self._by_client[record.client_id]
+        self._id_sum -= deadline_id
+        self._touch(record.client_id)
+
+    def _upsert(self, record: DeadlineRecord):
+        if _same(self.deadlines.get(record.id), record):
+            return
+        self._remove(record.id)
+        self.deadlines[record.id] = record
+        insort(self._index, record.key)
+        insort(self._by_client.setdefault(record.client_id, []), record.key)
+        self._id_sum += record.id
+        self._touch(record.client_id)
+
+    def load_full(self, payload: Dict):
+        """
+        Полная перезагрузка копии
+
+        Args:
+            payload: Ответ /api/deadlines/changes без since
+        """
+        self.deadlines = {}
+        self.clients = {}
+        self.cash_registers = {}
+        self._client_versions = {}
+        self._generation += 1
+        self.search_index.clear()
+        self._reference_rows(payload)
+
+        by_client: Dict[int, List[Tuple[date, int]]] = {}
+        for deadline_id, client_id, type_id, register_id, expiration, status in payload['deadlines']:
+            record = DeadlineRecord(deadline_id, client_id, type_id, register_id, date.fromisoformat(expiration))
+            self.deadlines[deadline_id] = record
+            by_client.setdefault(client_id, []).append(record.key)
+
+        # Сортировка один раз вместо вставок по одной
+        self._index = sorted(record.key for record in self.deadlines.values())
+        for keys in by_client.values():
+            keys.sort()
+        self._by_client = by_client
+        self._id_sum = sum(self.deadlines)
+
+        self._mark_synced(payload)
+        self.ready = True
+        self._metrics['full_syncs'] += 1
+        logger.info(
+            f"📦 Локальная копия загружена: {len(self.deadlines)} дедлайнов, "
+            f"{len(self.clients)} клиентов"
+        )
+
+    def apply_delta(self, payload: Dict) -> bool:
+        """
+        Применение изменений
+
+        Args:
+            payload: Ответ /api/deadlines/changes?since=...
+
+        Returns:
+            bool: False - версия не совпала, нужна полная перезагрузка
+        """
+        self._reference_rows(payload)
+        for deadline_id, client_id, type_id, register_id, expiration, status in payload['deadlines']:
+            if status == 'active':
+                self._upsert(DeadlineRecord(deadline_id, client_id, type_id, register_id, date.fromisoformat(expiration)))
+            else:
+                self._remove(deadline_id)
+
+        self._metrics['delta_syncs'] += 1
+        self._metrics['last_delta_rows'] = len(payload['deadlines'])
+
+        version = payload['version']
+        if len(self.deadlines) != version['active_count'] or self._id_sum != version['id_sum']:
+            self._metrics['version_mismatches'] += 1
+            return False
+
+        self._mark_synced(payload)
+        return True
+
+    def _mark_synced(self, payload: Dict):
+        self.server_time = datetime.fromisoformat(payload['server_time'])
+        self.synced_at = time.monotonic()
+
+    def delta_since(self) -> Optional[str]:
+        """Параметр since для следующей дельты"""
+        if self.server_time is None:
+            return None
+        return (self.server_time - SYNC_OVERLAP).isoformat()
+
+    def lag(self) -> Optional[float]:
+        """Секунд с последней успешной синхронизации"""
+        if self.synced_at is None:
+            return None
+        return time.monotonic() - self.synced_at
+
+    def is_fresh(self, max_lag: float) -> bool:
+        """Можно ли отвечать из копии"""
+        lag = self.lag()
+        return self.ready and lag is not None and lag <= max_lag
+
+    # ----------------------------------------
+    # Чтение
+    # ----------------------------------------
+
+    def _deadline_info(self, record: DeadlineRecord, today: date) -> Dict:
+        """Словарь дедлайна в формате checker.get_deadlines_page"""
+        from bot.services.checker import get_deadline_status
+
+        client = self.clients.get(record.client_id)
+        days_remaining = (record.expiration_date - today).days
+        info = {
+            'deadline_id': record.id,
+            'client_id': record.client_id,
+            'client_name': (client and (client.company_name or client.full_name)) or 'Неизвестно',
+            'client_inn': (client and client.inn) or 'Не указано',
+            'deadline_type_name': self.types.get(record.type_id) or 'Неизвестно',
+            'expiration_date': record.expiration_date,
+            'days_remaining': days_remaining,
+            'status': get_deadline_status(days_remaining)
+        }
+
+        register = self.cash_registers.get(record.cash_register_id) if record.cash_register_id else None
+        if register and (register.model or register.serial):
+            info['cash_register_model'] = register.model or 'Не указана'
+            info['cash_register_serial'] = register.serial or 'Не указан'
+            info['cash_register_name'] = register.name or register.model or 'ККТ'
+            info['installation_address'] = register.address
+
+        return info
+
+    def page(
+        self,
+        page: int,
+        page_size: int,
+        client_id: Optional[int] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None
+    ) -> Dict:
+        """
+        Страница активных дедлайнов и сводка по всей выборке
+
+        Args:
+            page: Номер страницы (с 1)
+            page_size: Размер страницы
+            client_id: Фильтр по клиенту
+            date_from: Дата истечения от
+            date_to: Дата истечения до
+
+        Returns:
+            Dict: deadlines, total, page, total_pages, status_counts
+        """
+        index = self._by_client.get(client_id, []) if client_id else self._index
+        lo = bisect_left(index, (date_from,)) if date_from else 0
+        hi = bisect_left(index, (date_to + timedelta(days=1),)) if date_to else len(index)
+        hi = max(hi, lo)
+
+        # Границы срочности внутри [lo, hi): expired < 0 <= red < 7 <= yellow < 14 <= green
+        today = date.today()
+        bounds = [
+            min(max(bisect_left(index, (today + timedelta(days=days),)), lo), hi)
+            for days in (0, 7, 14)
+        ]
+
+        start = lo + (page - 1) * page_size
+        keys = index[start:min(start + page_size, hi)]
+
+        total = hi - lo
+        return {
+            'deadlines': [self._deadline_info(self.deadlines[deadline_id], today) for _, deadline_id in keys],
+            'total': total,
+            'page': page,
+            'total_pages': math.ceil(total / page_size) if total > 0 else 1,
+            'status_counts': {
+                'expired': bounds[0] - lo,
+                'red': bounds[1] - bounds[0],
+                'yellow': bounds[2] - bounds[1],
+                'green': hi - bounds[2]
+            }
+        }
+
+    def search_clients(self, query: str) -> List[ClientRecord]:
+        """
+        Поиск активных клиентов по части названия или ИНН
+
+        Args:
+            query: Строка поиска
+
+        Returns:
+            List[ClientRecord]: Найденные клиенты по возрастанию ID
+        """
+        needle = query.casefold()
+        return sorted(
+            (
+                client for client in self.clients.values()
+                if client.is_active and (
+                    needle in (client.company_name or '').casefold()
+                    or needle in (client.inn or '')
+                )
+            ),
+            key=lambda client: client.id
+        )
+
+    def client_deadlines(self, client_id: int) -> List[Dict]:
+        """Все активные дедлайны клиента по дате истечения"""
+        today = date.today()
+        return [
+            self._deadline_info(self.deadlines[deadline_id], today)
+            for _, deadline_id in self._by_client.get(client_id, [])
+        ]
+
+    def client_version(self, client_id: int) -> Tuple[int, int]:
+        """
+        Версия данных клиента: меняется при изменении его дедлайнов, касс,
+        профиля, справочника типов и после полной перезагрузки
+
+        Args:
+            client_id: ID клиента
+
+        Returns:
+            Tuple: (поколение копии, счётчик изменений клиента)
+        """
+        return self._generation, self._client_versions.get(client_id, 0)
+
+    def get_metrics(self) -> Dict:
+        """
+        Метрики копии
+
+        Returns:
+            Dict: ready, lag (сек), deadlines, clients, счётчики синхронизаций
+        """
+        lag = self.lag()
+        return {
+            'ready': self.ready,
+            'lag': round(lag, 1) if lag is not None else None,
+            'deadlines': len(self.deadlines),
+            'clients': len(self.clients),
+            **self._metrics
+        }
+
+
+class ReplicaSyncer:
+    """Фоновая синхронизация копии с Web API"""
+
+    def __init__(self, api_client, replica: DeadlineReplica, interval: float = 5.0):
+        """
+        Args:
+            api_client: WebAPIClient
+            replica: Заполняемая копия
+            interval: Интервал запроса дельты (секунды)
+        """
+        self.api_client = api_client
+        self.replica = replica
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Запуск синхронизации (первая - полная выгрузка)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            logger.info(f"🔄 Синхронизация локальной копии: каждые {self.interval} сек")
+
+    async def stop(self):
+        """Остановка синхронизации"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except CircuitOpenError:
+                logger.debug("Circuit breaker открыт, синхронизация копии пропущена")
+            except Exception as e:
+                self.replica._metrics['errors'] += 1
+                logger.warning(f"⚠️ Ошибка синхронизации локальной копии: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def sync(self):
+        """Одна синхронизация: дельта или полная выгрузка"""
+        started = time.monotonic()
+
+        if self.replica.ready:
+            payload = await self.api_client.get_deadline_changes(since=self.replica.delta_since())
+            if self.replica.apply_delta(payload):
+                self.replica._metrics['last_sync_ms'] = int((time.monotonic() - started) * 1000)
+                return
+            logger.info("🔄 Версия локальной копии разошлась с API, полная перезагрузка")
+
+        payload = await self.api_client.get_deadline_changes()
+        self.replica.load_full(payload)
+        self.replica._metrics['last_sync_ms'] = int((time.monotonic() - started) * 1000)
+
+
+# Экспорт
+__all__ = [
+    'DeadlineRecord',
+    'ClientRecord',
+    'CashRegisterRecord',
+    'DeadlineReplica',
+    'ReplicaSyncer'
+]
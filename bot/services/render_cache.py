@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Кэш готовых сообщений со списками дедлайнов клиента
+Запись клиента привязана к версии его данных и к дате: пока дедлайны, кассы
+и профиль клиента не менялись, повторное нажатие "Мои дедлайны" отдаёт
+уже отформатированный HTML без запросов страницы и форматирования
+"""
+
+import logging
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+class RenderCache:
+    """LRU кэш сообщений по клиентам: client_id -> ((версия, дата), {ключ: значение})"""
+
+    def __init__(self, max_clients: int = 1000):
+        """
+        Args:
+            max_clients: Сколько клиентов хранить (вытесняются давно не запрошенные)
+        """
+        self.max_clients = max_clients
+        self._entries: 'OrderedDict[int, Tuple[Tuple, Dict[Hashable, Any]]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, client_id: int, version: Hashable, key: Hashable) -> Optional[Any]:
+        """
+        Готовое сообщение, если версия данных клиента и дата не изменились
+
+        Args:
+            client_id: ID клиента
+            version: Версия данных клиента
+            key: Ключ сообщения (вид списка, страница)
+
+        Returns:
+            Сохранённое значение или None
+        """
+        entry = self._entries.get(client_id)
+        value = entry[1].get(key) if entry is not None and entry[0] == (version, date.today()) else None
+
+        if value is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(client_id)
+        self.hits += 1
+        return value
+
+    def put(self, client_id: int, version: Hashable, key: Hashable, value: Any):
+        """
+        Сохранение сообщения; записи клиента с прежней версией удаляются
+
+        Args:
+            client_id: ID клиента
+            version: Версия данных клиента
+            key: Ключ сообщения
+            value: Готовое сообщение
+        """
+        stamp = (version, date.today())
+        entry = self._entries.get(client_id)
+        if entry is None or entry[0] != stamp:
+            entry = (stamp, {})
+            self._entries[client_id] = entry
+
+        entry[1][key] = value
+        self._entries.move_to_end(client_id)
+
+        while len(self._entries) > self.max_clients:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, client_id: int):
+        """Удаление всех сообщений клиента"""
+        self._entries.pop(client_id, None)
+
+    def get_metrics(self) -> Dict[str, int]:
+        """
+        Метрики кэша
+
+        Returns:
+            Dict: clients, hits, misses
+        """
+        return {'clients': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+def client_data_version(db: Session, client_id: int) -> Tuple:
+    """
+    Версия данных клиента одним запросом к БД
+
+    Меняется при изменении профиля клиента, его касс и активных дедлайнов
+    (в том числе удалении - по количеству и сумме ID).
+    Используются модели веб-приложения (дедлайны привязаны через client_id).
+
+    Args:
+        db: Сессия базы данных
+        client_id: ID клиента
+
+    Returns:
+        Tuple: Значения, сравниваемые целиком
+    """
+    from web.app.models.user import User
+    from web.app.models.client import Deadline
+    from web.app.models.cash_register import CashRegister
+
+    active = (Deadline.client_id == client_id, Deadline.status == 'active')
+    registers = CashRegister.client_id == client_id
+
+    row = db.query(
+        select(User.updated_at).where(User.id == client_id).scalar_subquery(),
+        select(func.count(Deadline.id)).where(*active).scalar_subquery(),
+        select(func.sum(Deadline.id)).where(*active).scalar_subquery(),
+        select(func.max(Deadline.updated_at)).where(*active).scalar_subquery(),
+        select(func.count(CashRegister.id)).where(registers).scalar_subquery(),
+        select(func.max(CashRegister.updated_at)).where(registers).scalar_subquery()
+    ).one()
+
+    return tuple(row)
+
+
+# Экспорт
+__all__ = ['RenderCache', 'client_data_version']
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Маршрутизация уведомлений для сотрудников (администраторов и менеджеров)
+Уведомление отправляется один раз в группу администраторов (ADMIN_GROUP_CHAT_ID),
+при необходимости с упоминанием менеджеров. Лично каждому сотруднику - только
+если так настроено для вида уведомления или отправка в группу не удалась
+"""
+
+import html
+import logging
+from typing import Dict, List, Tuple
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Виды уведомлений для сотрудников
+KIND_DEADLINE = 'deadline'
+KIND_DAILY_SUMMARY = 'daily_summary'
+KIND_SUPPORT_REQUEST = 'support_request'
+
+# Стратегии доставки
+STRATEGY_GROUP = 'group'
+STRATEGY_GROUP_MENTION = 'group_mention'
+STRATEGY_INDIVIDUAL = 'individual'
+
+STRATEGIES = (STRATEGY_GROUP, STRATEGY_GROUP_MENTION, STRATEGY_INDIVIDUAL)
+
+
+def get_group_chat_id() -> str:
+    """Chat ID группы администраторов (пустая строка - не настроена)"""
+    return (settings.admin_group_chat_id or '').strip()
+
+
+def get_staff_strategy(kind: str) -> str:
+    """
+    Стратегия доставки для вида уведомления
+
+    Без настроенной группы всегда individual.
+
+    Args:
+        kind: Вид уведомления (deadline, daily_summary, support_request)
+
+    Returns:
+        str: group, group_mention или individual
+    """
+    strategy = settings.staff_notification_routing_dict.get(kind, STRATEGY_GROUP)
+    if strategy not in STRATEGIES:
+        logger.warning(f"⚠️ Неизвестная стратегия '{strategy}' для уведомлений '{kind}', используется group")
+        strategy = STRATEGY_GROUP
+    if strategy != STRATEGY_INDIVIDUAL and not get_group_chat_id():
+        return STRATEGY_INDIVIDUAL
+    return strategy
+
+
+def get_staff_recipients() -> List[Dict]:
+    """
+    Сотрудники для личной доставки: администраторы (если включены
+    NOTIFICATION_INCLUDE_ADMINS) и менеджеры, без повторов
+
+    Returns:
+        List[Dict]: telegram_id, recipient_type, user_id - как в checker.get_notification_recipients
+    """
+    recipients = []
+    seen = set()
+    staff: List[Tuple[int, str]] = []
+    if settings.notification_include_admins:
+        staff.extend((admin_id, 'admin') for admin_id in settings.telegram_admin_ids_list)
+    staff.extend((manager_id, 'manager') for manager_id in settings.telegram_manager_ids_list)
+
+    for telegram_id, recipient_type in staff:
+        if telegram_id in seen:
+            continue
+        seen.add(telegram_id)
+        recipients.append({'telegram_id': str(telegram_id), 'recipient_type': recipient_type, 'user_id': None})
+    return recipients
+
+
+def format_staff_mentions() -> str:
+    """
+    Строка упоминаний из STAFF_GROUP_MENTIONS ("telegram_id:Имя,...")
+
+    Упоминание по ID (tg://user) работает и без username в Telegram.
+
+    Returns:
+        str: HTML строка или пустая строка
+    """
+    mentions = []
+    for telegram_id, name in settings.staff_group_mentions_dict.items():
+        mentions.append(f'<a href="tg://user?id={telegram_id}">{html.escape(name or str(telegram_id))}</a>')
+    return "👥 " + ", ".join(mentions) if mentions else ""
+
+
+async def send_staff_notification(bot, kind: str, text: str) -> List[Dict]:
+    """
+    Доставка уведомления сотрудникам по стратегии вида уведомления
+
+    Args:
+        bot: Экземпляр Telegram бота
+        kind: Вид уведомления
+        text: Текст сообщения (HTML)
+
+    Returns:
+        List[Dict]: Результаты по чатам: telegram_id, recipient_type, status (sent/failed), error
+    """
+    strategy = get_staff_strategy(kind)
+
+    if strategy != STRATEGY_INDIVIDUAL:
+        group_chat_id = get_group_chat_id()
+        message = text
+        mentions = format_staff_mentions() if strategy == STRATEGY_GROUP_MENTION else ""
+        if mentions:
+            message = f"{text}\n\n{mentions}"
+        try:
+            await bot.send_message(chat_id=group_chat_id, text=message, parse_mode='HTML')
+            logger.info(f"✅ Уведомление '{kind}' отправлено в группу администраторов ({group_chat_id})")
+            return [{'telegram_id': group_chat_id, 'recipient_type': 'group', 'status': 'sent', 'error': None}]
+        except Exception as e:
+            logger.error(f"❌ Ошибка отправки '{kind}' в группу администраторов ({group_chat_id}): {e}")
+            logger.warning("⚠️ Переключаемся на индивидуальную отправку сотрудникам")
+
+    results = []
+    for recipient in get_staff_recipients():
+        try:
+            await bot.send_message(chat_id=int(recipient['telegram_id']), text=text, parse_mode='HTML')
+            results.append({**recipient, 'status': 'sent', 'error': None})
+        except Exception as e:
+            logger.error(f"❌ Ошибка отправки '{kind}' сотруднику {recipient['telegram_id']}: {e}")
+            results.append({**recipient, 'status': 'failed', 'error': str(e)})
+
+    sent = sum(1 for result in results if result['status'] == 'sent')
+    logger.info(f"📨 Уведомление '{kind}' отправлено лично: {sent}/{len(results)} сотрудникам")
+    return results
+
+
+# Экспорт
+__all__ = [
+    'KIND_DEADLINE',
+    'KIND_DAILY_SUMMARY',
+    'KIND_SUPPORT_REQUEST',
+    'STRATEGY_GROUP',
+    'STRATEGY_GROUP_MENTION',
+    'STRATEGY_INDIVIDUAL',
+    'get_group_chat_id',
+    'get_staff_strategy',
+    'get_staff_recipients',
+    'format_staff_mentions',
+    'send_staff_notification'
+]
@@ -10,6 +10,7 @@ import logging
 from datetime import datetime, timedelta
 from typing import Optional
 from .exceptions import TokenRefreshError
+from .http_pool import get_shared_session
 
 logger = logging.getLogger(__name__)
 
@@ -103,49 +104,55 @@ class TokenManager:
         login_url = f"{self.api_base_url}/api/auth/login"
         
         try:
-            async with aiohttp.ClientSession() as session:
-                # Отправляем запрос на авторизацию
-                async with session.post(
-                    login_url,
-                    json={
-                        "username": self.username,
-                        "password": self.password
-                    },
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as response:
+            # Используем общий пул соединений (keep-alive с Web API)
+            session = get_shared_session()
+            
+            # Отправляем запрос на авторизацию
+            async with session.post(
+                login_url,
+                json={
+                    "username": self.username,
+                    "password": self.password
+                },
+                timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                
+                if response.status == 200:
+                    data = await response.json()
+                    self._token = data.get('access_token')
                     
-                    if response.status == 200:
-                        data = await response.json()
-                        self._token = data.get('access_token')
-                        
-                        if not self._token:
-                            raise TokenRefreshError("Токен отсутствует в ответе API")
-                        
-                        # Устанавливаем время истечения
-                        self._token_expires_at = datetime.now() + timedelta(
-                            seconds=self.refresh_interval
-                        )
-                        
-                        logger.info(
-                            f"✅ Токен успешно обновлён. "
-                            f"Истекает в {self._token_expires_at.strftime('%H:%M:%S')}"
-                        )
+                    if not self._token:
+                        raise TokenRefreshError("Токен отсутствует в ответе API")
                     
-                    elif response.status == 401:
-                        error_text = await response.text()
-                        raise TokenRefreshError(
-                            f"Неверные учётные данные бота: {error_text}"
-                        )
+                    # Устанавливаем время истечения
+                    self._token_expires_at = datetime.now() + timedelta(
+                        seconds=self.refresh_interval
+                    )
                     
-                    else:
-                        error_text = await response.text()
-                        raise TokenRefreshError(
-                            f"HTTP {response.status}: {error_text}"
-                        )
+                    logger.info(
+                        f"✅ Токен успешно обновлён. "
+                        f"Истекает в {self._token_expires_at.strftime('%H:%M:%S')}"
+                    )
+                
+                elif response.status == 401:
+                    error_text = await response.text()
+                    raise TokenRefreshError(
+                        f"Неверные учётные данные бота: {error_text}"
+                    )
+                
+                else:
+                    error_text = await response.text()
+                    raise TokenRefreshError(
+                        f"HTTP {response.status}: {error_text}",
+                        unavailable=response.status >= 500
+                    )
+        
+        except TokenRefreshError:
+            raise
         
-        except aiohttp.ClientError as e:
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             logger.error(f"Ошибка подключения к API: {e}")
-            raise TokenRefreshError(f"Не удалось подключиться к {login_url}: {e}")
+            raise TokenRefreshError(f"Не удалось подключиться к {login_url}: {e}", unavailable=True)
         
         except Exception as e:
             logger.error(f"Неожиданная ошибка при обновлении токена: {e}")
@@ -0,0 +1,42 @@
+-- Миграция: Таблицы рассылок объявлений клиентам
+-- Дата: 2026-10-19
+-- Описание: Задания рассылок (веб-интерфейс, /broadcast) и состояние доставки по каждому получателю
+
+CREATE TABLE IF NOT EXISTS broadcast_jobs (
+    id SERIAL PRIMARY KEY,
+    message_text TEXT NOT NULL,
+    filters JSON NOT NULL DEFAULT '{}',
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    total INTEGER NOT NULL DEFAULT 0,
+    delivered INTEGER NOT NULL DEFAULT 0,
+    blocked INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    created_by INTEGER REFERENCES users(id) ON DELETE SET NULL,
+    notify_chat_id VARCHAR(50),
+    error_message TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP,
+    
+    CONSTRAINT check_broadcast_job_status CHECK (status IN ('pending', 'running', 'paused', 'cancelled', 'completed', 'failed'))
+);
+
+CREATE INDEX IF NOT EXISTS ix_broadcast_jobs_status ON broadcast_jobs(status);
+
+CREATE TABLE IF NOT EXISTS broadcast_recipients (
+    id SERIAL PRIMARY KEY,
+    job_id INTEGER NOT NULL REFERENCES broadcast_jobs(id) ON DELETE CASCADE,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    telegram_id VARCHAR(50) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    error_message TEXT,
+    sent_at TIMESTAMP
+);
+
+-- Неотправленные получатели задания читаются пачками
+CREATE INDEX IF NOT EXISTS ix_broadcast_recipients_job_status ON broadcast_recipients(job_id, status, id);
+
+COMMENT ON TABLE broadcast_jobs IS 'Рассылки объявлений клиентам в Telegram';
+COMMENT ON COLUMN broadcast_jobs.filters IS 'Фильтр получателей: ofd_provider_id, deadline_type_id, region';
+COMMENT ON COLUMN broadcast_jobs.blocked IS 'Получатели, заблокировавшие бота';
+COMMENT ON TABLE broadcast_recipients IS 'Состояние доставки рассылки по каждому получателю';
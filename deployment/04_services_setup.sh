@@ -41,6 +41,24 @@ EOF
 
 echo "✓ kkt-web.service создан"
 
+# Воркеры uvicorn пишут в общий logs/web.log без ротации в процессе:
+# файл ротирует logrotate, воркеры переоткрывают его после переименования
+cat > /etc/logrotate.d/kkt-web <<EOF
+$APP_DIR/logs/web.log {
+    su $APP_USER $APP_USER
+    daily
+    maxsize 10M
+    rotate 5
+    missingok
+    notifempty
+    compress
+    delaycompress
+    create 0640 $APP_USER $APP_USER
+}
+EOF
+
+echo "✓ Ротация logs/web.log настроена (/etc/logrotate.d/kkt-web)"
+
 # ============================================
 # 2. Создание systemd сервиса для Telegram бота
 # ============================================
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+Общие фикстуры тестов веб-приложения
+
+Окружение задаётся до импорта модулей приложения: отдельная SQLite база,
+логи, метрики и рабочий каталог (бэкапы - backups/database относительно
+него) во временном каталоге, тестовые токены. Данные создаются
+seed_database с заданным числом клиентов.
+"""
+import os
+import tempfile
+from datetime import date, timedelta
+
+import pytest
+
+_TMP_DIR = tempfile.mkdtemp(prefix="kkt-tests-")
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP_DIR, 'test.db')}"
+os.environ["METRICS_DIR"] = os.path.join(_TMP_DIR, "metrics")
+os.environ["LOG_DIR"] = os.path.join(_TMP_DIR, "logs")
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "123456:TEST")
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ.setdefault("TELEGRAM_ADMIN_IDS", "1")
+# Пользователь токена кешируется на весь прогон: запрос к users при
+# истечении кеша не должен попадать в счётчики отдельных эндпоинтов
+os.environ["AUTH_USER_CACHE_TTL"] = "3600"
+
+# ID, которые получают записи seed_database
+ADMIN_ID = 1
+MANAGER_ID = 2
+FIRST_CLIENT_ID = 3
+
+# Хеш пароля один на сессию: токены и кеш авторизации переживают пересоздание данных
+_password_hash = None
+
+
+def seed_database(clients: int):
+    """
+    Пересоздание таблиц и тестовые данные
+
+    Администратор (ID 1), менеджер (ID 2), затем клиенты: у каждого две
+    кассы, четыре активных дедлайна, запись в журнале уведомлений,
+    обращение в поддержку и автобэкап в каталоге.
+
+    Args:
+        clients: Количество клиентов
+    """
+    from backend.database import Base as BackendBase
+    from backend.models import BroadcastJob, SupportRequest
+    from web.app.database import Base as WebBase, SessionLocal, engine
+    from web.app.models.backup import BackupCatalogEntry
+    from web.app.models.cash_register import CashRegister
+    from web.app.models.client import Deadline, DeadlineType, NotificationLog
+    from web.app.models.ofd_provider import OFDProvider
+    from web.app.models.user import User
+    from web.app.services.auth_service import get_password_hash
+
+    BackendBase.metadata.drop_all(bind=engine)
+    WebBase.metadata.drop_all(bind=engine)
+    # Схема веб-приложения первой: таблица users у неё полнее
+    WebBase.metadata.create_all(bind=engine)
+    BackendBase.metadata.create_all(bind=engine)
+
+    global _password_hash
+    if _password_hash is None:
+        _password_hash = get_password_hash("password")
+    password_hash = _password_hash
+
+    today = date.today()
+    db = SessionLocal()
+    try:
+        db.add_all([
+            User(id=ADMIN_ID, username="admin", email="admin@test.local", full_name="Администратор",
+                 role="admin", is_active=True, password_hash=password_hash),
+            User(id=MANAGER_ID, username="manager", email="manager@test.local", full_name="Менеджер",
+                 role="manager", is_active=True, password_hash=password_hash, telegram_id="200"),
+        ])
+        types = [DeadlineType(type_name=name, is_active=True) for name in ("ОФД", "ФН", "Регистрация ККТ", "ЭЦП")]
+        providers = [OFDProvider(name=name, is_active=True) for name in ("Такском", "Первый ОФД")]
+        db.add_all(types + providers)
+        db.flush()
+
+        for i in range(clients):
+            client = User(
+                id=FIRST_CLIENT_ID + i,
+                username=f"client{i}",
+                email=f"client{i}@test.local",
+                full_name=f"Клиент {i}",
+                role="client",
+                company_name=f'ООО "Компания {i}"',
+                inn=f"77{i:08d}",
+                telegram_id=str(1000 + i),
+                is_active=True
+            )
+            db.add(client)
+            db.flush()
+            registers = [
+                CashRegister(
+                    client_id=client.id,
+                    factory_number=f"F{i:04d}{j}",
+                    registration_number=f"R{i:04d}{j}",
+                    model="АТОЛ 30Ф",
+                    register_name=f"Касса {j + 1}",
+                    installation_address="Москва",
+                    ofd_provider_id=providers[j].id,
+                    fn_expiry_date=today + timedelta(days=30 + i),
+                    is_active=True
+                )
+                for j in range(2)
+            ]
+            db.add_all(registers)
+            db.flush()
+            for j, deadline_type in enumerate(types):
+                deadline = Deadline(
+                    client_id=client.id,
+                    deadline_type_id=deadline_type.id,
+                    cash_register_id=registers[j % 2].id if j < 2 else None,
+                    expiration_date=today + timedelta(days=(i * 7 + j * 5) % 60 - 5),
+                    status="active",
+                    notes=f"Дедлайн {j}"
+                )
+                db.add(deadline)
+                db.flush()
+                if j == 0:
+                    db.add(NotificationLog(
+                        deadline_id=deadline.id,
+                        recipient_telegram_id=client.telegram_id,
+                        message_text="Напоминание",
+                        status="sent"
+                    ))
+            db.add(SupportRequest(
+                client_id=client.id,
+                subject="Вопрос",
+                message="Не работает касса",
+                contact_phone="+79990000000",
+                status="new"
+            ))
+            db.add(BackupCatalogEntry(
+                filename=f"kkt_auto_backup_{i:04d}.db",
+                kind="auto",
+                format="sqlite",
+                size_bytes=1024 * (i + 1),
+                creator="Автоматический бэкап"
+            ))
+
+        db.add(BroadcastJob(message_text="Объявление", filters={}, status="completed", total=clients))
+        db.commit()
+    finally:
+        db.close()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def work_dir():
+    """
+    Рабочий каталог тестов - временный: BACKUP_DIR (backups/database) и
+    другие относительные пути приложения не попадают в репозиторий
+    """
+    cwd = os.getcwd()
+    os.chdir(_TMP_DIR)
+    yield _TMP_DIR
+    os.chdir(cwd)
+
+
+@pytest.fixture(scope="session")
+def app():
+    """Приложение без запуска startup (TestClient без with: планировщики не нужны)"""
+    from web.app.main import app
+
+    return app
+
+
+@pytest.fixture(scope="session")
+def admin_headers():
+    """
+    Заголовки администратора (как после входа)
+
+    Возвращает функцию: токен выпускается после seed_database, когда
+    администратор уже есть в базе.
+    """
+    from web.app.database import SessionLocal
+    from web.app.models.user import User
+    from web.app.services.auth_service import create_access_token, password_fingerprint
+
+    def make() -> dict:
+        db = SessionLocal()
+        try:
+            password_hash = db.query(User.password_hash).filter(User.id == ADMIN_ID).scalar()
+        finally:
+            db.close()
+        token = create_access_token(data={
+            "sub": str(ADMIN_ID),
+            "username": "admin",
+            "role": "admin",
+            "pwh": password_fingerprint(password_hash)
+        })
+        return {"Authorization": f"Bearer {token}"}
+
+    return make
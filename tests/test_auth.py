@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Аутентификация веб-API: кэш строки пользователя и отзыв токенов
+
+Кэш пользователя в тестах живёт весь прогон (AUTH_USER_CACHE_TTL=3600),
+поэтому устаревшая строка в кэше видна сразу.
+"""
+import bcrypt
+import pytest
+from fastapi.testclient import TestClient
+
+from tests.conftest import ADMIN_ID, seed_database
+
+
+@pytest.fixture
+def client(app):
+    """Клиент на свежих данных; кэш администратора сбрасывается до и после теста"""
+    from web.app.dependencies import invalidate_user_auth
+
+    seed_database(1)
+    invalidate_user_auth(ADMIN_ID)
+    yield TestClient(app)
+    seed_database(1)
+    invalidate_user_auth(ADMIN_ID)
+
+
+def set_admin_password_hash(password_hash: str):
+    """Хеш пароля администратора напрямую в БД (как из другого процесса)"""
+    from web.app.database import SessionLocal
+    from web.app.models.user import User
+
+    db = SessionLocal()
+    try:
+        db.query(User).filter(User.id == ADMIN_ID).update({User.password_hash: password_hash})
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_login_after_rehash(client, admin_headers, monkeypatch):
+    from web.app.config import settings
+
+    monkeypatch.setattr(settings, "bcrypt_rounds", 4)
+    set_admin_password_hash(bcrypt.hashpw(b"password", bcrypt.gensalt(rounds=5)).decode())
+
+    # Строка администратора со старым хешем попадает в кэш
+    old_headers = admin_headers()
+    assert client.get("/api/users", headers=old_headers).status_code == 200
+
+    response = client.post("/api/auth/login", json={"username": "admin", "password": "password"})
+    assert response.status_code == 200
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    assert client.get("/api/users", headers=headers).status_code == 200
+    # Хеш пересчитан - токен со старым отпечатком отозван
+    assert client.get("/api/users", headers=old_headers).status_code == 401
+
+
+def test_token_issued_by_another_process(client, admin_headers):
+    from web.app.services.auth_service import get_password_hash
+
+    old_headers = admin_headers()
+    assert client.get("/api/users", headers=old_headers).status_code == 200
+
+    # Пароль сменён в другом воркере: кэш этого процесса не сброшен
+    set_admin_password_hash(get_password_hash("new-password"))
+    new_headers = admin_headers()
+
+    assert client.get("/api/users", headers=new_headers).status_code == 200
+    assert client.get("/api/users", headers=old_headers).status_code == 401
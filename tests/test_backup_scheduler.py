@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Получение лидерства планировщиком (services/backup_scheduler)
+
+Запросы к БД и файлам нового лидера выполняются в потоках: event loop
+воркера продолжает обслуживать запросы, пока импорт каталога и
+восстановление снимков идут.
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from tests.conftest import seed_database
+
+# Медленный перенос прежних бэкапов (секунды)
+SLOW_IMPORT = 0.5
+
+
+def add_overdue_schedule() -> int:
+    """Расписание с пропущенным запуском и прерванный бэкап прежнего лидера"""
+    from web.app.database import SessionLocal
+    from web.app.models.backup import BackupHistory, BackupSchedule
+
+    db = SessionLocal()
+    try:
+        schedule = BackupSchedule(enabled=True, frequency='daily', next_run_at=datetime.now() - timedelta(days=2))
+        db.add(schedule)
+        db.flush()
+        db.add(BackupHistory(schedule_id=schedule.id, status='running', started_at=datetime.now()))
+        db.commit()
+        return schedule.id
+    finally:
+        db.close()
+
+
+def test_become_leader_keeps_loop_responsive(monkeypatch):
+    from web.app.config import settings
+    from web.app.database import SessionLocal
+    from web.app.models.backup import BackupHistory, BackupSchedule
+    from web.app.services import backup_catalog, backup_scheduler
+
+    seed_database(1)
+    schedule_id = add_overdue_schedule()
+    monkeypatch.setattr(settings, 'backup_catch_up', False)
+    monkeypatch.setattr(backup_catalog, 'import_existing_backups', lambda: time.sleep(SLOW_IMPORT))
+
+    async def run():
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        ticking = asyncio.create_task(ticker())
+        try:
+            await backup_scheduler._become_leader()
+            jobs = {job.id for job in backup_scheduler.scheduler.get_jobs()}
+        finally:
+            ticking.cancel()
+            backup_scheduler.shutdown_scheduler()
+        return jobs, max(b - a for a, b in zip(ticks, ticks[1:]))
+
+    jobs, max_gap = asyncio.run(run())
+
+    assert max_gap < SLOW_IMPORT / 2
+    assert {f"backup_schedule_{schedule_id}", "daily_stats_snapshot", "backup_catalog_verify"} <= jobs
+
+    db = SessionLocal()
+    try:
+        schedule = db.get(BackupSchedule, schedule_id)
+        assert schedule.next_run_at > datetime.now()
+        assert db.query(BackupHistory.status).filter(BackupHistory.schedule_id == schedule_id).scalar() == 'failed'
+    finally:
+        db.close()
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+Хранилище бэкапов с дедупликацией (services/backup_store)
+
+Бэкап - текстовый дамп во временном каталоге: восстановление байт в байт,
+общие куски у похожих бэкапов, сборка мусора и проверка целостности.
+"""
+import hashlib
+import os
+import time
+import zlib
+
+import pytest
+
+ROWS = 20000
+
+# Старше GC_GRACE_SECONDS: такие куски сборка мусора уже может удалять
+OLD = time.time() - 2 * 24 * 3600
+
+
+def make_dump(path, inserted=()) -> bytes:
+    """
+    Дамп из ROWS строк INSERT; inserted - номера строк, после которых
+    вставлена ещё одна (похожий бэкап следующего дня)
+    """
+    lines = []
+    for i in range(ROWS):
+        digest = hashlib.md5(str(i).encode()).hexdigest()
+        lines.append(f"INSERT INTO clients VALUES ({i}, 'Клиент {i}', '{digest}');\n")
+        if i in inserted:
+            lines.append(f"INSERT INTO clients VALUES ({ROWS + i}, 'Новый клиент', '{digest}');\n")
+    data = ''.join(lines).encode('utf-8')
+    path.write_bytes(data)
+    return data
+
+
+def chunk_digests(store, name) -> set:
+    return {digest for digest, _ in store.manifest(name)['chunks']}
+
+
+def age_chunks(store):
+    """Все куски - старше периода защиты сборки мусора"""
+    for path in store.chunks_dir.glob('*/*'):
+        os.utime(path, (OLD, OLD))
+
+
+@pytest.fixture
+def store(tmp_path):
+    from web.app.services.backup_store import BackupStore
+
+    return BackupStore(tmp_path / "store")
+
+
+def test_chunk_boundaries(tmp_path):
+    from web.app.services.backup_store import CHUNK_MAX_SIZE, CHUNK_MIN_SIZE, iter_chunks
+
+    data = make_dump(tmp_path / "a.dump") + b'x' * (CHUNK_MAX_SIZE + 100)
+    with open(tmp_path / "a.dump", 'wb') as f:
+        f.write(data)
+
+    with open(tmp_path / "a.dump", 'rb') as f:
+        chunks = list(iter_chunks(f))
+
+    assert b''.join(chunks) == data
+    assert all(CHUNK_MIN_SIZE <= len(chunk) <= CHUNK_MAX_SIZE for chunk in chunks[:-1])
+    # Текст режется по строкам, длинный хвост без переводов строк - по CHUNK_MAX_SIZE
+    text_chunks = [chunk for chunk in chunks if b'x' * 100 not in chunk]
+    assert all(chunk.endswith(b'\n') for chunk in text_chunks)
+    assert len(chunks[-2]) == CHUNK_MAX_SIZE
+
+
+def test_round_trip(store, tmp_path):
+    data = make_dump(tmp_path / "a.dump")
+
+    stored = store.put("a.dump", tmp_path / "a.dump")
+    store.extract("a.dump", tmp_path / "restored.dump")
+
+    assert stored.chunks > 1
+    assert stored.size_bytes == len(data)
+    assert stored.sha256 == hashlib.sha256(data).hexdigest()
+    assert (tmp_path / "restored.dump").read_bytes() == data
+    assert b''.join(store.iter_content("a.dump")) == data
+    assert store.verify("a.dump") == []
+
+
+def test_similar_backups_share_chunks(store, tmp_path):
+    make_dump(tmp_path / "a.dump")
+    data = make_dump(tmp_path / "b.dump", inserted={5000, 15000})
+
+    first = store.put("a.dump", tmp_path / "a.dump")
+    second = store.put("b.dump", tmp_path / "b.dump")
+
+    shared = chunk_digests(store, "a.dump") & chunk_digests(store, "b.dump")
+    assert len(shared) >= second.chunks - 4
+    assert second.new_bytes < first.new_bytes / 4
+    logical, physical = store.usage()
+    assert physical < logical / 2
+    assert b''.join(store.iter_content("b.dump")) == data
+
+
+def test_garbage_collection_keeps_live_chunks(store, tmp_path):
+    make_dump(tmp_path / "a.dump")
+    data = make_dump(tmp_path / "b.dump", inserted={5000, 15000})
+    store.put("a.dump", tmp_path / "a.dump")
+    store.put("b.dump", tmp_path / "b.dump")
+    only_a = chunk_digests(store, "a.dump") - chunk_digests(store, "b.dump")
+    assert only_a
+
+    store.delete("a.dump")
+    # Свежие куски без ссылок защищены: их может писать незавершённый put
+    assert store.collect_garbage() == (0, 0)
+
+    age_chunks(store)
+    removed, freed = store.collect_garbage()
+
+    assert removed == len(only_a) and freed > 0
+    remaining = {path.name for path in store.chunks_dir.glob('*/*')}
+    assert remaining == chunk_digests(store, "b.dump")
+    assert store.verify("b.dump") == []
+    assert b''.join(store.iter_content("b.dump")) == data
+
+
+def test_put_refreshes_reused_chunks(store, tmp_path):
+    make_dump(tmp_path / "a.dump")
+    store.put("a.dump", tmp_path / "a.dump")
+    store.delete("a.dump")
+    age_chunks(store)
+
+    # Повторная запись тех же данных продлевает существующие куски:
+    # сборка мусора не удалит их из-под put, пишущего новый манифест
+    store.put("a2.dump", tmp_path / "a.dump")
+    store.delete("a2.dump")
+
+    assert store.collect_garbage() == (0, 0)
+
+
+def test_verify_detects_corrupted_chunk(store, tmp_path):
+    from web.app.services.backup_store import BackupCorrupted
+
+    make_dump(tmp_path / "a.dump")
+    make_dump(tmp_path / "b.dump", inserted={5000})
+    store.put("a.dump", tmp_path / "a.dump")
+    store.put("b.dump", tmp_path / "b.dump")
+    digest, _ = store.manifest("a.dump")['chunks'][0]
+
+    # Кусок читается и распаковывается, но содержимое не то
+    store._chunk_path(digest).write_bytes(b'z' + zlib.compress(b'INSERT INTO clients VALUES (0);\n'))
+
+    problems = store.verify("a.dump")
+    assert len(problems) == 1 and digest in problems[0]
+    assert list(store.find_damaged_chunks()) == [digest]
+    with pytest.raises(BackupCorrupted):
+        b''.join(store.iter_content("a.dump"))
+
+    store._chunk_path(digest).unlink()
+    assert digest in store.verify("a.dump")[0]
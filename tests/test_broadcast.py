@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Рассылки объявлений (services/broadcast)
+
+Сбой при сохранении результатов пачки не приводит к повторной отправке,
+отмена задания, которое бот не обрабатывал, сопровождается итоговым отчётом.
+"""
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from tests.conftest import seed_database
+
+CLIENTS = 3
+
+
+class RecordingBot:
+    """Бот без сети: запоминает получателей сообщений"""
+
+    def __init__(self):
+        self.chat_ids = []
+
+    async def send_message(self, chat_id, text, parse_mode=None):
+        self.chat_ids.append(chat_id)
+
+
+def test_failed_save_does_not_resend_batch(monkeypatch):
+    from backend.database import SessionLocal
+    from backend.models import BroadcastRecipient
+    from bot.services import broadcast
+    from bot.services.broadcast import BroadcastSender, create_broadcast, get_broadcast
+
+    seed_database(CLIENTS)
+    job_id = create_broadcast("Объявление", {})
+    bot = RecordingBot()
+    sender = BroadcastSender(bot, rate_per_second=1000)
+    monkeypatch.setattr(broadcast.settings, 'telegram_admin_ids', '')
+
+    save_batch = sender._save_batch
+
+    def failing_save(*args):
+        raise RuntimeError("database is locked")
+
+    async def run():
+        sender._save_batch = failing_save
+        try:
+            await sender._process(job_id)
+        except RuntimeError:
+            pass
+        sender._save_batch = save_batch
+        await sender._process(job_id)
+
+    asyncio.run(run())
+
+    assert len(bot.chat_ids) == CLIENTS
+    job = get_broadcast(job_id)
+    assert (job['status'], job['failed'], job['pending']) == ('completed', CLIENTS, 0)
+    db = SessionLocal()
+    try:
+        statuses = {status for (status,) in db.query(BroadcastRecipient.status)}
+    finally:
+        db.close()
+    assert statuses == {'failed'}
+
+
+def test_cancelled_pending_job_is_reported(app, admin_headers, monkeypatch):
+    from bot.services import broadcast
+    from bot.services.broadcast import create_broadcast, set_broadcast_status
+
+    seed_database(CLIENTS)
+    reports = []
+
+    async def send_broadcast_report(bot, job):
+        reports.append((job['id'], job['status']))
+
+    monkeypatch.setattr(broadcast, 'send_broadcast_report', send_broadcast_report)
+
+    web_job = create_broadcast("Объявление", {})
+    response = TestClient(app).post(f"/api/broadcasts/{web_job}/cancel", headers=admin_headers())
+    assert response.status_code == 200
+    assert reports == [(web_job, 'cancelled')]
+
+    bot_job = create_broadcast("Объявление", {})
+    set_broadcast_status(bot_job, 'pause')
+    assert set_broadcast_status(bot_job, 'cancel')['report_needed']
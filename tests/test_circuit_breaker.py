@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+Circuit breaker клиента Web API бота: какие ошибки считаются сбоем
+
+Размыкают circuit только сеть, тайм-аут и 5xx. Ответы 4xx (в том числе
+401/403 и отказ во входе) приходят от работающего API.
+"""
+import asyncio
+
+import pytest
+
+from bot.services.api_client import WebAPIClient
+from bot.services.circuit_breaker import STATE_CLOSED, STATE_OPEN, CircuitBreaker
+from bot.services.exceptions import APIError, ConnectionError, NotFoundError, ServerError, TokenRefreshError
+
+CALLS = 10
+
+
+def call_repeatedly(error: Exception) -> str:
+    """CALLS запросов, каждый завершается error; состояние circuit после них"""
+    breaker = CircuitBreaker(window_size=CALLS, min_calls=5)
+    client = WebAPIClient("http://api.test", token_manager=None, circuit_breaker=breaker)
+
+    async def send(*args, **kwargs):
+        raise error
+
+    client._send = send
+
+    async def run():
+        for _ in range(CALLS):
+            if breaker.state == STATE_OPEN:
+                break
+            with pytest.raises(APIError):
+                await client._make_request("GET", "/api/deadlines")
+
+    asyncio.run(run())
+    return breaker.state
+
+
+@pytest.mark.parametrize("error", [
+    APIError("HTTP 401: Unauthorized"),
+    APIError("HTTP 403: Forbidden"),
+    APIError("HTTP 400: Bad Request"),
+    NotFoundError("Ресурс не найден"),
+    TokenRefreshError("Неверные учётные данные бота"),
+])
+def test_client_errors_keep_circuit_closed(error):
+    assert call_repeatedly(error) == STATE_CLOSED
+
+
+@pytest.mark.parametrize("error", [
+    ConnectionError("Тайм-аут запроса к API"),
+    ServerError("Ошибка сервера (502)"),
+    TokenRefreshError("Не удалось подключиться", unavailable=True),
+])
+def test_unavailable_api_opens_circuit(error):
+    assert call_repeatedly(error) == STATE_OPEN
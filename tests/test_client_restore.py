@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Восстановление одного клиента из бэкапа (services/client_restore)
+
+Бэкап снимается с тестовой базы SQLite в хранилище во временном каталоге,
+затем клиент удаляется и восстанавливается с разными конфликтами ID.
+"""
+import asyncio
+
+import pytest
+
+from tests.conftest import FIRST_CLIENT_ID, seed_database
+
+# Последний из трёх клиентов: его ID (и ID его строк) - максимальные и
+# после удаления достаются следующим вставкам
+CLIENT_ID = FIRST_CLIENT_ID + 2
+
+
+@pytest.fixture
+def backup_name(tmp_path, monkeypatch):
+    """Бэкап базы с тремя клиентами (BACKUP_DIR - относительный путь)"""
+    from web.app.services.backup_engine import create_database_backup
+    from web.app.services.backup_store import BACKUP_DIR, BackupStore
+
+    monkeypatch.chdir(tmp_path)
+    BackupStore(BACKUP_DIR / "store")
+    seed_database(3)
+    return asyncio.run(create_database_backup("kkt_test")).filename
+
+
+def client_snapshot(client_id: int) -> dict:
+    """Строки клиента без служебных дат"""
+    from web.app.database import SessionLocal
+    from web.app.models.cash_register import CashRegister
+    from web.app.models.client import Deadline, NotificationLog
+    from web.app.models.user import User
+
+    db = SessionLocal()
+    try:
+        deadlines = db.query(Deadline).filter(Deadline.client_id == client_id).order_by(Deadline.id).all()
+        return {
+            'user': db.query(User.email, User.inn).filter(User.id == client_id).first(),
+            'cash_registers': [
+                (r.id, r.factory_number, r.ofd_provider_id)
+                for r in db.query(CashRegister).filter(CashRegister.client_id == client_id).order_by(CashRegister.id)
+            ],
+            'deadlines': [(d.id, d.deadline_type_id, d.cash_register_id, d.expiration_date) for d in deadlines],
+            'notification_logs': [
+                (log.id, log.deadline_id, log.message_text)
+                for log in db.query(NotificationLog).filter(
+                    NotificationLog.deadline_id.in_([d.id for d in deadlines])
+                ).order_by(NotificationLog.id)
+            ]
+        }
+    finally:
+        db.close()
+
+
+def delete_client(client_id: int):
+    """Удаление клиента со всеми строками (как ошибка менеджера)"""
+    from web.app.database import SessionLocal
+    from web.app.models.cash_register import CashRegister
+    from web.app.models.client import Deadline, NotificationLog
+    from web.app.models.user import User
+
+    db = SessionLocal()
+    try:
+        deadline_ids = [d.id for d in db.query(Deadline.id).filter(Deadline.client_id == client_id)]
+        db.query(NotificationLog).filter(NotificationLog.deadline_id.in_(deadline_ids)).delete(synchronize_session=False)
+        db.query(Deadline).filter(Deadline.client_id == client_id).delete(synchronize_session=False)
+        db.query(CashRegister).filter(CashRegister.client_id == client_id).delete(synchronize_session=False)
+        db.query(User).filter(User.id == client_id).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_restore_deleted_client(backup_name):
+    from web.app.services.client_restore import restore_client
+
+    before = client_snapshot(CLIENT_ID)
+    other_before = client_snapshot(FIRST_CLIENT_ID)
+    delete_client(CLIENT_ID)
+
+    result = restore_client(backup_name, CLIENT_ID)
+    assert result.client_id == CLIENT_ID and result.user_restored
+    assert (result.cash_registers, result.deadlines, result.notification_logs) == (2, 4, 1)
+    assert result.new_ids == 0
+    assert client_snapshot(CLIENT_ID) == before
+    assert client_snapshot(FIRST_CLIENT_ID) == other_before
+
+    # Повторное восстановление ничего не дублирует
+    again = restore_client(backup_name, CLIENT_ID)
+    assert not again.user_restored and again.skipped == 1 + 2 + 4 + 1
+    assert client_snapshot(CLIENT_ID) == before
+
+
+def test_restore_remaps_taken_ids(backup_name):
+    from web.app.database import SessionLocal
+    from web.app.models.cash_register import CashRegister
+    from web.app.models.user import User
+    from web.app.services.client_restore import restore_client
+
+    before = client_snapshot(CLIENT_ID)
+    delete_client(CLIENT_ID)
+
+    # Освободившиеся ID заняли новый клиент и его касса
+    db = SessionLocal()
+    try:
+        newcomer = User(username="newcomer", email="new@test.local", full_name="Новый", role="client", is_active=True)
+        db.add(newcomer)
+        db.flush()
+        db.add(CashRegister(client_id=newcomer.id, factory_number="NEW", is_active=True))
+        db.commit()
+        assert newcomer.id == CLIENT_ID
+    finally:
+        db.close()
+
+    result = restore_client(backup_name, CLIENT_ID)
+    assert result.client_id != CLIENT_ID and result.user_restored
+    assert result.new_ids >= 2
+
+    after = client_snapshot(result.client_id)
+    assert after['user'] == before['user']
+    assert sorted(r[1] for r in after['cash_registers']) == sorted(r[1] for r in before['cash_registers'])
+    # Дедлайны ссылаются на кассы восстановленного клиента, журнал - на его дедлайны
+    register_ids = {r[0] for r in after['cash_registers']}
+    assert {d[2] for d in after['deadlines'] if d[2]} <= register_ids
+    assert {log[1] for log in after['notification_logs']} <= {d[0] for d in after['deadlines']}
+    assert client_snapshot(CLIENT_ID)['cash_registers'][0][1] == "NEW"
+
+
+def test_restore_conflict_and_dry_run(backup_name):
+    from web.app.database import SessionLocal
+    from web.app.models.user import User
+    from web.app.services.client_restore import ClientRestoreConflict, restore_client
+
+    before = client_snapshot(CLIENT_ID)
+    delete_client(CLIENT_ID)
+
+    preview = restore_client(backup_name, CLIENT_ID, dry_run=True)
+    assert preview.dry_run and preview.deadlines == 4
+    assert client_snapshot(CLIENT_ID)['user'] is None
+
+    db = SessionLocal()
+    try:
+        db.add(User(id=100, username="other", email=before['user'].email, full_name="Другой", role="client", is_active=True))
+        db.commit()
+    finally:
+        db.close()
+
+    with pytest.raises(ClientRestoreConflict):
+        restore_client(backup_name, CLIENT_ID)
+    assert client_snapshot(CLIENT_ID)['deadlines'] == []
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Страница дедлайнов бота: через Web API и через БД (fallback) - одинаково
+
+Дедлайны с одной датой истечения идут в порядке ID, поэтому соседние
+страницы не пропускают и не повторяют строки.
+"""
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from tests.conftest import seed_database
+
+PAGE_SIZE = 7
+
+
+class ApiStub:
+    """Клиент Web API бота поверх TestClient (только методы страницы дедлайнов)"""
+
+    def __init__(self, client: TestClient, headers: dict):
+        self.client = client
+        self.headers = headers
+
+    def _get(self, url: str, filters: dict) -> dict:
+        params = {key: value.isoformat() if hasattr(value, 'isoformat') else value
+                  for key, value in filters.items() if value is not None}
+        response = self.client.get(url, params=params, headers=self.headers)
+        assert response.status_code == 200
+        return response.json()
+
+    async def get_deadlines_filtered(self, filters: dict) -> dict:
+        return self._get("/api/deadlines", filters)
+
+    async def get_deadlines_summary(self, filters: dict) -> dict:
+        return self._get("/api/deadlines/summary", filters)
+
+
+@pytest.fixture
+def api_stub(app, admin_headers):
+    from bot.services import checker
+
+    seed_database(5)
+    stub = ApiStub(TestClient(app), admin_headers())
+    checker.set_api_client(None)
+    yield stub
+    checker.set_api_client(None)
+
+
+def load_pages() -> list:
+    """Все страницы get_deadlines_page"""
+    from bot.services.checker import get_deadlines_page
+
+    pages = []
+    page = 1
+    while True:
+        result = asyncio.run(get_deadlines_page(page, PAGE_SIZE))
+        pages.append(result)
+        if page >= result['total_pages']:
+            return pages
+        page += 1
+
+
+def test_api_and_fallback_pages_match(api_stub):
+    from bot.services import checker
+
+    fallback = load_pages()
+    checker.set_api_client(api_stub)
+    via_api = load_pages()
+
+    assert via_api == fallback
+    rows = [row for page in via_api for row in page['deadlines']]
+    assert len({row['deadline_id'] for row in rows}) == len(rows) == via_api[0]['total']
+    assert any('cash_register_serial' in row for row in rows)
+    assert rows == sorted(rows, key=lambda row: (row['expiration_date'], row['deadline_id']))
+
+
+def test_long_deadlines_fit_one_page():
+    from bot.services.formatter import TELEGRAM_MESSAGE_LIMIT, format_deadline_page
+    from bot.services.pagination import DEADLINES_PAGE_SIZE
+
+    deadlines = [
+        {
+            'deadline_id': i,
+            'client_name': f'ООО "Компания {i}"',
+            'client_inn': f"77{i:08d}",
+            'deadline_type_name': "ОФД",
+            'cash_register_model': "АТОЛ 30Ф",
+            'cash_register_serial': f"F{i:04d}",
+            'installation_address': "Москва, " + "длинный адрес " * (40 * i),
+            'description': "Примечание " * 150,
+            'expiration_date': "2026-01-01",
+            'days_remaining': 10,
+            'status': 'green'
+        }
+        for i in range(DEADLINES_PAGE_SIZE)
+    ]
+
+    text = format_deadline_page(
+        deadlines, title="📋 Все дедлайны", page=2, total_pages=3, total=15,
+        status_counts={'green': 15}, offset=DEADLINES_PAGE_SIZE
+    )
+
+    assert len(text) <= TELEGRAM_MESSAGE_LIMIT
+    for number in range(DEADLINES_PAGE_SIZE + 1, 2 * DEADLINES_PAGE_SIZE + 1):
+        assert f"<b>{number}.</b>" in text
+    # Короткие блоки не сокращаются
+    assert "• Адрес: Москва, \n" in text
+    assert "…" in text
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+FSM storage бота на SQLite (services/fsm_storage)
+
+Одновременные обработчики одного ключа, ещё не попавшего в кэш, видят
+одну запись: чтение с диска не затирает изменения соседнего обработчика.
+"""
+import asyncio
+
+from aiogram.fsm.storage.base import StorageKey
+
+KEY = StorageKey(bot_id=1, chat_id=1000, user_id=1000)
+
+
+def test_concurrent_first_access_keeps_update(tmp_path):
+    from bot.services.fsm_storage import SQLiteStorage
+
+    async def run():
+        storage = SQLiteStorage(path=str(tmp_path / "fsm.db"))
+        try:
+            await asyncio.gather(
+                storage.set_state(KEY, 'Registration:name'),
+                storage.get_state(KEY),
+                storage.set_data(KEY, {'phone': '+79990000000'}),
+            )
+            cached = (await storage.get_state(KEY), await storage.get_data(KEY))
+        finally:
+            await storage.close()
+
+        reopened = SQLiteStorage(path=str(tmp_path / "fsm.db"))
+        try:
+            stored = (await reopened.get_state(KEY), await reopened.get_data(KEY))
+        finally:
+            await reopened.close()
+        return cached, stored
+
+    cached, stored = asyncio.run(run())
+
+    assert cached == ('Registration:name', {'phone': '+79990000000'})
+    assert stored == cached
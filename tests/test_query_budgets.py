@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Бюджеты SQL запросов основных GET эндпоинтов
+
+Каждый эндпоинт вызывается на двух объёмах данных. Проверяется, что бюджет
+объявлен (@query_budget рядом с маршрутом), не превышен и что число
+запросов не растёт вместе с числом строк - иначе это N+1.
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from tests.conftest import FIRST_CLIENT_ID, seed_database
+from web.app.query_budget import QueryCounter, get_query_budget
+
+SMALL_CLIENTS = 3
+LARGE_CLIENTS = 25
+
+# (название, URL) - ID существуют при обоих объёмах данных
+ENDPOINTS = [
+    ("users", "/api/users"),
+    ("user", f"/api/users/{FIRST_CLIENT_ID}"),
+    ("user-full-details", f"/api/users/{FIRST_CLIENT_ID}/full-details"),
+    ("deadlines", "/api/deadlines?page_size=100"),
+    ("deadlines-summary", "/api/deadlines/summary"),
+    ("deadlines-expiring-soon", "/api/deadlines/expiring-soon?days=60"),
+    ("deadlines-urgent", "/api/deadlines/urgent?days=60"),
+    ("deadlines-by-client", f"/api/deadlines/by-client/{FIRST_CLIENT_ID}"),
+    ("deadlines-changes", "/api/deadlines/changes"),
+    ("deadline", "/api/deadlines/1"),
+    ("deadline-types", "/api/deadline-types"),
+    ("deadline-type", "/api/deadline-types/1"),
+    ("dashboard-stats", "/api/dashboard/stats"),
+    ("dashboard-trends", "/api/dashboard/trends"),
+    ("cash-registers", "/api/cash-registers"),
+    ("cash-register", "/api/cash-registers/1"),
+    ("ofd-providers", "/api/ofd-providers"),
+    ("ofd-provider", "/api/ofd-providers/1"),
+    ("support-requests", "/api/support-requests/"),
+    ("support-request", "/api/support-requests/1"),
+    ("support-requests-stats", "/api/support-requests/stats/summary"),
+    ("broadcasts", "/api/broadcasts"),
+    ("broadcast", "/api/broadcasts/1"),
+    ("export-clients", "/api/export/clients"),
+    ("export-deadlines", "/api/export/deadlines"),
+    ("export-statistics", "/api/export/statistics"),
+    ("backups", "/api/database/backups?sort_by=size_bytes"),
+]
+
+
+class RouteRecorder:
+    """ASGI обёртка: запоминает эндпоинт, выбранный роутером (scope["route"])"""
+
+    def __init__(self, app):
+        self.app = app
+        self.endpoint = None
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if scope["type"] == "http":
+                self.endpoint = getattr(scope.get("route"), "endpoint", None)
+
+
+def run_endpoints(app, headers: dict) -> dict:
+    """Вызов всех эндпоинтов под QueryCounter: название -> (код ответа, счётчик, эндпоинт)"""
+    recorder = RouteRecorder(app)
+    client = TestClient(recorder)
+    # Прогрев кеша авторизации, чтобы первый эндпоинт не считал загрузку пользователя
+    client.get(ENDPOINTS[0][1], headers=headers)
+    results = {}
+    for name, url in ENDPOINTS:
+        with QueryCounter() as counter:
+            response = client.get(url, headers=headers)
+        results[name] = (response.status_code, counter, recorder.endpoint)
+    return results
+
+
+@pytest.fixture(scope="module")
+def measurements(app, admin_headers):
+    """Счётчики запросов на малом и большом объёме данных"""
+    seed_database(SMALL_CLIENTS)
+    small = run_endpoints(app, admin_headers())
+    seed_database(LARGE_CLIENTS)
+    large = run_endpoints(app, admin_headers())
+    return small, large
+
+
+@pytest.mark.parametrize("name,url", ENDPOINTS, ids=[name for name, _ in ENDPOINTS])
+def test_query_budget(name, url, measurements):
+    small, large = measurements
+    budget = get_query_budget(small[name][2])
+    assert budget is not None, f"GET {url}: бюджет запросов не объявлен (@query_budget)"
+
+    for size, results in ((SMALL_CLIENTS, small), (LARGE_CLIENTS, large)):
+        status_code, counter, _ = results[name]
+        assert status_code == 200, f"GET {url} ({size} клиентов): код ответа {status_code}"
+        counter.check(budget, f"GET {url} ({size} клиентов)")
+
+    small_counter, large_counter = small[name][1], large[name][1]
+    assert large_counter.count == small_counter.count, (
+        f"GET {url}: {small_counter.count} SQL запросов при {SMALL_CLIENTS} клиентах, "
+        f"{large_counter.count} при {LARGE_CLIENTS}\n"
+        f"Повторяющиеся запросы:\n{large_counter.report()}"
+    )
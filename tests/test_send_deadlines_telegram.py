@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Отправка дедлайнов клиента в Telegram из веб-интерфейса
+
+Длинный список уходит страницами формата бота: каждое сообщение не
+длиннее лимита Telegram, дедлайны не теряются.
+"""
+import re
+from datetime import date, timedelta
+
+from fastapi.testclient import TestClient
+
+from tests.conftest import FIRST_CLIENT_ID, seed_database
+
+EXTRA_DEADLINES = 20
+
+
+def add_long_deadlines():
+    """Ещё EXTRA_DEADLINES дедлайнов клиента и очень длинные адреса касс"""
+    from web.app.database import SessionLocal
+    from web.app.models.cash_register import CashRegister
+    from web.app.models.client import Deadline
+
+    db = SessionLocal()
+    try:
+        registers = db.query(CashRegister).filter(CashRegister.client_id == FIRST_CLIENT_ID).all()
+        for register in registers:
+            register.installation_address = "Москва, " + "длинный адрес " * 100
+        template = db.query(Deadline).filter(Deadline.client_id == FIRST_CLIENT_ID).first()
+        db.add_all([
+            Deadline(
+                client_id=FIRST_CLIENT_ID,
+                deadline_type_id=template.deadline_type_id,
+                cash_register_id=registers[i % 2].id,
+                expiration_date=date.today() + timedelta(days=i),
+                status="active"
+            )
+            for i in range(EXTRA_DEADLINES)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_long_list_is_sent_in_pages(app, admin_headers, monkeypatch):
+    from bot.services import notifier
+    from bot.services.formatter import TELEGRAM_MESSAGE_LIMIT
+    from bot.services.pagination import DEADLINES_PAGE_SIZE
+
+    seed_database(1)
+    add_long_deadlines()
+    sent = []
+
+    async def send_notification(bot, chat_id, message):
+        sent.append(message)
+        return True
+
+    monkeypatch.setattr(notifier, 'send_notification', send_notification)
+
+    response = TestClient(app).post(
+        f"/api/users/{FIRST_CLIENT_ID}/send-deadlines-telegram", headers=admin_headers()
+    )
+
+    assert response.status_code == 200
+    total = 4 + EXTRA_DEADLINES
+    assert len(sent) == -(-total // DEADLINES_PAGE_SIZE)
+    assert all(len(message) <= TELEGRAM_MESSAGE_LIMIT for message in sent)
+    numbers = [int(n) for message in sent for n in re.findall(r"<b>(\d+)\.</b>", message)]
+    assert numbers == list(range(1, total + 1))
@@ -15,9 +15,12 @@ from ..models.user_schemas import (
     PasswordResetConfirm
 )
 from ..models.user import User, WebUser
-from ..services.auth_service import authenticate_user, create_access_token, decode_token, get_password_hash
+from ..services.auth_service import (
+    LoginRateLimited, authenticate_user_async, create_access_token, decode_token,
+    get_password_hash_async, login_throttle, password_fingerprint
+)
 from ..services.email_service import EmailService
-from ..dependencies import get_db
+from ..dependencies import get_db, invalidate_user_auth
 from datetime import datetime, timedelta
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
@@ -30,7 +33,16 @@ async def login(
     db: Session = Depends(get_db)
 ):
     """Вход в систему"""
-    user = authenticate_user(db, credentials.username, credentials.password)
+    # Попытки одного пользователя - по очереди и с ограничением частоты
+    try:
+        async with login_throttle.attempt(credentials.username.strip().casefold()):
+            user = await authenticate_user_async(db, credentials.username, credentials.password)
+    except LoginRateLimited as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Слишком много попыток входа. Попробуйте позже",
+            headers={"Retry-After": str(e.retry_after)},
+        )
     
     if not user:
         raise HTTPException(
@@ -47,7 +59,8 @@ async def login(
         data={
             "sub": str(user.id),
             "username": user.username,
-            "role": user.role
+            "role": user.role,
+            "pwh": password_fingerprint(user.password_hash)
         }
     )
     
@@ -149,10 +162,11 @@ async def set_password(
         )
     
     # Установка пароля
-    user.password_hash = get_password_hash(request.password)
+    user.password_hash = await get_password_hash_async(request.password)
     user.is_active = True
     user.registered_at = datetime.now()
     db.commit()
+    invalidate_user_auth(user.id)
     
     return MessageResponse(
         message=f"Пароль успешно установлен. Добро пожаловать, {user.full_name}!"
@@ -232,8 +246,9 @@ async def confirm_password_reset(
         )
     
     # Установка нового пароля
-    user.password_hash = get_password_hash(request.new_password)
+    user.password_hash = await get_password_hash_async(request.new_password)
     db.commit()
+    invalidate_user_auth(user.id)
     
     return MessageResponse(
         message="Пароль успешно изменён"
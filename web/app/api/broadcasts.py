@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+API endpoints для рассылок объявлений клиентам в Telegram
+Задание сохраняется в БД, отправку с ограничением скорости выполняет бот
+"""
+import logging
+from datetime import datetime
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from pydantic import BaseModel, Field
+
+from ..dependencies import get_db, require_roles
+from ..query_budget import query_budget
+from backend.models import BroadcastJob
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/broadcasts", tags=["Broadcasts"])
+
+
+check_admin_role = require_roles('admin', detail="Только администратор может управлять рассылками")
+
+
+# Pydantic схемы
+class BroadcastCreate(BaseModel):
+    """Схема создания рассылки"""
+    message: str = Field(..., min_length=1, max_length=4096, description="Текст объявления (HTML)")
+    ofd_provider_id: Optional[int] = Field(None, description="Только клиенты с кассами этого ОФД")
+    deadline_type_id: Optional[int] = Field(None, description="Только клиенты с активным дедлайном этого типа")
+    region: Optional[str] = Field(None, max_length=255, description="Часть адреса клиента или кассы")
+
+
+def get_job_or_404(db: Session, job_id: int) -> BroadcastJob:
+    """Получение задания рассылки или 404"""
+    job = db.query(BroadcastJob).filter(BroadcastJob.id == job_id).first()
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Рассылка с ID {job_id} не найдена"
+        )
+    return job
+
+
+async def send_cancel_report(job: dict):
+    """
+    Итоговый отчёт об отмене задания, которое бот не обрабатывал
+    (ожидало запуска или стояло на паузе): отправитель бота его уже не увидит
+    """
+    from aiogram import Bot
+    from bot.config import settings as bot_settings
+    from bot.services.broadcast import send_broadcast_report
+
+    try:
+        bot = Bot(token=bot_settings.telegram_bot_token)
+        try:
+            await send_broadcast_report(bot, job)
+        finally:
+            await bot.session.close()
+    except Exception as e:
+        logger.error(f"Не удалось отправить отчёт об отмене рассылки #{job['id']}: {e}")
+
+
+@router.post("", status_code=status.HTTP_201_CREATED)
+async def create_broadcast(
+    data: BroadcastCreate,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(check_admin_role)
+):
+    """
+    Создать рассылку
+    Бот выберет получателей по фильтру и начнёт отправку в течение нескольких секунд
+    """
+    filters = {
+        key: value
+        for key, value in data.model_dump(exclude={'message'}).items()
+        if value
+    }
+
+    job = BroadcastJob(
+        message_text=data.message,
+        filters=filters,
+        status='pending',
+        created_by=int(current_user['sub']) if current_user.get('sub') else None
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    return job.to_dict()
+
+
+@router.get("")
+@query_budget(2)
+async def list_broadcasts(
+    limit: int = Query(20, ge=1, le=100, description="Количество последних рассылок"),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(check_admin_role)
+):
+    """Последние рассылки с прогрессом"""
+    jobs = db.query(BroadcastJob).order_by(BroadcastJob.id.desc()).limit(limit).all()
+    return [job.to_dict() for job in jobs]
+
+
+@router.get("/{job_id}")
+@query_budget(2)
+async def get_broadcast(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(check_admin_role)
+):
+    """Прогресс рассылки: total, delivered, blocked, failed, pending"""
+    return get_job_or_404(db, job_id).to_dict()
+
+
+@router.post("/{job_id}/{action}")
+async def control_broadcast(
+    job_id: int,
+    action: Literal["pause", "resume", "cancel"],
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(check_admin_role)
+):
+    """
+    Пауза, продолжение или отмена рассылки
+    Бот применяет изменение после текущей пачки сообщений
+    """
+    job = get_job_or_404(db, job_id)
+    previous_status = job.status
+
+    if job.status in ('cancelled', 'completed', 'failed'):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Рассылка уже завершена ({job.status})"
+        )
+
+    if action == 'pause':
+        job.status = 'paused'
+    elif action == 'resume':
+        if job.status != 'paused':
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Рассылка не на паузе"
+            )
+        # Получатели ещё не выбраны - задание начнётся с начала
+        job.status = 'running' if job.started_at else 'pending'
+    else:
+        job.status = 'cancelled'
+        job.finished_at = datetime.now()
+
+    db.commit()
+    result = job.to_dict()
+
+    # Бот отчитывается только о заданиях, которые отправлял (running)
+    if action == 'cancel' and previous_status in ('pending', 'paused'):
+        await send_cancel_report(result)
+
+    return result
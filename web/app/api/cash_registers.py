@@ -2,6 +2,7 @@
 """
 API для управления кассовыми аппаратами
 """
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
@@ -10,26 +11,12 @@ from pydantic import BaseModel, Field
 
 from ..models import CashRegister
 from ..models.user import User
-from ..dependencies import get_db
-from ..services.auth_service import decode_token
+from ..dependencies import get_db, get_current_user
+from ..query_budget import query_budget
 from ..services.cash_register_deadline_service import CashRegisterDeadlineService
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 router = APIRouter(prefix="/api/cash-registers", tags=["Cash Registers"])
-security = HTTPBearer()
-
-
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Получение текущего пользователя из JWT токена"""
-    token = credentials.credentials
-    payload = decode_token(token)
-    if not payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Неверный или истёкший токен",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    return payload
+logger = logging.getLogger(__name__)
 
 
 # Schemas
@@ -88,6 +75,7 @@ class CashRegisterResponse(BaseModel):
 
 # Endpoints
 @router.get("", response_model=List[CashRegisterResponse])
+@query_budget(2)
 async def list_cash_registers(
     user_id: int = None,
     db: Session = Depends(get_db),
@@ -106,6 +94,7 @@ async def list_cash_registers(
 
 
 @router.get("/{register_id}", response_model=CashRegisterResponse)
+@query_budget(2)
 async def get_cash_register(
     register_id: int,
     db: Session = Depends(get_db),
@@ -173,7 +162,7 @@ async def create_cash_register(
             )
         except Exception as e:
             # Логируем ошибку, но не прерываем создание кассы
-            print(f"Предупреждение: не удалось создать дедлайны: {e}")
+            logger.warning(f"Предупреждение: не удалось создать дедлайны: {e}")
         
         db.commit()
         db.refresh(register)
@@ -248,7 +237,7 @@ async def update_cash_register(
             )
         except Exception as e:
             # Логируем ошибку, но не прерываем обновление кассы
-            print(f"Предупреждение: не удалось синхронизировать дедлайны: {e}")
+            logger.warning(f"Предупреждение: не удалось синхронизировать дедлайны: {e}")
         
         db.commit()
         db.refresh(register)
@@ -295,7 +284,7 @@ async def delete_cash_register(
     for deadline in deadlines_to_delete:
         db.delete(deadline)
     
-    print(f"[УДАЛЕНИЕ КАССЫ] Касса ID={register_id}: физически удалено {deleted_count} дедлайнов")
+    logger.info(f"[УДАЛЕНИЕ КАССЫ] Касса ID={register_id}: физически удалено {deleted_count} дедлайнов")
     
     db.commit()
     
@@ -8,7 +8,7 @@ from sqlalchemy import or_
 from typing import Optional
 import math
 
-from ..dependencies import get_db
+from ..dependencies import get_db, get_current_user
 from ..models.user import User
 from ..models.client import Deadline
 from ..models.cash_register import CashRegister
@@ -21,24 +21,8 @@ from ..models.client_schemas import (
     CashRegisterShort,
     DeadlineShortForClient
 )
-from ..services.auth_service import decode_token
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 router = APIRouter(prefix="/api/clients", tags=["Clients"])
-security = HTTPBearer()
-
-
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Получение текущего пользователя из JWT токена"""
-    token = credentials.credentials
-    payload = decode_token(token)
-    if not payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Неверный или истёкший токен",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    return payload
 
 
 @router.get("", response_model=ClientListResponse)
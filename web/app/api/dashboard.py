@@ -2,37 +2,28 @@
 """
 API endpoints для дашборда (статистика)
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+import logging
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, or_
 from datetime import date, timedelta
+from typing import Literal, Optional
 
-from ..dependencies import get_db
+from ..dependencies import get_db, get_current_user
+from ..query_budget import query_budget
 from ..models.user import User
 from ..models.client import Deadline, DeadlineType
 from ..models.cash_register import CashRegister
 from ..models.client_schemas import DashboardStats
-from ..services.auth_service import decode_token
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from ..models.stats_snapshot import DailyStatsSnapshot
+from ..services.stats_snapshot import aggregate_trends, backfill_snapshots
 
 router = APIRouter(prefix="/api/dashboard", tags=["Dashboard"])
-security = HTTPBearer()
-
-
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Получение текущего пользователя из JWT токена"""
-    token = credentials.credentials
-    payload = decode_token(token)
-    if not payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Неверный или истёкший токен",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    return payload
+logger = logging.getLogger(__name__)
 
 
 @router.get("/stats", response_model=DashboardStats)
+@query_budget(10)
 async def get_dashboard_stats(
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
@@ -103,7 +94,7 @@ async def get_dashboard_stats(
         )
     ).scalar()
     
-    print(f"[DEBUG] Dashboard stats: total_cash_registers={total_cash_registers}")
+    logger.debug(f"Dashboard stats: total_cash_registers={total_cash_registers}")
     
     return DashboardStats(
         total_clients=total_clients or 0,
@@ -115,4 +106,72 @@ async def get_dashboard_stats(
         status_yellow=status_yellow or 0,
         status_red=status_red or 0,
         status_expired=status_expired or 0
-    )
\ No newline at end of file
+    )
+
+
+@router.get("/trends")
+@query_budget(2)
+async def get_dashboard_trends(
+    date_from: Optional[date] = Query(None, alias="from", description="Дата от (по умолчанию 90 дней назад)"),
+    date_to: Optional[date] = Query(None, alias="to", description="Дата до (по умолчанию сегодня)"),
+    granularity: Literal["day", "week", "month"] = Query("day", description="Шаг графика"),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Тренды статистики из таблицы ежедневных снимков
+
+    Для недель и месяцев счётчики дедлайнов и открытых обращений берутся
+    на конец периода, уведомления и новые обращения суммируются
+    """
+    date_to = date_to or date.today()
+    date_from = date_from or date_to - timedelta(days=90)
+
+    if date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Дата 'from' позже даты 'to'"
+        )
+
+    rows = db.query(DailyStatsSnapshot).filter(
+        DailyStatsSnapshot.snapshot_date >= date_from,
+        DailyStatsSnapshot.snapshot_date <= date_to
+    ).order_by(DailyStatsSnapshot.snapshot_date).all()
+
+    return {
+        "from": date_from.isoformat(),
+        "to": date_to.isoformat(),
+        "granularity": granularity,
+        "points": aggregate_trends(rows, granularity)
+    }
+
+
+@router.post("/trends/backfill")
+async def backfill_dashboard_trends(
+    date_from: date = Query(..., alias="from", description="Первый день"),
+    date_to: Optional[date] = Query(None, alias="to", description="Последний день (по умолчанию вчера)"),
+    overwrite: bool = Query(False, description="Перезаписать снимки, снятые в свой день"),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Восстановление снимков статистики за прошлые дни (только администратор)"""
+    if current_user.get('role') != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Доступ запрещён. Требуются права администратора."
+        )
+
+    date_to = date_to or date.today() - timedelta(days=1)
+    if date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Дата 'from' позже даты 'to'"
+        )
+
+    written = backfill_snapshots(db, date_from, date_to, overwrite=overwrite)
+
+    return {
+        "from": date_from.isoformat(),
+        "to": date_to.isoformat(),
+        "written": written
+    }
@@ -2,37 +2,25 @@
 """
 API endpoints для управления типами дедлайнов
 """
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 
-from ..dependencies import get_db
+from ..dependencies import get_db, get_current_user
+from ..query_budget import query_budget
 from ..models.client import DeadlineType
 from ..models.client_schemas import (
     DeadlineTypeCreate,
     DeadlineTypeResponse
 )
-from ..services.auth_service import decode_token
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 router = APIRouter(prefix="/api/deadline-types", tags=["Deadline Types"])
-security = HTTPBearer()
-
-
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Получение текущего пользователя из JWT токена"""
-    token = credentials.credentials
-    payload = decode_token(token)
-    if not payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Неверный или истёкший токен",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    return payload
+logger = logging.getLogger(__name__)
 
 
 @router.get("", response_model=List[DeadlineTypeResponse])
+@query_budget(2)
 async def get_deadline_types(
     include_inactive: bool = False,
     db: Session = Depends(get_db),
@@ -49,6 +37,7 @@ async def get_deadline_types(
 
 
 @router.get("/{type_id}", response_model=DeadlineTypeResponse)
+@query_budget(2)
 async def get_deadline_type(
     type_id: int,
     db: Session = Depends(get_db),
@@ -177,7 +166,7 @@ async def delete_deadline_type(
     ).update({"deadline_type_id": None}, synchronize_session=False)
     
     if updated_count > 0:
-        print(f"ℹ️ Очищено поле типа в {updated_count} дедлайнах (тип '{deadline_type.type_name}' удален)")
+        logger.info(f"ℹ️ Очищено поле типа в {updated_count} дедлайнах (тип '{deadline_type.type_name}' удален)")
     
     # Удаление типа
     db.delete(deadline_type)
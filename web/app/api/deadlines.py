@@ -2,16 +2,19 @@
 """
 API endpoints для управления дедлайнами
 """
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_, func, case
 from typing import Optional, List
 from datetime import date, datetime, timedelta
 import math
 
-from ..dependencies import get_db
+from ..dependencies import get_db, get_current_user
+from ..query_budget import query_budget
 from ..models.client import Deadline, DeadlineType
 from ..models.user import User
+from ..responses import FastJSONResponse
 from ..models.client_schemas import (
     DeadlineCreate,
     DeadlineUpdate,
@@ -19,24 +22,9 @@ from ..models.client_schemas import (
     DeadlineDetailResponse,
     DeadlineListResponse
 )
-from ..services.auth_service import decode_token
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 router = APIRouter(prefix="/api/deadlines", tags=["Deadlines"])
-security = HTTPBearer()
-
-
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Получение текущего пользователя из JWT токена"""
-    token = credentials.credentials
-    payload = decode_token(token)
-    if not payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Неверный или истёкший токен",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    return payload
+logger = logging.getLogger(__name__)
 
 
 def calculate_days_until_expiration(expiration_date: date) -> int:
@@ -45,11 +33,21 @@ def calculate_days_until_expiration(expiration_date: date) -> int:
     return delta.days
 
 
-def enrich_deadline_with_details(deadline: Deadline, db: Session = None) -> dict:
-    """Обогащение данных дедлайна дополнительной информацией"""
-    client = None
-    deadline_type = None
-    
+def enrich_deadline_with_details(
+    deadline: Deadline,
+    db: Session = None,
+    client: Optional[User] = None,
+    deadline_type: Optional[DeadlineType] = None
+) -> dict:
+    """
+    Обогащение данных дедлайна дополнительной информацией
+
+    Args:
+        deadline: Дедлайн
+        db: Сессия - клиент и тип загружаются отдельными запросами
+        client: Клиент, уже загруженный вместе с дедлайном (без db)
+        deadline_type: Тип, уже загруженный вместе с дедлайном (без db)
+    """
     if db:
         # Поддержка дедлайнов с client_id (все дедлайны теперь используют User)
         if deadline.client_id:
@@ -84,6 +82,7 @@ def enrich_deadline_with_details(deadline: Deadline, db: Session = None) -> dict
 
 
 @router.get("", response_model=DeadlineListResponse)
+@query_budget(3)
 async def get_deadlines(
     page: int = Query(1, ge=1, description="Номер страницы"),
     page_size: int = Query(50, ge=1, le=100, description="Количество записей на странице"),
@@ -147,51 +146,132 @@ async def get_deadlines(
         # Подсчёт общего количества
         total = query.count()
         
-        # Пагинация
+        # Пагинация: только нужные колонки одним запросом, строки в словари
+        # без повторной проверки через DeadlineDetailResponse. Deadline.id -
+        # однозначный порядок при одинаковых датах (страницы не пропускают
+        # и не повторяют строки)
         offset = (page - 1) * page_size
-        deadlines = query.order_by(Deadline.expiration_date).offset(offset).limit(page_size).all()
+        rows = query.with_entities(
+            Deadline.id,
+            Deadline.client_id,
+            Deadline.deadline_type_id,
+            Deadline.cash_register_id,
+            Deadline.expiration_date,
+            Deadline.status,
+            Deadline.notes,
+            Deadline.created_at,
+            Deadline.updated_at,
+            User.id.label('user_id'),
+            User.company_name,
+            User.inn,
+            User.notifications_enabled,
+            DeadlineType.id.label('type_id'),
+            DeadlineType.type_name,
+            CashRegister.model.label('register_model'),
+            CashRegister.factory_number,
+            CashRegister.register_name,
+            CashRegister.installation_address
+        ).order_by(Deadline.expiration_date, Deadline.id).offset(offset).limit(page_size).all()
         
-        # Обогащение данных
-        enriched_deadlines = []
-        print(f"\n=== ОБРАБОТКА {len(deadlines)} ДЕДЛАЙНОВ ===")
-        for idx, d in enumerate(deadlines, 1):
-            try:
-                print(f"{idx}. Обрабатываем дедлайн ID={d.id}...")
-                enriched_deadlines.append(enrich_deadline_with_details(d, db))
-                print(f"   ✓ Успешно")
-            except Exception as e:
-                # Откатываем транзакцию при ошибке, чтобы избежать InFailedSqlTransaction
-                db.rollback()
-                import traceback
-                print(f"   ✖ ОШИБКА: Не удалось обработать дедлайн ID={d.id}")
-                print(f"   Причина: {str(e)}")
-                print(f"   client_id={d.client_id}, user_id={getattr(d, 'user_id', None)}, deadline_type_id={d.deadline_type_id}")
-                print(f"   Traceback:\n{traceback.format_exc()}")
-                continue
-        print(f"=== ИТОГО: Успешно обработано {len(enriched_deadlines)} из {len(deadlines)} дедлайнов ===\n")
+        today = date.today()
+        deadlines = [
+            {
+                "id": row.id,
+                "client_id": row.client_id,
+                "deadline_type_id": row.deadline_type_id,
+                "cash_register_id": row.cash_register_id,
+                "expiration_date": row.expiration_date,
+                "status": row.status,
+                "notes": row.notes,
+                "created_at": row.created_at,
+                "updated_at": row.updated_at,
+                "client": {
+                    "id": row.user_id,
+                    "company_name": row.company_name,
+                    "inn": row.inn
+                } if row.user_id is not None else None,
+                "deadline_type": {
+                    "id": row.type_id,
+                    "type_name": row.type_name
+                } if row.type_id is not None else None,
+                "cash_register": {
+                    "id": row.cash_register_id,
+                    "model": row.register_model,
+                    "factory_number": row.factory_number,
+                    "register_name": row.register_name,
+                    "installation_address": row.installation_address
+                } if row.cash_register_id is not None else None,
+                "notification_enabled": row.notifications_enabled is not False,
+                "days_until_expiration": (row.expiration_date - today).days
+            }
+            for row in rows
+        ]
         
         # Расчёт количества страниц
         total_pages = math.ceil(total / page_size) if total > 0 else 1
         
-        return DeadlineListResponse(
-            total=total,
-            deadlines=enriched_deadlines,
-            page=page,
-            page_size=page_size,
-            total_pages=total_pages
-        )
+        return FastJSONResponse({
+            "total": total,
+            "deadlines": deadlines,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": total_pages
+        })
     except Exception as e:
-        import traceback
-        print(f"Error in get_deadlines: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception(f"Error in get_deadlines: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Ошибка при загрузке дедлайнов: {str(e)}"
         )
 
 
+@router.get("/summary")
+@query_budget(2)
+async def get_deadlines_summary(
+    client_id: Optional[int] = Query(None, description="Фильтр по клиенту"),
+    deadline_status: Optional[str] = Query(None, description="Фильтр по статусу"),
+    date_from: Optional[date] = Query(None, description="Дата от"),
+    date_to: Optional[date] = Query(None, description="Дата до"),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Сводка по дедлайнам одним агрегатным запросом: общее количество
+    и распределение по срочности (expired, red, yellow, green)
+    """
+    today = date.today()
+    
+    query = db.query(
+        func.count(Deadline.id),
+        func.sum(case((Deadline.expiration_date < today, 1), else_=0)),
+        func.sum(case((and_(Deadline.expiration_date >= today, Deadline.expiration_date < today + timedelta(days=7)), 1), else_=0)),
+        func.sum(case((and_(Deadline.expiration_date >= today + timedelta(days=7), Deadline.expiration_date < today + timedelta(days=14)), 1), else_=0)),
+        func.sum(case((Deadline.expiration_date >= today + timedelta(days=14), 1), else_=0))
+    ).filter(Deadline.status == (deadline_status or 'active'))
+    
+    if client_id:
+        query = query.filter(Deadline.client_id == client_id)
+    
+    if date_from:
+        query = query.filter(Deadline.expiration_date >= date_from)
+    
+    if date_to:
+        query = query.filter(Deadline.expiration_date <= date_to)
+    
+    total, expired, red, yellow, green = query.one()
+    
+    return {
+        "total": total or 0,
+        "expired": expired or 0,
+        "red": red or 0,
+        "yellow": yellow or 0,
+        "green": green or 0
+    }
+
+
 @router.get("/expiring-soon", response_model=List[DeadlineDetailResponse])
 @router.get("/urgent", response_model=List[DeadlineDetailResponse])  # Alias для совместимости
+@query_budget(2)
 async def get_expiring_soon(
     days: int = Query(14, ge=1, le=90, description="Количество дней"),
     include_expired: bool = Query(True, description="Включать просроженные дедлайны"),
@@ -202,9 +282,9 @@ async def get_expiring_soon(
     
     target_date = date.today() + timedelta(days=days)
     
-    # Базовый запрос
-    base_query = db.query(Deadline)\
-        .outerjoin(User, Deadline.user_id == User.id)\
+    # Базовый запрос: клиент и тип в той же выборке, без запроса на строку
+    base_query = db.query(Deadline, User, DeadlineType)\
+        .outerjoin(User, Deadline.client_id == User.id)\
         .join(DeadlineType, Deadline.deadline_type_id == DeadlineType.id)\
         .filter(Deadline.status == 'active')
     
@@ -213,7 +293,7 @@ async def get_expiring_soon(
         # Включаем все дедлайны до target_date (включая просроченные)
         deadlines = base_query.filter(
             Deadline.expiration_date <= target_date
-        ).order_by(Deadline.expiration_date).all()
+        ).order_by(Deadline.expiration_date, Deadline.id).all()
     else:
         # Только будущие дедлайны
         deadlines = base_query.filter(
@@ -221,12 +301,13 @@ async def get_expiring_soon(
                 Deadline.expiration_date >= date.today(),
                 Deadline.expiration_date <= target_date
             )
-        ).order_by(Deadline.expiration_date).all()
+        ).order_by(Deadline.expiration_date, Deadline.id).all()
     
-    return [enrich_deadline_with_details(d, db) for d in deadlines]
+    return [enrich_deadline_with_details(d, client=c, deadline_type=t) for d, c, t in deadlines]
 
 
 @router.get("/by-client/{client_id}", response_model=List[DeadlineDetailResponse])
+@query_budget(3)
 async def get_deadlines_by_client(
     client_id: int,
     include_inactive: bool = False,
@@ -243,19 +324,113 @@ async def get_deadlines_by_client(
             detail=f"Клиент с ID {client_id} не найден"
         )
     
-    query = db.query(Deadline)\
+    query = db.query(Deadline, User, DeadlineType)\
+        .outerjoin(User, Deadline.client_id == User.id)\
         .join(DeadlineType, Deadline.deadline_type_id == DeadlineType.id)\
         .filter(or_(Deadline.user_id == client_id, Deadline.client_id == client_id))
     
     if not include_inactive:
         query = query.filter(Deadline.status == 'active')
     
-    deadlines = query.order_by(Deadline.expiration_date).all()
+    deadlines = query.order_by(Deadline.expiration_date, Deadline.id).all()
+    
+    return [enrich_deadline_with_details(d, client=c, deadline_type=t) for d, c, t in deadlines]
+
+
+def _db_now(db: Session) -> datetime:
+    """Текущее время по часам БД (в тех же единицах, что и updated_at)"""
+    value = db.query(func.now()).scalar()
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.replace(tzinfo=None)
+
+
+@router.get("/changes")
+@query_budget(7)
+async def get_deadline_changes(
+    since: Optional[datetime] = Query(None, description="Изменения с этого момента (server_time прошлого ответа); без параметра - полная выгрузка"),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Компактная выгрузка для локальной копии данных в боте
+    
+    Без since - все активные дедлайны, клиенты, кассы и типы.
+    С since - только записи с updated_at >= since (дедлайны в любом статусе,
+    чтобы бот удалил закрытые). version - отпечаток множества активных
+    дедлайнов: при расхождении с локальной копией бот делает полную выгрузку
+    (так обнаруживаются физически удалённые дедлайны).
+    """
+    from ..models.cash_register import CashRegister
+    
+    server_time = _db_now(db)
+    
+    deadlines_query = db.query(
+        Deadline.id,
+        Deadline.client_id,
+        Deadline.deadline_type_id,
+        Deadline.cash_register_id,
+        Deadline.expiration_date,
+        Deadline.status
+    )
+    clients_query = db.query(
+        User.id,
+        User.company_name,
+        User.full_name,
+        User.inn,
+        User.email,
+        User.phone,
+        User.telegram_id,
+        User.is_active
+    ).filter(User.role == 'client')
+    registers_query = db.query(
+        CashRegister.id,
+        CashRegister.model,
+        CashRegister.factory_number,
+        CashRegister.register_name,
+        CashRegister.installation_address,
+        CashRegister.client_id
+    )
+    
+    if since is None:
+        deadlines_query = deadlines_query.filter(Deadline.status == 'active')
+    else:
+        deadlines_query = deadlines_query.filter(Deadline.updated_at >= since)
+        clients_query = clients_query.filter(User.updated_at >= since)
+        registers_query = registers_query.filter(CashRegister.updated_at >= since)
+    
+    active_count, id_sum = db.query(
+        func.count(Deadline.id),
+        func.coalesce(func.sum(Deadline.id), 0)
+    ).filter(Deadline.status == 'active').one()
     
-    return [enrich_deadline_with_details(d, db) for d in deadlines]
+    # Списки вместо словарей - ответ в несколько раз компактнее
+    return {
+        "full": since is None,
+        "server_time": server_time.isoformat(),
+        "version": {"active_count": active_count, "id_sum": int(id_sum)},
+        "deadlines": [
+            [r.id, r.client_id, r.deadline_type_id, r.cash_register_id, r.expiration_date.isoformat(), r.status]
+            for r in deadlines_query.all()
+        ],
+        "clients": [
+            [r.id, r.company_name, r.full_name, r.inn, r.email, r.phone, r.telegram_id, r.is_active]
+            for r in clients_query.all()
+        ],
+        "cash_registers": [
+            [r.id, r.model, r.factory_number, r.register_name, r.installation_address, r.client_id]
+            for r in registers_query.all()
+        ],
+        # Справочник типов небольшой и без updated_at - отдаётся целиком
+        "deadline_types": [
+            [r.id, r.type_name]
+            for r in db.query(DeadlineType.id, DeadlineType.type_name).all()
+        ]
+    }
 
 
 @router.get("/{deadline_id}", response_model=DeadlineDetailResponse)
+@query_budget(4)
 async def get_deadline(
     deadline_id: int,
     db: Session = Depends(get_db),
@@ -4,34 +4,20 @@ API endpoints для экспорта данных
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.orm import Session, contains_eager
 from typing import Optional, Literal
 from datetime import datetime
 import json
 import csv
 import io
 
-from ..dependencies import get_db
+from ..dependencies import get_db, get_current_user
+from ..query_budget import query_budget
 from ..models.user import User
 from ..models.client import Deadline, DeadlineType
-from ..services.auth_service import decode_token
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 router = APIRouter(prefix="/api/export", tags=["Export"])
-security = HTTPBearer()
-
-
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Получение текущего пользователя из JWT токена"""
-    token = credentials.credentials
-    payload = decode_token(token)
-    if not payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Неверный или истёкший токен",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    return payload
 
 
 def export_clients_to_json(clients: list) -> str:
@@ -145,6 +131,7 @@ def export_deadlines_to_csv(deadlines: list) -> str:
 
 
 @router.get("/clients")
+@query_budget(2)
 async def export_clients(
     format: Literal["json", "csv"] = Query("json", description="Формат экспорта"),
     is_active: Optional[bool] = Query(None, description="Фильтр по активности"),
@@ -193,6 +180,7 @@ async def export_clients(
 
 
 @router.get("/deadlines")
+@query_budget(2)
 async def export_deadlines(
     format: Literal["json", "csv"] = Query("json", description="Формат экспорта"),
     status: Optional[str] = Query(None, description="Фильтр по статусу"),
@@ -215,8 +203,11 @@ async def export_deadlines(
             detail="Недостаточно прав для экспорта данных"
         )
     
-    # Получение данных с JOIN
-    query = db.query(Deadline).join(User, Deadline.client_id == User.id).join(DeadlineType)
+    # Получение данных с JOIN (клиент и тип заполняются из той же выборки)
+    query = db.query(Deadline)\
+        .join(User, Deadline.client_id == User.id)\
+        .join(DeadlineType)\
+        .options(contains_eager(Deadline.client), contains_eager(Deadline.deadline_type))
     
     if status:
         query = query.filter(Deadline.status == status)
@@ -246,6 +237,7 @@ async def export_deadlines(
 
 
 @router.get("/statistics")
+@query_budget(9)
 async def export_statistics(
     format: Literal["json", "csv"] = Query("json", description="Формат экспорта"),
     db: Session = Depends(get_db),
@@ -304,15 +296,17 @@ async def export_statistics(
     stats['status_red'] = red_count
     stats['status_expired'] = expired_count
     
-    # Дедлайны по типам
-    deadline_types = db.query(DeadlineType).all()
-    stats['by_type'] = {}
-    for dt in deadline_types:
-        count = db.query(Deadline).filter(
-            Deadline.deadline_type_id == dt.id,
-            Deadline.status == 'active'
-        ).count()
-        stats['by_type'][dt.type_name] = count
+    # Дедлайны по типам (одним запросом с группировкой)
+    by_type = dict(
+        db.query(Deadline.deadline_type_id, func.count(Deadline.id))
+        .filter(Deadline.status == 'active')
+        .group_by(Deadline.deadline_type_id)
+        .all()
+    )
+    stats['by_type'] = {
+        dt.type_name: by_type.get(dt.id, 0)
+        for dt in db.query(DeadlineType).all()
+    }
     
     # Формирование ответа
     if format == "json":
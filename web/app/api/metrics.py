@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+"""
+API метрик веб-приложения в формате Prometheus
+"""
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from ..dependencies import require_admin
+from ..services.telemetry import load_snapshots, render_prometheus
+
+router = APIRouter(prefix="/api/metrics", tags=["Metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("", response_class=PlainTextResponse)
+def get_metrics(current_user: dict = Depends(require_admin)):
+    """
+    Метрики запросов всех воркеров: гистограммы длительности по маршрутам,
+    число и время SQL запросов, медленные запросы
+    Только для администраторов
+    """
+    return PlainTextResponse(render_prometheus(load_snapshots()), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -8,6 +8,7 @@ from typing import List
 from pydantic import BaseModel
 
 from ..dependencies import get_db
+from ..query_budget import query_budget
 from ..models import OFDProvider
 
 
@@ -29,6 +30,7 @@ class OFDProviderResponse(BaseModel):
 
 
 @router.get("/ofd-providers", response_model=List[OFDProviderResponse])
+@query_budget(1)
 async def get_ofd_providers(
     active_only: bool = True,
     db: Session = Depends(get_db)
@@ -54,6 +56,7 @@ async def get_ofd_providers(
 
 
 @router.get("/ofd-providers/{provider_id}", response_model=OFDProviderResponse)
+@query_budget(1)
 async def get_ofd_provider(
     provider_id: int,
     db: Session = Depends(get_db)
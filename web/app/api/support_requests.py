@@ -5,43 +5,14 @@ API endpoints для управления обращениями клиенто
 from datetime import datetime
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session, joinedload
 from pydantic import BaseModel, Field
-import jwt
-from jwt.exceptions import InvalidTokenError
 
-from ..dependencies import get_db
-from ..config import settings
+from ..dependencies import get_db, get_current_user
+from ..query_budget import query_budget
 from backend.models import SupportRequest, User
 
 router = APIRouter(prefix="/api/support-requests", tags=["support_requests"])
-security = HTTPBearer()
-
-
-# Функция проверки токена аутентификации
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """
-    Проверка JWT токена и получение текущего пользователя
-    """
-    token = credentials.credentials
-    try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        username: str = payload.get("sub")
-        if username is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Не удалось валидировать токен"
-            )
-    except InvalidTokenError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Не удалось валидировать токен"
-        )
-    
-    # Здесь возвращаем объект с ролью для проверки прав
-    # В реальности нужно загружать пользователя из БД
-    return {"username": username, "role": payload.get("role", "viewer")}
 
 
 # Pydantic схемы
@@ -83,6 +54,7 @@ class SupportRequestResponse(SupportRequestBase):
 
 
 @router.get("/", response_model=List[SupportRequestResponse])
+@query_budget(2)
 async def get_support_requests(
     status_filter: Optional[str] = Query(None, description="Фильтр по статусу"),
     client_id: Optional[int] = Query(None, description="Фильтр по клиенту"),
@@ -145,6 +117,7 @@ async def get_support_requests(
 
 
 @router.get("/{request_id}", response_model=SupportRequestResponse)
+@query_budget(2)
 async def get_support_request(
     request_id: int,
     db: Session = Depends(get_db),
@@ -294,6 +267,7 @@ async def delete_support_request(
 
 
 @router.get("/stats/summary")
+@query_budget(6)
 async def get_support_stats(
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
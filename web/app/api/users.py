@@ -3,18 +3,20 @@
 API endpoints для управления унифицированными пользователями
 (клиенты, менеджеры, администраторы)
 """
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import or_
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime, timedelta
 import math
 import secrets
 import string
 
-from ..dependencies import get_db
+from ..dependencies import get_db, get_current_user, invalidate_user_auth, require_admin, require_roles
+from ..query_budget import query_budget
 from ..models.user import User
-from ..models.client import Deadline
+from ..models.client import Deadline, DeadlineType
 from ..models.cash_register import CashRegister
 from ..models.user_schemas import (
     UserCreateByAdmin,
@@ -27,48 +29,35 @@ from ..models.user_schemas import (
     TelegramRegistrationResponse
 )
 from ..models.schemas import MessageResponse
-from ..services.auth_service import get_password_hash, decode_token, create_access_token
+from ..responses import FastJSONResponse
+from ..services.auth_service import get_password_hash_async, create_access_token
 from ..services.email_service import EmailService
 from ..services.env_manager import env_manager
 from ..config import settings
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from bot.services.render_cache import RenderCache, client_data_version
 
 router = APIRouter(prefix="/api/users", tags=["Users"])
-security = HTTPBearer()
-email_service = EmailService()
-
-
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Получение текущего пользователя из JWT токена"""
-    token = credentials.credentials
-    payload = decode_token(token)
-    if not payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Неверный или истёкший токен",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    return payload
+logger = logging.getLogger(__name__)
 
+# Готовые сообщения "текущие дедлайны" по клиентам (см. send_deadlines_to_telegram)
+_deadlines_message_cache = RenderCache()
+email_service = EmailService()
 
-def check_admin_or_manager_role(current_user: dict = Depends(get_current_user)):
-    """Проверка прав администратора или менеджера"""
-    if current_user.get('role') not in ['admin', 'manager']:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Недостаточно прав для управления пользователями"
-        )
-    return current_user
+# Колонки пользователя в порядке полей UserResponse (списки без загрузки объектов User)
+USER_RESPONSE_COLUMNS = (
+    User.id, User.username, User.email, User.full_name, User.role,
+    User.phone, User.address, User.notes,
+    User.inn, User.company_name,
+    User.telegram_id, User.telegram_username, User.first_name, User.last_name,
+    User.notification_days, User.notifications_enabled,
+    User.is_active, User.registered_at, User.last_interaction, User.last_login,
+    User.created_at, User.updated_at
+)
 
 
-def check_admin_role(current_user: dict = Depends(get_current_user)):
-    """Проверка прав администратора"""
-    if current_user.get('role') != 'admin':
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Только администратор может выполнять это действие"
-        )
-    return current_user
+# Проверки ролей (общие зависимости из dependencies)
+check_admin_or_manager_role = require_roles('admin', 'manager', detail="Недостаточно прав для управления пользователями")
+check_admin_role = require_admin
 
 
 def generate_registration_code(length: int = 6) -> str:
@@ -78,6 +67,7 @@ def generate_registration_code(length: int = 6) -> str:
 
 
 @router.get("", response_model=UserListResponse)
+@query_budget(3)
 async def get_users(
     page: int = Query(1, ge=1, description="Номер страницы"),
     page_size: int = Query(50, ge=1, le=100, description="Количество записей на странице"),
@@ -123,30 +113,35 @@ async def get_users(
     # Подсчёт общего количества
     total = query.count()
     
-    # Пагинация
+    # Пагинация: колонки UserResponse и флаг has_password, строки в словари
+    # без повторной проверки через UserResponse
     offset = (page - 1) * page_size
-    users = query.order_by(User.full_name).offset(offset).limit(page_size).all()
-    
-    # Добавление флага has_password
-    users_with_flag = []
-    for user in users:
-        user_dict = UserResponse.model_validate(user).model_dump()
-        user_dict['has_password'] = user.password_hash is not None
-        users_with_flag.append(UserResponse(**user_dict))
+    rows = query.with_entities(
+        *USER_RESPONSE_COLUMNS,
+        User.password_hash.isnot(None).label('has_password')
+    ).order_by(User.full_name).offset(offset).limit(page_size).all()
+    
+    users = []
+    for row in rows:
+        user_dict = row._asdict()
+        user_dict['notifications_enabled'] = user_dict['notifications_enabled'] is not False
+        user_dict['has_password'] = bool(user_dict['has_password'])
+        users.append(user_dict)
     
     # Расчёт количества страниц
     total_pages = math.ceil(total / page_size) if total > 0 else 1
     
-    return UserListResponse(
-        total=total,
-        users=users_with_flag,
-        page=page,
-        page_size=page_size,
-        total_pages=total_pages
-    )
+    return FastJSONResponse({
+        "total": total,
+        "users": users,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": total_pages
+    })
 
 
 @router.get("/{user_id}", response_model=UserResponse)
+@query_budget(2)
 async def get_user(
     user_id: int,
     db: Session = Depends(get_db),
@@ -218,7 +213,7 @@ async def create_user(
     
     # Установка пароля если предоставлен
     if user_data.password:
-        user_dict['password_hash'] = get_password_hash(user_data.password)
+        user_dict['password_hash'] = await get_password_hash_async(user_data.password)
     else:
         user_dict['password_hash'] = None
     
@@ -257,11 +252,11 @@ async def create_user(
             if success:
                 # Перезапускаем бота для применения изменений
                 env_manager.restart_bot_service()
-                print(f"✅ Telegram ID {user_data.telegram_id} добавлен в .env для пользователя {new_user.full_name}")
+                logger.info(f"✅ Telegram ID {user_data.telegram_id} добавлен в .env для пользователя {new_user.full_name}")
             else:
-                print(f"⚠️  Не удалось добавить Telegram ID {user_data.telegram_id} в .env")
+                logger.warning(f"⚠️  Не удалось добавить Telegram ID {user_data.telegram_id} в .env")
         except Exception as e:
-            print(f"❌ Ошибка при добавлении Telegram ID в .env: {e}")
+            logger.error(f"❌ Ошибка при добавлении Telegram ID в .env: {e}")
             # Не прерываем создание пользователя из-за ошибки .env
     
     # Отправка email-приглашения если не установлен пароль
@@ -322,7 +317,7 @@ async def update_user(
     
     # Обработка смены пароля
     if 'password' in update_data and update_data['password']:
-        update_data['password_hash'] = get_password_hash(update_data['password'])
+        update_data['password_hash'] = await get_password_hash_async(update_data['password'])
         del update_data['password']
     
     # Проверка уникальности email при изменении
@@ -368,6 +363,10 @@ async def update_user(
     db.commit()
     db.refresh(user)
     
+    # Смена пароля, роли или активности отзывает выданные токены
+    if update_data.keys() & {'password_hash', 'role', 'is_active'}:
+        invalidate_user_auth(user.id)
+    
     return MessageResponse(
         message=f"Пользователь '{user.full_name}' успешно обновлён",
         id=user.id
@@ -412,9 +411,10 @@ async def toggle_user_status(
         for deadline in deadlines_to_delete:
             db.delete(deadline)
         
-        print(f"[ДЕАКТИВАЦИЯ КЛИЕНТА] Клиент ID={user_id}: физически удалено {deleted_count} дедлайнов")
+        logger.info(f"[ДЕАКТИВАЦИЯ КЛИЕНТА] Клиент ID={user_id}: физически удалено {deleted_count} дедлайнов")
     
     db.commit()
+    invalidate_user_auth(user.id)
     
     status_text = "активирован" if user.is_active else "деактивирован"
     return MessageResponse(
@@ -462,7 +462,7 @@ async def delete_user(
         deleted_deadlines_count = len(deadlines_to_delete)
         for deadline in deadlines_to_delete:
             db.delete(deadline)
-        print(f"[УДАЛЕНИЕ ПОЛЬЗОВАТЕЛЯ] Пользователь ID={user_id}: физически удалено {deleted_deadlines_count} дедлайнов")
+        logger.info(f"[УДАЛЕНИЕ ПОЛЬЗОВАТЕЛЯ] Пользователь ID={user_id}: физически удалено {deleted_deadlines_count} дедлайнов")
     
     # 2. Удаляем все кассы (если клиент)
     if user.role == 'client':
@@ -472,13 +472,14 @@ async def delete_user(
         deleted_cash_count = len(cash_registers_to_delete)
         for cash_register in cash_registers_to_delete:
             db.delete(cash_register)
-        print(f"[УДАЛЕНИЕ ПОЛЬЗОВАТЕЛЯ] Пользователь ID={user_id}: физически удалено {deleted_cash_count} касс")
+        logger.info(f"[УДАЛЕНИЕ ПОЛЬЗОВАТЕЛЯ] Пользователь ID={user_id}: физически удалено {deleted_cash_count} касс")
     
     # 3. ФИЗИЧЕСКИ УДАЛЯЕМ пользователя
     db.delete(user)
     db.commit()
+    invalidate_user_auth(user_id)
     
-    print(f"[УДАЛЕНИЕ ПОЛЬЗОВАТЕЛЯ] ✅ Пользователь ID={user_id} ({user_full_name}) физически удалён из БД")
+    logger.info(f"[УДАЛЕНИЕ ПОЛЬЗОВАТЕЛЯ] ✅ Пользователь ID={user_id} ({user_full_name}) физически удалён из БД")
     
     # 4. Если это администратор/менеджер с Telegram ID - удаляем из .env
     if user_role in ['admin', 'manager'] and user_telegram_id:
@@ -487,11 +488,11 @@ async def delete_user(
             if success:
                 # Перезапускаем бота для применения изменений
                 env_manager.restart_bot_service()
-                print(f"✅ Telegram ID {user_telegram_id} удалён из .env после удаления пользователя {user_full_name}")
+                logger.info(f"✅ Telegram ID {user_telegram_id} удалён из .env после удаления пользователя {user_full_name}")
             else:
-                print(f"⚠️  Не удалось удалить Telegram ID {user_telegram_id} из .env")
+                logger.warning(f"⚠️  Не удалось удалить Telegram ID {user_telegram_id} из .env")
         except Exception as e:
-            print(f"❌ Ошибка при удалении Telegram ID из .env: {e}")
+            logger.error(f"❌ Ошибка при удалении Telegram ID из .env: {e}")
     
     return MessageResponse(
         message=f"Пользователь '{user_full_name}' физически удалён"
@@ -696,6 +697,7 @@ async def register_telegram(
 
 
 @router.get("/{user_id}/full-details")
+@query_budget(4)
 async def get_user_full_details(
     user_id: int,
     db: Session = Depends(get_db),
@@ -720,8 +722,16 @@ async def get_user_full_details(
         CashRegister.is_active == True
     ).order_by(CashRegister.factory_number).all()
     
-    # Получить дедлайны
-    deadlines = db.query(Deadline).filter(
+    # Получить дедлайны (название типа - в том же запросе)
+    deadlines = db.query(
+        Deadline.id,
+        Deadline.expiration_date,
+        Deadline.notes,
+        Deadline.cash_register_id,
+        DeadlineType.type_name
+    ).outerjoin(
+        DeadlineType, Deadline.deadline_type_id == DeadlineType.id
+    ).filter(
         Deadline.client_id == user_id,
         Deadline.status == 'active'
     ).order_by(Deadline.expiration_date).all()
@@ -749,7 +759,7 @@ async def get_user_full_details(
         
         deadline_data = {
             "id": deadline.id,
-            "deadline_type_name": deadline.deadline_type.type_name if deadline.deadline_type else "Неизвестно",
+            "deadline_type_name": deadline.type_name or "Неизвестно",
             "expiration_date": deadline.expiration_date,
             "days_until_expiration": days_diff,
             "status_color": status_color,
@@ -776,8 +786,8 @@ async def get_user_full_details(
             deadline_data["deadline_id"] = deadline.id
             general_deadlines.append(deadline_data)
     
-    # Формирование ответа
-    return {
+    # Формирование ответа (словари сериализуются напрямую, без jsonable_encoder)
+    return FastJSONResponse({
         "id": user.id,
         "name": user.company_name or user.full_name,
         "inn": user.inn,
@@ -810,58 +820,28 @@ async def get_user_full_details(
         ],
         "register_deadlines": register_deadlines,
         "general_deadlines": general_deadlines
-    }
+    })
 
 
-@router.post("/{user_id}/send-deadlines-telegram", response_model=MessageResponse)
-async def send_deadlines_to_telegram(
-    user_id: int,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(check_admin_or_manager_role)
-):
-    """
-    Отправить текущие дедлайны клиента в Telegram
-    Доступно только для администраторов и менеджеров
+def _format_deadlines_pages(user: User, deadlines, sender: str) -> List[str]:
     """
-    from datetime import date
-    import os
-    import sys
-    
-    # Проверяем существование пользователя
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Пользователь с ID {user_id} не найден"
-        )
-    
-    # Проверяем, что это клиент
-    if user.role != 'client':
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Отправка дедлайнов доступна только для клиентов"
-        )
+    Форматирование текущих дедлайнов клиента для Telegram
     
-    # Проверяем наличие Telegram ID
-    if not user.telegram_id:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Клиент {user.company_name or user.full_name} не подключен к Telegram"
-        )
+    Список разбивается на страницы по DEADLINES_PAGE_SIZE дедлайнов, как в
+    боте: каждая страница - отдельное сообщение не длиннее лимита Telegram
     
-    # Получаем активные дедлайны клиента
-    deadlines = db.query(Deadline).filter(
-        Deadline.client_id == user_id,
-        Deadline.status == 'active'
-    ).order_by(Deadline.expiration_date).all()
+    Args:
+        user: Клиент
+        deadlines: Активные дедлайны с загруженными типами и кассами
+        sender: Имя сотрудника, отправившего список
     
-    if not deadlines:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"У клиента {user.company_name or user.full_name} нет активных дедлайнов"
-        )
+    Returns:
+        List[str]: HTML сообщения
+    """
+    from datetime import date
+    from bot.services.formatter import format_deadline_page
+    from bot.services.pagination import DEADLINES_PAGE_SIZE
     
-    # Формируем список дедлайнов для отправки
     today = date.today()
     deadlines_data = []
     
@@ -899,14 +879,93 @@ async def send_deadlines_to_telegram(
         
         deadlines_data.append(deadline_info)
     
+    title = f"📄 Ваши текущие дедлайны ({len(deadlines_data)})"
+    status_counts = {}
+    for deadline_info in deadlines_data:
+        status_counts[deadline_info['status']] = status_counts.get(deadline_info['status'], 0) + 1
+    total_pages = math.ceil(len(deadlines_data) / DEADLINES_PAGE_SIZE)
+    
+    return [
+        format_deadline_page(
+            deadlines_data[offset:offset + DEADLINES_PAGE_SIZE],
+            title=title,
+            page=page,
+            total_pages=total_pages,
+            total=len(deadlines_data),
+            status_counts=status_counts,
+            offset=offset,
+            hint=f"ℹ️ <i>Отправлено {sender}</i>"
+        )
+        for page, offset in enumerate(range(0, len(deadlines_data), DEADLINES_PAGE_SIZE), 1)
+    ]
+
+
+@router.post("/{user_id}/send-deadlines-telegram", response_model=MessageResponse)
+async def send_deadlines_to_telegram(
+    user_id: int,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(check_admin_or_manager_role)
+):
+    """
+    Отправить текущие дедлайны клиента в Telegram
+    Доступно только для администраторов и менеджеров
+    """
+    import os
+    import sys
+    
+    # Проверяем существование пользователя
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Пользователь с ID {user_id} не найден"
+        )
+    
+    # Проверяем, что это клиент
+    if user.role != 'client':
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Отправка дедлайнов доступна только для клиентов"
+        )
+    
+    # Проверяем наличие Telegram ID
+    if not user.telegram_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Клиент {user.company_name or user.full_name} не подключен к Telegram"
+        )
+    
     # Добавляем путь к bot в sys.path для импорта
     project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
     if project_root not in sys.path:
         sys.path.insert(0, project_root)
     
+    # Готовые страницы из кэша, пока данные клиента не менялись
+    sender = current_user.get('full_name', 'администратором')
+    version = client_data_version(db, user_id)
+    pages = _deadlines_message_cache.get(user_id, version, ('telegram', sender))
+    
+    if pages is None:
+        # Активные дедлайны клиента вместе с типами и кассами одним запросом
+        deadlines = db.query(Deadline).options(
+            joinedload(Deadline.deadline_type),
+            joinedload(Deadline.cash_register)
+        ).filter(
+            Deadline.client_id == user_id,
+            Deadline.status == 'active'
+        ).order_by(Deadline.expiration_date).all()
+        
+        if not deadlines:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"У клиента {user.company_name or user.full_name} нет активных дедлайнов"
+            )
+        
+        pages = _format_deadlines_pages(user, deadlines, sender)
+        _deadlines_message_cache.put(user_id, version, ('telegram', sender), pages)
+    
     try:
         # Импортируем сервисы бота
-        from bot.services.formatter import format_deadline_list
         from bot.services.notifier import send_notification
         from aiogram import Bot
         from bot.config import settings as bot_settings
@@ -914,27 +973,27 @@ async def send_deadlines_to_telegram(
         # Создаем экземпляр бота
         bot = Bot(token=bot_settings.telegram_bot_token)
         
-        # Форматируем сообщение
-        title = f"📄 Ваши текущие дедлайны ({len(deadlines_data)})"
-        message = format_deadline_list(deadlines_data, title=title)
-        message += f"\n\nℹ️ <i>Отправлено {current_user.get('full_name', 'администратором')}</i>"
-        
-        # Отправляем уведомление
-        success = await send_notification(bot, int(user.telegram_id), message)
-        
-        # Закрываем бота
-        await bot.session.close()
+        # Отправляем страницы по порядку, на первой ошибке останавливаемся
+        try:
+            sent = 0
+            for page in pages:
+                if not await send_notification(bot, int(user.telegram_id), page):
+                    break
+                sent += 1
+        finally:
+            # Закрываем бота
+            await bot.session.close()
         
-        if success:
+        if sent == len(pages):
             return MessageResponse(
                 message=f"Дедлайны успешно отправлены клиенту {user.company_name or user.full_name} в Telegram"
             )
         else:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Не удалось отправить сообщение в Telegram"
+                detail=f"Не удалось отправить сообщение в Telegram (отправлено страниц: {sent} из {len(pages)})"
             )
-            
+    
     except ImportError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -15,6 +15,46 @@ class WebSettings:
     algorithm: str = os.getenv("JWT_ALGORITHM", "HS256")
     access_token_expire_minutes: int = int(os.getenv("JWT_EXPIRATION_HOURS", "8")) * 60  # Конвертируем часы в минуты
     
+    # Кэш аутентификации: проверенные токены (до exp) и строки пользователей
+    auth_claims_cache_size: int = int(os.getenv("AUTH_CLAIMS_CACHE_SIZE", "10000"))
+    auth_user_cache_ttl: float = float(os.getenv("AUTH_USER_CACHE_TTL", "30"))  # секунды
+    
+    # Пароли: cost bcrypt, потоки для bcrypt, лимит попыток входа на пользователя
+    bcrypt_rounds: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    bcrypt_max_workers: int = int(os.getenv("BCRYPT_MAX_WORKERS", "2"))
+    login_rate_limit: int = int(os.getenv("LOGIN_RATE_LIMIT", "10"))
+    login_rate_window: float = float(os.getenv("LOGIN_RATE_WINDOW", "60"))  # секунды
+    
+    # Статика: max-age для HTML и файлов без отпечатка, период проверки изменений исходников
+    static_html_max_age: int = int(os.getenv("STATIC_HTML_MAX_AGE", "0"))  # секунды
+    static_assets_check_interval: float = float(os.getenv("STATIC_ASSETS_CHECK_INTERVAL", "2"))  # секунды
+    
+    # Сжатие ответов API: минимальный размер (байт) и уровень gzip
+    gzip_minimum_size: int = int(os.getenv("GZIP_MINIMUM_SIZE", "1024"))
+    gzip_level: int = int(os.getenv("GZIP_LEVEL", "6"))
+    
+    # Телеметрия: порог медленного SQL (мс), каталог снимков метрик воркеров, период сохранения (сек)
+    slow_query_threshold_ms: float = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+    metrics_dir: str = os.getenv("METRICS_DIR", "logs/metrics")
+    metrics_flush_interval: float = float(os.getenv("METRICS_FLUSH_INTERVAL", "10"))
+    
+    # Планировщик (автобэкапы, снимки статистики): работает в одном процессе - лидере.
+    # SCHEDULER_ENABLED=false - воркеры не участвуют, планировщик запускается отдельно
+    # (python -m web.app.services.backup_scheduler)
+    scheduler_enabled: bool = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+    scheduler_lock_file: str = os.getenv("SCHEDULER_LOCK_FILE", "logs/scheduler.lock")  # только SQLite
+    scheduler_leader_check_interval: float = float(os.getenv("SCHEDULER_LEADER_CHECK_INTERVAL", "30"))  # секунды
+    # Пропущенный за время остановки автобэкап выполняется один раз после запуска
+    backup_catch_up: bool = os.getenv("BACKUP_CATCH_UP", "true").lower() == "true"
+    
+    # Бэкапы: уровень сжатия кусков хранилища (zlib/zstd), потоки pg_restore,
+    # страниц SQLite за шаг онлайн-бэкапа
+    backup_compression_level: int = int(os.getenv("BACKUP_COMPRESSION_LEVEL", "6"))
+    backup_restore_jobs: int = int(os.getenv("BACKUP_RESTORE_JOBS", "4"))
+    backup_sqlite_step_pages: int = int(os.getenv("BACKUP_SQLITE_STEP_PAGES", "1024"))
+    # Период проверки контрольных сумм бэкапов каталога (часы, 0 - не проверять)
+    backup_verify_interval_hours: float = float(os.getenv("BACKUP_VERIFY_INTERVAL_HOURS", "24"))
+    
     # База данных
     database_url: str = os.getenv("DATABASE_URL", "sqlite:///database/kkt_services.db")
     
@@ -1,10 +1,38 @@
 # -*- coding: utf-8 -*-
 """
 Dependency Injection для FastAPI
+
+Аутентификация общая для всех роутеров: подпись JWT проверяется один раз,
+проверенные claims хранятся по хешу токена до его exp. Строка пользователя
+кэшируется на короткое время (AUTH_USER_CACHE_TTL) - по ней токен
+отзывается после деактивации, смены роли или пароля, в том числе в других
+процессах. В этом процессе invalidate_user_auth() сбрасывает кэш сразу.
+Если токен не совпадает со строкой из кэша, строка перечитывается из БД:
+токен, выпущенный другим процессом после смены пароля или роли, не
+отзывается по устаревшему кэшу.
 """
-from typing import Generator
+import hashlib
+import time
+from typing import Dict, Generator, Optional, Set, Tuple
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from .config import settings
 from .database import SessionLocal
+from .models.user import User
+from .services.auth_service import decode_token, password_fingerprint
+
+security = HTTPBearer()
+
+# sha256 токена -> (exp, claims)
+_claims_cache: Dict[str, Tuple[float, dict]] = {}
+# ID пользователя -> хеши его токенов в кэше
+_user_tokens: Dict[int, Set[str]] = {}
+# ID пользователя -> (момент устаревания, отсоединённая строка User или None)
+_user_cache: Dict[int, Tuple[float, Optional[User]]] = {}
 
 
 def get_db() -> Generator:
@@ -13,4 +41,192 @@ def get_db() -> Generator:
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _verify_token(token: str) -> Tuple[str, dict]:
+    """Claims токена из кэша или после проверки подписи"""
+    token_hash = hashlib.sha256(token.encode('utf-8')).hexdigest()
+    now = time.time()
+
+    cached = _claims_cache.get(token_hash)
+    if cached is not None:
+        if cached[0] > now:
+            return token_hash, cached[1]
+        _drop_token(token_hash)
+
+    payload = decode_token(token)
+    # Токены активации и сброса пароля (type) не дают доступа к API
+    if not payload or payload.get('type') or not str(payload.get('sub', '')).isdigit():
+        raise _unauthorized("Неверный или истёкший токен")
+
+    if len(_claims_cache) >= settings.auth_claims_cache_size:
+        for expired in [key for key, (exp, _) in _claims_cache.items() if exp <= now]:
+            _drop_token(expired)
+        if len(_claims_cache) >= settings.auth_claims_cache_size:
+            _drop_token(next(iter(_claims_cache)))
+
+    _claims_cache[token_hash] = (float(payload['exp']), payload)
+    _user_tokens.setdefault(int(payload['sub']), set()).add(token_hash)
+    return token_hash, payload
+
+
+def _drop_token(token_hash: str):
+    entry = _claims_cache.pop(token_hash, None)
+    if entry is not None:
+        tokens = _user_tokens.get(int(entry[1]['sub']))
+        if tokens is not None:
+            tokens.discard(token_hash)
+            if not tokens:
+                _user_tokens.pop(int(entry[1]['sub']), None)
+
+
+def _load_user(user_id: int) -> Optional[User]:
+    """Строка пользователя, отсоединённая от сессии (выполняется в пуле потоков)"""
+    db = SessionLocal()
+    try:
+        user = db.get(User, user_id)
+        if user is not None:
+            db.expunge(user)
+        return user
+    finally:
+        db.close()
+
+
+async def _get_user_row(user_id: int, refresh: bool = False) -> Tuple[Optional[User], bool]:
+    """
+    Строка пользователя из кэша или из БД
+
+    Args:
+        user_id: ID пользователя
+        refresh: Загрузить из БД, минуя кэш
+
+    Returns:
+        Tuple[Optional[User], bool]: Строка и признак, что она из кэша
+    """
+    cached = _user_cache.get(user_id)
+    if not refresh and cached is not None and cached[0] > time.monotonic():
+        return cached[1], True
+
+    user = await run_in_threadpool(_load_user, user_id)
+    _user_cache[user_id] = (time.monotonic() + settings.auth_user_cache_ttl, user)
+    return user, False
+
+
+def _is_revoked(claims: dict, user: Optional[User]) -> bool:
+    """Токен не соответствует строке пользователя (удалён, деактивирован, сменил роль или пароль)"""
+    fingerprint = claims.get('pwh')
+    return (
+        user is None
+        or not user.is_active
+        or user.role != claims.get('role')
+        or (fingerprint is not None and fingerprint != password_fingerprint(user.password_hash))
+    )
+
+
+async def _authenticate(credentials: HTTPAuthorizationCredentials) -> Tuple[dict, User]:
+    token_hash, claims = _verify_token(credentials.credentials)
+    user_id = int(claims['sub'])
+    user, from_cache = await _get_user_row(user_id)
+
+    if _is_revoked(claims, user) and from_cache:
+        # Строка в кэше могла устареть: пароль или роль сменили в другом
+        # процессе, и новый токен выпущен по свежей строке
+        user, _ = await _get_user_row(user_id, refresh=True)
+
+    if _is_revoked(claims, user):
+        _drop_token(token_hash)
+        raise _unauthorized("Токен отозван: войдите заново")
+
+    return claims, user
+
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+    """
+    Claims JWT текущего пользователя (sub, username, role, exp)
+
+    Returns:
+        dict: Claims токена (не изменять - объект общий для запросов с этим токеном)
+    """
+    claims, _ = await _authenticate(credentials)
+    return claims
+
+
+async def get_current_user_model(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
+    """
+    Строка User текущего пользователя из кэша (отсоединена от сессии,
+    связи не загружаются - для изменений загрузите пользователя в своей сессии)
+
+    Returns:
+        User: Пользователь
+    """
+    _, user = await _authenticate(credentials)
+    return user
+
+
+def require_roles(*roles: str, detail: str = "Недостаточно прав для выполнения действия"):
+    """
+    Зависимость, пропускающая только указанные роли
+
+    Args:
+        *roles: Допустимые роли
+        detail: Текст ошибки 403
+
+    Returns:
+        Зависимость FastAPI, возвращающая claims текущего пользователя
+    """
+    async def dependency(current_user: dict = Depends(get_current_user)) -> dict:
+        if current_user.get('role') not in roles:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+        return current_user
+
+    return dependency
+
+
+require_admin = require_roles('admin', detail="Только администратор может выполнять это действие")
+require_admin_or_manager = require_roles('admin', 'manager')
+
+
+def invalidate_user_auth(user_id: int):
+    """
+    Сброс кэша аутентификации пользователя: вызывать после смены пароля,
+    роли, деактивации или удаления
+
+    Args:
+        user_id: ID пользователя
+    """
+    _user_cache.pop(user_id, None)
+    for token_hash in list(_user_tokens.get(user_id, ())):
+        _drop_token(token_hash)
+
+
+def get_auth_cache_metrics() -> Dict[str, int]:
+    """
+    Размер кэшей аутентификации
+
+    Returns:
+        Dict: tokens, users
+    """
+    return {'tokens': len(_claims_cache), 'users': len(_user_cache)}
+
+
+# Экспорт
+__all__ = [
+    'get_db',
+    'security',
+    'get_current_user',
+    'get_current_user_model',
+    'require_roles',
+    'require_admin',
+    'require_admin_or_manager',
+    'invalidate_user_auth',
+    'get_auth_cache_metrics'
+]
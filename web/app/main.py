@@ -4,21 +4,23 @@
 """
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from fastapi.responses import RedirectResponse
 import logging
 import os
+import uuid
 from starlette.middleware.base import BaseHTTPMiddleware
 
+from backend.logging_config import setup_logging, shutdown_logging, request_id_var
+
 # ОТНОСИТЕЛЬНЫЕ ИМПОРТЫ
 from .config import settings
-from .api import auth, clients, deadline_types, deadlines, dashboard, export, users, cash_registers, ofd_providers, database_management, support_requests
+from .middleware.compression import SelectiveGZipMiddleware
+from .middleware.telemetry import TelemetryMiddleware
+from .responses import FastJSONResponse
+from .services.static_assets import FingerprintedStaticFiles
+from .services.telemetry import install_sql_hooks, start_snapshot_flusher, stop_snapshot_flusher
+from .api import auth, clients, deadline_types, deadlines, dashboard, export, users, cash_registers, ofd_providers, database_management, support_requests, broadcasts, metrics
 
-# Настройка логирования
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 # Создание приложения FastAPI
@@ -27,7 +29,8 @@ app = FastAPI(
     description="Система управления дедлайнами истечения услуг ККТ",
     version="1.0.0",
     docs_url="/api/docs",
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    default_response_class=FastJSONResponse
 )
 
 # CORS middleware
@@ -39,18 +42,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Middleware для отключения кеша статических файлов
-class NoCacheMiddleware(BaseHTTPMiddleware):
+# Middleware идентификатора запроса: X-Request-ID попадает во все записи логов запроса
+class RequestIdMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-        # Отключаем кеш для всех статических файлов
-        if request.url.path.startswith("/static/"):
-            response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate, max-age=0"
-            response.headers["Pragma"] = "no-cache"
-            response.headers["Expires"] = "0"
+        request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex[:16]
+        token = request_id_var.set(request_id)
+        try:
+            response = await call_next(request)
+        finally:
+            request_id_var.reset(token)
+        response.headers["X-Request-ID"] = request_id
         return response
 
-app.add_middleware(NoCacheMiddleware)
+app.add_middleware(RequestIdMiddleware)
+
+# Сжатие ответов API больше порога (статика и бэкапы уже сжаты)
+app.add_middleware(
+    SelectiveGZipMiddleware,
+    minimum_size=settings.gzip_minimum_size,
+    compresslevel=settings.gzip_level
+)
+
+# Телеметрия (внешний слой): длительность, SQL запросы по маршрутам, Server-Timing
+install_sql_hooks()
+app.add_middleware(TelemetryMiddleware)
 
 # Подключение роутеров API
 app.include_router(auth.router)
@@ -64,14 +79,16 @@ app.include_router(cash_registers.router)
 app.include_router(ofd_providers.router)
 app.include_router(database_management.router)
 app.include_router(support_requests.router)
+app.include_router(broadcasts.router)
+app.include_router(metrics.router)
 
 # Путь к статическим файлам
 STATIC_DIR = os.path.join(os.path.dirname(__file__), "static")
 
 # Проверка существования директории static
 if os.path.exists(STATIC_DIR):
-    app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
-    logger.info(f"📁 Статические файлы подключены: {STATIC_DIR}")
+    # JS/CSS с отпечатком содержимого кэшируются на год, HTML - с проверкой по ETag
+    app.mount("/static", FingerprintedStaticFiles(directory=STATIC_DIR), name="static")
 else:
     logger.warning(f"⚠️ Директория static не найдена: {STATIC_DIR}")
 
@@ -79,7 +96,12 @@ else:
 @app.on_event("startup")
 async def startup_event():
     """Действия при запуске приложения"""
+    # Логирование (logs/web.log и консоль - в отдельном потоке). Воркеры
+    # uvicorn пишут в один файл, его ротирует logrotate
+    setup_logging('web', 'web.log', shared=True)
+
     logger.info("🚀 FastAPI приложение запущено!")
+    logger.info(f"📁 Статические файлы: {STATIC_DIR}")
     logger.info(f"📊 База данных: {settings.database_url}")
     logger.info(f"🌐 CORS origins: {settings.cors_origins}")
     logger.info(f"🔐 JWT срок действия: {settings.access_token_expire_minutes} минут")
@@ -95,11 +117,16 @@ async def startup_event():
     logger.info(f"  - /api/export (Data Export)")
     logger.info(f"  - /api/database (Database Management)")
     logger.info(f"  - /api/support-requests (Support Requests)")
+    logger.info(f"  - /api/broadcasts (Broadcasts)")
+    logger.info(f"  - /api/metrics (Metrics)")
     
-    # Инициализация планировщика автобэкапов
+    # Снимки метрик воркера для /api/metrics
+    start_snapshot_flusher()
+    
+    # Планировщик автобэкапов и снимков статистики - только в процессе-лидере
     try:
-        from .services.backup_scheduler import init_scheduler
-        init_scheduler()
+        from .services.backup_scheduler import start_scheduler_leadership
+        start_scheduler_leadership()
     except Exception as e:
         logger.error(f"⚠️ Ошибка инициализации планировщика автобэкапов: {e}")
 
@@ -107,14 +134,17 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """Действия при остановке приложения"""
+    stop_snapshot_flusher()
+    
     # Остановка планировщика
     try:
-        from .services.backup_scheduler import shutdown_scheduler
-        shutdown_scheduler()
+        from .services.backup_scheduler import stop_scheduler_leadership
+        await stop_scheduler_leadership()
     except Exception as e:
         logger.error(f"⚠️ Ошибка остановки планировщика: {e}")
     
     logger.info("🛑 FastAPI приложение остановлено")
+    shutdown_logging()
 
 
 @app.get("/", response_class=RedirectResponse)
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""
+Сжатие ответов API
+
+GZipMiddleware Starlette для ответов больше порога, кроме путей, которые
+уже отдаются сжатыми: статика (готовые .gz варианты) и файлы бэкапов.
+"""
+from typing import Sequence
+
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Пути, ответы которых не сжимаются повторно
+DEFAULT_EXCLUDE_PATHS = ("/static/", "/api/database/backup/")
+
+
+class SelectiveGZipMiddleware:
+    """GZip для ответов от minimum_size байт, кроме путей из exclude_paths"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        compresslevel: int = 6,
+        exclude_paths: Sequence[str] = DEFAULT_EXCLUDE_PATHS
+    ):
+        self.app = app
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.exclude_paths = tuple(exclude_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+        await self.gzip(scope, receive, send)
+
+
+# Экспорт
+__all__ = ['SelectiveGZipMiddleware']
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Телеметрия HTTP запросов
+
+Длительность запроса, число запросов к БД и их время по маршрутам
+(services/telemetry). В ответ добавляется Server-Timing: db - время SQL,
+app - время до начала ответа, их видно во вкладке Network браузера.
+Превышение бюджета запросов эндпоинта (@query_budget) пишется в лог.
+"""
+import logging
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..query_budget import get_query_budget
+from ..services.telemetry import finish_request, route_label, start_request, telemetry_store
+
+logger = logging.getLogger(__name__)
+
+
+class TelemetryMiddleware:
+    """Метрики запросов и заголовок Server-Timing"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        stats, token = start_request(scope)
+        status_code = 500
+
+        async def send_with_timing(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                app_ms = (time.perf_counter() - started) * 1000
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries", app;dur={app_ms:.1f}'
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            finish_request(token)
+            telemetry_store.record(
+                scope["method"], route_label(scope), status_code, time.perf_counter() - started, stats
+            )
+            budget = get_query_budget(getattr(scope.get("route"), "endpoint", None))
+            if budget is not None and stats.queries > budget:
+                logger.warning(
+                    f"⚠️ {scope['method']} {route_label(scope)}: {stats.queries} SQL запросов "
+                    f"при бюджете {budget}"
+                )
+
+
+# Экспорт
+__all__ = ['TelemetryMiddleware']
@@ -0,0 +1,29 @@
+-- Миграция 012: Таблица ежедневных снимков статистики
+-- Дата: 2026-10-19
+-- Описание: Одна строка на день для графиков трендов (/api/dashboard/trends)
+
+CREATE TABLE IF NOT EXISTS daily_stats_snapshots (
+    id SERIAL PRIMARY KEY,
+    snapshot_date DATE NOT NULL UNIQUE,
+    active_deadlines INTEGER NOT NULL DEFAULT 0,
+    status_expired INTEGER NOT NULL DEFAULT 0,
+    status_red INTEGER NOT NULL DEFAULT 0,
+    status_yellow INTEGER NOT NULL DEFAULT 0,
+    status_green INTEGER NOT NULL DEFAULT 0,
+    by_deadline_type JSON NOT NULL DEFAULT '{}',
+    by_ofd_provider JSON NOT NULL DEFAULT '{}',
+    notifications_sent INTEGER NOT NULL DEFAULT 0,
+    notifications_failed INTEGER NOT NULL DEFAULT 0,
+    support_requests_created INTEGER NOT NULL DEFAULT 0,
+    support_requests_open INTEGER NOT NULL DEFAULT 0,
+    is_backfilled BOOLEAN NOT NULL DEFAULT FALSE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Комментарии
+COMMENT ON TABLE daily_stats_snapshots IS 'Ежедневные снимки статистики для графиков трендов';
+COMMENT ON COLUMN daily_stats_snapshots.by_deadline_type IS 'Активные дедлайны по типам: {"<deadline_type_id>": количество}';
+COMMENT ON COLUMN daily_stats_snapshots.by_ofd_provider IS 'Активные дедлайны по ОФД: {"<ofd_provider_id>": количество}';
+COMMENT ON COLUMN daily_stats_snapshots.is_backfilled IS 'Снимок восстановлен по истории, а не снят в свой день';
+
+CREATE INDEX IF NOT EXISTS idx_daily_stats_snapshots_date ON daily_stats_snapshots(snapshot_date);
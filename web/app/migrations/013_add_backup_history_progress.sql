@@ -0,0 +1,7 @@
+-- Миграция 013: Ход выполнения автобэкапа
+-- Дата: 2026-10-19
+-- Описание: Прогресс pg_dump (таблица N из M) для записей со статусом running
+
+ALTER TABLE backup_history ADD COLUMN IF NOT EXISTS progress VARCHAR(255);
+
+COMMENT ON COLUMN backup_history.progress IS 'Ход выполнения бэкапа (для running)';
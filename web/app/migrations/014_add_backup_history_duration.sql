@@ -0,0 +1,7 @@
+-- Миграция 014: Длительность бэкапа
+-- Дата: 2026-10-19
+-- Описание: Время создания бэкапа рядом с размером (size_bytes)
+
+ALTER TABLE backup_history ADD COLUMN IF NOT EXISTS duration_seconds DOUBLE PRECISION;
+
+COMMENT ON COLUMN backup_history.duration_seconds IS 'Длительность создания бэкапа (секунды)';
@@ -0,0 +1,37 @@
+-- Миграция 015: Каталог резервных копий
+-- Дата: 2026-10-19
+-- Описание: Ручные и автоматические бэкапы в одной таблице вместо
+-- backups/database/backup_metadata.json и обхода файлов при каждом списке
+
+CREATE TABLE IF NOT EXISTS backup_catalog (
+    id SERIAL PRIMARY KEY,
+    filename VARCHAR(255) NOT NULL UNIQUE,
+    kind VARCHAR(20) NOT NULL DEFAULT 'manual', -- manual, auto
+    status VARCHAR(20) NOT NULL DEFAULT 'available', -- available, corrupted, missing
+    format VARCHAR(20), -- pg_custom, pg_sql, sqlite
+    compression VARCHAR(20), -- zstd, zlib, gzip, none
+    size_bytes BIGINT,
+    stored_bytes BIGINT,
+    sha256 VARCHAR(64),
+    duration_seconds DOUBLE PRECISION,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    created_by INTEGER REFERENCES users(id) ON DELETE SET NULL,
+    creator VARCHAR(255),
+    description TEXT,
+    schedule_id INTEGER REFERENCES backup_schedules(id) ON DELETE SET NULL,
+    verified_at TIMESTAMP,
+    verify_error TEXT,
+    CONSTRAINT valid_backup_kind CHECK (kind IN ('manual', 'auto')),
+    CONSTRAINT valid_backup_catalog_status CHECK (status IN ('available', 'corrupted', 'missing'))
+);
+
+COMMENT ON TABLE backup_catalog IS 'Каталог резервных копий базы данных';
+COMMENT ON COLUMN backup_catalog.kind IS 'manual (вручную) или auto (по расписанию)';
+COMMENT ON COLUMN backup_catalog.status IS 'Результат последней проверки: available, corrupted, missing';
+COMMENT ON COLUMN backup_catalog.stored_bytes IS 'Новые данные в хранилище после дедупликации и сжатия';
+COMMENT ON COLUMN backup_catalog.sha256 IS 'SHA-256 содержимого бэкапа';
+COMMENT ON COLUMN backup_catalog.verified_at IS 'Время последней проверки контрольных сумм';
+
+CREATE INDEX IF NOT EXISTS idx_backup_catalog_created ON backup_catalog(created_at);
+CREATE INDEX IF NOT EXISTS idx_backup_catalog_kind_created ON backup_catalog(kind, created_at);
+CREATE INDEX IF NOT EXISTS idx_backup_catalog_status ON backup_catalog(status);
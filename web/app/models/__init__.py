@@ -6,7 +6,8 @@ from .client import DeadlineType, Deadline, NotificationLog
 from .user import WebUser, User
 from .cash_register import CashRegister
 from .ofd_provider import OFDProvider
-from .backup import BackupSchedule, BackupHistory
+from .backup import BackupSchedule, BackupHistory, BackupCatalogEntry
+from .stats_snapshot import DailyStatsSnapshot
 
 __all__ = [
     'DeadlineType', 
@@ -17,5 +18,7 @@ __all__ = [
     'CashRegister',
     'OFDProvider',
     'BackupSchedule',
-    'BackupHistory'
+    'BackupCatalogEntry',
+    'BackupHistory',
+    'DailyStatsSnapshot'
 ]
\ No newline at end of file
@@ -2,7 +2,7 @@
 """
 Модели для автоматических бэкапов базы данных
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Time, Text, BigInteger, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Time, Text, BigInteger, Float, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from datetime import datetime, time
@@ -48,10 +48,44 @@ class BackupHistory(Base):
     status = Column(String(20), nullable=False, default='running')  # running, success, failed
     filename = Column(String(255))
     size_bytes = Column(BigInteger)
+    duration_seconds = Column(Float)  # Длительность создания бэкапа
     error_message = Column(Text)
+    progress = Column(String(255))  # Ход выполнения (для running)
     
     # Relationships
     schedule = relationship("BackupSchedule", back_populates="history")
     
     def __repr__(self):
         return f"<BackupHistory(id={self.id}, status='{self.status}', started_at='{self.started_at}')>"
+
+
+class BackupCatalogEntry(Base):
+    """Модель каталога резервных копий (ручных и автоматических)"""
+    __tablename__ = "backup_catalog"
+    __table_args__ = (
+        Index('idx_backup_catalog_created', 'created_at'),
+        Index('idx_backup_catalog_kind_created', 'kind', 'created_at'),
+        Index('idx_backup_catalog_status', 'status'),
+        {'extend_existing': True}
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    filename = Column(String(255), nullable=False, unique=True)
+    kind = Column(String(20), nullable=False, default='manual')  # manual, auto
+    status = Column(String(20), nullable=False, default='available')  # available, corrupted, missing
+    format = Column(String(20))  # pg_custom, pg_sql, sqlite
+    compression = Column(String(20))  # zstd, zlib (куски хранилища), gzip, none
+    size_bytes = Column(BigInteger)
+    stored_bytes = Column(BigInteger)  # Новые данные в хранилище после дедупликации
+    sha256 = Column(String(64))
+    duration_seconds = Column(Float)
+    created_at = Column(DateTime, server_default=func.now())
+    created_by = Column(Integer, ForeignKey('users.id', ondelete='SET NULL'))
+    creator = Column(String(255))  # Email администратора или "Автоматический бэкап"
+    description = Column(Text)
+    schedule_id = Column(Integer, ForeignKey('backup_schedules.id', ondelete='SET NULL'))
+    verified_at = Column(DateTime)
+    verify_error = Column(Text)
+    
+    def __repr__(self):
+        return f"<BackupCatalogEntry(id={self.id}, filename='{self.filename}', status='{self.status}')>"
@@ -218,6 +218,18 @@ class DeadlineTypeInfo(BaseModel):
         populate_by_name = True
 
 
+class CashRegisterInfo(BaseModel):
+    """Информация о кассе в дедлайне"""
+    id: Optional[int] = None
+    model: Optional[str] = None
+    factory_number: Optional[str] = None
+    register_name: Optional[str] = None
+    installation_address: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
 class DeadlineDetailResponse(BaseModel):
     """Расширенная схема дедлайна с данными клиента и типа"""
     id: int
@@ -231,6 +243,7 @@ class DeadlineDetailResponse(BaseModel):
     updated_at: datetime
     client: Optional[ClientInfo] = None
     deadline_type: Optional[DeadlineTypeInfo] = None
+    cash_register: Optional[CashRegisterInfo] = None  # Только в списке GET /api/deadlines
     notification_enabled: bool = True
     days_until_expiration: Optional[int] = None
 
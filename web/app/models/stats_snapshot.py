@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Модель ежедневного снимка статистики (история для графиков трендов)
+"""
+from sqlalchemy import Column, Integer, Boolean, Date, DateTime, JSON
+from sqlalchemy.sql import func
+
+from ..database import Base
+
+
+class DailyStatsSnapshot(Base):
+    """
+    Снимок статистики за один день
+
+    Состояние (счётчики дедлайнов по срочности, типам и ОФД) фиксируется
+    на конец дня, потоки (уведомления, обращения) - суммы за день
+    """
+    __tablename__ = "daily_stats_snapshots"
+    __table_args__ = {'extend_existing': True}
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    snapshot_date = Column(Date, nullable=False, unique=True, index=True)
+
+    # Активные дедлайны по срочности
+    active_deadlines = Column(Integer, nullable=False, default=0)
+    status_expired = Column(Integer, nullable=False, default=0)  # < 0 дней
+    status_red = Column(Integer, nullable=False, default=0)  # 0-6 дней
+    status_yellow = Column(Integer, nullable=False, default=0)  # 7-13 дней
+    status_green = Column(Integer, nullable=False, default=0)  # 14+ дней
+
+    # Разбивка активных дедлайнов: {"<id типа>": количество}, {"<id ОФД>": количество}
+    by_deadline_type = Column(JSON, nullable=False, default=dict)
+    by_ofd_provider = Column(JSON, nullable=False, default=dict)
+
+    # Потоки за день
+    notifications_sent = Column(Integer, nullable=False, default=0)
+    notifications_failed = Column(Integer, nullable=False, default=0)
+    support_requests_created = Column(Integer, nullable=False, default=0)
+    support_requests_open = Column(Integer, nullable=False, default=0)
+
+    # True - восстановлен по истории (created_at/expiration_date), а не снят в тот день
+    is_backfilled = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime, server_default=func.now())
+
+    def __repr__(self):
+        return f"<DailyStatsSnapshot(date={self.snapshot_date}, active={self.active_deadlines})>"
+
+    def to_dict(self):
+        """Преобразование в словарь для JSON ответа"""
+        return {
+            "date": self.snapshot_date.isoformat(),
+            "active_deadlines": self.active_deadlines,
+            "status_expired": self.status_expired,
+            "status_red": self.status_red,
+            "status_yellow": self.status_yellow,
+            "status_green": self.status_green,
+            "by_deadline_type": self.by_deadline_type or {},
+            "by_ofd_provider": self.by_ofd_provider or {},
+            "notifications_sent": self.notifications_sent,
+            "notifications_failed": self.notifications_failed,
+            "support_requests_created": self.support_requests_created,
+            "support_requests_open": self.support_requests_open,
+            "is_backfilled": self.is_backfilled
+        }
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Бюджеты SQL запросов эндпоинтов
+
+Бюджет объявляется рядом с маршрутом декоратором query_budget и задаёт
+максимум SQL запросов на один вызов, не зависящий от числа строк в БД.
+Тесты (tests/test_query_budgets.py) проверяют его через QueryCounter на
+двух объёмах данных, TelemetryMiddleware пишет предупреждение, если бюджет
+превышен в работе.
+
+Бюджет включает загрузку пользователя токена (один запрос, когда истёк кеш
+авторизации).
+
+    @router.get("/{user_id}")
+    @query_budget(3)
+    async def get_user(...):
+"""
+import re
+import threading
+from collections import Counter
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Атрибут функции эндпоинта с бюджетом
+BUDGET_ATTRIBUTE = '__query_budget__'
+
+_IN_LIST_RE = re.compile(r'\(\s*(?:\?|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|:\w+))+\s*\)')
+_NUMBER_RE = re.compile(r'\b\d+\b')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Эндпоинт выполнил больше SQL запросов, чем позволяет бюджет"""
+
+
+def query_budget(max_queries: int) -> Callable:
+    """
+    Декоратор эндпоинта: максимум SQL запросов на вызов
+
+    Args:
+        max_queries: Бюджет запросов
+
+    Returns:
+        Декоратор, возвращающий ту же функцию
+    """
+    def decorator(func: Callable) -> Callable:
+        setattr(func, BUDGET_ATTRIBUTE, max_queries)
+        return func
+
+    return decorator
+
+
+def get_query_budget(endpoint: Optional[Callable]) -> Optional[int]:
+    """Бюджет эндпоинта или None, если не объявлен"""
+    return getattr(endpoint, BUDGET_ATTRIBUTE, None)
+
+
+def normalize_statement(statement: str) -> str:
+    """SQL без переносов, со списками параметров IN (?, ?, ?) -> (?...) и числами -> N"""
+    statement = ' '.join(statement.split())
+    statement = _IN_LIST_RE.sub('(?...)', statement)
+    return _NUMBER_RE.sub('N', statement)
+
+
+class QueryCounter:
+    """
+    Подсчёт SQL запросов всех engine процесса внутри блока with
+
+        with QueryCounter() as counter:
+            client.get("/api/deadlines")
+        counter.check(5, "GET /api/deadlines")
+    """
+
+    def __init__(self):
+        self.statements: List[str] = []
+        self._lock = threading.Lock()
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        with self._lock:
+            self.statements.append(statement)
+
+    def __enter__(self) -> 'QueryCounter':
+        event.listen(Engine, 'before_cursor_execute', self._on_execute)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        event.remove(Engine, 'before_cursor_execute', self._on_execute)
+
+    @property
+    def count(self) -> int:
+        """Выполнено запросов"""
+        return len(self.statements)
+
+    def repeated(self) -> List[Tuple[str, int]]:
+        """Запросы, выполненные больше одного раза (после нормализации), по убыванию"""
+        counts = Counter(normalize_statement(statement) for statement in self.statements)
+        return [(statement, count) for statement, count in counts.most_common() if count > 1]
+
+    def report(self, limit: int = 10) -> str:
+        """Текст с повторяющимися запросами для сообщения об ошибке"""
+        lines = []
+        for statement, count in self.repeated()[:limit]:
+            lines.append(f"  {count}x {statement[:300]}")
+        return "\n".join(lines) if lines else "  (повторяющихся запросов нет)"
+
+    def check(self, max_queries: int, label: str = ""):
+        """
+        Проверка бюджета
+
+        Raises:
+            QueryBudgetExceeded: Запросов больше max_queries
+        """
+        if self.count > max_queries:
+            raise QueryBudgetExceeded(
+                f"{label}: {self.count} SQL запросов при бюджете {max_queries}\n"
+                f"Повторяющиеся запросы:\n{self.report()}"
+            )
+
+
+# Экспорт
+__all__ = [
+    'QueryBudgetExceeded',
+    'QueryCounter',
+    'query_budget',
+    'get_query_budget',
+    'normalize_statement'
+]
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+JSON ответы API
+
+FastJSONResponse - класс ответа по умолчанию: сериализация через orjson
+(если установлен), иначе через json стандартной библиотеки.
+
+Списочные эндпоинты могут вернуть FastJSONResponse напрямую из словарей,
+собранных по выбранным колонкам: тогда FastAPI не проверяет каждую строку
+через response_model повторно, а схема OpenAPI остаётся прежней.
+"""
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+from uuid import UUID
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson необязателен
+    orjson = None
+
+ORJSON_AVAILABLE = orjson is not None
+
+
+def _default(value: Any) -> Any:
+    """Типы, которые стандартный json не сериализует (как jsonable_encoder)"""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _orjson_default(value: Any) -> Any:
+    if isinstance(value, (Decimal, set, frozenset, bytes)):
+        return _default(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Сериализация в JSON (UTF-8, без пробелов)
+
+    Args:
+        content: Словари, списки, строки, числа, даты
+
+    Returns:
+        bytes: JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+        default=_default
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON ответ через orjson (или json при его отсутствии)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# Экспорт
+__all__ = ['FastJSONResponse', 'ORJSON_AVAILABLE', 'dumps']
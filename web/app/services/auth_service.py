@@ -1,9 +1,22 @@
 # -*- coding: utf-8 -*-
 """
 Сервис аутентификации
+
+bcrypt (~250ms CPU на проверку при cost 12) выполняется в ограниченном пуле
+потоков (bcrypt освобождает GIL), а не в event loop: пока идёт проверка пароля,
+остальные запросы воркера обслуживаются. Асинхронные обработчики используют
+*_async варианты функций.
 """
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Deque, Dict, Optional
 from jose import JWTError, jwt
 import bcrypt
 from sqlalchemy.orm import Session
@@ -12,6 +25,22 @@ from sqlalchemy.orm import Session
 from ..models.user import User
 from ..config import settings
 
+logger = logging.getLogger(__name__)
+
+_hash_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_hash_executor() -> ThreadPoolExecutor:
+    """Пул потоков bcrypt (создаётся при первом вызове)"""
+    global _hash_executor
+
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=settings.bcrypt_max_workers,
+            thread_name_prefix="web-bcrypt"
+        )
+    return _hash_executor
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Проверка пароля"""
@@ -22,12 +51,37 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 
 def get_password_hash(password: str) -> str:
-    """Хеширование пароля"""
-    salt = bcrypt.gensalt()
+    """Хеширование пароля (cost - BCRYPT_ROUNDS)"""
+    salt = bcrypt.gensalt(rounds=settings.bcrypt_rounds)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
 
+def needs_rehash(hashed_password: str) -> bool:
+    """Сохранён ли хеш с cost, отличным от BCRYPT_ROUNDS ("$2b$12$...")"""
+    try:
+        return int(hashed_password.split('$')[2]) != settings.bcrypt_rounds
+    except (IndexError, ValueError):
+        return False
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Проверка пароля в пуле потоков bcrypt"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_hash_executor(), verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Хеширование пароля в пуле потоков bcrypt"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_hash_executor(), get_password_hash, password)
+
+
+def password_fingerprint(password_hash: Optional[str]) -> str:
+    """Короткий отпечаток хеша пароля для claim pwh: после смены пароля старые токены отзываются"""
+    return hashlib.sha256((password_hash or '').encode('utf-8')).hexdigest()[:16]
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Создание JWT токена"""
     to_encode = data.copy()
@@ -74,6 +128,116 @@ def authenticate_user(db: Session, username: str, password: str) -> Optional[Use
     return user
 
 
+async def authenticate_user_async(db: Session, username: str, password: str) -> Optional[User]:
+    """Аутентификация пользователя без блокировки event loop
+    
+    Как authenticate_user, но bcrypt - в пуле потоков. Хеш с устаревшим
+    cost после успешного входа пересчитывается с текущим BCRYPT_ROUNDS.
+    """
+    user = db.query(User).filter(User.username == username).first()
+    if not user:
+        user = db.query(User).filter(User.email == username).first()
+    
+    if not user or not user.password_hash:
+        return None
+    
+    # Соединение возвращается в пул на время bcrypt: иначе параллельные
+    # входы занимают весь пул и блокируют остальные запросы
+    password_hash = user.password_hash
+    db.rollback()
+    
+    if not await verify_password_async(password, password_hash):
+        return None
+    
+    if not user.is_active:
+        return None
+    
+    rehashed = needs_rehash(password_hash)
+    if rehashed:
+        user.password_hash = await get_password_hash_async(password)
+        logger.info(f"Хеш пароля пользователя {user.id} пересчитан с cost={settings.bcrypt_rounds}")
+    
+    user.last_interaction = datetime.utcnow()
+    db.commit()
+    
+    if rehashed:
+        # В кэше аутентификации - строка со старым хешем: токен с новым pwh
+        # считался бы отозванным
+        from ..dependencies import invalidate_user_auth
+        invalidate_user_auth(user.id)
+    
+    return user
+
+
+class LoginRateLimited(Exception):
+    """Превышен лимит попыток входа"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Повторите через {retry_after} сек")
+        self.retry_after = retry_after
+
+
+class LoginThrottle:
+    """
+    Ограничение входа по имени пользователя: попытки одного пользователя
+    выполняются по очереди и не чаще max_attempts за window секунд
+    """
+
+    MAX_KEYS = 10000
+
+    def __init__(self, max_attempts: int, window: float):
+        self.max_attempts = max_attempts
+        self.window = window
+        self._attempts: Dict[str, Deque[float]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._waiting: Dict[str, int] = {}
+
+    def retry_after(self, key: str) -> int:
+        """Секунд до следующей разрешённой попытки (0 - можно сейчас)"""
+        attempts = self._attempts.get(key)
+        if not attempts:
+            return 0
+        now = time.monotonic()
+        while attempts and now - attempts[0] >= self.window:
+            attempts.popleft()
+        if not attempts:
+            del self._attempts[key]
+            return 0
+        if len(attempts) < self.max_attempts:
+            return 0
+        return max(1, math.ceil(self.window - (now - attempts[0])))
+
+    @asynccontextmanager
+    async def attempt(self, key: str):
+        """
+        Попытка входа: ожидание очереди пользователя и учёт попытки
+
+        Raises:
+            LoginRateLimited: Лимит попыток исчерпан
+        """
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        self._waiting[key] = self._waiting.get(key, 0) + 1
+        try:
+            async with lock:
+                retry_after = self.retry_after(key)
+                if retry_after:
+                    raise LoginRateLimited(retry_after)
+                if len(self._attempts) >= self.MAX_KEYS:
+                    # Перебор имён пользователей не должен раздувать словарь
+                    for stale in list(self._attempts):
+                        self.retry_after(stale)
+                self._attempts.setdefault(key, deque()).append(time.monotonic())
+                yield
+        finally:
+            self._waiting[key] -= 1
+            if not self._waiting[key]:
+                del self._waiting[key]
+                self._locks.pop(key, None)
+
+
+login_throttle = LoginThrottle(settings.login_rate_limit, settings.login_rate_window)
+
+
 def decode_token(token: str) -> Optional[dict]:
     """Декодирование JWT токена"""
     try:
@@ -0,0 +1,389 @@
+# -*- coding: utf-8 -*-
+"""
+Каталог резервных копий
+
+Одна таблица backup_catalog для ручных (POST /api/database/backup) и
+автоматических бэкапов: размер, sha256, формат, сжатие, длительность,
+автор и статус. Список бэкапов - запрос к каталогу, без чтения файлов и
+манифестов.
+
+Лидер планировщика раз в BACKUP_VERIFY_INTERVAL_HOURS перепроверяет
+контрольные суммы (verify_catalog): бэкап с повреждённым куском получает
+статус corrupted, пропавший - missing.
+
+Бэкапы, известные до каталога (backups/database/backup_metadata.json,
+успешные записи BackupHistory, манифесты хранилища), переносятся в
+каталог при получении лидерства (import_existing_backups).
+"""
+import asyncio
+import hashlib
+import json
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from apscheduler.triggers.interval import IntervalTrigger
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import SessionLocal, engine
+from ..models.backup import BackupCatalogEntry, BackupHistory
+from .backup_engine import BackupResult, backup_exists, backup_size, iter_backup
+from .backup_store import BACKUP_DIR, CHUNK_COMPRESSION, backup_store
+
+logger = logging.getLogger(__name__)
+
+# Вид бэкапа
+KIND_MANUAL = 'manual'
+KIND_AUTO = 'auto'
+
+# Статус по результату последней проверки
+STATUS_AVAILABLE = 'available'
+STATUS_CORRUPTED = 'corrupted'
+STATUS_MISSING = 'missing'
+
+# Автор автоматических бэкапов
+AUTO_CREATOR = "Автоматический бэкап"
+
+# Прежний файл метаданных ручных бэкапов (переносится в каталог)
+LEGACY_METADATA_FILE = BACKUP_DIR / "backup_metadata.json"
+
+VERIFY_JOB_ID = "backup_catalog_verify"
+
+# Проверка одного бэкапа: статус, проблемы, sha256 содержимого
+CheckResult = Tuple[str, List[str], Optional[str]]
+
+
+def describe_backup(filename: str) -> Tuple[str, str]:
+    """
+    Формат и сжатие бэкапа по имени
+
+    Returns:
+        Tuple[str, str]: (pg_custom | pg_sql | sqlite, zstd | zlib | gzip | none)
+    """
+    if filename.endswith('.dump'):
+        file_format = 'pg_custom'
+    elif filename.endswith('.sql'):
+        file_format = 'pg_sql'
+    else:
+        file_format = 'sqlite'
+
+    if backup_store.exists(filename):
+        compression = CHUNK_COMPRESSION
+    elif filename.endswith('.zst'):
+        compression = 'zstd'
+    elif filename.endswith('.gz'):
+        compression = 'gzip'
+    elif file_format == 'pg_custom':
+        compression = 'zlib'  # Старый pg_dump -Fc со сжатием внутри файла
+    else:
+        compression = 'none'
+    return file_format, compression
+
+
+def register_backup(
+    db: Session,
+    result: BackupResult,
+    kind: str,
+    creator: str,
+    created_by: Optional[int] = None,
+    description: str = "",
+    schedule_id: Optional[int] = None
+) -> BackupCatalogEntry:
+    """
+    Запись созданного бэкапа в каталог
+
+    Args:
+        db: Сессия БД
+        result: Результат create_database_backup
+        kind: KIND_MANUAL или KIND_AUTO
+        creator: Email администратора или AUTO_CREATOR
+        created_by: ID администратора
+        description: Описание
+        schedule_id: Расписание автобэкапа
+
+    Returns:
+        BackupCatalogEntry: Новая запись
+    """
+    file_format, compression = describe_backup(result.filename)
+    entry = BackupCatalogEntry(
+        filename=result.filename,
+        kind=kind,
+        status=STATUS_AVAILABLE,
+        format=file_format,
+        compression=compression,
+        size_bytes=result.size_bytes,
+        stored_bytes=result.stored_bytes,
+        sha256=result.sha256,
+        duration_seconds=result.duration_seconds,
+        created_at=datetime.now(),
+        created_by=created_by,
+        creator=creator,
+        description=description,
+        schedule_id=schedule_id,
+        verified_at=datetime.now()
+    )
+    db.add(entry)
+    db.commit()
+    db.refresh(entry)
+    return entry
+
+
+def _existing_entry(filename: str, **fields) -> Optional[BackupCatalogEntry]:
+    """Запись каталога для бэкапа, который есть в хранилище или файлом"""
+    size_bytes = backup_size(filename)
+    if size_bytes is None:
+        return None
+    file_format, compression = describe_backup(filename)
+    sha256 = backup_store.manifest(filename)['sha256'] if backup_store.exists(filename) else None
+    return BackupCatalogEntry(
+        filename=filename,
+        status=STATUS_AVAILABLE,
+        format=file_format,
+        compression=compression,
+        size_bytes=size_bytes,
+        sha256=sha256,
+        **fields
+    )
+
+
+def import_existing_backups() -> int:
+    """
+    Перенос в каталог бэкапов, созданных до него
+
+    Источники: backup_metadata.json (ручные), успешные записи BackupHistory
+    (автоматические), манифесты хранилища без записи в каталоге. Файл
+    метаданных после переноса переименовывается в .imported.
+
+    Returns:
+        int: Добавлено записей
+    """
+    db = SessionLocal()
+    try:
+        known = {filename for (filename,) in db.query(BackupCatalogEntry.filename)}
+        entries = []
+
+        def add(filename: str, **fields):
+            if filename in known:
+                return
+            entry = _existing_entry(filename, **fields)
+            if entry is not None:
+                known.add(filename)
+                entries.append(entry)
+
+        metadata = {}
+        if LEGACY_METADATA_FILE.exists():
+            with open(LEGACY_METADATA_FILE, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+        for filename, info in metadata.items():
+            add(
+                filename,
+                kind=KIND_MANUAL,
+                created_at=datetime.fromisoformat(info['created_at']),
+                creator=info.get('created_by'),
+                description=info.get('description', ''),
+                duration_seconds=info.get('duration_seconds')
+            )
+
+        history = db.query(BackupHistory).filter(
+            BackupHistory.status == 'success',
+            BackupHistory.filename.isnot(None)
+        ).all()
+        for record in history:
+            add(
+                record.filename,
+                kind=KIND_AUTO,
+                created_at=record.started_at,
+                creator=AUTO_CREATOR,
+                schedule_id=record.schedule_id,
+                duration_seconds=record.duration_seconds
+            )
+
+        for filename in backup_store.names():
+            auto = filename.startswith('kkt_auto_backup')
+            add(
+                filename,
+                kind=KIND_AUTO if auto else KIND_MANUAL,
+                created_at=datetime.fromisoformat(backup_store.manifest(filename)['created_at']),
+                creator=AUTO_CREATOR if auto else None
+            )
+
+        if entries:
+            db.add_all(entries)
+            try:
+                db.commit()
+            except IntegrityError:
+                # Перенос одновременно выполнил другой процесс
+                db.rollback()
+                return 0
+            logger.info(f"📚 В каталог бэкапов перенесено записей: {len(entries)}")
+
+        if LEGACY_METADATA_FILE.exists():
+            LEGACY_METADATA_FILE.rename(LEGACY_METADATA_FILE.with_name(LEGACY_METADATA_FILE.name + '.imported'))
+        return len(entries)
+    finally:
+        db.close()
+
+
+def _check_backup(filename: str, expected_sha256: Optional[str], damaged: Optional[Dict[str, str]]) -> CheckResult:
+    """
+    Проверка одного бэкапа
+
+    Args:
+        filename: Имя бэкапа
+        expected_sha256: sha256 из каталога (None - ещё не посчитан)
+        damaged: Результат backup_store.find_damaged_chunks или None -
+            проверить куски этого бэкапа
+
+    Returns:
+        CheckResult: Статус, проблемы и sha256 содержимого
+    """
+    if backup_store.exists(filename):
+        manifest = backup_store.manifest(filename)
+        if damaged is None:
+            problems = backup_store.verify(filename)
+        else:
+            problems = list(dict.fromkeys(
+                damaged[digest] for digest, _ in manifest['chunks'] if digest in damaged
+            ))
+        sha256 = manifest['sha256']
+    elif backup_exists(filename):
+        digest = hashlib.sha256()
+        for block in iter_backup(filename):
+            digest.update(block)
+        problems = []
+        sha256 = digest.hexdigest()
+    else:
+        return STATUS_MISSING, ["Бэкап не найден"], None
+
+    if expected_sha256 and sha256 != expected_sha256:
+        problems.append("sha256 не совпадает с каталогом")
+    return (STATUS_CORRUPTED if problems else STATUS_AVAILABLE), problems, sha256
+
+
+def _save_checks(results: Dict[int, CheckResult]):
+    """Запись результатов проверки в каталог"""
+    now = datetime.now()
+    db = SessionLocal()
+    try:
+        for entry in db.query(BackupCatalogEntry).filter(BackupCatalogEntry.id.in_(list(results))):
+            status, problems, sha256 = results[entry.id]
+            entry.status = status
+            entry.verify_error = "; ".join(problems) or None
+            entry.verified_at = now
+            if entry.sha256 is None:
+                entry.sha256 = sha256
+        db.commit()
+    finally:
+        db.close()
+
+
+def verify_catalog() -> Dict[str, int]:
+    """
+    Проверка контрольных сумм всех бэкапов каталога (выполнять в потоке)
+
+    Куски хранилища читаются по одному разу на все бэкапы; сессия БД не
+    держится открытой на время чтения.
+
+    Returns:
+        Dict[str, int]: Число бэкапов по статусам
+    """
+    db = SessionLocal()
+    try:
+        rows = db.query(BackupCatalogEntry.id, BackupCatalogEntry.filename, BackupCatalogEntry.sha256).all()
+    finally:
+        db.close()
+
+    damaged = backup_store.find_damaged_chunks()
+    results = {row.id: _check_backup(row.filename, row.sha256, damaged) for row in rows}
+    _save_checks(results)
+
+    counts = Counter(status for status, _, _ in results.values())
+    for row in rows:
+        status, problems, _ = results[row.id]
+        if status != STATUS_AVAILABLE:
+            logger.error(f"❌ Бэкап {row.filename}: {status}, {'; '.join(problems)}")
+    logger.info(f"🔍 Проверка каталога бэкапов: {dict(counts)}")
+    return dict(counts)
+
+
+def verify_backup(filename: str) -> Tuple[str, List[str]]:
+    """
+    Проверка одного бэкапа с записью результата в каталог (выполнять в потоке)
+
+    Returns:
+        Tuple[str, List[str]]: Статус и проблемы
+    """
+    db = SessionLocal()
+    try:
+        entry = db.query(BackupCatalogEntry.id, BackupCatalogEntry.sha256).filter(
+            BackupCatalogEntry.filename == filename
+        ).first()
+    finally:
+        db.close()
+
+    result = _check_backup(filename, entry.sha256 if entry else None, None)
+    if entry is not None:
+        _save_checks({entry.id: result})
+    return result[0], result[1]
+
+
+async def run_catalog_verification():
+    """Задача планировщика: проверка каталога без блокировки event loop"""
+    try:
+        await asyncio.to_thread(verify_catalog)
+    except Exception as e:
+        logger.error(f"Ошибка проверки каталога бэкапов: {e}")
+
+
+def _prepare_catalog():
+    """Таблица каталога (если миграция 015 не применена) и перенос прежних бэкапов"""
+    BackupCatalogEntry.__table__.create(bind=engine, checkfirst=True)
+    import_existing_backups()
+
+
+async def init_catalog(scheduler) -> None:
+    """
+    Подготовка каталога в процессе - лидере планировщика
+
+    Создаёт таблицу и переносит прежние бэкапы в потоке (запросы к БД и
+    чтение манифестов не блокируют event loop), регистрирует периодическую
+    проверку контрольных сумм.
+
+    Args:
+        scheduler: Планировщик APScheduler (общий с автобэкапами)
+    """
+    await asyncio.to_thread(_prepare_catalog)
+
+    hours = settings.backup_verify_interval_hours
+    if hours <= 0:
+        return
+    scheduler.add_job(
+        run_catalog_verification,
+        trigger=IntervalTrigger(hours=hours),
+        id=VERIFY_JOB_ID,
+        name="Проверка контрольных сумм бэкапов",
+        replace_existing=True,
+        coalesce=True
+    )
+    logger.info(f"Проверка каталога бэкапов: каждые {hours:g} ч")
+
+
+# Экспорт
+__all__ = [
+    'KIND_MANUAL',
+    'KIND_AUTO',
+    'STATUS_AVAILABLE',
+    'STATUS_CORRUPTED',
+    'STATUS_MISSING',
+    'AUTO_CREATOR',
+    'describe_backup',
+    'register_backup',
+    'import_existing_backups',
+    'verify_catalog',
+    'verify_backup',
+    'run_catalog_verification',
+    'init_catalog'
+]
@@ -1,113 +1,155 @@
 # -*- coding: utf-8 -*-
 """
 Сервис планировщика автоматических бэкапов базы данных
+
+Планировщик (автобэкапы и снимки статистики) работает только в процессе -
+лидере: каждый воркер uvicorn пытается взять LeaderLock, остальные
+повторяют попытку каждые SCHEDULER_LEADER_CHECK_INTERVAL секунд и
+подхватывают планировщик, если лидер завершился. Лидер с тем же
+интервалом перечитывает расписание - изменения из PUT /backup-schedule
+применяются без перезапуска.
+
+Бэкап создаёт services/backup_engine (PostgreSQL и SQLite) без блокировки
+event loop, ход выполнения пишется в BackupHistory.progress, готовый
+бэкап записывается в каталог (services/backup_catalog). Бэкап,
+пропущенный пока приложение было остановлено, выполняется один раз при
+получении лидерства (BACKUP_CATCH_UP).
+
+Запросы к БД и файлам при получении лидерства и проверке расписаний
+выполняются в потоках; в event loop остаются только операции с задачами
+планировщика - захват лидерства (в том числе при failover) не блокирует
+воркер.
 """
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+import asyncio
 import logging
 import os
-import subprocess
-from pathlib import Path
 
+from ..config import settings
 from ..database import SessionLocal
-from ..models.backup import BackupSchedule, BackupHistory
-from ..api.database_management import get_database_connection_string, BACKUP_DIR
+from ..models.backup import BackupSchedule, BackupHistory, BackupCatalogEntry
+from .backup_catalog import AUTO_CREATOR, KIND_AUTO, register_backup
+from .backup_engine import BackupResult, create_database_backup, remove_backup
+from .backup_store import backup_store
+from .leader_lock import LeaderLock
 
 logger = logging.getLogger(__name__)
 
 # Глобальный планировщик
 scheduler = AsyncIOScheduler()
 
+# Имя блокировки лидера планировщика
+SCHEDULER_LOCK_NAME = "kkt_scheduler"
+
+# Запуск, опоздавший не больше чем на столько секунд (занятый loop, пауза
+# процесса), выполняется; несколько пропущенных запусков - один раз
+MISFIRE_GRACE_TIME = 3600
+
+_leader_lock: Optional[LeaderLock] = None
+_leader_task: Optional[asyncio.Task] = None
+_schedules_signature: Optional[Tuple] = None
+
+# Бэкапы по расписанию и догоняющий запуск не выполняются одновременно
+_backup_running = asyncio.Lock()
+
+
+def _start_history(schedule_id: int) -> int:
+    """Запись running в истории, возвращает её ID"""
+    db = SessionLocal()
+    try:
+        record = BackupHistory(schedule_id=schedule_id, status='running', started_at=datetime.now())
+        db.add(record)
+        db.commit()
+        return record.id
+    finally:
+        db.close()
+
+
+def _update_history(history_id: int, **fields):
+    """Обновление записи истории"""
+    db = SessionLocal()
+    try:
+        db.query(BackupHistory).filter(BackupHistory.id == history_id).update(fields)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _register_auto_backup(schedule_id: int, backup: BackupResult):
+    """Запись автобэкапа в каталог"""
+    db = SessionLocal()
+    try:
+        register_backup(db, backup, KIND_AUTO, AUTO_CREATOR, schedule_id=schedule_id)
+    finally:
+        db.close()
+
+
+def _finish_schedule_run(schedule_id: int):
+    """Время последнего и следующего запуска, очистка старых бэкапов"""
+    db = SessionLocal()
+    try:
+        schedule = db.query(BackupSchedule).filter(BackupSchedule.id == schedule_id).first()
+        if schedule:
+            schedule.last_run_at = datetime.now()
+            schedule.next_run_at = calculate_next_run(schedule)
+            db.commit()
+        cleanup_old_backups(db, schedule_id)
+    finally:
+        db.close()
+
 
-def create_backup_task(schedule_id: int):
+async def create_backup_task(schedule_id: int):
     """
     Выполнение задачи создания бэкапа
     
     Args:
         schedule_id: ID расписания, которое запустило бэкап
     """
-    db = SessionLocal()
-    history_record = None
-    
-    try:
-        logger.info(f"Начало выполнения автоматического бэкапа (schedule_id={schedule_id})")
-        
-        # Создаем запись в истории
-        history_record = BackupHistory(
-            schedule_id=schedule_id,
-            status='running',
-            started_at=datetime.now()
-        )
-        db.add(history_record)
-        db.commit()
-        db.refresh(history_record)
-        
-        # Получаем параметры БД
-        db_config = get_database_connection_string()
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        if db_config['type'] == 'postgresql':
-            # PostgreSQL бэкап через pg_dump
-            filename = f"kkt_auto_backup_{timestamp}.sql"
-            filepath = BACKUP_DIR / filename
-            
-            env = os.environ.copy()
-            env['PGPASSWORD'] = db_config['password']
-            
-            cmd = [
-                'pg_dump',
-                '-h', db_config['host'],
-                '-p', db_config['port'],
-                '-U', db_config['user'],
-                '-d', db_config['database'],
-                '-f', str(filepath),
-                '--clean',
-                '--if-exists'
-            ]
+    if _backup_running.locked():
+        logger.warning(f"Автобэкап уже выполняется, запуск пропущен (schedule_id={schedule_id})")
+        return
+
+    async with _backup_running:
+        history_id = None
+        try:
+            logger.info(f"Начало выполнения автоматического бэкапа (schedule_id={schedule_id})")
             
-            result = subprocess.run(cmd, env=env, capture_output=True, text=True)
+            # Создаем запись в истории
+            history_id = await asyncio.to_thread(_start_history, schedule_id)
             
-            if result.returncode != 0:
-                raise Exception(f"pg_dump error: {result.stderr}")
+            def report_progress(text: str):
+                _update_history(history_id, progress=text[:255])
             
-            # Получаем размер файла
-            file_size = filepath.stat().st_size
+            backup = await create_database_backup("kkt_auto_backup", report_progress)
             
             # Обновляем историю - успех
-            history_record.status = 'success'
-            history_record.completed_at = datetime.now()
-            history_record.filename = filename
-            history_record.size_bytes = file_size
-            db.commit()
+            await asyncio.to_thread(
+                _update_history, history_id,
+                status='success', completed_at=datetime.now(), filename=backup.filename,
+                size_bytes=backup.size_bytes, duration_seconds=backup.duration_seconds, progress=None
+            )
+            await asyncio.to_thread(_register_auto_backup, schedule_id, backup)
+            logger.info(f"Автоматический бэкап успешно создан: {backup.filename} ({backup.size_bytes} bytes)")
             
-            logger.info(f"Автоматический бэкап успешно создан: {filename} ({file_size} bytes)")
+        except Exception as e:
+            logger.error(f"Ошибка при создании автоматического бэкапа: {e}")
             
-        else:
-            raise Exception("SQLite автоматический бэкап не поддерживается")
-        
-        # Обновляем расписание
-        schedule = db.query(BackupSchedule).filter(BackupSchedule.id == schedule_id).first()
-        if schedule:
-            schedule.last_run_at = datetime.now()
-            schedule.next_run_at = calculate_next_run(schedule)
-            db.commit()
-        
-        # Очистка старых бэкапов
-        cleanup_old_backups(db, schedule_id)
-        
-    except Exception as e:
-        logger.error(f"Ошибка при создании автоматического бэкапа: {e}")
+            if history_id is not None:
+                await asyncio.to_thread(
+                    _update_history, history_id,
+                    status='failed', completed_at=datetime.now(), error_message=str(e), progress=None
+                )
         
-        if history_record:
-            history_record.status = 'failed'
-            history_record.completed_at = datetime.now()
-            history_record.error_message = str(e)
-            db.commit()
-    
-    finally:
-        db.close()
+        # Следующий запуск - и после ошибки, иначе догоняющий запуск повторял бы её
+        try:
+            await asyncio.to_thread(_finish_schedule_run, schedule_id)
+        except Exception as e:
+            logger.error(f"Ошибка обновления расписания после бэкапа: {e}")
 
 
 def cleanup_old_backups(db: Session, schedule_id: int):
@@ -126,26 +168,31 @@ def cleanup_old_backups(db: Session, schedule_id: int):
         # Вычисляем дату отсечки
         cutoff_date = datetime.now() - timedelta(days=schedule.retention_days)
         
-        # Находим старые записи в истории
-        old_records = db.query(BackupHistory).filter(
+        # Находим старые автобэкапы в каталоге
+        old_entries = db.query(BackupCatalogEntry).filter(
+            BackupCatalogEntry.kind == KIND_AUTO,
+            or_(BackupCatalogEntry.schedule_id == schedule_id, BackupCatalogEntry.schedule_id.is_(None)),
+            BackupCatalogEntry.created_at < cutoff_date
+        ).all()
+        
+        for entry in old_entries:
+            # Удаляем бэкап (манифест хранилища или старый файл)
+            if remove_backup(entry.filename):
+                logger.info(f"Удален старый бэкап: {entry.filename}")
+            db.delete(entry)
+        
+        # Успешные запуски в истории хранятся столько же
+        db.query(BackupHistory).filter(
             BackupHistory.schedule_id == schedule_id,
             BackupHistory.started_at < cutoff_date,
             BackupHistory.status == 'success'
-        ).all()
-        
-        for record in old_records:
-            # Удаляем физический файл
-            if record.filename:
-                filepath = BACKUP_DIR / record.filename
-                if filepath.exists():
-                    filepath.unlink()
-                    logger.info(f"Удален старый бэкап: {record.filename}")
-            
-            # Удаляем запись из истории
-            db.delete(record)
+        ).delete(synchronize_session=False)
         
         db.commit()
-        logger.info(f"Очистка завершена: удалено {len(old_records)} старых бэкапов")
+        logger.info(f"Очистка завершена: удалено {len(old_entries)} старых бэкапов")
+        
+        # Куски, на которые больше не ссылается ни один бэкап
+        backup_store.collect_garbage()
         
     except Exception as e:
         logger.error(f"Ошибка при очистке старых бэкапов: {e}")
@@ -240,46 +287,237 @@ def update_scheduler_job(schedule: BackupSchedule):
         trigger=trigger,
         id=job_id,
         args=[schedule.id],
-        name=f"Автоматический бэкап ({schedule.frequency})"
+        name=f"Автоматический бэкап ({schedule.frequency})",
+        coalesce=True,
+        misfire_grace_time=MISFIRE_GRACE_TIME
     )
     
     logger.info(f"Задача автобэкапа обновлена: {schedule.frequency} в {hour:02d}:{minute:02d}")
 
 
-def init_scheduler():
+def _schedules_state(schedules) -> Tuple:
+    """Отпечаток расписаний: по нему лидер замечает изменения"""
+    return tuple(sorted((schedule.id, schedule.updated_at, schedule.enabled) for schedule in schedules))
+
+
+def _schedule_catch_up(schedule: BackupSchedule, missed_at: datetime, now: datetime):
     """
-    Инициализация планировщика при старте приложения
+    Пропущенный запуск: выполняется один раз сразу (BACKUP_CATCH_UP),
+    сколько бы запусков ни было пропущено
     """
-    logger.info("Инициализация планировщика автоматических бэкапов")
-    
+    if settings.backup_catch_up:
+        logger.info(
+            f"Пропущен автобэкап {missed_at:%Y-%m-%d %H:%M} (schedule_id={schedule.id}), "
+            f"выполняется сейчас"
+        )
+        scheduler.add_job(
+            create_backup_task,
+            trigger='date',
+            run_date=now,
+            id=f"backup_catch_up_{schedule.id}",
+            args=[schedule.id],
+            name="Догоняющий автобэкап",
+            replace_existing=True,
+            misfire_grace_time=MISFIRE_GRACE_TIME
+        )
+    else:
+        logger.info(f"Пропущен автобэкап {missed_at:%Y-%m-%d %H:%M} (schedule_id={schedule.id})")
+
+
+def _load_schedules() -> List[BackupSchedule]:
+    """Расписания из БД (отсоединены от сессии)"""
     db = SessionLocal()
     try:
-        # Загружаем расписание из БД
+        return db.query(BackupSchedule).all()
+    finally:
+        db.close()
+
+
+def _prepare_schedules() -> Tuple[List[BackupSchedule], List[Tuple[BackupSchedule, datetime]]]:
+    """
+    Расписания для нового лидера (выполняется в потоке)
+    
+    Пересчитывает next_run_at, отмечает бэкапы прежнего лидера, прерванные
+    его остановкой.
+    
+    Returns:
+        Tuple: Все расписания и пропущенные запуски (расписание, время запуска)
+    """
+    db = SessionLocal(expire_on_commit=False)
+    try:
         schedules = db.query(BackupSchedule).all()
+        now = datetime.now()
+        missed = []
         
         for schedule in schedules:
-            update_scheduler_job(schedule)
+            if schedule.enabled and schedule.next_run_at and schedule.next_run_at <= now:
+                missed.append((schedule, schedule.next_run_at))
+                schedule.next_run_at = calculate_next_run(schedule)
             
             # Вычисляем next_run_at если не установлено
             if not schedule.next_run_at:
                 schedule.next_run_at = calculate_next_run(schedule)
-                db.commit()
+        
+        # Бэкапы прежнего лидера, прерванные его остановкой
+        interrupted = db.query(BackupHistory).filter(BackupHistory.status == 'running').update({
+            'status': 'failed',
+            'completed_at': now,
+            'error_message': "Прервано остановкой процесса планировщика",
+            'progress': None
+        })
+        if interrupted:
+            logger.warning(f"Прерванных автобэкапов отмечено: {interrupted}")
+        
+        db.commit()
+        return schedules, missed
+    finally:
+        db.close()
+
+
+async def init_scheduler():
+    """
+    Загрузка расписаний в планировщик (вызывается лидером)
+    """
+    global _schedules_signature
+    
+    logger.info("Инициализация планировщика автоматических бэкапов")
+    
+    try:
+        schedules, missed = await asyncio.to_thread(_prepare_schedules)
+        now = datetime.now()
+        
+        for schedule in schedules:
+            update_scheduler_job(schedule)
+        for schedule, missed_at in missed:
+            _schedule_catch_up(schedule, missed_at, now)
+        _schedules_signature = _schedules_state(schedules)
         
         # Запускаем планировщик
         if not scheduler.running:
             scheduler.start()
             logger.info("Планировщик автоматических бэкапов запущен")
-        
+    
     except Exception as e:
         logger.error(f"Ошибка при инициализации планировщика: {e}")
-    finally:
-        db.close()
+
+
+async def sync_schedules():
+    """Применение изменённых расписаний к задачам планировщика (у лидера)"""
+    global _schedules_signature
+
+    try:
+        schedules = await asyncio.to_thread(_load_schedules)
+        signature = _schedules_state(schedules)
+        if signature == _schedules_signature:
+            return
+        for schedule in schedules:
+            update_scheduler_job(schedule)
+        _schedules_signature = signature
+    except Exception as e:
+        logger.error(f"Ошибка обновления задач автобэкапа: {e}")
 
 
 def shutdown_scheduler():
     """
-    Остановка планировщика при завершении приложения
+    Остановка планировщика (потеря лидерства или завершение процесса)
     """
     if scheduler.running:
-        scheduler.shutdown()
+        scheduler.remove_all_jobs()
+        scheduler.shutdown(wait=False)
         logger.info("Планировщик автоматических бэкапов остановлен")
+
+
+async def _become_leader():
+    """Запуск задач планировщика в этом процессе"""
+    from .backup_catalog import init_catalog
+    from .stats_snapshot import init_snapshot_job
+
+    logger.info(f"👑 Процесс {os.getpid()} - лидер планировщика")
+    await init_scheduler()
+
+    # Ежедневные снимки статистики (в том же планировщике)
+    try:
+        await init_snapshot_job(scheduler)
+    except Exception as e:
+        logger.error(f"⚠️ Ошибка инициализации снимков статистики: {e}")
+
+    # Каталог бэкапов: перенос прежних бэкапов и проверка контрольных сумм
+    try:
+        await init_catalog(scheduler)
+    except Exception as e:
+        logger.error(f"⚠️ Ошибка инициализации каталога бэкапов: {e}")
+
+
+async def _leadership_loop():
+    """Захват и удержание лидерства, пока процесс работает"""
+    lock = _leader_lock
+    try:
+        while True:
+            if not lock.held:
+                if await asyncio.to_thread(lock.try_acquire):
+                    await _become_leader()
+            elif await asyncio.to_thread(lock.is_held):
+                await sync_schedules()
+            else:
+                logger.warning("Лидерство планировщика потеряно, задачи остановлены")
+                shutdown_scheduler()
+            await asyncio.sleep(settings.scheduler_leader_check_interval)
+    finally:
+        shutdown_scheduler()
+        lock.release()
+
+
+def start_scheduler_leadership(force: bool = False):
+    """
+    Участие процесса в выборе лидера планировщика (вызывать при старте приложения)
+
+    Args:
+        force: Участвовать и при SCHEDULER_ENABLED=false (отдельный процесс
+            планировщика); иначе при выключенном планировщике ничего не делает
+    """
+    global _leader_lock, _leader_task
+
+    if not (force or settings.scheduler_enabled):
+        logger.info("Планировщик в веб-воркерах отключён (SCHEDULER_ENABLED=false)")
+        return
+    if _leader_task is None or _leader_task.done():
+        _leader_lock = LeaderLock(SCHEDULER_LOCK_NAME, settings.scheduler_lock_file)
+        _leader_task = asyncio.create_task(_leadership_loop())
+
+
+async def stop_scheduler_leadership():
+    """Остановка планировщика и освобождение лидерства"""
+    global _leader_task
+
+    task, _leader_task = _leader_task, None
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+async def _run_standalone():
+    start_scheduler_leadership(force=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await stop_scheduler_leadership()
+
+
+def main():
+    """Отдельный процесс планировщика: python -m web.app.services.backup_scheduler"""
+    from backend.logging_config import setup_logging, shutdown_logging
+
+    setup_logging('scheduler', 'scheduler.log')
+    try:
+        asyncio.run(_run_standalone())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        shutdown_logging()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,368 @@
+# -*- coding: utf-8 -*-
+"""
+Хранилище бэкапов с дедупликацией
+
+Бэкап режется на куски по содержимому (content-defined chunking): граница -
+перевод строки, crc32 окна перед которым попадает в CHUNK_CUT_MASK, с
+ограничениями CHUNK_MIN_SIZE/CHUNK_MAX_SIZE. Вставка строк в таблицу
+сдвигает границы только рядом с изменением, остальные куски совпадают с
+куском предыдущего дня.
+
+Кусок хранится один раз под sha256 содержимого (chunks/ab/abcd...),
+сжатый zstd или zlib; бэкап - манифест со списком кусков
+(manifests/<имя>.json). Удаление бэкапа удаляет манифест, куски без
+ссылок удаляет collect_garbage. При чтении каждый кусок сверяется с
+хешем, verify проверяет бэкап целиком.
+
+    store.put("kkt_backup_20260101_030000.dump", tmp_path)
+    for block in store.iter_content("kkt_backup_20260101_030000.dump"):
+        ...
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from ..config import settings
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard необязателен
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Директория для хранения резервных копий
+BACKUP_DIR = Path("backups/database")
+BACKUP_DIR.mkdir(parents=True, exist_ok=True)
+
+# Границы кусков: не меньше MIN, не больше MAX, в среднем MIN + (маска+1) строк
+CHUNK_MIN_SIZE = 16 * 1024
+CHUNK_MAX_SIZE = 256 * 1024
+CHUNK_CUT_MASK = 0x0F
+CHUNK_WINDOW = 48
+
+# Чтение исходного файла блоками
+READ_SIZE = 4 * 1024 * 1024
+
+# Куски моложе этого не удаляются сборкой мусора: их может записывать
+# бэкап, манифест которого ещё не сохранён (секунды)
+GC_GRACE_SECONDS = 3600
+
+# Первый байт файла куска - способ сжатия
+CODEC_ZLIB = b'z'
+CODEC_ZSTD = b's'
+
+# Сжатие новых кусков (для каталога бэкапов)
+CHUNK_COMPRESSION = 'zstd' if zstandard is not None else 'zlib'
+
+
+class BackupCorrupted(Exception):
+    """Кусок бэкапа отсутствует или не совпадает с хешем"""
+
+
+class StoredBackup(NamedTuple):
+    """Результат записи бэкапа в хранилище"""
+    size_bytes: int
+    sha256: str
+    chunks: int
+    new_bytes: int  # Сжатый объём новых кусков
+
+
+def _find_cut(buf: bytes, start: int, end: int) -> int:
+    """Конец куска, начинающегося в start (end - предел буфера)"""
+    limit = min(start + CHUNK_MAX_SIZE, end)
+    i = start + CHUNK_MIN_SIZE
+    while i < limit:
+        i = buf.find(b'\n', i, limit)
+        if i < 0:
+            break
+        i += 1
+        if zlib.crc32(buf[i - CHUNK_WINDOW:i]) & CHUNK_CUT_MASK == 0:
+            return i
+    return limit
+
+
+def iter_chunks(stream: BinaryIO) -> Iterator[bytes]:
+    """
+    Куски потока с границами по содержимому
+
+    Args:
+        stream: Бинарный поток
+
+    Yields:
+        bytes: Очередной кусок
+    """
+    buf = b''
+    pos = 0
+    eof = False
+    while True:
+        if not eof and len(buf) - pos < CHUNK_MAX_SIZE:
+            data = stream.read(READ_SIZE)
+            if data:
+                buf = buf[pos:] + data
+                pos = 0
+                continue
+            eof = True
+        if pos >= len(buf):
+            return
+        cut = _find_cut(buf, pos, len(buf))
+        yield buf[pos:cut]
+        pos = cut
+
+
+def _compress(data: bytes) -> bytes:
+    if zstandard is not None:
+        return CODEC_ZSTD + zstandard.ZstdCompressor(level=settings.backup_compression_level).compress(data)
+    return CODEC_ZLIB + zlib.compress(data, settings.backup_compression_level)
+
+
+def _decompress(blob: bytes) -> bytes:
+    codec, payload = blob[:1], blob[1:]
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(payload)
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise BackupCorrupted("Кусок сжат zstd, нужен пакет zstandard")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    raise BackupCorrupted(f"Неизвестный способ сжатия куска: {codec!r}")
+
+
+def _write_atomic(path: Path, data: bytes):
+    """Запись через временный файл: читатели не видят недописанный файл"""
+    fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+
+class BackupStore:
+    """Хранилище бэкапов: куски по хешу и манифесты"""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.chunks_dir = root / "chunks"
+        self.manifests_dir = root / "manifests"
+        self.chunks_dir.mkdir(parents=True, exist_ok=True)
+        self.manifests_dir.mkdir(parents=True, exist_ok=True)
+
+    def _chunk_path(self, digest: str) -> Path:
+        return self.chunks_dir / digest[:2] / digest
+
+    def _manifest_path(self, name: str) -> Optional[Path]:
+        # Имя приходит из URL: только имя файла, без каталогов
+        if not name or name != os.path.basename(name) or name.startswith('.'):
+            return None
+        return self.manifests_dir / f"{name}.json"
+
+    def exists(self, name: str) -> bool:
+        """Бэкап есть в хранилище"""
+        path = self._manifest_path(name)
+        return path is not None and path.exists()
+
+    def manifest(self, name: str) -> Dict:
+        """
+        Манифест бэкапа
+
+        Raises:
+            FileNotFoundError: Бэкапа нет
+        """
+        path = self._manifest_path(name)
+        if path is None:
+            raise FileNotFoundError(name)
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def names(self) -> List[str]:
+        """Имена бэкапов в хранилище"""
+        return sorted(p.name[:-len('.json')] for p in self.manifests_dir.glob('*.json'))
+
+    def put(self, name: str, source: Path) -> StoredBackup:
+        """
+        Запись файла в хранилище как бэкап name
+
+        Новые куски сжимаются и записываются, уже существующие только
+        получают свежий mtime (защита от одновременной сборки мусора).
+
+        Args:
+            name: Имя бэкапа
+            source: Исходный файл
+
+        Returns:
+            StoredBackup: Размер, sha256, число кусков и объём новых данных
+        """
+        manifest_path = self._manifest_path(name)
+        if manifest_path is None:
+            raise ValueError(f"Недопустимое имя бэкапа: {name}")
+
+        total = hashlib.sha256()
+        chunks = []
+        size = 0
+        new_bytes = 0
+        with open(source, 'rb') as f:
+            for chunk in iter_chunks(f):
+                digest = hashlib.sha256(chunk).hexdigest()
+                total.update(chunk)
+                size += len(chunk)
+                chunks.append([digest, len(chunk)])
+
+                path = self._chunk_path(digest)
+                if path.exists():
+                    os.utime(path)
+                    continue
+                path.parent.mkdir(exist_ok=True)
+                blob = _compress(chunk)
+                _write_atomic(path, blob)
+                new_bytes += len(blob)
+
+        manifest = {
+            'name': name,
+            'size_bytes': size,
+            'sha256': total.hexdigest(),
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'chunks': chunks
+        }
+        _write_atomic(manifest_path, json.dumps(manifest).encode('utf-8'))
+        return StoredBackup(size, manifest['sha256'], len(chunks), new_bytes)
+
+    def _read_chunk(self, digest: str, size: int) -> bytes:
+        try:
+            blob = self._chunk_path(digest).read_bytes()
+        except FileNotFoundError:
+            raise BackupCorrupted(f"Кусок {digest} отсутствует")
+        data = _decompress(blob)
+        if len(data) != size or hashlib.sha256(data).hexdigest() != digest:
+            raise BackupCorrupted(f"Кусок {digest} не совпадает с хешем")
+        return data
+
+    def iter_content(self, name: str) -> Iterator[bytes]:
+        """
+        Содержимое бэкапа по кускам (каждый сверяется с хешем)
+
+        Raises:
+            FileNotFoundError: Бэкапа нет
+            BackupCorrupted: Кусок отсутствует или повреждён
+        """
+        for digest, size in self.manifest(name)['chunks']:
+            yield self._read_chunk(digest, size)
+
+    def extract(self, name: str, target: Path):
+        """Сборка бэкапа в файл target"""
+        with open(target, 'wb') as f:
+            for block in self.iter_content(name):
+                f.write(block)
+
+    def verify(self, name: str) -> List[str]:
+        """
+        Проверка целостности: каждый кусок и sha256 бэкапа целиком
+
+        Returns:
+            List[str]: Найденные проблемы (пусто - бэкап цел)
+        """
+        manifest = self.manifest(name)
+        problems = []
+        total = hashlib.sha256()
+        for digest, size in manifest['chunks']:
+            try:
+                total.update(self._read_chunk(digest, size))
+            except Exception as e:
+                problems.append(str(e))
+        if not problems and total.hexdigest() != manifest['sha256']:
+            problems.append("sha256 бэкапа не совпадает с манифестом")
+        return problems
+
+    def find_damaged_chunks(self) -> Dict[str, str]:
+        """
+        Проверка всех кусков, на которые ссылаются манифесты
+
+        Каждый кусок читается один раз, сколько бы бэкапов на него ни
+        ссылалось - дешевле, чем verify каждого бэкапа.
+
+        Returns:
+            Dict[str, str]: Хеш куска -> описание проблемы
+        """
+        digests = {}
+        for name in self.names():
+            for digest, size in self.manifest(name)['chunks']:
+                digests[digest] = size
+        damaged = {}
+        for digest, size in digests.items():
+            try:
+                self._read_chunk(digest, size)
+            except Exception as e:
+                damaged[digest] = str(e)
+        return damaged
+
+    def delete(self, name: str) -> bool:
+        """Удаление манифеста (куски освобождает collect_garbage)"""
+        path = self._manifest_path(name)
+        if path is None or not path.exists():
+            return False
+        path.unlink()
+        return True
+
+    def collect_garbage(self, grace_seconds: float = GC_GRACE_SECONDS) -> Tuple[int, int]:
+        """
+        Удаление кусков, на которые не ссылается ни один манифест
+
+        Args:
+            grace_seconds: Не трогать куски моложе (их может писать put)
+
+        Returns:
+            Tuple[int, int]: Удалено кусков, освобождено байт
+        """
+        refs = Counter()
+        for name in self.names():
+            try:
+                refs.update(digest for digest, _ in self.manifest(name)['chunks'])
+            except (OSError, ValueError) as e:
+                # Нечитаемый манифест: без полного списка ссылок удалять нельзя
+                logger.error(f"Сборка мусора бэкапов отменена, манифест {name}: {e}")
+                return 0, 0
+
+        cutoff = time.time() - grace_seconds
+        removed = 0
+        freed = 0
+        for path in self.chunks_dir.glob('*/*'):
+            if path.name in refs or path.name.startswith('.'):
+                continue
+            stat = path.stat()
+            if stat.st_mtime > cutoff:
+                continue
+            path.unlink()
+            removed += 1
+            freed += stat.st_size
+        if removed:
+            logger.info(f"🧹 Удалено кусков бэкапов: {removed}, освобождено {freed / (1024 * 1024):.1f} МБ")
+        return removed, freed
+
+    def usage(self) -> Tuple[int, int]:
+        """Объём бэкапов без дедупликации и фактически занятое место (байт)"""
+        logical = sum(self.manifest(name)['size_bytes'] for name in self.names())
+        physical = sum(path.stat().st_size for path in self.chunks_dir.glob('*/*'))
+        return logical, physical
+
+
+backup_store = BackupStore(BACKUP_DIR / "store")
+
+
+# Экспорт
+__all__ = [
+    'BACKUP_DIR',
+    'CHUNK_COMPRESSION',
+    'BackupCorrupted',
+    'BackupStore',
+    'StoredBackup',
+    'backup_store',
+    'iter_chunks'
+]
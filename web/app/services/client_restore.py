@@ -0,0 +1,401 @@
+# -*- coding: utf-8 -*-
+"""
+Восстановление одного клиента из бэкапа
+
+Бэкап не накатывается на рабочую базу целиком. Он загружается во
+временную базу (в рабочем потоке, event loop свободен):
+    - SQLite: файл бэкапа, собранный из хранилища
+    - PostgreSQL: отдельная база kkt_restore_*, куда pg_restore переносит
+      только CLIENT_TABLES; после копирования база удаляется
+Из неё одной транзакцией копируются клиент (строка users), его кассы,
+дедлайны и журнал уведомлений. Остальные данные рабочей базы не трогаются.
+
+Конфликты ID: строка вставляется со своим ID, если он свободен; если ID
+занят другой записью - с новым ID, ссылки (кассы дедлайнов, дедлайны
+журнала) переназначаются. Строки, которые уже есть у клиента, пропускаются -
+повторное восстановление ничего не дублирует. Ссылки на удалённые
+справочники (тип дедлайна, провайдер ОФД) обнуляются.
+
+Если email, логин, ИНН или Telegram ID клиента в рабочей базе уже у
+другого пользователя, восстановление отменяется (ClientRestoreConflict).
+"""
+import logging
+import subprocess
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, NamedTuple, Tuple
+
+from sqlalchemy import MetaData, create_engine, inspect, insert, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.pool import NullPool
+
+from ..database import SessionLocal, engine
+from ..models.cash_register import CashRegister
+from ..models.client import Deadline, DeadlineType, NotificationLog
+from ..models.ofd_provider import OFDProvider
+from ..models.user import User
+from .backup_engine import (
+    PG_CUSTOM_SUFFIX,
+    extract_backup,
+    get_database_connection_string,
+    pg_env,
+    sqlite_backup_file
+)
+
+logger = logging.getLogger(__name__)
+
+# Таблицы клиента, которые переносятся из бэкапа
+CLIENT_TABLES = ('users', 'cash_registers', 'deadlines', 'notification_logs')
+
+# Уникальные поля пользователя: совпадение с другим пользователем - конфликт
+USER_UNIQUE_COLUMNS = ('username', 'email', 'inn', 'telegram_id')
+
+# Префикс временной базы PostgreSQL
+SCRATCH_DATABASE_PREFIX = "kkt_restore_"
+
+
+class ClientRestoreError(Exception):
+    """Клиента нельзя восстановить из этого бэкапа"""
+
+
+class ClientRestoreConflict(ClientRestoreError):
+    """Уникальные данные клиента уже у другого пользователя"""
+
+
+class ClientRestoreResult(NamedTuple):
+    """Итог восстановления клиента"""
+    client_id: int  # ID в рабочей базе
+    source_client_id: int  # ID в бэкапе
+    user_restored: bool  # False - клиент уже был в базе
+    cash_registers: int
+    deadlines: int
+    notification_logs: int
+    skipped: int  # Строки, которые уже есть у клиента
+    new_ids: int  # Строки, получившие новый ID из-за конфликта
+    dry_run: bool
+    duration_seconds: float
+
+
+def _run(cmd: List[str], env: dict):
+    """Запуск pg_restore/psql с ошибкой по stderr"""
+    process = subprocess.run(cmd, env=env, capture_output=True)
+    if process.returncode != 0:
+        raise ClientRestoreError(
+            f"Ошибка загрузки бэкапа во временную базу: {process.stderr.decode('utf-8', errors='ignore')[-2000:]}"
+        )
+
+
+@contextmanager
+def _scratch_postgres(filepath, db_config: dict) -> Iterator[Engine]:
+    """Временная база PostgreSQL с таблицами клиента из бэкапа"""
+    scratch = f"{SCRATCH_DATABASE_PREFIX}{uuid.uuid4().hex[:12]}"
+    admin_engine = create_engine(engine.url, poolclass=NullPool, isolation_level="AUTOCOMMIT")
+    scratch_engine = None
+    try:
+        with admin_engine.connect() as conn:
+            conn.execute(text(f'CREATE DATABASE "{scratch}"'))
+
+        connection = ['-h', db_config['host'], '-p', db_config['port'], '-U', db_config['user'], '-d', scratch]
+        if filepath.name.endswith(PG_CUSTOM_SUFFIX):
+            tables = [arg for table in CLIENT_TABLES for arg in ('-t', table)]
+            cmd = ['pg_restore', *connection, '--no-owner', '--no-privileges', *tables, str(filepath)]
+        else:
+            # Старый бэкап .sql - целиком (выборочно psql не умеет)
+            cmd = ['psql', *connection, '-q', '-f', str(filepath)]
+        _run(cmd, pg_env(db_config['password']))
+
+        scratch_engine = create_engine(engine.url.set(database=scratch), poolclass=NullPool)
+        yield scratch_engine
+    finally:
+        if scratch_engine is not None:
+            scratch_engine.dispose()
+        with admin_engine.connect() as conn:
+            conn.execute(text(f'DROP DATABASE IF EXISTS "{scratch}"'))
+        admin_engine.dispose()
+
+
+@contextmanager
+def open_backup_database(filename: str) -> Iterator[Engine]:
+    """
+    Бэкап как временная база только для чтения (выполнять в потоке)
+
+    Args:
+        filename: Имя бэкапа
+
+    Yields:
+        Engine: Подключение к временной базе
+    """
+    db_config = get_database_connection_string()
+    filepath, temporary = extract_backup(filename)
+    try:
+        if db_config['type'] == 'postgresql':
+            with _scratch_postgres(filepath, db_config) as scratch_engine:
+                yield scratch_engine
+            return
+
+        sqlite_path, unpacked = sqlite_backup_file(filepath)
+        scratch_engine = create_engine(f"sqlite:///{sqlite_path}", poolclass=NullPool)
+        try:
+            yield scratch_engine
+        finally:
+            scratch_engine.dispose()
+            if unpacked:
+                sqlite_path.unlink(missing_ok=True)
+    finally:
+        if temporary:
+            filepath.unlink(missing_ok=True)
+
+
+def load_client_rows(source: Engine, client_id: int) -> Dict[str, List[dict]]:
+    """
+    Строки клиента из временной базы
+
+    Args:
+        source: Временная база (open_backup_database)
+        client_id: ID клиента в бэкапе
+
+    Returns:
+        Dict[str, List[dict]]: Таблица -> строки
+    """
+    existing = set(inspect(source).get_table_names())
+    metadata = MetaData()
+    metadata.reflect(bind=source, only=[table for table in CLIENT_TABLES if table in existing])
+    if 'users' not in metadata.tables:
+        raise ClientRestoreError("В бэкапе нет таблицы users")
+    tables = metadata.tables
+
+    with source.connect() as conn:
+        def rows(table: str, column: str, values: List[int]) -> List[dict]:
+            if table not in tables or not values:
+                return []
+            query = select(tables[table]).where(tables[table].c[column].in_(values))
+            return [dict(row) for row in conn.execute(query).mappings()]
+
+        users = rows('users', 'id', [client_id])
+        if not users:
+            raise ClientRestoreError(f"Клиента с ID {client_id} нет в бэкапе")
+        if users[0].get('role', 'client') != 'client':
+            raise ClientRestoreError(f"Пользователь {client_id} в бэкапе - не клиент")
+
+        deadlines = rows('deadlines', 'client_id', [client_id])
+        return {
+            'users': users,
+            'cash_registers': rows('cash_registers', 'client_id', [client_id]),
+            'deadlines': deadlines,
+            'notification_logs': rows('notification_logs', 'deadline_id', [row['id'] for row in deadlines])
+        }
+
+
+class _Copier:
+    """Вставка строк клиента в рабочую базу с переназначением ID"""
+
+    def __init__(self, conn: Connection):
+        self.conn = conn
+        self.skipped = 0
+        self.new_ids = 0
+
+    def existing_ids(self, table, ids) -> set:
+        """ID из ids, которые есть в таблице рабочей базы"""
+        if not ids:
+            return set()
+        return {row_id for (row_id,) in self.conn.execute(select(table.c.id).where(table.c.id.in_(list(ids))))}
+
+    def insert_rows(self, table, rows: List[dict], remap: Callable[[dict], dict], owner_column: str) -> Dict[int, int]:
+        """
+        Вставка строк
+
+        Сначала строки со свободными ID (явный ID), затем строки, чей ID
+        занят (новый ID): иначе новый ID мог бы занять ID следующей строки
+        из бэкапа.
+
+        Args:
+            table: Таблица рабочей базы
+            rows: Строки из бэкапа
+            remap: Переназначение ссылок строки
+            owner_column: Строка с тем же ID и тем же значением этой колонки
+                (после remap) уже восстановлена и пропускается
+
+        Returns:
+            Dict[int, int]: ID в бэкапе -> ID в рабочей базе
+        """
+        mapping = {}
+        if not rows:
+            return mapping
+        current = dict(self.conn.execute(
+            select(table.c.id, table.c[owner_column]).where(table.c.id.in_([row['id'] for row in rows]))
+        ).all())
+        taken = []
+        explicit = False
+        for row in rows:
+            values = remap({key: value for key, value in row.items() if key in table.c})
+            old_id = values['id']
+            if old_id not in current:
+                mapping[old_id] = self.insert(table, values)
+                explicit = True
+            elif current[old_id] == values[owner_column]:
+                mapping[old_id] = old_id
+                self.skipped += 1
+            else:
+                taken.append(values)
+
+        if explicit:
+            self.sync_sequence(table.name)
+        for values in taken:
+            old_id = values.pop('id')
+            mapping[old_id] = self.insert(table, values)
+            self.new_ids += 1
+        return mapping
+
+    def insert(self, table, values: dict) -> int:
+        """Вставка строки, ID в рабочей базе"""
+        return self.conn.execute(insert(table).values(**values)).inserted_primary_key[0]
+
+    def sync_sequence(self, table: str):
+        """Последовательность ID PostgreSQL выше вставленных явных ID"""
+        if self.conn.dialect.name != 'postgresql':
+            return
+        self.conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"(SELECT COALESCE(MAX(id), 1) FROM {table}))"
+        ))
+
+
+def _restore_user(conn: Connection, copier: _Copier, user: dict) -> Tuple[int, bool]:
+    """Строка клиента: существующий клиент с тем же ID, ID из бэкапа или новый"""
+    users = User.__table__
+    values = {key: value for key, value in user.items() if key in users.c}
+
+    same = conn.execute(select(users.c.id, users.c.email, users.c.inn).where(users.c.id == values['id'])).first()
+    if same is not None and (same.email == values.get('email') or (values.get('inn') and same.inn == values['inn'])):
+        copier.skipped += 1
+        return same.id, False
+
+    for column in USER_UNIQUE_COLUMNS:
+        value = values.get(column)
+        if value is None:
+            continue
+        owner = conn.execute(select(users.c.id).where(users.c[column] == value)).scalar()
+        if owner is not None:
+            raise ClientRestoreConflict(f"{column}={value} уже у пользователя ID {owner}")
+    if values.get('registration_code') is not None and conn.execute(
+        select(users.c.id).where(users.c.registration_code == values['registration_code'])
+    ).first():
+        values['registration_code'] = None
+        values['code_expires_at'] = None
+
+    if same is not None:
+        del values['id']
+        copier.new_ids += 1
+        return copier.insert(users, values), True
+    new_id = copier.insert(users, values)
+    copier.sync_sequence(users.name)
+    return new_id, True
+
+
+def restore_client(filename: str, client_id: int, dry_run: bool = False) -> ClientRestoreResult:
+    """
+    Восстановление клиента из бэкапа одной транзакцией (выполнять в потоке)
+
+    Args:
+        filename: Имя бэкапа
+        client_id: ID клиента в бэкапе
+        dry_run: Выполнить и откатить - посмотреть, что будет восстановлено
+
+    Returns:
+        ClientRestoreResult: Итог
+
+    Raises:
+        FileNotFoundError: Бэкапа нет
+        ClientRestoreError: Клиента нет в бэкапе или бэкап не загрузился
+        ClientRestoreConflict: Данные клиента уже у другого пользователя
+    """
+    started = time.monotonic()
+    with open_backup_database(filename) as source:
+        rows = load_client_rows(source, client_id)
+
+    db = SessionLocal()
+    try:
+        conn = db.connection()
+        copier = _Copier(conn)
+        new_client_id, user_restored = _restore_user(conn, copier, rows['users'][0])
+
+        ofd_ids = copier.existing_ids(OFDProvider.__table__, {
+            row['ofd_provider_id'] for row in rows['cash_registers'] if row.get('ofd_provider_id')
+        })
+
+        def remap_register(values: dict) -> dict:
+            values['client_id'] = new_client_id
+            if values.get('ofd_provider_id') not in ofd_ids:
+                values['ofd_provider_id'] = None
+            return values
+
+        registers = copier.insert_rows(
+            CashRegister.__table__, rows['cash_registers'], remap_register, 'client_id'
+        )
+
+        type_ids = copier.existing_ids(DeadlineType.__table__, {
+            row['deadline_type_id'] for row in rows['deadlines'] if row.get('deadline_type_id')
+        })
+        user_ids = copier.existing_ids(User.__table__, {
+            row['user_id'] for row in rows['deadlines'] if row.get('user_id')
+        })
+
+        def remap_deadline(values: dict) -> dict:
+            values['client_id'] = new_client_id
+            values['cash_register_id'] = registers.get(values.get('cash_register_id'))
+            if values.get('deadline_type_id') not in type_ids:
+                values['deadline_type_id'] = None
+            if values.get('user_id') == client_id:
+                values['user_id'] = new_client_id
+            elif values.get('user_id') not in user_ids:
+                values['user_id'] = None
+            return values
+
+        deadlines = copier.insert_rows(
+            Deadline.__table__, rows['deadlines'], remap_deadline, 'client_id'
+        )
+
+        def remap_log(values: dict) -> dict:
+            values['deadline_id'] = deadlines[values['deadline_id']]
+            return values
+
+        logs = copier.insert_rows(
+            NotificationLog.__table__, rows['notification_logs'], remap_log, 'deadline_id'
+        )
+
+        if dry_run:
+            db.rollback()
+        else:
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    result = ClientRestoreResult(
+        client_id=new_client_id,
+        source_client_id=client_id,
+        user_restored=user_restored,
+        cash_registers=len(registers),
+        deadlines=len(deadlines),
+        notification_logs=len(logs),
+        skipped=copier.skipped,
+        new_ids=copier.new_ids,
+        dry_run=dry_run,
+        duration_seconds=round(time.monotonic() - started, 3)
+    )
+    logger.info(f"♻️ Восстановление клиента {client_id} из {filename}: {result}")
+    return result
+
+
+# Экспорт
+__all__ = [
+    'ClientRestoreError',
+    'ClientRestoreConflict',
+    'ClientRestoreResult',
+    'open_backup_database',
+    'load_client_rows',
+    'restore_client'
+]
@@ -3,11 +3,14 @@
 Сервис для управления .env файлом
 Управление списком TELEGRAM_ADMIN_IDS
 """
+import logging
 import os
 import subprocess
 from typing import List, Optional
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
 
 class EnvManager:
     """Менеджер для работы с .env файлом"""
@@ -59,7 +62,7 @@ class EnvManager:
             True если успешно, False если произошла ошибка
         """
         if not self.env_path.exists():
-            print(f"❌ .env файл не найден: {self.env_path}")
+            logger.error(f"❌ .env файл не найден: {self.env_path}")
             return False
         
         try:
@@ -87,11 +90,11 @@ class EnvManager:
             with open(self.env_path, 'w', encoding='utf-8') as f:
                 f.writelines(lines)
             
-            print(f"✅ TELEGRAM_ADMIN_IDS обновлён: {new_value}")
+            logger.info(f"✅ TELEGRAM_ADMIN_IDS обновлён: {new_value}")
             return True
             
         except Exception as e:
-            print(f"❌ Ошибка при обновлении .env файла: {e}")
+            logger.error(f"❌ Ошибка при обновлении .env файла: {e}")
             return False
     
     def add_admin_telegram_id(self, telegram_id: str) -> bool:
@@ -108,7 +111,7 @@ class EnvManager:
         
         # Проверяем, что ID ещё нет в списке
         if telegram_id in current_ids:
-            print(f"⚠️  Telegram ID {telegram_id} уже в списке администраторов")
+            logger.warning(f"⚠️  Telegram ID {telegram_id} уже в списке администраторов")
             return False
         
         # Добавляем новый ID
@@ -129,7 +132,7 @@ class EnvManager:
         
         # Проверяем, что ID есть в списке
         if telegram_id not in current_ids:
-            print(f"⚠️  Telegram ID {telegram_id} не найден в списке администраторов")
+            logger.warning(f"⚠️  Telegram ID {telegram_id} не найден в списке администраторов")
             return False
         
         # Удаляем ID
@@ -146,7 +149,7 @@ class EnvManager:
         try:
             # Проверяем, что мы на Linux (в продакшене)
             if os.name != 'posix':
-                print("⚠️  Перезапуск бота доступен только на Linux сервере")
+                logger.warning("⚠️  Перезапуск бота доступен только на Linux сервере")
                 return False
             
             # Перезапускаем systemd сервис
@@ -158,17 +161,17 @@ class EnvManager:
             )
             
             if result.returncode == 0:
-                print("✅ Бот успешно перезапущен")
+                logger.info("✅ Бот успешно перезапущен")
                 return True
             else:
-                print(f"❌ Ошибка при перезапуске бота: {result.stderr}")
+                logger.error(f"❌ Ошибка при перезапуске бота: {result.stderr}")
                 return False
                 
         except subprocess.TimeoutExpired:
-            print("❌ Превышено время ожидания при перезапуске бота")
+            logger.error("❌ Превышено время ожидания при перезапуске бота")
             return False
         except Exception as e:
-            print(f"❌ Ошибка при перезапуске бота: {e}")
+            logger.error(f"❌ Ошибка при перезапуске бота: {e}")
             return False
 
 
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+Блокировка лидера между процессами
+
+Из нескольких воркеров uvicorn (или отдельного процесса планировщика)
+блокировку держит ровно один. PostgreSQL - сессионная advisory-блокировка
+на отдельном соединении (снимается сервером, если процесс умер), SQLite -
+блокировка файла ОС (fcntl.flock, на Windows msvcrt.locking), которую
+тоже снимает ОС при завершении процесса.
+"""
+import logging
+import os
+import zlib
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+from ..database import engine, is_sqlite
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderLock:
+    """
+    Неблокирующая блокировка лидера
+
+        lock = LeaderLock("backup_scheduler", "logs/scheduler.lock")
+        if lock.try_acquire():
+            ...  # этот процесс - лидер, пока lock.is_held()
+        lock.release()
+    """
+
+    def __init__(self, name: str, lock_file: str):
+        """
+        Args:
+            name: Имя блокировки (ключ advisory-блокировки PostgreSQL)
+            lock_file: Файл блокировки для SQLite
+        """
+        self.name = name
+        self.lock_file = lock_file
+        # Ключ advisory-блокировки - bigint, стабильный между процессами
+        self.key = zlib.crc32(name.encode('utf-8'))
+        self._conn = None
+        self._file = None
+
+    @property
+    def held(self) -> bool:
+        """Блокировка захвачена этим процессом"""
+        return self._conn is not None or self._file is not None
+
+    def try_acquire(self) -> bool:
+        """
+        Попытка захвата без ожидания
+
+        Returns:
+            bool: True, если блокировка теперь у этого процесса
+        """
+        if self.held:
+            return True
+        try:
+            return self._acquire_file() if is_sqlite else self._acquire_advisory()
+        except Exception as e:
+            logger.error(f"Ошибка захвата блокировки {self.name}: {e}")
+            self.release()
+            return False
+
+    def _acquire_advisory(self) -> bool:
+        # Отдельное соединение вне пула: блокировка живёт, пока оно открыто
+        lock_engine = create_engine(engine.url, poolclass=NullPool)
+        conn = lock_engine.connect()
+        acquired = conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}).scalar()
+        conn.commit()
+        if acquired:
+            self._conn = conn
+            return True
+        conn.close()
+        lock_engine.dispose()
+        return False
+
+    def _acquire_file(self) -> bool:
+        os.makedirs(os.path.dirname(os.path.abspath(self.lock_file)), exist_ok=True)
+        f = open(self.lock_file, 'a+')
+        try:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            f.close()
+            return False
+        # PID владельца - для диагностики
+        f.seek(0)
+        f.truncate()
+        f.write(str(os.getpid()))
+        f.flush()
+        self._file = f
+        return True
+
+    def is_held(self) -> bool:
+        """
+        Проверка, что блокировка всё ещё у этого процесса
+
+        Для PostgreSQL - запрос по соединению блокировки: при обрыве
+        соединения сервер снимает блокировку и её может взять другой процесс.
+        """
+        if self._conn is not None:
+            try:
+                self._conn.execute(text("SELECT 1"))
+                self._conn.commit()
+            except Exception as e:
+                logger.warning(f"Соединение блокировки {self.name} потеряно: {e}")
+                self.release()
+                return False
+            return True
+        return self._file is not None
+
+    def release(self):
+        """Освобождение блокировки (повторный вызов ничего не делает)"""
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+                conn.commit()
+            except Exception:
+                pass
+            lock_engine = conn.engine
+            conn.close()
+            lock_engine.dispose()
+
+        f, self._file = self._file, None
+        if f is not None:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            except OSError:
+                pass
+            f.close()
+
+
+# Экспорт
+__all__ = ['LeaderLock']
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+Статические файлы веб-интерфейса с отпечатками содержимого
+
+При запуске JS и CSS получают имя с хешем содержимого (auth.js ->
+auth.3f9a1c2b7d.js), ссылки на них в HTML переписываются, для всех файлов
+заранее готовится gzip вариант. Файлы с отпечатком кэшируются браузером
+на год (immutable), HTML - только с проверкой по ETag, поэтому после
+деплоя браузер сразу получает новые ссылки. Изменение исходников
+замечается по mtime без перезапуска сервера.
+"""
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Расширения, получающие отпечаток в имени
+FINGERPRINT_EXTENSIONS = ('.js', '.css')
+# Расширения, которые собираются в память и сжимаются
+BUILD_EXTENSIONS = FINGERPRINT_EXTENSIONS + ('.html',)
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Меньше этого gzip не даёт выигрыша
+GZIP_MIN_SIZE = 1024
+
+# src="/static/js/auth.js?v=20251214" -> путь без ручного ?v=
+_REFERENCE_RE = re.compile(r'(?P<attr>\b(?:src|href)=)(?P<quote>["\'])/static/(?P<path>[^"\'?#]+)(?:\?[^"\'#]*)?(?P=quote)')
+
+
+class Asset(NamedTuple):
+    """Собранный файл: тело, gzip вариант (или None), тип, ETag, Cache-Control"""
+    body: bytes
+    gzip_body: Optional[bytes]
+    media_type: str
+    etag: str
+    cache_control: str
+
+
+def revalidate_cache_control() -> str:
+    """Cache-Control для HTML и файлов без отпечатка"""
+    return f"public, max-age={settings.static_html_max_age}, must-revalidate"
+
+
+def fingerprint_name(path: str, body: bytes) -> str:
+    """js/auth.js -> js/auth.<10 символов sha256>.js"""
+    root, ext = os.path.splitext(path)
+    return f"{root}.{hashlib.sha256(body).hexdigest()[:10]}{ext}"
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Принимает ли клиент gzip (с учётом gzip;q=0)"""
+    for part in accept_encoding.split(','):
+        coding, _, params = part.partition(';')
+        if coding.strip().lower() not in ('gzip', '*'):
+            continue
+        quality = params.strip().lower()
+        if quality.startswith('q='):
+            try:
+                return float(quality[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+def _make_asset(path: str, body: bytes, cache_control: str) -> Asset:
+    gzip_body = None
+    if len(body) >= GZIP_MIN_SIZE:
+        compressed = gzip.compress(body, compresslevel=9, mtime=0)
+        if len(compressed) < len(body):
+            gzip_body = compressed
+    media_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+    return Asset(body, gzip_body, media_type, etag, cache_control)
+
+
+def build_assets(directory: str) -> Tuple[Dict[str, Asset], Dict[str, str]]:
+    """
+    Сборка статических файлов в память
+
+    Args:
+        directory: Каталог static
+
+    Returns:
+        Tuple: (путь относительно /static -> файл, исходный путь -> путь с отпечатком)
+    """
+    sources: Dict[str, bytes] = {}
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith(BUILD_EXTENSIONS):
+                full_path = os.path.join(root, name)
+                path = os.path.relpath(full_path, directory).replace(os.sep, '/')
+                with open(full_path, 'rb') as f:
+                    sources[path] = f.read()
+
+    assets: Dict[str, Asset] = {}
+    manifest: Dict[str, str] = {}
+    for path, body in sources.items():
+        if path.endswith(FINGERPRINT_EXTENSIONS):
+            hashed = fingerprint_name(path, body)
+            manifest[path] = hashed
+            assets[hashed] = _make_asset(path, body, IMMUTABLE_CACHE_CONTROL)
+            # Исходное имя остаётся доступным (ссылки из JS, старые закладки)
+            assets[path] = _make_asset(path, body, revalidate_cache_control())
+
+    def rewrite(match) -> str:
+        hashed = manifest.get(match.group('path'))
+        if hashed is None:
+            return match.group(0)
+        return f"{match.group('attr')}{match.group('quote')}/static/{hashed}{match.group('quote')}"
+
+    for path, body in sources.items():
+        if path.endswith('.html'):
+            html = _REFERENCE_RE.sub(rewrite, body.decode('utf-8'))
+            assets[path] = _make_asset(path, html.encode('utf-8'), revalidate_cache_control())
+
+    return assets, manifest
+
+
+class FingerprintedStaticFiles(StaticFiles):
+    """
+    StaticFiles с собранными в память JS, CSS и HTML
+
+    Прочие файлы отдаются с диска как раньше, с Cache-Control проверки.
+    Файлы с отпечатком предыдущей сборки остаются доступными до следующей
+    пересборки, чтобы уже открытые страницы догрузили свои скрипты.
+    """
+
+    def __init__(self, *, directory: str, **kwargs):
+        super().__init__(directory=directory, **kwargs)
+        self._assets: Dict[str, Asset] = {}
+        self._previous: Dict[str, Asset] = {}
+        self.manifest: Dict[str, str] = {}
+        self._snapshot: Dict[str, Tuple[int, int]] = {}
+        self._checked_at = 0.0
+        self._rebuild()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(BUILD_EXTENSIONS):
+                    stat_result = os.stat(os.path.join(root, name))
+                    snapshot[os.path.join(root, name)] = (stat_result.st_mtime_ns, stat_result.st_size)
+        return snapshot
+
+    def _rebuild(self):
+        started = time.perf_counter()
+        snapshot = self._scan()
+        assets, manifest = build_assets(self.directory)
+        self._previous = {
+            path: asset for path, asset in self._assets.items()
+            if asset.cache_control == IMMUTABLE_CACHE_CONTROL and path not in assets
+        }
+        self._assets, self.manifest, self._snapshot = assets, manifest, snapshot
+        raw = sum(len(asset.body) for asset in assets.values())
+        compressed = sum(len(asset.gzip_body or asset.body) for asset in assets.values())
+        logger.info(
+            f"📦 Статика собрана: {len(manifest)} JS/CSS с отпечатком, {len(assets)} файлов, "
+            f"{raw // 1024} КБ -> {compressed // 1024} КБ gzip за {(time.perf_counter() - started) * 1000:.0f} мс"
+        )
+
+    def _refresh(self):
+        """Пересборка, если исходники изменились (не чаще STATIC_ASSETS_CHECK_INTERVAL)"""
+        if self._scan() != self._snapshot:
+            self._rebuild()
+        self._checked_at = time.monotonic()
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if time.monotonic() - self._checked_at >= settings.static_assets_check_interval:
+            await anyio.to_thread.run_sync(self._refresh)
+
+        key = path.replace(os.sep, '/')
+        asset = self._assets.get(key) or self._previous.get(key)
+        if asset is None or scope["method"] not in ("GET", "HEAD"):
+            response = await super().get_response(path, scope)
+            if response.status_code == 200 and "cache-control" not in response.headers:
+                response.headers["Cache-Control"] = revalidate_cache_control()
+            return response
+
+        request_headers = Headers(scope=scope)
+        use_gzip = asset.gzip_body is not None and accepts_gzip(request_headers.get("accept-encoding", ""))
+        etag = asset.etag[:-1] + '-gz"' if use_gzip else asset.etag
+        headers = {"Cache-Control": asset.cache_control, "ETag": etag, "Vary": "Accept-Encoding"}
+
+        if_none_match = request_headers.get("if-none-match", "")
+        if etag in [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]:
+            return Response(status_code=304, headers=headers)
+
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+        body = asset.gzip_body if use_gzip else asset.body
+        return Response(body, media_type=asset.media_type, headers=headers)
+
+
+# Экспорт
+__all__ = [
+    'Asset',
+    'FingerprintedStaticFiles',
+    'build_assets',
+    'fingerprint_name',
+    'accepts_gzip'
+]
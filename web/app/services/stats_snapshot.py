@@ -0,0 +1,377 @@
+# -*- coding: utf-8 -*-
+"""
+Сервис ежедневных снимков статистики
+Ночная задача сохраняет одну строку на день в daily_stats_snapshots,
+backfill восстанавливает прошлые дни по created_at/expiration_date за один проход
+"""
+from apscheduler.triggers.cron import CronTrigger
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+import asyncio
+import logging
+
+from backend.config import settings
+from backend.models import SupportRequest
+from ..database import SessionLocal, engine
+from ..models.client import Deadline, NotificationLog
+from ..models.cash_register import CashRegister
+from ..models.stats_snapshot import DailyStatsSnapshot
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_JOB_ID = "daily_stats_snapshot"
+SNAPSHOT_GAP_JOB_ID = "stats_snapshot_gap"
+
+# Поля состояния на конец дня (в трендах берётся последнее значение периода)
+STATE_FIELDS = [
+    'active_deadlines',
+    'status_expired',
+    'status_red',
+    'status_yellow',
+    'status_green',
+    'support_requests_open'
+]
+
+# Поля-потоки за день (в трендах суммируются за период)
+FLOW_FIELDS = [
+    'notifications_sent',
+    'notifications_failed',
+    'support_requests_created'
+]
+
+
+class _DayCounter:
+    """
+    Счётчик интервалов по дням через разностный массив
+
+    add(start, end) увеличивает значение для дней [start, end) за O(1),
+    values() разворачивает префиксные суммы по всему диапазону
+    """
+
+    def __init__(self, date_from: date, days: int):
+        self.date_from = date_from
+        self.days = days
+        self._diff = [0] * (days + 1)
+
+    def add(self, start: date, end: date):
+        a = max((start - self.date_from).days, 0)
+        b = min((end - self.date_from).days, self.days)
+        if a < b:
+            self._diff[a] += 1
+            self._diff[b] -= 1
+
+    def values(self) -> List[int]:
+        result = []
+        running = 0
+        for delta in self._diff[:self.days]:
+            running += delta
+            result.append(running)
+        return result
+
+
+def _to_date(value) -> Optional[date]:
+    """Дата из date/datetime/строки (func.date в SQLite возвращает строку)"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def compute_snapshots(db: Session, date_from: date, date_to: date) -> Dict[date, Dict]:
+    """
+    Расчёт снимков за диапазон дат набором агрегатных запросов
+
+    Каждая таблица читается один раз, интервалы "дедлайн существовал и был
+    в статусе X" раскладываются по дням разностными массивами - стоимость
+    O(строк + дней) вместо отдельного запроса на каждый день.
+    Закрытые дедлайны считаются активными до даты updated_at.
+
+    Args:
+        db: Сессия БД
+        date_from: Первый день
+        date_to: Последний день (включительно)
+
+    Returns:
+        Dict: дата -> значения полей DailyStatsSnapshot
+    """
+    days = (date_to - date_from).days + 1
+    day_after = date_to + timedelta(days=1)
+
+    buckets = {name: _DayCounter(date_from, days) for name in ('status_expired', 'status_red', 'status_yellow', 'status_green')}
+    active = _DayCounter(date_from, days)
+    by_type: Dict[int, _DayCounter] = defaultdict(lambda: _DayCounter(date_from, days))
+    by_ofd: Dict[int, _DayCounter] = defaultdict(lambda: _DayCounter(date_from, days))
+
+    # Дедлайны: только активные или закрытые внутри диапазона
+    rows = db.query(
+        Deadline.deadline_type_id,
+        CashRegister.ofd_provider_id,
+        Deadline.created_at,
+        Deadline.expiration_date,
+        Deadline.status,
+        Deadline.updated_at
+    ).outerjoin(
+        CashRegister, Deadline.cash_register_id == CashRegister.id
+    ).filter(
+        or_(Deadline.created_at.is_(None), Deadline.created_at < day_after),
+        or_(Deadline.status == 'active', Deadline.updated_at >= date_from)
+    ).all()
+
+    for type_id, ofd_id, created_at, expiration_date, status, updated_at in rows:
+        start = _to_date(created_at) or date_from
+        end = day_after if status == 'active' else (_to_date(updated_at) or date_from)
+        if start >= end:
+            continue
+
+        active.add(start, end)
+        # days_remaining = expiration_date - день: green >= 14, yellow 7-13, red 0-6, expired < 0
+        buckets['status_green'].add(start, min(end, expiration_date - timedelta(days=13)))
+        buckets['status_yellow'].add(max(start, expiration_date - timedelta(days=13)), min(end, expiration_date - timedelta(days=6)))
+        buckets['status_red'].add(max(start, expiration_date - timedelta(days=6)), min(end, expiration_date + timedelta(days=1)))
+        buckets['status_expired'].add(max(start, expiration_date + timedelta(days=1)), end)
+
+        if type_id is not None:
+            by_type[type_id].add(start, end)
+        if ofd_id is not None:
+            by_ofd[ofd_id].add(start, end)
+
+    # Уведомления по дням и статусам
+    sent = defaultdict(int)
+    failed = defaultdict(int)
+    notification_rows = db.query(
+        func.date(NotificationLog.sent_at),
+        NotificationLog.status,
+        func.count(NotificationLog.id)
+    ).filter(
+        NotificationLog.sent_at >= date_from,
+        NotificationLog.sent_at < day_after
+    ).group_by(
+        func.date(NotificationLog.sent_at),
+        NotificationLog.status
+    ).all()
+
+    for day, status, count in notification_rows:
+        if status == 'sent':
+            sent[_to_date(day)] += count
+        elif status == 'failed':
+            failed[_to_date(day)] += count
+
+    # Обращения: созданные за день и открытые на конец дня
+    support_created = defaultdict(int)
+    support_open = _DayCounter(date_from, days)
+    support_rows = db.query(
+        SupportRequest.created_at,
+        SupportRequest.resolved_at
+    ).filter(
+        SupportRequest.created_at < day_after,
+        or_(SupportRequest.resolved_at.is_(None), SupportRequest.resolved_at >= date_from)
+    ).all()
+
+    for created_at, resolved_at in support_rows:
+        created = _to_date(created_at)
+        support_created[created] += 1
+        support_open.add(created, _to_date(resolved_at) or day_after)
+
+    # Сборка строк по дням
+    columns = {name: counter.values() for name, counter in buckets.items()}
+    columns['active_deadlines'] = active.values()
+    columns['support_requests_open'] = support_open.values()
+    type_columns = {type_id: counter.values() for type_id, counter in by_type.items()}
+    ofd_columns = {ofd_id: counter.values() for ofd_id, counter in by_ofd.items()}
+
+    snapshots = {}
+    for i in range(days):
+        day = date_from + timedelta(days=i)
+        snapshot = {name: values[i] for name, values in columns.items()}
+        snapshot['by_deadline_type'] = {str(k): v[i] for k, v in type_columns.items() if v[i]}
+        snapshot['by_ofd_provider'] = {str(k): v[i] for k, v in ofd_columns.items() if v[i]}
+        snapshot['notifications_sent'] = sent.get(day, 0)
+        snapshot['notifications_failed'] = failed.get(day, 0)
+        snapshot['support_requests_created'] = support_created.get(day, 0)
+        snapshots[day] = snapshot
+
+    return snapshots
+
+
+def save_snapshots(
+    db: Session,
+    snapshots: Dict[date, Dict],
+    is_backfilled: bool,
+    overwrite: bool = False
+) -> int:
+    """
+    Запись снимков (upsert по snapshot_date)
+
+    Args:
+        db: Сессия БД
+        snapshots: Результат compute_snapshots
+        is_backfilled: Пометка восстановленных снимков
+        overwrite: Перезаписывать снимки, снятые в свой день (не восстановленные)
+
+    Returns:
+        int: Количество записанных строк
+    """
+    if not snapshots:
+        return 0
+
+    existing = {
+        row.snapshot_date: row
+        for row in db.query(DailyStatsSnapshot).filter(
+            DailyStatsSnapshot.snapshot_date >= min(snapshots),
+            DailyStatsSnapshot.snapshot_date <= max(snapshots)
+        )
+    }
+
+    written = 0
+    for day, values in snapshots.items():
+        row = existing.get(day)
+        if row is None:
+            row = DailyStatsSnapshot(snapshot_date=day)
+            db.add(row)
+        elif is_backfilled and not row.is_backfilled and not overwrite:
+            continue
+
+        for name, value in values.items():
+            setattr(row, name, value)
+        row.is_backfilled = is_backfilled
+        written += 1
+
+    db.commit()
+    return written
+
+
+def take_daily_snapshot(snapshot_date: Optional[date] = None) -> None:
+    """
+    Задача планировщика: снимок статистики за текущий день
+
+    Args:
+        snapshot_date: День снимка (по умолчанию сегодня)
+    """
+    snapshot_date = snapshot_date or date.today()
+    db = SessionLocal()
+    try:
+        snapshots = compute_snapshots(db, snapshot_date, snapshot_date)
+        save_snapshots(db, snapshots, is_backfilled=False)
+        logger.info(
+            f"Снимок статистики за {snapshot_date}: "
+            f"{snapshots[snapshot_date]['active_deadlines']} активных дедлайнов"
+        )
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Ошибка создания снимка статистики: {e}")
+    finally:
+        db.close()
+
+
+def backfill_snapshots(db: Session, date_from: date, date_to: date, overwrite: bool = False) -> int:
+    """
+    Восстановление снимков за прошлые дни
+
+    Args:
+        db: Сессия БД
+        date_from: Первый день
+        date_to: Последний день (включительно)
+        overwrite: Перезаписывать снимки, снятые в свой день
+
+    Returns:
+        int: Количество записанных строк
+    """
+    snapshots = compute_snapshots(db, date_from, date_to)
+    written = save_snapshots(db, snapshots, is_backfilled=True, overwrite=overwrite)
+    logger.info(f"Backfill снимков статистики {date_from} - {date_to}: записано {written}")
+    return written
+
+
+def fill_snapshot_gap() -> None:
+    """Восстановление дней, пропущенных пока приложение было остановлено"""
+    db = SessionLocal()
+    try:
+        last_date = db.query(func.max(DailyStatsSnapshot.snapshot_date)).scalar()
+        yesterday = date.today() - timedelta(days=1)
+        # Без истории снимков backfill запускается вручную (POST /api/dashboard/trends/backfill)
+        if last_date is not None and last_date < yesterday:
+            backfill_snapshots(db, last_date + timedelta(days=1), yesterday)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Ошибка восстановления пропущенных снимков статистики: {e}")
+    finally:
+        db.close()
+
+
+async def init_snapshot_job(scheduler) -> None:
+    """
+    Регистрация ночной задачи снимков в планировщике приложения
+
+    Пропущенные дни восстанавливаются разовой задачей планировщика (в его
+    пуле потоков), а не при получении лидерства.
+
+    Args:
+        scheduler: Планировщик APScheduler (общий с автобэкапами)
+    """
+    await asyncio.to_thread(DailyStatsSnapshot.__table__.create, bind=engine, checkfirst=True)
+
+    hour, minute = (int(part) for part in settings.stats_snapshot_time.split(':'))
+    scheduler.add_job(
+        take_daily_snapshot,
+        trigger=CronTrigger(hour=hour, minute=minute),
+        id=SNAPSHOT_JOB_ID,
+        name="Ежедневный снимок статистики",
+        replace_existing=True
+    )
+    scheduler.add_job(
+        fill_snapshot_gap,
+        trigger='date',
+        id=SNAPSHOT_GAP_JOB_ID,
+        name="Восстановление пропущенных снимков статистики",
+        replace_existing=True,
+        misfire_grace_time=None
+    )
+
+    logger.info(f"Задача снимков статистики: ежедневно в {hour:02d}:{minute:02d}")
+
+
+def aggregate_trends(rows: List[DailyStatsSnapshot], granularity: str) -> List[Dict]:
+    """
+    Группировка дневных снимков по периодам
+
+    Поля состояния берутся из последнего снимка периода, потоки суммируются
+
+    Args:
+        rows: Снимки, отсортированные по дате
+        granularity: day, week или month
+
+    Returns:
+        List[Dict]: Точки графика с полем period (дата начала периода)
+    """
+    points: List[Dict] = []
+    current_period = None
+
+    for row in rows:
+        day = row.snapshot_date
+        if granularity == 'week':
+            period = day - timedelta(days=day.weekday())
+        elif granularity == 'month':
+            period = day.replace(day=1)
+        else:
+            period = day
+
+        values = row.to_dict()
+        if period != current_period:
+            current_period = period
+            points.append({'period': period.isoformat(), 'days': 0, **{name: 0 for name in FLOW_FIELDS}})
+
+        point = points[-1]
+        point['days'] += 1
+        for name in FLOW_FIELDS:
+            point[name] += values[name]
+        for name in STATE_FIELDS + ['date', 'by_deadline_type', 'by_ofd_provider']:
+            point[name] = values[name]
+        point['is_backfilled'] = point.get('is_backfilled', False) or values['is_backfilled']
+
+    return points
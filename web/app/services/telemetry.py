@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+"""
+Телеметрия запросов веб-приложения
+
+Каждый HTTP запрос получает RequestStats в contextvar; обработчики
+SQLAlchemy before/after_cursor_execute (на всех engine процесса) считают
+в нём запросы к БД и их время, медленные запросы пишутся в лог с маршрутом.
+
+По завершении запроса TelemetryMiddleware записывает метрики маршрута в
+TelemetryStore процесса. Каждый воркер uvicorn периодически сохраняет свой
+снимок в METRICS_DIR (web-<pid>.json); /api/metrics суммирует снимки живых
+воркеров и отдаёт их в текстовом формате Prometheus.
+"""
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Границы корзин гистограммы длительности запросов (секунды)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Длина SQL в логе медленных запросов
+SLOW_QUERY_LOG_LENGTH = 500
+
+
+class RequestStats:
+    """Запросы к БД в рамках одного HTTP запроса"""
+
+    __slots__ = ('scope', 'queries', 'db_time', 'slow_queries')
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.queries = 0
+        self.db_time = 0.0
+        self.slow_queries = 0
+
+
+_request_stats: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar('request_stats', default=None)
+
+
+def route_label(scope: dict) -> str:
+    """
+    Шаблон маршрута запроса ("/api/users/{user_id}") для меток метрик
+
+    До выбора маршрута и для неизвестных путей - "other", чтобы
+    произвольные URL не раздували число рядов.
+    """
+    route = scope.get('route')
+    path_format = getattr(route, 'path_format', None) or getattr(route, 'path', None)
+    if path_format:
+        return path_format
+    if scope.get('path', '').startswith('/static/'):
+        return '/static'
+    return 'other'
+
+
+def start_request(scope: dict) -> Tuple[RequestStats, contextvars.Token]:
+    """Начало учёта запроса (вызывается middleware)"""
+    stats = RequestStats(scope)
+    return stats, _request_stats.set(stats)
+
+
+def finish_request(token: contextvars.Token):
+    """Окончание учёта запроса"""
+    _request_stats.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _request_stats.get() is not None:
+        conn.info.setdefault('telemetry_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _request_stats.get()
+    if stats is None:
+        return
+    started = conn.info.get('telemetry_started')
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    stats.queries += 1
+    stats.db_time += elapsed
+
+    if elapsed * 1000 >= settings.slow_query_threshold_ms:
+        stats.slow_queries += 1
+        scope = stats.scope
+        logger.warning(
+            f"🐢 Медленный запрос {elapsed * 1000:.0f} мс в {scope.get('method')} {route_label(scope)}: "
+            f"{' '.join(statement.split())[:SLOW_QUERY_LOG_LENGTH]}"
+        )
+
+
+def install_sql_hooks():
+    """Подключение счётчиков SQL ко всем engine процесса (повторный вызов ничего не делает)"""
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+class TelemetryStore:
+    """
+    Метрики маршрутов одного процесса
+
+    histograms: (method, route) -> [счётчики корзин с +Inf, сумма, количество]
+    counters: имя -> (метки) -> значение
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms: Dict[Tuple[str, str], List] = {}
+        self.counters: Dict[str, Dict[Tuple[str, ...], float]] = {}
+
+    def _inc(self, name: str, labels: Tuple[str, ...], value: float = 1.0):
+        series = self.counters.setdefault(name, {})
+        series[labels] = series.get(labels, 0.0) + value
+
+    def record(self, method: str, route: str, status: int, duration: float, stats: RequestStats):
+        """
+        Учёт завершённого запроса
+
+        Args:
+            method: HTTP метод
+            route: Шаблон маршрута
+            status: Код ответа
+            duration: Длительность (секунды)
+            stats: Запросы к БД
+        """
+        with self._lock:
+            entry = self.histograms.get((method, route))
+            if entry is None:
+                entry = [[0] * (len(LATENCY_BUCKETS) + 1), 0.0, 0]
+                self.histograms[(method, route)] = entry
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if duration <= bound:
+                    entry[0][i] += 1
+            entry[0][-1] += 1
+            entry[1] += duration
+            entry[2] += 1
+
+            self._inc('http_requests_total', (method, route, str(status)))
+            self._inc('http_request_db_queries_total', (method, route), stats.queries)
+            self._inc('http_request_db_seconds_total', (method, route), stats.db_time)
+            if stats.slow_queries:
+                self._inc('db_slow_queries_total', (method, route), stats.slow_queries)
+
+    def snapshot(self) -> Dict:
+        """Снимок метрик для файла воркера"""
+        with self._lock:
+            return {
+                'pid': os.getpid(),
+                'written_at': time.time(),
+                'histograms': [
+                    [method, route, list(buckets), total, count]
+                    for (method, route), (buckets, total, count) in self.histograms.items()
+                ],
+                'counters': {
+                    name: [[*labels, value] for labels, value in series.items()]
+                    for name, series in self.counters.items()
+                }
+            }
+
+
+telemetry_store = TelemetryStore()
+
+
+def _snapshot_path(pid: int) -> str:
+    return os.path.join(settings.metrics_dir, f"web-{pid}.json")
+
+
+def flush_snapshot():
+    """Сохранение снимка метрик этого воркера (атомарно)"""
+    os.makedirs(settings.metrics_dir, exist_ok=True)
+    path = _snapshot_path(os.getpid())
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(telemetry_store.snapshot(), f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+_flusher_task: Optional[asyncio.Task] = None
+
+
+async def _flush_periodically():
+    while True:
+        await asyncio.sleep(settings.metrics_flush_interval)
+        try:
+            await asyncio.to_thread(flush_snapshot)
+        except Exception as e:
+            logger.error(f"Ошибка сохранения снимка метрик: {e}")
+
+
+def start_snapshot_flusher():
+    """Периодическое сохранение снимка метрик воркера (вызывать при старте приложения)"""
+    global _flusher_task
+
+    if _flusher_task is None or _flusher_task.done():
+        _flusher_task = asyncio.create_task(_flush_periodically())
+
+
+def stop_snapshot_flusher():
+    """Остановка сохранения и удаление снимка воркера"""
+    global _flusher_task
+
+    if _flusher_task is not None:
+        _flusher_task.cancel()
+        _flusher_task = None
+    try:
+        os.remove(_snapshot_path(os.getpid()))
+    except OSError:
+        pass
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def load_snapshots() -> List[Dict]:
+    """
+    Снимки всех живых воркеров (свой - свежий, без ожидания сохранения)
+
+    Файлы завершившихся воркеров удаляются.
+    """
+    flush_snapshot()
+    snapshots = []
+    for name in os.listdir(settings.metrics_dir):
+        if not (name.startswith('web-') and name.endswith('.json')):
+            continue
+        path = os.path.join(settings.metrics_dir, name)
+        try:
+            with open(path, encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            continue
+        pid = snapshot.get('pid')
+        if not isinstance(pid, int) or pid <= 0 or not _pid_alive(pid):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            continue
+        snapshots.append(snapshot)
+    return snapshots
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _labels(names: Tuple[str, ...], values) -> str:
+    return ','.join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+
+
+COUNTER_HELP = {
+    'http_requests_total': (('method', 'route', 'status'), "Запросы по маршрутам и кодам ответа"),
+    'http_request_db_queries_total': (('method', 'route'), "SQL запросы, выполненные при обработке запросов"),
+    'http_request_db_seconds_total': (('method', 'route'), "Время SQL запросов при обработке запросов"),
+    'db_slow_queries_total': (('method', 'route'), "SQL запросы дольше SLOW_QUERY_THRESHOLD_MS"),
+}
+
+
+def render_prometheus(snapshots: List[Dict]) -> str:
+    """
+    Сумма снимков воркеров в текстовом формате Prometheus
+
+    Args:
+        snapshots: Снимки TelemetryStore.snapshot()
+
+    Returns:
+        str: Текст метрик
+    """
+    histograms: Dict[Tuple[str, str], List] = {}
+    counters: Dict[str, Dict[Tuple[str, ...], float]] = {}
+    for snapshot in snapshots:
+        for method, route, buckets, total, count in snapshot.get('histograms', []):
+            entry = histograms.setdefault((method, route), [[0] * len(buckets), 0.0, 0])
+            entry[0] = [a + b for a, b in zip(entry[0], buckets)]
+            entry[1] += total
+            entry[2] += count
+        for name, series in snapshot.get('counters', {}).items():
+            target = counters.setdefault(name, {})
+            for *labels, value in series:
+                target[tuple(labels)] = target.get(tuple(labels), 0.0) + value
+
+    lines = [
+        "# HELP http_request_duration_seconds Длительность обработки запросов",
+        "# TYPE http_request_duration_seconds histogram"
+    ]
+    for (method, route), (buckets, total, count) in sorted(histograms.items()):
+        base = _labels(('method', 'route'), (method, route))
+        for bound, value in zip([*map(str, LATENCY_BUCKETS), '+Inf'], buckets):
+            lines.append(f'http_request_duration_seconds_bucket{{{base},le="{bound}"}} {value}')
+        lines.append(f'http_request_duration_seconds_sum{{{base}}} {total:.6f}')
+        lines.append(f'http_request_duration_seconds_count{{{base}}} {count}')
+
+    for name, (label_names, help_text) in COUNTER_HELP.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for labels, value in sorted(counters.get(name, {}).items()):
+            lines.append(f"{name}{{{_labels(label_names, labels)}}} {_number(value)}")
+
+    lines.append("# HELP web_workers Воркеры, снимки которых вошли в метрики")
+    lines.append("# TYPE web_workers gauge")
+    lines.append(f"web_workers {len(snapshots)}")
+    return "\n".join(lines) + "\n"
+
+
+# Экспорт
+__all__ = [
+    'LATENCY_BUCKETS',
+    'RequestStats',
+    'TelemetryStore',
+    'telemetry_store',
+    'route_label',
+    'start_request',
+    'finish_request',
+    'install_sql_hooks',
+    'flush_snapshot',
+    'start_snapshot_flusher',
+    'stop_snapshot_flusher',
+    'load_snapshots',
+    'render_prometheus'
+]
@@ -1,6 +1,10 @@
 // database-management.js - Управление резервными копиями БД
 const API_BASE_URL = window.location.origin + '/api';
 
+// Список бэкапов: страница и сортировка
+const BACKUPS_PAGE_SIZE = 50;
+let backupsPage = 1;
+
 // Функции для работы с токеном
 function getToken() {
     return localStorage.getItem('access_token');
@@ -68,7 +72,13 @@ function initDialogs() {
 // Загрузить список резервных копий
 async function loadBackups() {
     try {
-        const response = await fetch(`${API_BASE_URL}/database/backups`, {
+        const params = new URLSearchParams({
+            page: backupsPage,
+            page_size: BACKUPS_PAGE_SIZE,
+            sort_by: document.getElementById('backupsSortBy').value,
+            order: document.getElementById('backupsOrder').value
+        });
+        const response = await fetch(`${API_BASE_URL}/database/backups?${params}`, {
             headers: {
                 'Authorization': `Bearer ${getToken()}`
             }
@@ -82,7 +92,13 @@ async function loadBackups() {
 
         if (response.ok) {
             const data = await response.json();
+            // Страница опустела (удалили последние бэкапы на ней) - на последнюю
+            if (data.backups.length === 0 && backupsPage > data.total_pages) {
+                backupsPage = data.total_pages;
+                return loadBackups();
+            }
             displayBackups(data);
+            updateBackupsPagination(data.page, data.total_pages);
         } else {
             const error = await response.json();
             alert(`Ошибка загрузки списка: ${error.detail}`);
@@ -114,9 +130,8 @@ function displayBackups(data) {
     if (totalBackups) totalBackups.textContent = data.total_count || 0;
     if (totalSize) totalSize.textContent = `${data.total_size_mb || 0} МБ`;
     
-    if (data.backups && data.backups.length > 0) {
-        const lastBackupDate = new Date(data.backups[0].created_at);
-        if (lastBackup) lastBackup.textContent = formatDateTime(lastBackupDate);
+    if (data.last_backup_at) {
+        if (lastBackup) lastBackup.textContent = formatDateTime(new Date(data.last_backup_at));
     } else {
         if (lastBackup) lastBackup.textContent = 'Нет копий';
     }
@@ -142,6 +157,9 @@ function displayBackups(data) {
                 <button class="mdl-button mdl-js-button mdl-button--icon" onclick="downloadBackup('${backup.filename}')" title="Скачать">
                     <i class="material-icons">download</i>
                 </button>
+                <button class="mdl-button mdl-js-button mdl-button--icon" onclick="showRestoreDialog('${backup.filename}')" title="Восстановить">
+                    <i class="material-icons">restore</i>
+                </button>
                 <button class="mdl-button mdl-js-button mdl-button--icon" onclick="deleteBackup('${backup.filename}')" title="Удалить">
                     <i class="material-icons">delete</i>
                 </button>
@@ -155,7 +173,24 @@ function displayBackups(data) {
     updateRestoreSelect(data.backups);
 }
 
-// Обновить список для восстановления
+// Обновить переключатель страниц
+function updateBackupsPagination(page, totalPages) {
+    document.getElementById('backupsPageInfo').textContent = `Страница ${page} из ${totalPages}`;
+    document.getElementById('backupsPrevPageBtn').disabled = page <= 1;
+    document.getElementById('backupsNextPageBtn').disabled = page >= totalPages;
+}
+
+function changeBackupsPage(page) {
+    backupsPage = page;
+    loadBackups();
+}
+
+function changeBackupsSort() {
+    backupsPage = 1;
+    loadBackups();
+}
+
+// Обновить список для восстановления (бэкапы текущей страницы)
 function updateRestoreSelect(backups) {
     const select = document.getElementById('restoreBackupSelect');
     select.innerHTML = '';
@@ -285,10 +320,13 @@ async function deleteBackup(filename) {
     }
 }
 
-// Показать диалог восстановления
-function showRestoreDialog() {
+// Показать диалог восстановления (filename - выбрать бэкап из строки таблицы)
+function showRestoreDialog(filename) {
     const dialog = document.getElementById('restoreDialog');
     document.getElementById('restorePassword').value = '';
+    if (filename) {
+        document.getElementById('restoreBackupSelect').value = filename;
+    }
     dialog.showModal();
 }
 
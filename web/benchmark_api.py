@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+Замер сериализации и размера ответов списочных эндпоинтов API
+
+На отдельной SQLite базе с тестовыми клиентами и дедлайнами сравнивает:
+    - сериализацию страницы /api/deadlines как раньше (проверка каждой
+      строки через DeadlineListResponse, jsonable_encoder, json.dumps)
+      и как сейчас (словари из колонок, FastJSONResponse)
+    - байты ответа без сжатия и с gzip (SelectiveGZipMiddleware)
+    - полное время запроса через приложение
+
+Использование:
+    python web/benchmark_api.py --clients 400 --page-size 100
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Добавить путь к корню проекта
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Аргументы командной строки"""
+    parser = argparse.ArgumentParser(description="Сериализация и размер ответов API (offline, SQLite)")
+    parser.add_argument('--db', default='database/benchmark_api.db', help="Файл SQLite базы для замера")
+    parser.add_argument('--clients', type=int, default=400, help="Клиентов в тестовых данных")
+    parser.add_argument('--deadlines-per-client', type=int, default=5, help="Дедлайнов на клиента")
+    parser.add_argument('--page-size', type=int, default=100, help="Размер страницы /api/deadlines")
+    parser.add_argument('--repeat', type=int, default=50, help="Повторов каждого замера")
+    return parser.parse_args(argv)
+
+
+def configure_environment(args: argparse.Namespace):
+    """Настройки веб-приложения для замера (до импорта модулей приложения)"""
+    db_path = os.path.abspath(args.db)
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+
+
+def seed_database(clients: int, deadlines_per_client: int):
+    """Клиенты с кассами и дедлайнами"""
+    from web.app.database import Base, SessionLocal, engine
+    from web.app.models.cash_register import CashRegister
+    from web.app.models.client import Deadline, DeadlineType
+    from web.app.models.user import User
+
+    Base.metadata.create_all(bind=engine)
+    rnd = random.Random(1)
+    db = SessionLocal()
+    try:
+        types = [DeadlineType(type_name=name) for name in ('ОФД', 'ФН', 'Регистрация ККТ', 'ЭЦП')]
+        db.add_all(types)
+        db.flush()
+        for i in range(clients):
+            user = User(
+                username=f"client{i}",
+                email=f"client{i}@benchmark.local",
+                full_name=f"Клиент {i}",
+                role='client',
+                company_name=f'ООО "Компания {i}"',
+                inn=f"77{i:08d}",
+                is_active=True
+            )
+            db.add(user)
+            db.flush()
+            register = CashRegister(client_id=user.id, factory_number=f"F{i:06d}", model='АТОЛ 30Ф', is_active=True)
+            db.add(register)
+            db.flush()
+            for j in range(deadlines_per_client):
+                db.add(Deadline(
+                    client_id=user.id,
+                    deadline_type_id=types[j % len(types)].id,
+                    cash_register_id=register.id if j % 2 else None,
+                    expiration_date=date.today() + timedelta(days=rnd.randint(-10, 180)),
+                    status='active',
+                    notes=f"Примечание {j}" if j % 2 else None
+                ))
+        db.commit()
+    finally:
+        db.close()
+
+
+def measure(func: Callable, repeat: int) -> float:
+    """Медианное время вызова (мс)"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict:
+    from fastapi import FastAPI
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.testclient import TestClient
+
+    from web.app.api import deadlines
+    from web.app.dependencies import get_current_user
+    from web.app.middleware.compression import SelectiveGZipMiddleware
+    from web.app.models.client_schemas import DeadlineListResponse
+    from web.app.responses import ORJSON_AVAILABLE, FastJSONResponse, dumps
+
+    app = FastAPI(default_response_class=FastJSONResponse)
+    app.add_middleware(SelectiveGZipMiddleware, minimum_size=1024)
+    app.include_router(deadlines.router)
+    app.dependency_overrides[get_current_user] = lambda: {'sub': '1', 'role': 'admin'}
+    client = TestClient(app)
+
+    url = f"/api/deadlines?page_size={args.page_size}"
+    payload = client.get(url, headers={'Accept-Encoding': 'identity'}).json()
+
+    def legacy():
+        model = DeadlineListResponse(**payload)
+        return json.dumps(jsonable_encoder(model), ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+
+    def fast():
+        return dumps(payload)
+
+    plain_response = client.get(url, headers={'Accept-Encoding': 'identity'})
+    gzip_response = client.get(url, headers={'Accept-Encoding': 'gzip'})
+
+    return {
+        'rows': len(payload['deadlines']),
+        'orjson': ORJSON_AVAILABLE,
+        'serialize_legacy_ms': measure(legacy, args.repeat),
+        'serialize_fast_ms': measure(fast, args.repeat),
+        'wire_identity': int(plain_response.headers['content-length']),
+        'wire_gzip': int(gzip_response.headers['content-length']),
+        'request_ms': measure(lambda: client.get(url, headers={'Accept-Encoding': 'gzip'}), args.repeat)
+    }
+
+
+def format_report(result: Dict) -> str:
+    """Отчёт"""
+    return "\n".join([
+        f"/api/deadlines: {result['rows']} строк, orjson={'да' if result['orjson'] else 'нет'}",
+        f"  сериализация: раньше {result['serialize_legacy_ms']:.2f} мс, сейчас {result['serialize_fast_ms']:.2f} мс",
+        f"  на проводе:   {result['wire_identity']} байт без сжатия, {result['wire_gzip']} байт gzip",
+        f"  запрос целиком (gzip): {result['request_ms']:.1f} мс"
+    ])
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    configure_environment(args)
+    seed_database(args.clients, args.deadlines_per_client)
+    print(format_report(run_benchmark(args)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+Замер задержки входа в веб-панель при параллельных запросах
+
+Запускает одновременные входы разных пользователей через сервис
+аутентификации (тот же путь, что и POST /api/auth/login) на отдельной
+SQLite базе и сравнивает режимы:
+    pool   - bcrypt в пуле потоков (authenticate_user_async)
+    inline - bcrypt прямо в event loop (authenticate_user, как было раньше)
+
+Пока идут входы, фоновая задача измеряет задержку event loop - её видят
+все остальные запросы воркера.
+
+Использование:
+    python web/benchmark_login.py --logins 40 --concurrency 20
+    python web/benchmark_login.py --mode pool --rounds 12 --workers 4
+    python web/benchmark_login.py --seed-rounds 10 --rounds 12  # пересчёт хешей при входе
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Добавить путь к корню проекта
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+PASSWORD = "benchmark-password"
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Аргументы командной строки"""
+    parser = argparse.ArgumentParser(description="Задержка входа при параллельных запросах (offline, SQLite)")
+    parser.add_argument('--db', default='database/benchmark_login.db', help="Файл SQLite базы для замера")
+    parser.add_argument('--logins', type=int, default=40, help="Сколько входов выполнить")
+    parser.add_argument('--concurrency', type=int, default=20, help="Одновременных входов")
+    parser.add_argument('--mode', choices=('pool', 'inline', 'both'), default='both', help="Режим проверки пароля")
+    parser.add_argument('--rounds', type=int, default=None, help="BCRYPT_ROUNDS (по умолчанию из настроек)")
+    parser.add_argument('--seed-rounds', type=int, default=None, help="Cost хешей тестовых пользователей")
+    parser.add_argument('--workers', type=int, default=None, help="BCRYPT_MAX_WORKERS")
+    return parser.parse_args(argv)
+
+
+def configure_environment(args: argparse.Namespace):
+    """Настройки веб-приложения для замера (до импорта модулей приложения)"""
+    db_path = os.path.abspath(args.db)
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+    os.environ['LOGIN_RATE_LIMIT'] = str(args.logins * 2)
+    if args.rounds is not None:
+        os.environ['BCRYPT_ROUNDS'] = str(args.rounds)
+    if args.workers is not None:
+        os.environ['BCRYPT_MAX_WORKERS'] = str(args.workers)
+
+
+def seed_users(count: int, rounds: int):
+    """Создание пользователей с одинаковым паролем"""
+    import bcrypt
+    from web.app.database import Base, SessionLocal, engine
+    from web.app.models.user import User
+
+    Base.metadata.create_all(bind=engine)
+    password_hash = bcrypt.hashpw(PASSWORD.encode('utf-8'), bcrypt.gensalt(rounds=rounds)).decode('utf-8')
+
+    db = SessionLocal()
+    try:
+        db.add_all([
+            User(
+                username=f"bench{i}",
+                email=f"bench{i}@benchmark.local",
+                full_name=f"Пользователь {i}",
+                role='manager',
+                is_active=True,
+                password_hash=password_hash
+            )
+            for i in range(count)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Перцентиль (q от 0 до 100) по отсортированной копии"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def _probe_loop(stop: asyncio.Event, lags: List[float], interval: float = 0.01):
+    """Задержка event loop: насколько позже запланированного просыпается задача"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - started - interval))
+
+
+async def run_mode(mode: str, logins: int, concurrency: int) -> Dict:
+    """
+    Параллельные входы в одном режиме
+
+    Returns:
+        Dict: Задержки входов и event loop (мс), пропускная способность
+    """
+    from web.app.database import SessionLocal
+    from web.app.services.auth_service import authenticate_user, authenticate_user_async, login_throttle
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failed = 0
+
+    async def login(i: int, submitted: float):
+        nonlocal failed
+        username = f"bench{i}"
+        async with semaphore:
+            db = SessionLocal()
+            try:
+                async with login_throttle.attempt(username):
+                    if mode == 'pool':
+                        user = await authenticate_user_async(db, username, PASSWORD)
+                    else:
+                        user = authenticate_user(db, username, PASSWORD)
+            finally:
+                db.close()
+            # С момента поступления запроса, включая ожидание в очереди
+            latencies.append((time.perf_counter() - submitted) * 1000)
+            if user is None:
+                failed += 1
+
+    lags: List[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe_loop(stop, lags))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(login(i, started) for i in range(logins)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await probe
+
+    lags_ms = [lag * 1000 for lag in lags]
+    return {
+        'mode': mode,
+        'logins': logins,
+        'failed': failed,
+        'elapsed_s': elapsed,
+        'throughput': logins / elapsed if elapsed else 0.0,
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+        'loop_lag_p50': percentile(lags_ms, 50),
+        'loop_lag_max': max(lags_ms, default=0.0),
+        'loop_lag_mean': statistics.fmean(lags_ms) if lags_ms else 0.0
+    }
+
+
+def format_report(results: List[Dict], settings) -> str:
+    """Отчёт в виде таблицы"""
+    lines = [
+        f"bcrypt cost={settings.bcrypt_rounds}, потоков={settings.bcrypt_max_workers}",
+        f"{'режим':<8}{'входов':>8}{'ошибок':>8}{'вход/с':>9}{'p50 мс':>9}{'p95 мс':>9}{'p99 мс':>9}"
+        f"{'loop p50':>10}{'loop max':>10}"
+    ]
+    for result in results:
+        lines.append(
+            f"{result['mode']:<8}{result['logins']:>8}{result['failed']:>8}{result['throughput']:>9.1f}"
+            f"{result['p50']:>9.0f}{result['p95']:>9.0f}{result['p99']:>9.0f}"
+            f"{result['loop_lag_p50']:>10.1f}{result['loop_lag_max']:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+async def run_benchmark(args: argparse.Namespace) -> List[Dict]:
+    from web.app.config import settings
+    from web.app.database import Base, engine
+
+    modes = ['pool', 'inline'] if args.mode == 'both' else [args.mode]
+    results = []
+    for mode in modes:
+        # Свежие хеши для каждого режима: пересчёт cost тоже входит в замер
+        seed_rounds = args.seed_rounds or settings.bcrypt_rounds
+        Base.metadata.drop_all(bind=engine)
+        seed_users(args.logins, seed_rounds)
+        results.append(await run_mode(mode, args.logins, args.concurrency))
+    return results
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    configure_environment(args)
+
+    from web.app.config import settings
+
+    results = asyncio.run(run_benchmark(args))
+    print(format_report(results, settings))
+
+
+if __name__ == '__main__':
+    main()